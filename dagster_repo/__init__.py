@@ -27,11 +27,16 @@ from dagster_repo.resources import get_db_resource
 DBT_PROJECT_DIR = Path(__file__).joinpath("..", "..", "dbt_project").resolve()
 
 all_assets = load_assets_from_modules([core, gitlab, reports])
+jobs = []
+sensors = []
 
 try:
-    from dagster_repo.assets.dbt import devops_dbt_assets
+    from dagster_repo.assets.dbt import DBT_SOURCE_CHANGES_JOB, dbt_source_change_sensor, devops_dbt_assets
 
     all_assets.append(devops_dbt_assets)
+    # Selective dbt builds triggered by source watermarks (see dbt_source_change_sensor)
+    jobs.append(DefineAssetJob(name=DBT_SOURCE_CHANGES_JOB, selection=AssetSelection.assets(devops_dbt_assets)))
+    sensors.append(dbt_source_change_sensor)
 except ImportError:
     pass
 
@@ -55,6 +60,7 @@ audit_report_schedule = ScheduleDefinition(
 defs = Definitions(
     assets=all_assets,
     resources=resources,
-    jobs=[audit_report_job],
+    jobs=[audit_report_job, *jobs],
     schedules=[audit_report_schedule],
+    sensors=sensors,
 )
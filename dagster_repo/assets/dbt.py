@@ -4,16 +4,27 @@ This module defines the integration between Dagster and dbt, allowing dbt models
 to be managed as Software-Defined Assets (SDA) within the Dagster ecosystem.
 """
 
+import json
 import os
+from datetime import datetime
 from pathlib import Path
 
-from dagster import AssetExecutionContext
+from dagster import AssetExecutionContext, RunRequest, SensorEvaluationContext, SkipReason, sensor
 from dagster_dbt import DbtCliResource, dbt_assets
+from sqlalchemy.orm import Session
+
+from dagster_repo.resources import DatabaseResource
+from devops_collector.config import settings
+from devops_collector.core.dbt_trigger import changed_sources, read_sync_watermarks, source_selectors
 
 
 DBT_PROJECT_DIR = Path(__file__).joinpath("..", "..", "..", "dbt_project").resolve()
 dbt_resource = DbtCliResource(project_dir=os.fspath(DBT_PROJECT_DIR))
 
+# Run tag carrying the dbt selection computed by dbt_source_change_sensor.
+DBT_SELECT_TAG = "devops/dbt_select"
+DBT_SOURCE_CHANGES_JOB = "dbt_source_changes_job"
+
 
 @dbt_assets(manifest=DBT_PROJECT_DIR.joinpath("target", "manifest.json"))
 def devops_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource):
@@ -23,7 +34,44 @@ def devops_dbt_assets(context: AssetExecutionContext, dbt: DbtCliResource):
         context: The Dagster execution context.
         dbt: The dbt CLI resource used to execute commands.
 
+    Runs started by dbt_source_change_sensor carry a dbt selection in the
+    DBT_SELECT_TAG run tag and only build the changed sources' downstream models.
+
     Yields:
         Dagster events for each dbt artifact produced during execution.
     """
-    yield from dbt.cli(["build"], context=context).get_artifacts()
+    selection = context.run.tags.get(DBT_SELECT_TAG)
+    args = ["build", "--select", *selection.split()] if selection else ["build"]
+    yield from dbt.cli(args, context=context).get_artifacts()
+
+
+@sensor(job_name=DBT_SOURCE_CHANGES_JOB, minimum_interval_seconds=settings.scheduler.dbt_debounce_seconds)
+def dbt_source_change_sensor(context: SensorEvaluationContext, db: DatabaseResource):
+    """Requests a selective dbt build for sources whose sync watermark advanced.
+
+    The sensor cursor stores the per-source watermarks seen on the previous tick,
+    so syncs finishing within one sensor interval coalesce into a single run.
+
+    Args:
+        context: The Dagster sensor evaluation context.
+        db: The database resource used to read sync watermarks.
+
+    Returns:
+        A RunRequest tagged with the dbt selection, or a SkipReason.
+    """
+    previous = {source: datetime.fromisoformat(value) for source, value in json.loads(context.cursor).items()} if context.cursor else None
+    # Resources are rebuilt for every sensor tick, so the engine is disposed here rather than cached.
+    engine = db.get_engine()
+    try:
+        with Session(engine) as session:
+            current = read_sync_watermarks(session)
+    finally:
+        engine.dispose()
+    changed = changed_sources(previous, current)
+    context.update_cursor(json.dumps({source: value.isoformat() for source, value in current.items()}))
+    if not changed:
+        return SkipReason("No source received new data since the last evaluation.")
+    return RunRequest(
+        run_key=f"dbt-sources-{max(current[source] for source in changed).isoformat()}",
+        tags={DBT_SELECT_TAG: " ".join(source_selectors(changed))},
+    )
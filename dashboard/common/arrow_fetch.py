@@ -0,0 +1,111 @@
+"""PostgreSQL → Arrow 读取路径
+
+pd.read_sql 会先把每一行构造成 Python 元组再组装 DataFrame，宽表上这是主要开销。
+这里用 COPY (query) TO STDOUT 取回 CSV 字节流，交给 Arrow 的多线程 C++ 解析器，
+列类型按结果集描述中的 PostgreSQL 类型 OID 显式指定 (不做推断)，
+再转换为 Arrow-backed pandas dtypes，整个过程不经过逐行的 Python 对象。
+"""
+
+import io
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+# PostgreSQL 类型 OID → Arrow 类型；结果集含其他类型 (json、数组、interval 等) 时回退 read_sql
+PG_ARROW_TYPES = {
+    16: pa.bool_(),
+    18: pa.string(),
+    19: pa.string(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    25: pa.string(),
+    26: pa.int64(),
+    700: pa.float32(),
+    701: pa.float64(),
+    1042: pa.string(),
+    1043: pa.string(),
+    1082: pa.date32(),
+    1083: pa.time64("us"),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+    # numeric 在看板中仅用于展示与聚合，按 float64 读取
+    1700: pa.float64(),
+    2950: pa.string(),
+}
+
+
+def _pandas_dtype(arrow_type: pa.DataType):
+    """Arrow 类型 → pandas dtype。
+
+    字符串保留 object：plotly 5 无法序列化类别轴上的 pd.NA，其余类型使用 ArrowDtype。
+    """
+    if pa.types.is_string(arrow_type):
+        return None
+    return pd.ArrowDtype(arrow_type)
+
+
+def _render(conn: Connection, cursor, query: str, params: dict | None) -> bytes:
+    """把 :name 占位的 SQL 与参数渲染为可嵌入 COPY 的语句 (由驱动负责转义)。"""
+    compiled = text(query).compile(dialect=conn.dialect)
+    return cursor.mogrify(str(compiled), compiled.construct_params(params or {})).strip().rstrip(b";")
+
+
+def read_arrow(conn: Connection, query: str, params: dict | None = None) -> pd.DataFrame | None:
+    """通过 COPY + Arrow 读取查询结果。
+
+    Args:
+        conn: PostgreSQL (psycopg2) 连接
+        query: SQL 语句，参数使用 :name 占位
+        params: 绑定参数
+
+    Returns:
+        Arrow-backed DataFrame；结果集包含不支持的列类型或解析失败时返回 None，由调用方回退 read_sql
+    """
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        sql = _render(conn, cursor, query, params)
+        # LIMIT 0 只规划不执行，用于取得列名与类型
+        cursor.execute(b"SELECT * FROM (" + sql + b") AS q LIMIT 0")
+        names = [col.name for col in cursor.description]
+        try:
+            types = [PG_ARROW_TYPES[col.type_code] for col in cursor.description]
+        except KeyError:
+            return None
+
+        # 只影响输出格式 (ISO 8601)，时间戳带时区偏移，由 Arrow 统一换算为 UTC
+        cursor.execute("SET LOCAL DateStyle = 'ISO'")
+        buffer = io.BytesIO()
+        cursor.copy_expert(b"COPY (" + sql + b") TO STDOUT WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+
+    if not buffer.tell():
+        table = pa.schema([pa.field(name, type_) for name, type_ in zip(names, types, strict=True)]).empty_table()
+        return table.to_pandas(types_mapper=_pandas_dtype)
+
+    # 列名按位置给出 (允许重名)，类型按位置映射到 Arrow 自动生成的列名
+    auto_names = [f"f{i}" for i in range(len(names))]
+    try:
+        table = pa_csv.read_csv(
+            pa.BufferReader(pa.py_buffer(buffer.getbuffer())),
+            read_options=pa_csv.ReadOptions(column_names=auto_names),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=dict(zip(auto_names, types, strict=True)),
+                true_values=["t"],
+                false_values=["f"],
+                # PG 的 CSV 中 NULL 为未加引号的空值，空字符串为 ""
+                null_values=[""],
+                strings_can_be_null=True,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+    except pa.ArrowInvalid:
+        return None
+    table = table.rename_columns(names)
+    return table.to_pandas(types_mapper=_pandas_dtype, split_blocks=True, self_destruct=True)
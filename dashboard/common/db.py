@@ -1,8 +1,184 @@
-from sqlalchemy import create_engine
+"""Dashboard 数据访问层
 
+整个 Streamlit 进程共享一个带连接池的 Engine；查询结果按 SQL + 参数缓存，
+并以最近一次 dbt 运行完成时间 (dbt_run_log，由 on-run-end 钩子写入) 作为数据版本：
+dbt 完成后版本变化，旧结果自然失效，并发访问的用户共享同一份结果。
+
+PostgreSQL 上默认通过 COPY + Arrow 取数 (见 arrow_fetch)，数值/时间列为 Arrow-backed dtypes。
+
+页面读取大型 mart 时使用 query_mart / distinct_values，把侧边栏过滤、日期窗口、
+聚合与 Top-N 下推到 SQL，避免整表读入 pandas 后再过滤。
+"""
+
+import re
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from dashboard.common.arrow_fetch import read_arrow
 from devops_collector.config import settings
 
 
-def get_db_engine():
-    """Returns a SQLAlchemy engine using the project settings."""
-    return create_engine(settings.database.uri)
+# 数据版本不变时查询结果的最长缓存时间 (秒)
+QUERY_CACHE_TTL = 3600
+# 轮询 dbt 运行记录的间隔 (秒)，即 dbt 完成后看板最迟多久切换到新数据
+DATA_VERSION_TTL = 30
+
+
+@st.cache_resource
+def get_db_engine() -> Engine:
+    """Returns the process-wide pooled SQLAlchemy engine."""
+    return create_engine(settings.database.uri, pool_size=5, max_overflow=10, pool_pre_ping=True, pool_recycle=1800)
+
+
+@st.cache_data(ttl=DATA_VERSION_TTL, show_spinner=False)
+def get_data_version() -> str:
+    """返回最近一次 dbt 运行的完成时间，用作查询缓存的数据版本 (无运行记录时为空串)。"""
+    try:
+        with get_db_engine().connect() as conn:
+            finished_at = conn.execute(text("SELECT max(finished_at) FROM dbt_run_log")).scalar()
+    except SQLAlchemyError:
+        return ""
+    return str(finished_at) if finished_at else ""
+
+
+def read_query(query: str, params: dict | None = None) -> pd.DataFrame:
+    """执行查询并返回 DataFrame (不经过缓存)。"""
+    with get_db_engine().connect() as conn:
+        if settings.database.arrow_fetch and conn.dialect.name == "postgresql":
+            df = read_arrow(conn, query, params)
+            if df is not None:
+                return df
+        return pd.read_sql(text(query), conn, params=params)
+
+
+@st.cache_data(ttl=QUERY_CACHE_TTL, max_entries=512, show_spinner=False)
+def _cached_query(query: str, params: dict | None, data_version: str) -> pd.DataFrame:
+    """按 (SQL, 参数, 数据版本) 缓存的查询结果。"""
+    return read_query(query, params)
+
+
+def run_query(query: str, params: dict | None = None) -> pd.DataFrame:
+    """执行查询并返回 DataFrame，结果在所有会话间共享，dbt 重新运行后自动失效。
+
+    Args:
+        query: SQL 语句，参数使用 :name 占位
+        params: 绑定参数
+    """
+    return _cached_query(query, params, get_data_version())
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+_OPERATORS = {"=", "!=", "<>", "<", "<=", ">", ">=", "like"}
+
+
+def _identifier(name: str) -> str:
+    """校验表名/列名，防止把非标识符拼入 SQL。"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"Invalid SQL identifier: {name!r}")
+    return name
+
+
+def build_where(
+    filters: Mapping[str, Any] | None = None,
+    date_column: str | None = None,
+    since: Any = None,
+    until: Any = None,
+) -> tuple[str, dict]:
+    """根据过滤条件生成 WHERE 子句与绑定参数。
+
+    filters 的键为列名，可带比较符后缀 (如 "risk_score >=")；值为列表/元组/集合时生成 IN
+    (后缀为 != 或 <> 时生成 NOT IN，其他比较符不能搭配集合)，
+    值为 None 或空集合时忽略该条件 (对应侧边栏"全部")。日期窗口为 [since, until)。
+
+    Returns:
+        (以 " WHERE " 开头的子句或空串, 参数字典)
+    """
+    clauses, params = [], {}
+    for key, value in (filters or {}).items():
+        column, _, op = key.strip().partition(" ")
+        column, op = _identifier(column), (op.strip().lower() or "=")
+        if op not in _OPERATORS:
+            raise ValueError(f"Unsupported operator: {op!r}")
+        if value is None:
+            continue
+        name = f"p{len(params)}"
+        if isinstance(value, list | tuple | set | frozenset):
+            values = sorted(value, key=str) if isinstance(value, set | frozenset) else list(value)
+            if not values:
+                continue
+            if op not in ("=", "!=", "<>"):
+                raise ValueError(f"Operator {op!r} cannot be used with a list of values")
+            names = [f"{name}_{i}" for i in range(len(values))]
+            membership = "IN" if op == "=" else "NOT IN"
+            clauses.append(f"{column} {membership} ({', '.join(':' + n for n in names)})")
+            params.update(zip(names, values, strict=True))
+        else:
+            clauses.append(f"{column} {op.upper()} :{name}")
+            params[name] = value
+    if date_column:
+        if since is not None:
+            clauses.append(f"{_identifier(date_column)} >= :since")
+            params["since"] = since
+        if until is not None:
+            clauses.append(f"{_identifier(date_column)} < :until")
+            params["until"] = until
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+def build_mart_query(
+    table: str,
+    columns: Sequence[str] = ("*",),
+    *,
+    filters: Mapping[str, Any] | None = None,
+    date_column: str | None = None,
+    since: Any = None,
+    until: Any = None,
+    group_by: Sequence[str] = (),
+    order_by: str | None = None,
+    descending: bool = True,
+    limit: int | None = None,
+) -> tuple[str, dict]:
+    """生成在数据库端完成过滤、聚合与 Top-N 的 SELECT 语句。
+
+    Args:
+        table: 表名，如 "public_marts.fct_code_hotspots"
+        columns: 选取的列或聚合表达式 (由页面代码给定，如 "count(*) AS total_files")
+        filters: 过滤条件，见 build_where
+        date_column: 日期窗口作用的列
+        since: 窗口起点 (含)
+        until: 窗口终点 (不含)
+        group_by: 分组列
+        order_by: 排序列
+        descending: 是否倒序
+        limit: 最多返回的行数
+
+    Returns:
+        (SQL, 绑定参数)
+    """
+    where, params = build_where(filters, date_column, since, until)
+    query = f"SELECT {', '.join(columns)} FROM {_identifier(table)}{where}"
+    if group_by:
+        query += " GROUP BY " + ", ".join(_identifier(c) for c in group_by)
+    if order_by:
+        query += f" ORDER BY {_identifier(order_by)} {'DESC' if descending else 'ASC'}"
+    if limit is not None:
+        query += f" LIMIT {int(limit)}"
+    return query, params
+
+
+def query_mart(table: str, columns: Sequence[str] = ("*",), **options: Any) -> pd.DataFrame:
+    """按 build_mart_query 的参数读取 mart，结果经过 run_query 缓存。"""
+    return run_query(*build_mart_query(table, columns, **options))
+
+
+def distinct_values(table: str, column: str, filters: Mapping[str, Any] | None = None) -> list:
+    """返回某列的去重取值 (升序，不含 NULL)，用于侧边栏选项。"""
+    column = _identifier(column)
+    df = query_mart(table, [f"DISTINCT {column}"], filters=filters, order_by=column, descending=False)
+    return df[column].dropna().tolist()
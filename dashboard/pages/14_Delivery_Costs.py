@@ -2,30 +2,39 @@
 
 import plotly.express as px
 import streamlit as st
-from utils import run_query, set_page_config
+from utils import distinct_values, query_mart, set_page_config
 
 
+MART = "public_marts.fct_delivery_costs"
+
 set_page_config()
 st.title("💸 交付成本与 FinOps (Delivery Costs)")
 st.markdown("---")
-costs_df = run_query("SELECT * FROM public_marts.fct_delivery_costs")
-if not costs_df.empty:
+
+st.sidebar.header("数据筛选")
+selected_ratings = st.sidebar.multiselect("成本效益等级", distinct_values(MART, "efficiency_rating"))
+top_n = st.sidebar.slider("展示成本 Top N 项目", 5, 200, 20, step=5)
+filters = {"efficiency_rating": selected_ratings}
+
+summary = query_mart(MART, ["coalesce(sum(total_cost), 0) AS total_cost", "count(*) AS project_count"], filters=filters)
+project_count = int(summary["project_count"].iloc[0])
+if project_count:
+    costs_df = query_mart(MART, filters=filters, order_by="total_cost", limit=top_n)
     st.markdown("### 交付成本概览")
     c1, c2 = st.columns(2)
-    c1.metric("总估算成本", f"${costs_df['total_estimated_cost'].sum():,.2f}")
-    c2.metric("涵盖项目数", len(costs_df))
-    fig_costs = px.pie(
-        costs_df, values="total_estimated_cost", names="project_name", title="各项目估算交付成本分布 (USD)", hole=0.4
-    )
+    c1.metric("总估算成本", f"${float(summary['total_cost'].iloc[0]):,.2f}")
+    c2.metric("涵盖项目数", project_count)
+    fig_costs = px.pie(costs_df, values="total_cost", names="project_name", title=f"成本 Top {top_n} 项目交付成本分布 (USD)", hole=0.4)
     st.plotly_chart(fig_costs, use_container_width=True)
     st.markdown("### 成本明细表")
     st.dataframe(costs_df, use_container_width=True)
     fig_bar = px.bar(
         costs_df,
         x="project_name",
-        y=["labor_estimated_score", "infra_cost_factor"],
-        title="成本结构分析 (人工分数 vs 基建因子)",
-        barmode="group",
+        y="cost_per_mr",
+        color="efficiency_rating",
+        hover_data=["prod_deploys"],
+        title="单 MR 交付成本 (按成本效益等级着色)",
     )
     st.plotly_chart(fig_bar, use_container_width=True)
 else:
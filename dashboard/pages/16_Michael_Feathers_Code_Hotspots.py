@@ -1,9 +1,7 @@
-import pandas as pd
 import plotly.express as px
 import streamlit as st
-from sqlalchemy import text
 
-from dashboard.common.db import get_db_engine
+from dashboard.common.db import distinct_values, query_mart
 
 
 st.set_page_config(page_title="Code Hotspots Radar", page_icon="[Heat]", layout="wide")
@@ -61,51 +59,57 @@ st.markdown(
 )
 
 
-# --- Data Loading ---
-@st.cache_data(ttl=600)
-def load_data():
-    engine = get_db_engine()
-    query = "SELECT * FROM public_marts.fct_code_hotspots"
-    with engine.connect() as conn:
-        return pd.read_sql(text(query), conn)
-
-
-df = load_data()
+# --- Sidebar Filters ---
+MART = "public_marts.fct_code_hotspots"
 
-if df.empty:
+unique_projects = distinct_values(MART, "project_id")
+if not unique_projects:
     st.info("No data available yet. Please run dbt to build fct_code_hotspots.")
     st.stop()
 
-# --- Sidebar Filters ---
-unique_projects = sorted(df["project_id"].unique())
-selected_projects = st.sidebar.multiselect("Filter by Project", unique_projects, default=unique_projects)
-
-if selected_projects:
-    filtered_df = df[df["project_id"].isin(selected_projects)]
-else:
-    filtered_df = df
+selected_projects = st.sidebar.multiselect("Filter by Project (empty = all)", unique_projects)
+top_n = st.sidebar.slider("Top N files by risk", 100, 10000, 2000, step=100)
+filters = {"project_id": selected_projects}
+
+summary = query_mart(
+    MART,
+    [
+        "count(*) AS total_files",
+        "coalesce(sum(CASE WHEN risk_zone = 'RED_ZONE' THEN 1 ELSE 0 END), 0) AS red_count",
+        "coalesce(avg(churn_90d), 0) AS avg_churn",
+        "coalesce(max(risk_factor), 0) AS max_risk",
+    ],
+    filters=filters,
+).iloc[0]
+filtered_df = query_mart(
+    MART,
+    ["project_id", "file_path", "churn_90d", "estimated_loc", "risk_factor", "risk_zone", "project_risk_rank", "last_modified_at"],
+    filters=filters,
+    order_by="risk_factor",
+    limit=top_n,
+)
 
 # --- Global KPIs ---
 kpi1, kpi2, kpi3, kpi4 = st.columns(4)
 with kpi1:
     st.markdown(
-        f'<div class="glass-card"><p>Total Files</p><p class="metric-value">{len(filtered_df)}</p></div>',
+        f'<div class="glass-card"><p>Total Files</p><p class="metric-value">{int(summary["total_files"])}</p></div>',
         unsafe_allow_html=True,
     )
 with kpi2:
-    red_count = len(filtered_df[filtered_df["risk_zone"] == "RED_ZONE"])
+    red_count = int(summary["red_count"])
     st.markdown(
         f'<div class="glass-card"><p>Red Zone (Critical)</p><p class="metric-value" style="background: linear-gradient(90deg, #ef4444, #f87171); -webkit-background-clip: text;">{red_count}</p></div>',
         unsafe_allow_html=True,
     )
 with kpi3:
-    avg_churn = round(filtered_df["churn_90d"].mean(), 1)
+    avg_churn = round(float(summary["avg_churn"]), 1)
     st.markdown(
         f'<div class="glass-card"><p>Avg Churn (90d)</p><p class="metric-value">{avg_churn}</p></div>',
         unsafe_allow_html=True,
     )
 with kpi4:
-    max_risk = round(filtered_df["risk_factor"].max(), 1)
+    max_risk = round(float(summary["max_risk"]), 1)
     st.markdown(
         f'<div class="glass-card"><p>Peak Risk Score</p><p class="metric-value">{max_risk}</p></div>',
         unsafe_allow_html=True,
@@ -116,7 +120,7 @@ col_main, col_list = st.columns([2, 1])
 
 with col_main:
     st.markdown('<div class="glass-card">', unsafe_allow_html=True)
-    st.subheader("Complexity vs Churn Quadrant")
+    st.subheader(f"Complexity vs Churn Quadrant (Top {len(filtered_df)} by risk)")
 
     fig = px.scatter(
         filtered_df,
@@ -143,7 +147,7 @@ with col_main:
 
 with col_list:
     st.subheader("Critical Hotspots")
-    hotspots = filtered_df[filtered_df["risk_zone"] == "RED_ZONE"].sort_values("risk_factor", ascending=False).head(15)
+    hotspots = query_mart(MART, filters={**filters, "risk_zone": "RED_ZONE"}, order_by="risk_factor", limit=15)
 
     if not hotspots.empty:
         for _, row in hotspots.iterrows():
@@ -171,8 +175,6 @@ with col_list:
 # --- Detailed View ---
 with st.expander("Full Data Explorer"):
     st.dataframe(
-        filtered_df[
-            ["project_id", "file_path", "churn_90d", "estimated_loc", "risk_factor", "risk_zone", "last_modified_at"]
-        ].sort_values("risk_factor", ascending=False),
+        filtered_df[["project_id", "file_path", "churn_90d", "estimated_loc", "risk_factor", "risk_zone", "last_modified_at"]],
         use_container_width=True,
     )
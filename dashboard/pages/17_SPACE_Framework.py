@@ -50,18 +50,18 @@ st.markdown(
 
 
 # --- Data Loading ---
-@st.cache_data(ttl=600)
 def load_space_data():
-    # v3.0 Use dws_space_metrics_daily
+    # 读取 dbt 物化的预聚合表 (日期 + 部门粒度)，合计 / 人数即逐人平均
     query = """
-    SELECT 
-        avg(s_satisfaction) as satisfaction,
-        avg(p_performance) as performance,
-        avg(a_activity) as activity,
-        avg(c_collaboration) as communication,
-        avg(e_efficiency_hours) as efficiency,
-        (avg(s_satisfaction) + avg(p_performance) + avg(a_activity) + avg(c_collaboration) + avg(e_efficiency_hours)) / 5.0 as total
-    FROM public_marts.dws_space_metrics_daily
+    SELECT
+        sum(sum_satisfaction) / sum(user_count) as satisfaction,
+        sum(sum_performance) / sum(user_count) as performance,
+        sum(sum_activity) / sum(user_count) as activity_score,
+        sum(sum_collaboration) / sum(user_count) as communication,
+        sum(sum_efficiency_hours) / sum(user_count) as efficiency,
+        (sum(sum_satisfaction) + sum(sum_performance) + sum(sum_activity) + sum(sum_collaboration) + sum(sum_efficiency_hours))
+            / sum(user_count) / 5.0 as total
+    FROM public_marts.rpt_dash_space_team_daily
     WHERE metric_date >= CURRENT_DATE - INTERVAL '30 days'
     """
     df = run_query(query)
@@ -208,8 +208,8 @@ with col_insights:
 # --- Regional Heatmap or Trend ---
 st.subheader("📈 团队效能演进 (Team Evolution)")
 trend_query = """
-SELECT metric_date, avg(total_space_score) as total_score 
-FROM public_marts.dws_space_metrics_daily 
+SELECT metric_date, sum(sum_total_score) / sum(user_count) as total_score
+FROM public_marts.rpt_dash_space_team_daily
 GROUP BY 1 ORDER BY 1
 """
 trend_df = run_query(trend_query)
@@ -11,9 +11,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from sqlalchemy import text
 
-from dashboard.common.db import get_db_engine
+from dashboard.common.db import run_query
 
 
 st.set_page_config(page_title="Value Stream Management", page_icon="🌊", layout="wide")
@@ -43,25 +42,20 @@ st.markdown(
 
 
 # --- Data Loading ---
-@st.cache_data(ttl=600)
 def load_flow_data():
-    engine = get_db_engine()
-
     try:
-        # v3.0 Update: Use dws layer
-        query = "SELECT * FROM public_marts.dws_flow_metrics_weekly"
-        with engine.connect() as conn:
-            df_weekly = pd.read_sql(text(query), conn)
+        # 读取 dbt 物化的预聚合表：周汇总保留最近 52 周，明细只含近 90 天
+        query = "SELECT * FROM public_marts.rpt_dash_flow_weekly WHERE metric_week >= CURRENT_DATE - INTERVAL '52 weeks'"
+        df_weekly = run_query(query)
 
         # Raw items for scatter
-        query_items = "SELECT * FROM public_marts.view_flow_items WHERE created_at >= CURRENT_DATE - INTERVAL '90 days'"
-        with engine.connect() as conn:
-            df_items = pd.read_sql(text(query_items), conn)
+        query_items = "SELECT * FROM public_marts.rpt_dash_flow_items_recent WHERE created_at >= CURRENT_DATE - INTERVAL '90 days'"
+        df_items = run_query(query_items)
 
         return df_weekly, df_items
 
     except Exception as e:
-        st.warning(f"无法加载价值流数据 (dws_flow_metrics_weekly)。请运行 dbt 模型。错误: {e}")
+        st.warning(f"无法加载价值流数据 (rpt_dash_flow_weekly)。请运行 dbt 模型。错误: {e}")
         return pd.DataFrame(), pd.DataFrame()
 
 
@@ -71,12 +65,6 @@ if df_weekly.empty:
     st.info("No Flow data available. Ensure issues are synced and labeled correctly.")
     st.stop()
 
-# --- Sidebar Filters ---
-projects = df_weekly["project_id"].unique()  # Note: View returns ID, usually join name in View or here
-if "project_id" in df_weekly.columns:
-    # Simple filter if logic complex
-    pass
-
 # --- 1. Flow Distribution (Allocation) ---
 st.subheader("1. Flow Distribution (Allocations)")
 st.caption("Are we investing enough in Debt and Risk? Or drowning in Defects?")
@@ -124,7 +112,7 @@ with c2:
             y="flow_time_days",
             color="flow_type",
             color_discrete_map={"Feature": "#5B9BD5", "Defect": "#C00000", "Debt": "#FFC000", "Risk": "#ED7D31"},
-            hover_data=["title", "project_name"],
+            hover_data=["title", "project_id"],
             title="Time to Close (Days) by Item",
         )
         st.plotly_chart(fig_time, use_container_width=True)
@@ -135,19 +123,14 @@ with c2:
 st.subheader("4. Current Flow Load (WIP)")
 st.caption("Snapshot of currently open work items. High WIP = Bottleneck.")
 
-# Calculate current WIP from items view (Active items)
-# Note: Re-querying view might be better for real-time listing, but reusing cached df_items is safer for now if we load 'opened' too.
-# For simplicity, we query a summary now.
+# WIP 快照由 dbt 运行时物化 (rpt_dash_flow_wip)
 try:
-    engine = get_db_engine()
-    with engine.connect() as conn:
-        wip_query = """
-        SELECT flow_type, count(*) as count 
-        FROM public_marts.view_flow_items 
-        WHERE state = 'opened' 
-        GROUP BY flow_type
-        """
-        wip_df = pd.read_sql(text(wip_query), conn)
+    wip_query = """
+    SELECT flow_type, sum(wip_count) as count
+    FROM public_marts.rpt_dash_flow_wip
+    GROUP BY flow_type
+    """
+    wip_df = run_query(wip_query)
 
     if not wip_df.empty:
         fig_wip = px.pie(
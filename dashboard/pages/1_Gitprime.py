@@ -4,12 +4,10 @@
 核心指标包括 ELOC 分数、Impact (影响力)、Churn Rate (近期代码重写率) 以及 Sherpa Score (协作贡献)。
 """
 
-import pandas as pd
 import plotly.express as px
 import streamlit as st
-from sqlalchemy import create_engine, text
 
-from devops_collector.config import settings
+from dashboard.common.db import run_query
 
 
 # Page Configuration
@@ -50,77 +48,9 @@ st.markdown(
 )
 
 
-# Database Connection
-@st.cache_resource
-def get_db_engine():
-    """Create and cache the database engine connection.
-
-    Returns:
-        sqlalchemy.engine.Engine: Database engine instance.
-    """
-    return create_engine(settings.database.uri)
-
-
 def load_data():
-    """Loads leaderboard data from database with fallback logic."""
-    engine = get_db_engine()
-
-    # Query trying to join all metrics including Collaboration (Reviews)
-    query_full = """
-    SELECT 
-        u.full_name,
-        u.department_id,
-        u.primary_email,
-        COALESCE(SUM(cm.eloc_score), 0) as eloc_score,
-        COALESCE(SUM(cm.impact_score), 0) as impact_score,
-        COALESCE(SUM(cm.churn_lines), 0) as churn_lines,
-        COALESCE(SUM(cm.raw_additions), 0) as raw_additions,
-        COALESCE(SUM(cm.test_lines), 0) as test_lines,
-        COALESCE(AVG(cm.refactor_ratio), 0) as refactor_ratio,
-        COALESCE(SUM(dds.review_count), 0) as review_count,
-        count(distinct cm.commit_id) as commits_90d,
-        count(distinct date(cm.committed_at)) as active_days
-    FROM mdm_identities u
-    LEFT JOIN commit_metrics cm ON u.primary_email = cm.author_email 
-        AND cm.committed_at >= NOW() - INTERVAL '90 days'
-    LEFT JOIN daily_dev_stats dds ON u.id = dds.user_id 
-        AND dds.date >= CURRENT_DATE - INTERVAL '90 days'
-    GROUP BY u.full_name, u.department_id, u.primary_email, u.id
-    HAVING SUM(cm.eloc_score) > 0 OR SUM(dds.review_count) > 0
-    ORDER BY impact_score DESC;
-    """
-
-    # Fallback query
-    query_basic = """
-    SELECT 
-        u.full_name,
-        u.department_id,
-        u.primary_email,
-        COALESCE(SUM(cm.eloc_score), 0) as eloc_score,
-        COALESCE(SUM(cm.impact_score), 0) as impact_score,
-        COALESCE(SUM(cm.churn_lines), 0) as churn_lines,
-        COALESCE(SUM(cm.raw_additions), 0) as raw_additions,
-        COALESCE(SUM(cm.test_lines), 0) as test_lines,
-        COALESCE(AVG(cm.refactor_ratio), 0) as refactor_ratio,
-        0 as review_count,
-        count(distinct cm.commit_id) as commits_90d,
-        count(distinct date(cm.committed_at)) as active_days
-    FROM mdm_identities u
-    LEFT JOIN commit_metrics cm ON u.primary_email = cm.author_email 
-        AND cm.committed_at >= NOW() - INTERVAL '90 days'
-    GROUP BY u.full_name, u.department_id, u.primary_email
-    HAVING SUM(cm.eloc_score) > 0
-    ORDER BY impact_score DESC;
-    """
-
-    try:
-        with engine.connect() as conn:
-            df = pd.read_sql(text(query_full), conn)
-    except Exception:
-        with engine.connect() as conn:
-            df = pd.read_sql(text(query_basic), conn)
-
-    return df
+    """Loads the 90-day leaderboard from the rollup table materialised by dbt."""
+    return run_query("SELECT * FROM public_marts.rpt_dash_gitprime_users ORDER BY impact_score DESC")
 
 
 def process_metrics(df):
@@ -181,7 +111,6 @@ st.markdown(
 """,
     unsafe_allow_html=True,
 )
-st.button("Refresh Data", on_click=st.cache_resource.clear)
 
 raw_df = load_data()
 df = process_metrics(raw_df)
@@ -1,7 +1,6 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
-from dashboard.common.db import get_db_engine
+from dashboard.common.db import run_query
 
 # 页面基础配置
 st.set_page_config(page_title="Nexus FinOps Dashboard", layout="wide")
@@ -14,15 +13,12 @@ st.markdown("""
 2. **资产治理**：利用“积分制”揪出那些没人要的、“脏乱差”的组件，并提供自动化清理建议。
 """)
 
-# 连接数据库
-engine = get_db_engine()
-
 # --- 模块 1: 财务概览 ---
 st.header("1. 存储成本中心 (FinOps)")
 
 try:
     # 读取成本事实表
-    cost_df = pd.read_sql("SELECT * FROM fct_nexus_storage_costs", engine)
+    cost_df = run_query("SELECT * FROM fct_nexus_storage_costs")
     
     if not cost_df.empty:
         # 指标卡片
@@ -56,7 +52,7 @@ except Exception as e:
 st.header("2. 资源健康度 & “死亡名单”扫描")
 
 try:
-    cleanup_df = pd.read_sql("SELECT * FROM fct_nexus_cleanup_list", engine)
+    cleanup_df = run_query("SELECT * FROM fct_nexus_cleanup_list")
     
     if not cleanup_df.empty:
         # 统计各级别的数量
@@ -1,9 +1,12 @@
+from datetime import date, timedelta
+
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from sqlalchemy.sql import text
-from dashboard.common.db import get_db_engine
+
+from dashboard.common.db import query_mart, run_query
+
 
 # --- 页面基础配置 ---
 st.set_page_config(page_title="DORA 2.0 精修大盘", page_icon="🎯", layout="wide")
@@ -34,19 +37,13 @@ st.markdown("### [小白专区] 您的业务交付健康度实时雷达")
 st.info("💡 **DORA 2.0 指标定义**：以禅道“发布记录”为部署准绳，仅统计 P1 级“生产环境”事故。这比普通的自动化指标更符合业务真实体感。")
 
 # --- 数据加载 ---
-@st.cache_data(ttl=600)
 def load_data():
-    engine = get_db_engine()
     try:
-        with engine.connect() as conn:
-            dora_df = pd.read_sql(text("SELECT * FROM fct_dora_metrics_v2"), conn)
-            # 加载漏斗细节
-            funnel_df = pd.read_sql(text("SELECT * FROM int_dora_issue_commit_lifecycle"), conn)
-            return dora_df, funnel_df
-    except Exception as e:
-        return pd.DataFrame(), pd.DataFrame()
+        return run_query("SELECT * FROM fct_dora_metrics_v2")
+    except Exception:
+        return pd.DataFrame()
 
-dora_df, funnel_df = load_data()
+dora_df = load_data()
 
 if dora_df.empty:
     st.warning("🚨 尚未发现 DORA 2.0 数据。请确保已执行 `dbt run --select fct_dora_metrics_v2`。")
@@ -61,6 +58,9 @@ if selected_product != "全部":
 else:
     filtered_df = dora_df
 
+FUNNEL_WINDOWS = {"近 90 天": 90, "近 180 天": 180, "近 1 年": 365, "全部": None}
+funnel_window = st.sidebar.selectbox("漏斗统计窗口 (需求创建时间)", list(FUNNEL_WINDOWS), index=1)
+
 # --- 1. 核心四大指标 (Core 4 Highlights) ---
 st.header("1. 核心效能摘要 (DORA Core 4)")
 latest_month = filtered_df["audit_month"].max()
@@ -83,18 +83,23 @@ with m4:
 
 # --- 2. 交付漏斗分析 (Delivery Funnel) ---
 st.header("2. 交付过程漏斗 (瓶颈定位)")
-if not funnel_df.empty:
-    if selected_product != "all" and selected_product != "全部":
-        # 获取该产品的平均生命周期
-        # 注意：这里需要根据 product_id 关联，由于 streamlit 过滤器选的是名称，这里做个转换
-        pid = dora_df[dora_df["product_name"] == selected_product]["product_id"].iloc[0]
-        p_funnel = funnel_df[funnel_df["product_id"] == pid]
-    else:
-        p_funnel = funnel_df
-    
-    avg_response = p_funnel["response_lead_hours"].mean()
-    avg_dev = p_funnel["dev_duration_hours"].mean()
-    
+# 漏斗只需要平均耗时：按产品与时间窗口在数据库端聚合，不读取生命周期明细
+funnel_filters = {}
+if selected_product != "全部":
+    # streamlit 过滤器选的是名称，这里转换为 product_id
+    funnel_filters["product_id"] = int(dora_df[dora_df["product_name"] == selected_product]["product_id"].iloc[0])
+window_days = FUNNEL_WINDOWS[funnel_window]
+funnel_df = query_mart(
+    "int_dora_issue_commit_lifecycle",
+    ["count(*) AS issue_count", "coalesce(avg(response_lead_hours), 0) AS avg_response", "coalesce(avg(dev_duration_hours), 0) AS avg_dev"],
+    filters=funnel_filters,
+    date_column="issue_created_at",
+    since=date.today() - timedelta(days=window_days) if window_days else None,
+)
+if int(funnel_df["issue_count"].iloc[0]):
+    avg_response = float(funnel_df["avg_response"].iloc[0])
+    avg_dev = float(funnel_df["avg_dev"].iloc[0])
+
     fig = go.Figure(go.Funnel(
         y = ["需求响应 (等待有人领)", "代码开发 (正在写代码)", "制品发布 (最终交付)"],
         x = [avg_response + avg_dev + 10, avg_dev + 10, 10], # 模拟示意，真实逻辑可更精细
@@ -2,9 +2,8 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from sqlalchemy.sql import text
 
-from dashboard.common.db import get_db_engine
+from dashboard.common.db import run_query
 
 
 st.set_page_config(page_title="DORA Metrics", page_icon="[DORA]", layout="wide")
@@ -59,13 +58,10 @@ st.markdown(
 
 
 # --- Data Loading ---
-@st.cache_data(ttl=600)
 def load_dora_data():
-    engine = get_db_engine()
     try:
         query = "SELECT * FROM public_marts.fct_dora_metrics"
-        with engine.connect() as conn:
-            return pd.read_sql(text(query), conn)
+        return run_query(query)
     except:
         return pd.DataFrame()
 
@@ -2,18 +2,25 @@
 
 import plotly.express as px
 import streamlit as st
-from utils import run_query, set_page_config
+from utils import distinct_values, query_mart, set_page_config
 
 
+MART = "public_marts.fct_shadow_it_discovery"
+
 set_page_config()
 st.title("🕵️ 影子系统发现 (Shadow IT Discovery)")
 st.markdown("---")
-shadow_df = run_query("SELECT * FROM public_marts.fct_shadow_it_discovery")
-total_shadow = len(shadow_df[shadow_df["discovery_reason"] != "Unknown"])
-st.metric("发现的异常/影子项目", total_shadow)
-st.markdown(
-    "\n通过监控 **非标准化仓库命名**、**长期无 Readme**、**非官方 CI 工具链** 以及 **权限配置异常** 识别研发过程中的影子资产。\n"
-)
+
+st.sidebar.header("数据筛选")
+selected_status = st.sidebar.multiselect("风险等级", distinct_values(MART, "shadow_it_status"))
+min_risk = st.sidebar.slider("最低风险评分", 0, 100, 0, step=10)
+top_n = st.sidebar.number_input("展示 Top N 项目", min_value=50, max_value=5000, value=500, step=50)
+filters = {"shadow_it_status": selected_status, "risk_score >=": min_risk}
+
+summary = query_mart(MART, ["count(*) AS total_shadow"], filters={**filters, "discovery_reason !=": "Unknown"})
+st.metric("发现的异常/影子项目", int(summary["total_shadow"].iloc[0]))
+st.markdown("\n通过监控 **非标准化仓库命名**、**长期无 Readme**、**非官方 CI 工具链** 以及 **权限配置异常** 识别研发过程中的影子资产。\n")
+shadow_df = query_mart(MART, filters=filters, order_by="risk_score", limit=top_n)
 if not shadow_df.empty:
     fig = px.scatter(
         shadow_df,
@@ -27,6 +34,6 @@ if not shadow_df.empty:
     )
     st.plotly_chart(fig, use_container_width=True)
     st.markdown("### 风险项目清单")
-    st.dataframe(shadow_df.sort_values("risk_score", ascending=False), use_container_width=True)
+    st.dataframe(shadow_df, use_container_width=True)
 else:
     st.success("目前未发现任何影子 IT 风险项目。")
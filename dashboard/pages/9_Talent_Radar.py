@@ -1,9 +1,8 @@
 import pandas as pd
 import plotly.express as px
 import streamlit as st
-from sqlalchemy.sql import text
 
-from dashboard.common.db import get_db_engine
+from dashboard.common.db import run_query
 
 
 st.set_page_config(page_title="Talent Radar", page_icon="[Talent]", layout="wide")
@@ -58,26 +57,20 @@ st.markdown(
 
 
 # --- Data Loading ---
-@st.cache_data(ttl=600)
 def load_talent_data():
-    engine = get_db_engine()
     try:
         query = "SELECT * FROM public_marts.fct_talent_radar"
-        with engine.connect() as conn:
-            return pd.read_sql(text(query), conn)
+        return run_query(query)
     except:
         return pd.DataFrame()
 
 
-@st.cache_data(ttl=600)
 def load_bus_factor():
-    engine = get_db_engine()
     try:
         query = (
             "SELECT * FROM public_marts.dws_subsystem_bus_factor WHERE knowledge_risk_status != 'HEALTHY_DISTRIBUTION'"
         )
-        with engine.connect() as conn:
-            return pd.read_sql(text(query), conn)
+        return run_query(query)
     except:
         return pd.DataFrame()
 
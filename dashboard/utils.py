@@ -1,30 +1,21 @@
-"""TODO: Add module description."""
+"""Dashboard 页面公共工具 (查询与页面配置)。"""
 
-import pandas as pd
 import streamlit as st
-from sqlalchemy import create_engine
 
-from devops_collector.config import settings
+from dashboard.common.db import distinct_values, get_db_engine, query_mart, run_query
 
 
-def get_engine():
-    """Returns a SQLAlchemy engine using the project settings."""
-    return create_engine(settings.database.uri)
+__all__ = ["distinct_values", "get_engine", "query_mart", "run_query", "set_page_config"]
 
 
-@st.cache_data(ttl=1)
-def run_query(query: str):
-    """Runs a SQL query and returns a pandas DataFrame, with caching."""
-    engine = get_engine()
-    with engine.connect() as conn:
-        return pd.read_sql(query, conn)
+def get_engine():
+    """Returns the process-wide pooled SQLAlchemy engine."""
+    return get_db_engine()
 
 
 def set_page_config():
     """Standardizes page configuration for the dashboard."""
-    st.set_page_config(
-        page_title="DevOps Intelligence Dashboard", page_icon="🚀", layout="wide", initial_sidebar_state="expanded"
-    )
+    st.set_page_config(page_title="DevOps Intelligence Dashboard", page_icon="🚀", layout="wide", initial_sidebar_state="expanded")
     st.markdown(
         "\n        <style>\n        .main {\n            background-color: #0e1117;\n        }\n        .stMetric {\n            background-color: #1e2130;\n            padding: 15px;\n            border-radius: 10px;\n            border: 1px solid #3d4455;\n        }\n        h1, h2, h3 {\n            color: #ffffff;\n            font-family: 'Outfit', sans-serif;\n        }\n        </style>\n    ",
         unsafe_allow_html=True,
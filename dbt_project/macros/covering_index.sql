@@ -0,0 +1,13 @@
+{#
+    为看板预聚合表创建覆盖索引 (post_hook)。
+
+    columns 为检索/排序列，include 为附带列：页面查询只命中索引即可返回 (Index Only Scan)，
+    不回表。表物化每次重建，索引随新表一并创建。
+    索引不指定名称，由 PostgreSQL 生成不冲突的名字：post_hook 执行时旧表仅被重命名为备份表，
+    其索引仍占用原名，固定名称配合 if not exists 会跳过建索引，随后索引随备份表一起被删除。
+#}
+{% macro covering_index(columns, include=[]) %}
+    create index on {{ this }} ({{ columns | join(', ') }})
+        {%- if include %} include ({{ include | join(', ') }}){% endif %};
+    analyze {{ this }}
+{% endmacro %}
@@ -0,0 +1,24 @@
+{#
+    记录 dbt 运行完成时间 (on-run-end 钩子)。
+
+    Dashboard 以 max(finished_at) 作为查询缓存的数据版本，dbt 完成后看板缓存随之失效。
+#}
+{% macro record_dbt_run() %}
+    {% if execute %}
+        create table if not exists {{ target.schema }}.dbt_run_log (
+            invocation_id varchar(64) primary key,
+            command varchar(50),
+            models_succeeded integer,
+            models_failed integer,
+            finished_at timestamptz not null default now()
+        );
+        insert into {{ target.schema }}.dbt_run_log (invocation_id, command, models_succeeded, models_failed)
+        values (
+            '{{ invocation_id }}',
+            '{{ flags.WHICH }}',
+            {{ results | selectattr("status", "in", ["success", "pass"]) | list | length }},
+            {{ results | selectattr("status", "in", ["error", "fail"]) | list | length }}
+        )
+        on conflict (invocation_id) do nothing;
+    {% endif %}
+{% endmacro %}
@@ -1,6 +1,37 @@
 
+{{
+    config(
+        materialized='incremental',
+        unique_key='commit_sha',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['committed_date']},
+            {'columns': ['author_user_id']},
+            {'columns': ['zentao_id']}
+        ]
+    )
+}}
+
+/*
+    提交与作者对齐 (Commits with Authors)
+
+    逐条提交的身份匹配是相关子查询，开销随提交总量线性增长，因此按提交增量物化，每次只处理：
+    1. 回看窗口内的提交 (按已有最大 committed_date 往前回看 incremental_lookback_days 天)；
+    2. 尚未入表的提交：迟到的历史提交 (如新接入项目、补采) 的 committed_date 早于窗口，按 commit_sha 补入；
+    3. 此前未能匹配到作者的提交 (身份映射补齐后自动回填)。
+    loaded_at 记录该行最近一次写入的运行时间，供下游按新入库提交增量 (如 int_dora_issue_commit_lifecycle)。
+*/
+
 with commits as (
-    select * from {{ ref('stg_gitlab_commits') }}
+    select * from {{ ref('stg_gitlab_commits') }} s
+    {% if is_incremental() %}
+    where committed_date >= (select max(committed_date) - interval '{{ var("incremental_lookback_days", 3) }} days' from {{ this }})
+       or not exists (select 1 from {{ this }} t where t.commit_sha = s.commit_sha)
+       or commit_sha in (
+           select commit_sha from {{ this }}
+           where author_user_id = '00000000-0000-0000-0000-000000000000'::uuid
+       )
+    {% endif %}
 ),
 
 identities as (
@@ -25,13 +56,15 @@ joined as (
             '00000000-0000-0000-0000-000000000000'::uuid
         ) as author_user_id,
         c.author_email,
+        c.zentao_id,
         c.eloc_score,
         c.impact_score,
         c.churn_lines,
         c.file_count,
         c.test_lines,
         c.comment_lines,
-        c.refactor_ratio
+        c.refactor_ratio,
+        '{{ run_started_at }}'::timestamptz as loaded_at
     from commits c
 )
 
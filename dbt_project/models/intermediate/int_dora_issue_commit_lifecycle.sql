@@ -1,15 +1,40 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key='issue_unique_id',
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['product_id', 'issue_created_at']}
+        ]
+    )
+}}
+
 -- 禅道需求与代码提交关联中间表
 -- 小白版逻辑：通过代码提交信息里的 #123 找到对应的禅道单子，并计算工作耗时。
+-- 增量：只重算有新入库提交或禅道单子有更新的 Issue，按 issue_unique_id 整行替换。
+-- 新提交按上游 loaded_at (写入时间) 而非 committed_date 判断，迟到的历史提交也能触发重算；
+-- max_commit_loaded_at 即已处理到的入库水位。
 
 with issues as (
     select * from {{ ref('stg_zentao_issues') }}
 ),
 
 commits as (
-    select * from {{ ref('stg_gitlab_commits') }}
+    select * from {{ ref('int_commits_with_authors') }}
     where zentao_id is not null
 ),
 
+{% if is_incremental() %}
+affected_zentao_ids as (
+    select zentao_id from commits
+    where loaded_at > (select coalesce(max(max_commit_loaded_at), '-infinity'::timestamptz) from {{ this }})
+    union
+    select raw_id::text from issues
+    where updated_at >= (select max(issue_updated_at) - interval '{{ var("incremental_lookback_days", 3) }} days' from {{ this }})
+),
+{% endif %}
+
 -- 关联
 joined as (
     select
@@ -18,12 +43,17 @@ joined as (
         i.issue_type,
         i.product_id,
         i.created_at as issue_created_at,
+        i.updated_at as issue_updated_at,
         c.commit_sha,
         c.project_id as gitlab_project_id,
         c.committed_date,
-        c.author_email
+        c.author_email,
+        c.loaded_at
     from issues i
     inner join commits c on i.raw_id::text = c.zentao_id
+    {% if is_incremental() %}
+    where c.zentao_id in (select zentao_id from affected_zentao_ids)
+    {% endif %}
 ),
 
 -- 聚合每个 Issue 的开发时间线
@@ -34,9 +64,11 @@ issue_lifecycle as (
         issue_type,
         product_id,
         issue_created_at,
+        issue_updated_at,
         min(committed_date) as first_commit_at,
         max(committed_date) as last_commit_at,
         count(distinct commit_sha) as total_commits,
+        max(loaded_at) as max_commit_loaded_at,
         
         -- 计算从需求创建到开始写代码的“响应延迟”
         extract(epoch from (min(committed_date) - issue_created_at)) / 3600.0 as response_lead_hours,
@@ -44,7 +76,7 @@ issue_lifecycle as (
         -- 计算从第一行代码到最后一行代码的“开发时长”
         extract(epoch from (max(committed_date) - min(committed_date))) / 3600.0 as dev_duration_hours
     from joined
-    group by 1, 2, 3, 4, 5
+    group by 1, 2, 3, 4, 5, 6
 )
 
 select * from issue_lifecycle
@@ -0,0 +1,79 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['project_id', 'file_path', 'commit_date'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['commit_date']},
+            {'columns': ['project_id', 'file_path']}
+        ]
+    )
+}}
+
+/*
+    文件日变更汇总 (File Churn Daily)
+
+    粒度：项目 + 文件 + 提交日期。int_file_churn_metrics 的增量底座。
+    增量重算的起点取两者较早者：
+    1. 已有最新日期往前回看 incremental_lookback_days 天；
+    2. 新入库文件统计 (file_stat_id 单调递增) 所属提交的最早日期，覆盖迟到的历史提交。
+    起点之后的日期整日重算并按 unique_key 替换。
+*/
+
+with
+
+file_stats as (
+    select * from {{ ref('stg_gitlab_commit_file_stats') }}
+),
+
+commits as (
+    select commit_sha, project_id, committed_date from {{ ref('stg_gitlab_commits') }}
+),
+
+{% if is_incremental() %}
+recompute_from as (
+    select least(
+        (select max(commit_date) from {{ this }}) - {{ var('incremental_lookback_days', 3) }},
+        (
+            select min(c.committed_date)::date
+            from file_stats f
+            join commits c on f.commit_id = c.commit_sha
+            where f.file_stat_id > (select max(max_file_stat_id) from {{ this }})
+        )
+    ) as commit_date
+),
+{% endif %}
+
+joined as (
+    select
+        c.project_id,
+        f.file_path,
+        c.committed_date::date as commit_date,
+        c.committed_date,
+        f.commit_id,
+        f.file_stat_id,
+        f.code_added,
+        f.code_deleted
+    from file_stats f
+    join commits c on f.commit_id = c.commit_sha
+    where f.file_path not like '%.json'
+      and f.file_path not like '%.lock'
+      and f.file_path not like '%.md'
+      and f.file_path not like '%.txt'
+    {% if is_incremental() %}
+      and c.committed_date >= (select commit_date from recompute_from)
+    {% endif %}
+)
+
+select
+    project_id,
+    file_path,
+    commit_date,
+    count(distinct commit_id) as commit_count,
+    sum(code_added) as code_added,
+    sum(code_deleted) as code_deleted,
+    max(committed_date) as last_committed_at,
+    max(file_stat_id) as max_file_stat_id
+from joined
+group by 1, 2, 3
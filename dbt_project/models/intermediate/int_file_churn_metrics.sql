@@ -1,42 +1,63 @@
+{{
+    config(
+        materialized='incremental',
+        incremental_strategy='delete+insert',
+        unique_key=['project_id', 'file_path'],
+        on_schema_change='append_new_columns',
+        indexes=[
+            {'columns': ['last_modified_at']}
+        ]
+    )
+}}
 
-with file_stats as (
-    select * from {{ ref('stg_gitlab_commit_file_stats') }}
+/*
+    文件变更度量 (File Churn Metrics)
+
+    粒度：项目 + 文件，基于 int_file_churn_daily 汇总。
+    增量运行只重算两类文件 (其余文件的累计值与窗口计数均不会变化)：
+    1. 有新入库文件统计的文件；
+    2. 上次构建前 90 天内有提交的文件 (滑动窗口计数可能已变化)。
+    复杂度阈值 (estimated_loc > 10) 由 fct_code_hotspots 过滤，保证文件跌破阈值时此处仍被更新。
+*/
+
+with daily as (
+    select * from {{ ref('int_file_churn_daily') }}
 ),
 
-commits as (
-    select * from {{ ref('stg_gitlab_commits') }}
+{% if is_incremental() %}
+affected_files as (
+    select distinct project_id, file_path
+    from daily
+    where commit_date >= (select max(refreshed_on) from {{ this }}) - interval '90 days'
+       or max_file_stat_id > (select max(max_file_stat_id) from {{ this }})
 ),
 
-joined as (
-    select
-        f.file_path,
-        c.project_id,
-        c.committed_date,
-        f.commit_id,
-        f.code_added,
-        f.code_deleted
-    from file_stats f
-    join commits c on f.commit_id = c.commit_sha
-    where f.file_path not like '%.json'
-      and f.file_path not like '%.lock'
-      and f.file_path not like '%.md'
-      and f.file_path not like '%.txt'
+scoped as (
+    select d.*
+    from daily d
+    join affected_files a on d.project_id = a.project_id and d.file_path = a.file_path
+)
+{% else %}
+scoped as (
+    select * from daily
 )
+{% endif %}
 
 select
     project_id,
     file_path,
-    -- 90天内的变更频率 (Churn)
-    count(distinct case when committed_date >= current_date - interval '90 days' then commit_id end) as churn_90d,
+    -- 90天内的变更频率 (Churn)；提交只属于一天，按日去重计数之和即窗口内去重提交数
+    coalesce(sum(commit_count) filter (where commit_date >= current_date - interval '90 days'), 0) as churn_90d,
     -- 30天内的变更频率
-    count(distinct case when committed_date >= current_date - interval '30 days' then commit_id end) as churn_30d,
+    coalesce(sum(commit_count) filter (where commit_date >= current_date - interval '30 days'), 0) as churn_30d,
     -- 7天内的变更频率
-    count(distinct case when committed_date >= current_date - interval '7 days' then commit_id end) as churn_7d,
-    
+    coalesce(sum(commit_count) filter (where commit_date >= current_date - interval '7 days'), 0) as churn_7d,
+
     -- 预估行数 (Complexity Proxy)
     abs(sum(code_added) - sum(code_deleted)) as estimated_loc,
-    
-    max(committed_date) as last_modified_at
-from joined
+
+    max(last_committed_at) as last_modified_at,
+    max(max_file_stat_id) as max_file_stat_id,
+    current_date as refreshed_on
+from scoped
 group by 1, 2
-having abs(sum(code_added) - sum(code_deleted)) > 10
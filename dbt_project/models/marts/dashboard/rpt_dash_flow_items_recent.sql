@@ -0,0 +1,20 @@
+/*
+    看板预聚合：近 90 天价值流明细 (18_Value_Stream Flow Time 散点)
+
+    只保留页面展示窗口内的工作项与所需列，避免每次访问展开 int_flow_items 视图链。
+*/
+
+{{ config(
+    post_hook=["{{ covering_index(['created_at'], ['closed_at', 'flow_time_days', 'flow_type', 'project_id', 'title']) }}"]
+) }}
+
+select
+    work_item_id,
+    source_project_id as project_id,
+    title,
+    flow_type,
+    created_at,
+    closed_at,
+    flow_time_days
+from {{ ref('int_flow_items') }}
+where created_at >= current_date - interval '90 days'
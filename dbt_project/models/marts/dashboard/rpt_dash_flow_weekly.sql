@@ -0,0 +1,24 @@
+/*
+    看板预聚合：价值流周汇总 (18_Value_Stream)
+
+    粒度：周。跨项目合并 dws_flow_metrics_weekly，页面按周直接绘图。
+*/
+
+{{ config(
+    post_hook=["{{ covering_index(['metric_week'], ['flow_velocity', 'closed_features', 'closed_defects', 'closed_debts', 'closed_risks', 'avg_flow_time_days']) }}"]
+) }}
+
+with weekly as (
+    select * from {{ ref('dws_flow_metrics_weekly') }}
+)
+
+select
+    metric_week,
+    sum(flow_velocity) as flow_velocity,
+    sum(closed_features) as closed_features,
+    sum(closed_defects) as closed_defects,
+    sum(closed_debts) as closed_debts,
+    sum(closed_risks) as closed_risks,
+    round(sum(avg_flow_time_days * flow_velocity) / nullif(sum(flow_velocity), 0), 2) as avg_flow_time_days
+from weekly
+group by 1
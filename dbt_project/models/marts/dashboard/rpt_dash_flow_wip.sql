@@ -0,0 +1,17 @@
+/*
+    看板预聚合：当前在制品 (18_Value_Stream Flow Load)
+
+    粒度：项目 + 价值类型，统计 dbt 运行时仍处于 opened 状态的工作项。
+*/
+
+{{ config(
+    post_hook=["{{ covering_index(['flow_type'], ['project_id', 'wip_count']) }}"]
+) }}
+
+select
+    source_project_id as project_id,
+    flow_type,
+    count(*) as wip_count
+from {{ ref('int_flow_items') }}
+where current_status = 'opened'
+group by 1, 2
@@ -0,0 +1,57 @@
+/*
+    看板预聚合：开发者近 90 天 ELOC 贡献 (1_Gitprime)
+
+    粒度：用户。提交指标来自 rpt_commit_metrics，评审次数来自 dws_developer_metrics_daily。
+*/
+
+{{ config(
+    post_hook=["{{ covering_index(['impact_score'], ['full_name', 'department_id', 'primary_email', 'eloc_score', 'churn_lines', 'raw_additions', 'test_lines', 'refactor_ratio', 'review_count', 'commits_90d', 'active_days']) }}"]
+) }}
+
+with users as (
+    select user_id, real_name, department_id, email from {{ ref('stg_mdm_identities') }}
+),
+
+commits as (
+    select
+        author_user_id as user_id,
+        sum(eloc_score) as eloc_score,
+        sum(impact_score) as impact_score,
+        sum(churn_lines) as churn_lines,
+        sum(raw_additions) as raw_additions,
+        sum(test_lines) as test_lines,
+        avg(refactor_ratio) as refactor_ratio,
+        count(distinct commit_sha) as commits_90d,
+        count(distinct committed_at::date) as active_days
+    from {{ source('raw', 'rpt_commit_metrics') }}
+    where committed_at >= current_date - interval '90 days'
+      and author_user_id is not null
+    group by 1
+),
+
+reviews as (
+    select
+        user_id,
+        sum(review_count) as review_count
+    from {{ ref('dws_developer_metrics_daily') }}
+    where metric_date >= current_date - interval '90 days'
+    group by 1
+)
+
+select
+    u.real_name as full_name,
+    u.department_id,
+    u.email as primary_email,
+    coalesce(c.eloc_score, 0) as eloc_score,
+    coalesce(c.impact_score, 0) as impact_score,
+    coalesce(c.churn_lines, 0) as churn_lines,
+    coalesce(c.raw_additions, 0) as raw_additions,
+    coalesce(c.test_lines, 0) as test_lines,
+    coalesce(c.refactor_ratio, 0) as refactor_ratio,
+    coalesce(r.review_count, 0) as review_count,
+    coalesce(c.commits_90d, 0) as commits_90d,
+    coalesce(c.active_days, 0) as active_days
+from users u
+left join commits c on u.user_id = c.user_id
+left join reviews r on u.user_id = r.user_id
+where coalesce(c.eloc_score, 0) > 0 or coalesce(r.review_count, 0) > 0
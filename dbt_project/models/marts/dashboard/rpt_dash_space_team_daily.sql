@@ -0,0 +1,32 @@
+/*
+    看板预聚合：SPACE 团队日度汇总 (17_SPACE_Framework)
+
+    粒度：日期 + 部门。保存各维度的合计与人数而非平均值，
+    页面按任意日期窗口 sum(合计) / sum(人数) 即可还原逐人平均。
+*/
+
+{{ config(
+    post_hook=["{{ covering_index(['metric_date'], ['department_id', 'user_count', 'sum_satisfaction', 'sum_performance', 'sum_activity', 'sum_collaboration', 'sum_efficiency_hours', 'sum_total_score']) }}"]
+) }}
+
+with space as (
+    select * from {{ ref('dws_space_metrics_daily') }}
+),
+
+users as (
+    select user_id, department_id from {{ ref('stg_mdm_identities') }}
+)
+
+select
+    s.metric_date,
+    u.department_id,
+    count(*) as user_count,
+    sum(s.s_satisfaction) as sum_satisfaction,
+    sum(s.p_performance) as sum_performance,
+    sum(s.a_activity) as sum_activity,
+    sum(s.c_collaboration) as sum_collaboration,
+    sum(s.e_efficiency_hours) as sum_efficiency_hours,
+    sum(s.total_space_score) as sum_total_score
+from space s
+left join users u on s.user_id = u.user_id
+group by 1, 2
@@ -6,10 +6,13 @@
     1. 维度：Churn (更新频率) vs Complexity (复杂度)。
     2. 目标：识别高频率改动且高复杂度的文件，这些通常是重构的最佳候选对象。
     3. 算法：Risk Factor = Churn * log(Complexity + 2)
+    4. 只有近 90 天有改动的文件才可能 churn_90d > 0，按 last_modified_at 取增量表的近期切片 (走索引)。
 */
 
 with churn_metrics as (
     select * from {{ ref('int_file_churn_metrics') }}
+    where last_modified_at >= current_date - interval '90 days'
+      and estimated_loc > 10
 ),
 
 ranked_hotspots as (
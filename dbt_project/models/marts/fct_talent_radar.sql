@@ -10,12 +10,14 @@
 
 with 
 
+-- 只读取近 90 天的提交：int_commits_with_authors 为增量表，按 committed_date 索引范围扫描
 commits as (
     select 
         author_user_id as user_id,
         project_id,
         committed_date
     from {{ ref('int_commits_with_authors') }}
+    where committed_date >= current_date - interval '90 days'
 ),
 
 asset_weights as (
@@ -27,7 +29,6 @@ asset_weights as (
     from commits c
     left join {{ ref('stg_mdm_entity_topology') }} et 
         on c.project_id::text = et.external_resource_id
-    where c.committed_date >= current_date - interval '90 days'
     group by 1
 ),
 
@@ -0,0 +1,86 @@
+"""add cve_catalog and reference it from dependency_cves
+
+Revision ID: d7c1e4a9b2f0
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7c1e4a9b2f0"
+down_revision: str | None = "a1b2c3d4e5f6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    from sqlalchemy import inspect
+
+    inspector = inspect(bind)
+    existing_tables = inspector.get_table_names()
+
+    # 1. 建表 (已通过 add_dependency_check_tables.sql 建过的环境跳过)
+    if "cve_catalog" not in existing_tables:
+        op.create_table(
+            "cve_catalog",
+            sa.Column("cve_id", sa.String(length=50), nullable=False),
+            sa.Column("cvss_score", sa.Float(), nullable=True),
+            sa.Column("cvss_vector", sa.String(length=200), nullable=True),
+            sa.Column("severity", sa.String(length=20), nullable=True),
+            sa.Column("description", sa.Text(), nullable=True),
+            sa.Column("published_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("last_modified_date", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("references", postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), nullable=True, comment="创建时间"),
+            sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True, comment="最后更新时间"),
+            sa.Column("created_by", sa.UUID(as_uuid=True), nullable=True, comment="创建者ID"),
+            sa.Column("updated_by", sa.UUID(as_uuid=True), nullable=True, comment="最后操作者ID"),
+            sa.ForeignKeyConstraint(["created_by"], ["mdm_identities.global_user_id"], name="fk_audit_created_by"),
+            sa.ForeignKeyConstraint(["updated_by"], ["mdm_identities.global_user_id"], name="fk_audit_updated_by"),
+            sa.PrimaryKeyConstraint("cve_id"),
+        )
+        op.create_index(op.f("ix_cve_catalog_created_by"), "cve_catalog", ["created_by"], unique=False)
+        op.create_index(op.f("ix_cve_catalog_updated_by"), "cve_catalog", ["updated_by"], unique=False)
+
+    if "dependency_cves" not in existing_tables:
+        return
+
+    # 2. 回填：每个 CVE 取最近一次写入的漏洞详情，已存在的知识库条目保持不变
+    op.execute(
+        """
+        INSERT INTO cve_catalog (cve_id, cvss_score, cvss_vector, severity, description,
+                                 published_date, last_modified_date, "references", created_at, updated_at)
+        SELECT DISTINCT ON (cve_id)
+               cve_id, cvss_score, cvss_vector, severity, description,
+               published_date, last_modified_date, "references", NOW(), NOW()
+        FROM dependency_cves
+        WHERE cve_id IS NOT NULL
+        ORDER BY cve_id, COALESCE(updated_at, created_at) DESC NULLS LAST, id DESC
+        ON CONFLICT (cve_id) DO NOTHING
+        """
+    )
+
+    # 3. 外键与索引 (回填后所有 cve_id 均可在知识库中找到)
+    if not any(fk["referred_table"] == "cve_catalog" for fk in inspector.get_foreign_keys("dependency_cves")):
+        op.create_foreign_key("fk_dependency_cves_cve_id", "dependency_cves", "cve_catalog", ["cve_id"], ["cve_id"])
+    indexes = {ix["name"] for ix in inspector.get_indexes("dependency_cves")}
+    if not indexes & {"ix_dependency_cves_cve_id", "idx_dependency_cves_cve_id"}:
+        op.create_index(op.f("ix_dependency_cves_cve_id"), "dependency_cves", ["cve_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint("fk_dependency_cves_cve_id", "dependency_cves", type_="foreignkey")
+    op.drop_index(op.f("ix_dependency_cves_cve_id"), table_name="dependency_cves")
+    op.drop_index(op.f("ix_cve_catalog_updated_by"), table_name="cve_catalog")
+    op.drop_index(op.f("ix_cve_catalog_created_by"), table_name="cve_catalog")
+    op.drop_table("cve_catalog")
@@ -0,0 +1,158 @@
+"""partition stg_raw_data by collection month
+
+Revision ID: e3a9f5c2d8b1
+Revises: d7c1e4a9b2f0
+Create Date: 2026-10-19 10:38:00.000000
+
+旧的单表 stg_raw_data (自增 id 主键 + uq_raw_data_staging) 迁移为按 collected_month
+RANGE 分区的结构：主键 (source, entity_type, external_id, collected_month)、JSONB 载荷、payload_hash。
+旧表重命名后复制保留期内的数据 (payload_hash 留空，实体下次采集时重写一次即补齐)，再删除旧表。
+迁移期间请暂停 Worker。仅 PostgreSQL 执行，已分区的库直接跳过。
+"""
+
+from collections.abc import Sequence
+from datetime import UTC, date, datetime, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a9f5c2d8b1"
+down_revision: str | None = "d7c1e4a9b2f0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "stg_raw_data"
+LEGACY_TABLE = f"{TABLE}_legacy"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _rename_with_indexes(bind, old: str, new: str) -> None:
+    for index in bind.execute(sa.text("SELECT indexname FROM pg_indexes WHERE tablename = :name"), {"name": old}).scalars():
+        op.execute(f'ALTER INDEX "{index}" RENAME TO "{index}_legacy"')
+    op.rename_table(old, new)
+
+
+def _audit_columns() -> list[sa.Column]:
+    return [
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=True, comment="创建时间"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True, comment="最后更新时间"),
+        sa.Column("created_by", sa.UUID(as_uuid=True), nullable=True, comment="创建者ID"),
+        sa.Column("updated_by", sa.UUID(as_uuid=True), nullable=True, comment="最后操作者ID"),
+        sa.ForeignKeyConstraint(["created_by"], ["mdm_identities.global_user_id"], name="fk_audit_created_by"),
+        sa.ForeignKeyConstraint(["updated_by"], ["mdm_identities.global_user_id"], name="fk_audit_updated_by"),
+    ]
+
+
+def _create_audit_indexes() -> None:
+    for name in ("correlation_id", "created_by", "updated_by"):
+        op.create_index(op.f(f"ix_{TABLE}_{name}"), TABLE, [name], unique=False)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    if bind.execute(sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"), {"name": TABLE}).scalar():
+        return
+
+    has_legacy = bind.execute(sa.text("SELECT to_regclass(:name)"), {"name": TABLE}).scalar() is not None
+    if has_legacy:
+        _rename_with_indexes(bind, TABLE, LEGACY_TABLE)
+
+    op.create_table(
+        TABLE,
+        sa.Column("source", sa.String(length=50), nullable=False, comment="数据来源系统 (gitlab/jira/sonar)"),
+        sa.Column("entity_type", sa.String(length=50), nullable=False, comment="实体类型 (project/issue/pipeline)"),
+        sa.Column("external_id", sa.String(length=100), nullable=False, comment="外部系统记录ID"),
+        sa.Column("collected_month", sa.Date(), nullable=False, comment="采集月份 (分区键，取当月1日)"),
+        sa.Column("payload", postgresql.JSONB(astext_type=sa.Text()), nullable=True, comment="原始 JSON 数据负载"),
+        sa.Column("payload_hash", sa.String(length=32), nullable=True, comment="载荷内容指纹 (payload_fingerprint)"),
+        sa.Column("schema_version", sa.String(length=20), nullable=True, comment="Payload 结构版本"),
+        sa.Column("correlation_id", sa.String(length=100), nullable=True, comment="关联追踪ID"),
+        sa.Column("collected_at", sa.DateTime(timezone=True), nullable=True, comment="采集时间 (载荷最近一次变化时)"),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("source", "entity_type", "external_id", "collected_month"),
+        postgresql_partition_by="RANGE (collected_month)",
+    )
+    _create_audit_indexes()
+
+    # 保留期内各月份至之后若干个月的分区，外加 DEFAULT 分区兜底 (运行时由 ensure_raw_data_partitions 继续预建)
+    from devops_collector.config import settings
+
+    today = datetime.now(UTC).date()
+    current = today.replace(day=1)
+    since = (today - timedelta(days=settings.database.raw_data_retention_days)).replace(day=1) if has_legacy else current
+    month, last = since, _add_months(current, settings.database.raw_data_partitions_ahead)
+    while month <= last:
+        op.execute(f"CREATE TABLE \"{TABLE}_p{month:%Y%m}\" PARTITION OF {TABLE} FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')")
+        month = _add_months(month, 1)
+    op.execute(f'CREATE TABLE "{TABLE}_default" PARTITION OF {TABLE} DEFAULT')
+
+    if not has_legacy:
+        return
+    op.execute(
+        sa.text(
+            f"""
+            INSERT INTO {TABLE} (
+                source, entity_type, external_id, collected_month, payload, schema_version, correlation_id,
+                collected_at, created_at, updated_at, created_by, updated_by
+            )
+            SELECT
+                source, entity_type, external_id,
+                date_trunc('month', coalesce(collected_at, created_at, now()) AT TIME ZONE 'UTC')::date,
+                payload::jsonb, schema_version, correlation_id, collected_at, created_at, updated_at, created_by, updated_by
+            FROM {LEGACY_TABLE}
+            WHERE source IS NOT NULL AND entity_type IS NOT NULL AND external_id IS NOT NULL
+              AND coalesce(collected_at, created_at, now()) >= :since
+            ON CONFLICT DO NOTHING
+            """  # nosec B608
+        ).bindparams(since=since)
+    )
+    op.drop_table(LEGACY_TABLE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql":
+        return
+    _rename_with_indexes(bind, TABLE, LEGACY_TABLE)
+    op.create_table(
+        TABLE,
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False, comment="自增主键"),
+        sa.Column("source", sa.String(length=50), nullable=True, comment="数据来源系统 (gitlab/jira/sonar)"),
+        sa.Column("entity_type", sa.String(length=50), nullable=True, comment="实体类型 (project/issue/pipeline)"),
+        sa.Column("external_id", sa.String(length=100), nullable=True, comment="外部系统记录ID"),
+        sa.Column("payload", sa.JSON(), nullable=True, comment="原始 JSON 数据负载"),
+        sa.Column("schema_version", sa.String(length=20), nullable=True, comment="Payload 结构版本"),
+        sa.Column("correlation_id", sa.String(length=100), nullable=True, comment="关联追踪ID"),
+        sa.Column("collected_at", sa.DateTime(timezone=True), nullable=True, comment="采集时间"),
+        *_audit_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("source", "entity_type", "external_id", name="uq_raw_data_staging"),
+    )
+    _create_audit_indexes()
+    op.create_index(op.f(f"ix_{TABLE}_external_id"), TABLE, ["external_id"], unique=False)
+    # 每个实体只保留最近一个月的载荷
+    op.execute(
+        f"""
+        INSERT INTO {TABLE} (
+            source, entity_type, external_id, payload, schema_version, correlation_id,
+            collected_at, created_at, updated_at, created_by, updated_by
+        )
+        SELECT DISTINCT ON (source, entity_type, external_id)
+            source, entity_type, external_id, payload::json, schema_version, correlation_id,
+            collected_at, created_at, updated_at, created_by, updated_by
+        FROM {LEGACY_TABLE}
+        ORDER BY source, entity_type, external_id, collected_month DESC
+        """  # nosec B608
+    )
+    op.drop_table(LEGACY_TABLE)
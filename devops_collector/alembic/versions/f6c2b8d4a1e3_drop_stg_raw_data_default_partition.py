@@ -0,0 +1,60 @@
+"""drop the stg_raw_data default partition
+
+Revision ID: f6c2b8d4a1e3
+Revises: e3a9f5c2d8b1
+Create Date: 2026-10-19 16:20:00.000000
+
+存在 DEFAULT 分区时 PostgreSQL 不允许 DETACH PARTITION ... CONCURRENTLY，保留期清理只能以
+ACCESS EXCLUSIVE 锁脱离过期分区。月份分区已由 Worker 启动与调度器每日预建，这里去掉 DEFAULT 分区：
+先脱离，为其中数据所在的月份补建分区并写回父表，再删除。仅 PostgreSQL 执行。
+"""
+
+from collections.abc import Sequence
+from datetime import date
+
+import sqlalchemy as sa
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f6c2b8d4a1e3"
+down_revision: str | None = "e3a9f5c2d8b1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+TABLE = "stg_raw_data"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_partitioned(bind) -> bool:
+    return bool(bind.execute(sa.text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"), {"name": TABLE}).scalar())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _is_partitioned(bind):
+        return
+    if bind.execute(sa.text("SELECT to_regclass(:name)"), {"name": DEFAULT_PARTITION}).scalar() is None:
+        return
+
+    op.execute(f'ALTER TABLE {TABLE} DETACH PARTITION "{DEFAULT_PARTITION}"')
+    months = bind.execute(sa.text(f'SELECT DISTINCT collected_month FROM "{DEFAULT_PARTITION}"')).scalars().all()  # nosec B608
+    # collected_month 均为月初，直接作为分区下界
+    for month in months:
+        op.execute(f"CREATE TABLE IF NOT EXISTS \"{TABLE}_p{month:%Y%m}\" PARTITION OF {TABLE} FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')")
+    op.execute(f'INSERT INTO {TABLE} SELECT * FROM "{DEFAULT_PARTITION}" ON CONFLICT DO NOTHING')  # nosec B608
+    op.drop_table(DEFAULT_PARTITION)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or not _is_partitioned(bind):
+        return
+    op.execute(f'CREATE TABLE IF NOT EXISTS "{DEFAULT_PARTITION}" PARTITION OF {TABLE} DEFAULT')
@@ -12,6 +12,7 @@ Typical usage:
 """
 
 import logging
+import threading
 import time
 from abc import ABC, abstractmethod
 from typing import Any
@@ -45,23 +46,25 @@ class RateLimiter:
         self.rate_limit = rate_limit
         self.tokens = float(rate_limit)
         self.last_update = time.time()
+        # 多个抓取线程共享同一客户端时，保证令牌扣减的原子性
+        self._lock = threading.Lock()
 
     def get_token(self) -> bool:
-        """尝试获取一个请求令牌。
+        """尝试获取一个请求令牌 (线程安全)。
 
         Returns:
             True 如果成功获取令牌，False 如果需要等待
         """
-        current = time.time()
-        time_passed = current - self.last_update
-        self.tokens += time_passed * self.rate_limit
-        if self.tokens > self.rate_limit:
-            self.tokens = float(self.rate_limit)
-        self.last_update = current
-        if self.tokens >= 1:
-            self.tokens -= 1
-            return True
-        else:
+        with self._lock:
+            current = time.time()
+            time_passed = current - self.last_update
+            self.tokens += time_passed * self.rate_limit
+            if self.tokens > self.rate_limit:
+                self.tokens = float(self.rate_limit)
+            self.last_update = current
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
             return False
 
     def wait_for_token(self) -> None:
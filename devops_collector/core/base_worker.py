@@ -8,6 +8,7 @@
 
 import logging
 from abc import ABC, abstractmethod
+from collections.abc import Callable
 from datetime import UTC, datetime
 from typing import Any
 
@@ -21,6 +22,8 @@ class BaseWorker(ABC):
     """所有数据采集 Worker 的抽象基类。"""
 
     SCHEMA_VERSION = "1.0"
+    # 为 False 时 filter_changed 不比较指纹，全部重写 (用于转换逻辑变更后的 Staging 回放)
+    skip_unchanged = True
 
     def __init__(self, session: Session, client: Any, correlation_id: str = "unknown-cid"):
         """初始化 Worker。
@@ -103,41 +106,111 @@ class BaseWorker(ABC):
         percent = current / total * 100 if total > 0 else 0
         self.logger.info(f"[PROGRESS] {message}: {current}/{total} ({percent:.1f}%)")
 
+    def get_checkpoint(self, source: str, scope: Any, entity_type: str) -> Any | None:
+        """读取指定采集范围的同步断点。
+
+        Args:
+            source: 来源系统类型
+            scope: 采集范围标识 (产品ID/仓库名等)
+            entity_type: 实体类型
+
+        Returns:
+            SyncCheckpoint 实例，不存在时返回 None
+        """
+        from devops_collector.models.base_models import SyncCheckpoint
+
+        return self.session.query(SyncCheckpoint).filter_by(source=source, scope=str(scope), entity_type=entity_type).first()
+
+    def save_checkpoint(self, source: str, scope: Any, entity_type: str, cursor: Any | None = None, processed_count: int | None = None, **fields: Any) -> Any:
+        """写入同步断点 (随当前事务一起提交)。
+
+        调用方应在每批次数据与断点位于同一事务时提交，确保断点不会领先于已落库的数据。
+
+        Args:
+            source: 来源系统类型
+            scope: 采集范围标识
+            entity_type: 实体类型
+            cursor: 已完成的分页游标
+            processed_count: 本轮累计处理数量
+            **fields: 其他需要更新的断点字段 (如 watermark)
+
+        Returns:
+            更新后的 SyncCheckpoint 实例
+        """
+        from devops_collector.models.base_models import SyncCheckpoint
+
+        checkpoint = self.get_checkpoint(source, scope, entity_type)
+        if not checkpoint:
+            checkpoint = SyncCheckpoint(source=source, scope=str(scope), entity_type=entity_type, processed_count=0)
+            self.session.add(checkpoint)
+        checkpoint.cursor = str(cursor) if cursor is not None else None
+        if processed_count is not None:
+            checkpoint.processed_count = processed_count
+        for key, value in fields.items():
+            setattr(checkpoint, key, value)
+        checkpoint.status = "RUNNING"
+        self.session.flush()
+        return checkpoint
+
+    def complete_checkpoint(self, source: str, scope: Any, entity_type: str, **fields: Any) -> None:
+        """标记一轮采集完成：清空游标，下次从头开始 (保留水位等其他字段)。"""
+        from devops_collector.models.base_models import SyncCheckpoint
+
+        checkpoint = self.get_checkpoint(source, scope, entity_type)
+        if not checkpoint:
+            checkpoint = SyncCheckpoint(source=source, scope=str(scope), entity_type=entity_type, processed_count=0)
+            self.session.add(checkpoint)
+        checkpoint.cursor = None
+        for key, value in fields.items():
+            setattr(checkpoint, key, value)
+        checkpoint.status = "COMPLETED"
+        self.session.flush()
+
     def save_to_staging(self, source: str, entity_type: str, external_id: str, payload: dict, schema_version: str = "1.0") -> None:
-        """将原始数据保存到 Staging 层，消除重复的 Upsert 逻辑。"""
+        """将原始数据保存到 Staging 层，消除重复的 Upsert 逻辑。
+
+        同一实体每个采集月份一行 (分区键 collected_month)；载荷指纹未变化时不重写。
+        """
         from sqlalchemy.dialects.postgresql import insert
 
+        from devops_collector.core.utils import payload_fingerprint
         from devops_collector.models.base_models import RawDataStaging
 
+        now = datetime.now(UTC)
         data = {
             "source": source,
             "entity_type": entity_type,
             "external_id": str(external_id),
+            "collected_month": now.date().replace(day=1),
             "payload": payload,
+            "payload_hash": payload_fingerprint(payload),
             "schema_version": schema_version,
             "correlation_id": self.correlation_id,
-            "collected_at": datetime.now(UTC),
+            "collected_at": now,
         }
         try:
             # 使用嵌套事务 (Savepoint) 尝试 Upsert，防止事务中止
             with self.session.begin_nested():
                 stmt = insert(RawDataStaging).values(**data)
                 stmt = stmt.on_conflict_do_update(
-                    index_elements=["source", "entity_type", "external_id"],
+                    index_elements=["source", "entity_type", "external_id", "collected_month"],
                     set_={
                         "payload": stmt.excluded.payload,
+                        "payload_hash": stmt.excluded.payload_hash,
                         "schema_version": stmt.excluded.schema_version,
                         "collected_at": stmt.excluded.collected_at,
                     },
+                    where=RawDataStaging.payload_hash.is_distinct_from(stmt.excluded.payload_hash),
                 )
                 self.session.execute(stmt)
         except Exception as e:
             # 如果核心 Upsert 语法失败（例如某些不支持 upsert 的 PG 版本），则尝试回退到手动查询更新
             self.logger.debug(f"Upsert failed, falling back to manual merge for {entity_type}:{external_id}: {e}")
-            existing = self.session.query(RawDataStaging).filter_by(source=source, entity_type=entity_type, external_id=str(external_id)).first()
+            existing = self.session.get(RawDataStaging, (source, entity_type, str(external_id), data["collected_month"]))
             if existing:
-                for k, v in data.items():
-                    setattr(existing, k, v)
+                if existing.payload_hash != data["payload_hash"]:
+                    for k, v in data.items():
+                        setattr(existing, k, v)
             else:
                 self.session.add(RawDataStaging(**data))
                 try:
@@ -145,25 +218,38 @@ class BaseWorker(ABC):
                 except Exception:
                     self.session.rollback()  # 真的没法救了再 rollback
 
-    def bulk_save_to_staging(self, source: str, entity_type: str, items: list[dict], id_field: str = "id", schema_version: str = "1.0") -> None:
+    def bulk_save_to_staging(
+        self,
+        source: str,
+        entity_type: str,
+        items: list[dict],
+        id_field: str | Callable[[dict], Any] = "id",
+        schema_version: str = "1.0",
+    ) -> None:
         """高性能批量存放原始数据到 Staging 层。
 
         针对大数据宽表（如 GitLab Commits），利用 PostgreSQL 原生的 COPY FROM
         将数据快速导入到临时表，再经 ON CONFLICT DO UPDATE 合并，
-        性能比批量 ORM 插入提升 5-10 倍。
+        性能比批量 ORM 插入提升 5-10 倍。载荷指纹未变化的行不重写。
+
+        id_field 可以是载荷中的字段名，也可以是根据载荷计算外部 ID 的函数
+        (用于没有天然 ID 字段的实体，如 JFrog 制品的 repo:path/name)。
         """
         import csv
         import io
         import json
 
+        from devops_collector.core.utils import payload_fingerprint
+
+        get_id = id_field if callable(id_field) else (lambda item: item.get(id_field, ""))
+
         # 判断数据库方言。非 PostgreSQL 环境（如集成测试中的 SQLite）不支持 COPY FROM 和特定的 JSONB 转换。
         # 此时降级到逐条 save_to_staging，虽然性能略低但能保证集成测试通过。
         dialect = self.session.bind.dialect.name
         if dialect != "postgresql":
             self.logger.debug(f"Non-PostgreSQL dialect ({dialect}) detected, using graceful fallback for bulk_save_to_staging")
             for item in items:
-                ext_id = item.get(id_field, "")
-                self.save_to_staging(source, entity_type, ext_id, item, schema_version)
+                self.save_to_staging(source, entity_type, get_id(item), item, schema_version)
             return
 
         # 获取底层 psycopg 的连接对象
@@ -176,9 +262,9 @@ class BaseWorker(ABC):
         writer = csv.writer(csv_file, quoting=csv.QUOTE_MINIMAL)
 
         for item in items:
-            ext_id = str(item.get(id_field, ""))
+            ext_id = str(get_id(item))
             payload_str = json.dumps(item)
-            writer.writerow([source, entity_type, ext_id, payload_str, schema_version, self.correlation_id])
+            writer.writerow([source, entity_type, ext_id, payload_str, payload_fingerprint(item), schema_version, self.correlation_id])
 
         csv_file.seek(0)
         temp_table = f"tmp_stg_{source}_{entity_type}_{id(self)}"
@@ -186,24 +272,32 @@ class BaseWorker(ABC):
         # 并不是所有 DBAPI cursor 都支持 context manager (如 SQLite)，因此在原始连接操作时建议显式关闭
         cursor = raw_conn.cursor()
         try:
-            # 创建仅限于当前事务内的临时表
-            cursor.execute(f"CREATE TEMP TABLE {temp_table} (LIKE stg_raw_data INCLUDING DEFAULTS) ON COMMIT DROP")
+            # 创建仅限于当前事务内的临时表 (不用 LIKE：分区键 collected_month 为 NOT NULL，由合并语句填充)
+            cursor.execute(
+                f"CREATE TEMP TABLE {temp_table} (source varchar(50), entity_type varchar(50), external_id varchar(100), "
+                "payload jsonb, payload_hash varchar(32), schema_version varchar(20), correlation_id varchar(100)) ON COMMIT DROP"
+            )
 
             # 使用原生的 copy_expert 进行高性能加载
-            copy_sql = f"COPY {temp_table} (source, entity_type, external_id, payload, schema_version, correlation_id) FROM STDIN WITH CSV"
+            copy_sql = f"COPY {temp_table} (source, entity_type, external_id, payload, payload_hash, schema_version, correlation_id) FROM STDIN WITH CSV"
             cursor.copy_expert(copy_sql, csv_file)
 
-            # 通过 Upsert 逻辑把临时表合并到主表
+            # 通过 Upsert 逻辑把临时表合并到主表 (按采集月份落入对应分区，指纹未变化时跳过)
             upsert_sql = f"""
-                INSERT INTO stg_raw_data (source, entity_type, external_id, payload, schema_version, correlation_id, collected_at)
-                SELECT source, entity_type, external_id, cast(payload as jsonb), schema_version, correlation_id, CURRENT_TIMESTAMP
+                INSERT INTO stg_raw_data (
+                    source, entity_type, external_id, collected_month, payload, payload_hash, schema_version, correlation_id, collected_at
+                )
+                SELECT source, entity_type, external_id, date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC')::date,
+                       cast(payload as jsonb), payload_hash, schema_version, correlation_id, CURRENT_TIMESTAMP
                 FROM {temp_table}
-                ON CONFLICT (source, entity_type, external_id)
+                ON CONFLICT (source, entity_type, external_id, collected_month)
                 DO UPDATE SET
                     payload = EXCLUDED.payload,
+                    payload_hash = EXCLUDED.payload_hash,
                     schema_version = EXCLUDED.schema_version,
                     correlation_id = EXCLUDED.correlation_id,
                     collected_at = EXCLUDED.collected_at
+                WHERE stg_raw_data.payload_hash IS DISTINCT FROM EXCLUDED.payload_hash
             """  # nosec B608
             cursor.execute(upsert_sql)
 
@@ -211,3 +305,30 @@ class BaseWorker(ABC):
             cursor.execute(f"DROP TABLE {temp_table}")
         finally:
             cursor.close()
+
+    def filter_changed(self, model: Any, batch: list[dict], *criteria: Any, key: Callable[[dict], Any] = lambda data: data["id"]) -> dict[Any, str]:
+        """按载荷指纹筛选批次中新增或有变化的实体。
+
+        整批一次 IN 查询读取已存的 raw_data_hash 并与本次载荷指纹比较。指纹相同说明上游未变化，
+        调用方应整条跳过：不重写字段、不重置 promoted_at，也就不会触发下游转正与 dbt 重算。
+
+        Args:
+            model: 带 id 与 raw_data_hash 列的实体模型
+            batch: 原始载荷列表
+            *criteria: 附加过滤条件 (如复合主键的 ZenTaoIssue.type == "bug")
+            key: 从载荷中取实体 ID 的函数
+
+        Returns:
+            {实体 ID: 载荷指纹}，只包含需要写入的实体
+        """
+        from devops_collector.core.utils import payload_fingerprint
+
+        fingerprints = {key(data): payload_fingerprint(data) for data in batch}
+        if not fingerprints or not self.skip_unchanged:
+            return fingerprints
+        stored = dict(self.session.query(model.id, model.raw_data_hash).filter(model.id.in_(fingerprints), *criteria).all())
+        changed = {entity_id: digest for entity_id, digest in fingerprints.items() if stored.get(entity_id) != digest}
+        skipped = len(fingerprints) - len(changed)
+        if skipped:
+            self.logger.debug(f"Skipped {skipped} unchanged {model.__tablename__} record(s)")
+        return changed
@@ -0,0 +1,212 @@
+"""dbt 按数据源选择性构建
+
+调度器每轮读取各采集源的同步水位 (插件主表 last_synced_at 与同步断点的最大更新时间)，
+只对水位前进过的源执行 dbt build --select source:raw.<table>+，而不是每分钟全量 dbt run。
+连续到达的同步通过静默期 (debounce) 合并为一次构建；另按固定周期执行一次全量构建，
+覆盖依赖 current_date 滑动窗口、但上游没有新数据的模型。
+
+构建分两步：先排除测试构建模型 (成功与否决定是否继续反向 ETL)，再对同一选择执行 dbt test。
+数据测试失败只记录告警，不阻塞下游；模型构建连续失败时按静默期指数退避重试。
+"""
+
+import logging
+import subprocess
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import DateTime, column, func, inspect, select, table
+from sqlalchemy.orm import Session
+
+from devops_collector.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+# 采集源 → dbt_project/models/staging/sources.yml 中 raw 源下的表
+DBT_SOURCE_TABLES: dict[str, tuple[str, ...]] = {
+    "gitlab": (
+        "gitlab_projects",
+        "gitlab_commits",
+        "commit_file_stats",
+        "gitlab_issues",
+        "gitlab_merge_requests",
+        "gitlab_pipelines",
+        "gitlab_deployments",
+        "gitlab_notes",
+        "gitlab_packages",
+        "gitlab_dependencies",
+        "rpt_commit_metrics",
+    ),
+    "zentao": (
+        "zentao_products",
+        "zentao_executions",
+        "zentao_issues",
+        "zentao_product_plans",
+        "zentao_builds",
+        "zentao_releases",
+        "zentao_actions",
+        "zentao_test_cases",
+        "zentao_test_results",
+    ),
+    "sonarqube": ("sonar_projects", "sonar_measures", "sonar_issues"),
+    "jenkins": ("jenkins_jobs", "jenkins_builds"),
+    "jira": ("jira_issues", "jira_projects", "jira_boards", "jira_sprints", "jira_issue_histories"),
+    "nexus": ("nexus_components", "nexus_assets"),
+    # 数据转正 (PromotionService) 写入的主数据
+    "mdm": ("mdm_identities", "mdm_identity_mappings", "mdm_organizations", "mdm_projects", "mdm_epics", "mdm_entity_topology"),
+}
+
+# 采集源 → 记录同步完成时间的插件主表 (均为小表)
+SYNC_STATE_TABLES: dict[str, str] = {
+    "gitlab": "gitlab_projects",
+    "zentao": "zentao_products",
+    "sonarqube": "sonar_projects",
+    "jenkins": "jenkins_jobs",
+    "jira": "jira_projects",
+}
+
+_CHECKPOINTS = table("sys_sync_checkpoints", column("source"), column("created_at", DateTime), column("updated_at", DateTime))
+
+
+def read_sync_watermarks(session: Session) -> dict[str, datetime]:
+    """读取各采集源当前的同步水位。
+
+    Returns:
+        {采集源: 最近一次同步完成/断点推进的时间}；尚未同步过的源不出现在结果中
+    """
+    existing = set(inspect(session.get_bind()).get_table_names())
+    watermarks: dict[str, datetime] = {}
+    for source, table_name in SYNC_STATE_TABLES.items():
+        if table_name not in existing:
+            continue
+        synced_at = column("last_synced_at", DateTime)
+        value = session.execute(select(func.max(synced_at)).select_from(table(table_name, synced_at))).scalar()
+        if value is not None:
+            watermarks[source] = value
+
+    if _CHECKPOINTS.name in existing:
+        touched_at = func.max(func.coalesce(_CHECKPOINTS.c.updated_at, _CHECKPOINTS.c.created_at))
+        for source, value in session.execute(select(_CHECKPOINTS.c.source, touched_at).group_by(_CHECKPOINTS.c.source)):
+            if source in DBT_SOURCE_TABLES and value is not None:
+                watermarks[source] = max(watermarks.get(source, value), value)
+    return watermarks
+
+
+def changed_sources(previous: dict[str, datetime] | None, current: dict[str, datetime]) -> set[str]:
+    """对比两次水位，返回有新数据的采集源。previous 为 None (无基线) 时视为全部变化。"""
+    if previous is None:
+        return set(current)
+    return {source for source, value in current.items() if source not in previous or value > previous[source]}
+
+
+def source_selectors(sources: Iterable[str]) -> list[str]:
+    """采集源 → dbt 选择器 (源表及其全部下游)。"""
+    return sorted({f"source:raw.{name}+" for source in sources for name in DBT_SOURCE_TABLES.get(source, ())})
+
+
+class DbtBuildTrigger:
+    """跟踪待构建的数据源，并在静默期结束后触发一次选择性 dbt build。"""
+
+    def __init__(
+        self,
+        project_dir: str = "dbt_project",
+        debounce_seconds: int | None = None,
+        max_delay_seconds: int | None = None,
+        full_build_hours: int | None = None,
+    ):
+        """初始化触发器。
+
+        Args:
+            project_dir: dbt 项目目录 (同时作为 profiles 目录)
+            debounce_seconds: 最后一次变化后需保持静默的秒数
+            max_delay_seconds: 首次变化后最长等待秒数 (持续有同步时也不会无限推迟)
+            full_build_hours: 全量构建周期 (小时)，进程启动后的第一次构建总是全量
+        """
+        scheduler = settings.scheduler
+        self.project_dir = project_dir
+        self.debounce = timedelta(seconds=scheduler.dbt_debounce_seconds if debounce_seconds is None else debounce_seconds)
+        self.max_delay = timedelta(seconds=scheduler.dbt_max_delay_seconds if max_delay_seconds is None else max_delay_seconds)
+        self.full_build_interval = timedelta(hours=scheduler.dbt_full_build_hours if full_build_hours is None else full_build_hours)
+        self.watermarks: dict[str, datetime] | None = None
+        self.pending: set[str] = set()
+        self.first_change_at: datetime | None = None
+        self.last_change_at: datetime | None = None
+        self.last_full_build_at: datetime | None = None
+        self.failures = 0
+        self.retry_at: datetime | None = None
+
+    def observe(self, session: Session, now: datetime | None = None) -> set[str]:
+        """读取同步水位并记录新变化的数据源。首次调用只建立基线 (启动后的全量构建会覆盖它们)。"""
+        current = read_sync_watermarks(session)
+        changed = changed_sources(self.watermarks, current) if self.watermarks is not None else set()
+        self.watermarks = current
+        self.mark_changed(*changed, now=now)
+        return changed
+
+    def mark_changed(self, *sources: str, now: datetime | None = None) -> None:
+        """把数据源加入待构建集合，并重置静默期计时。"""
+        if not sources:
+            return
+        now = now or datetime.now(UTC)
+        self.pending.update(sources)
+        self.first_change_at = self.first_change_at or now
+        self.last_change_at = now
+
+    def full_build_due(self, now: datetime | None = None) -> bool:
+        """是否到了全量构建周期。"""
+        now = now or datetime.now(UTC)
+        return self.last_full_build_at is None or now - self.last_full_build_at >= self.full_build_interval
+
+    def due(self, now: datetime | None = None) -> bool:
+        """是否应立即构建：全量周期已到，或有待构建的源且静默期结束/等待已达上限；失败退避期内不构建。"""
+        now = now or datetime.now(UTC)
+        if self.retry_at is not None and now < self.retry_at:
+            return False
+        if self.full_build_due(now):
+            return True
+        if not self.pending:
+            return False
+        return now - self.last_change_at >= self.debounce or now - self.first_change_at >= self.max_delay
+
+    def command(self, now: datetime | None = None, test: bool = False) -> list[str]:
+        """当前应执行的 dbt 命令：默认为排除测试的 dbt build，test=True 时为同一选择上的 dbt test。"""
+        cmd = ["dbt", "test" if test else "build", "--project-dir", self.project_dir, "--profiles-dir", self.project_dir]
+        if not test:
+            cmd += ["--exclude-resource-type", "test"]
+        if self.full_build_due(now):
+            return cmd
+        return [*cmd, "--select", *source_selectors(self.pending)]
+
+    def run(self, now: datetime | None = None) -> bool:
+        """执行一次 dbt build，随后执行 dbt test。
+
+        模型构建成功即清空待构建集合并返回 True，测试失败只记录告警；
+        构建失败时保留待构建集合，并按静默期指数退避 (上限为全量构建周期) 后重试。
+
+        Returns:
+            模型构建是否成功
+        """
+        now = now or datetime.now(UTC)
+        full = self.full_build_due(now)
+        scope = "full" if full else ", ".join(sorted(self.pending))
+        logger.info(f"Triggering dbt build ({scope})...")
+        result = subprocess.run(self.command(now), capture_output=True, text=True, check=False)
+        if result.returncode != 0:
+            self.failures += 1
+            delay = min(self.debounce * 2 ** (self.failures - 1), self.full_build_interval)
+            self.retry_at = now + delay
+            logger.error(f"dbt build failed ({self.failures} in a row, retry in {delay}): {(result.stdout or '')[-2000:]}{result.stderr or ''}")
+            return False
+
+        logger.info("dbt build success")
+        tests = subprocess.run(self.command(now, test=True), capture_output=True, text=True, check=False)
+        if tests.returncode != 0:
+            logger.warning(f"dbt test failed ({scope}): {(tests.stdout or '')[-2000:]}{tests.stderr or ''}")
+
+        self.failures = 0
+        self.retry_at = None
+        self.pending.clear()
+        self.first_change_at = self.last_change_at = None
+        if full:
+            self.last_full_build_at = now
+        return True
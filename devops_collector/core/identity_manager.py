@@ -6,6 +6,7 @@
 
 import logging
 import uuid
+from collections.abc import Iterable
 from typing import Any
 
 from sqlalchemy.dialects.postgresql import insert
@@ -153,3 +154,105 @@ class IdentityManager:
         if user:
             cls._local_cache[cache_key] = user.global_user_id
         return user
+
+    @classmethod
+    def resolve_users(
+        cls,
+        session: Session,
+        source: str,
+        external_ids: Iterable[Any],
+        profiles: dict[str, dict[str, Any]] | None = None,
+    ) -> dict[str, User]:
+        """批量解析一组外部账号对应的全局用户。
+
+        语义与逐个调用 ``get_or_create_user(session, source, external_id, email, name)``
+        一致 (不新建用户)，但整批只需固定次数的查询：缓存命中的用户一次、映射表一次、
+        映射指向的用户一次、Email 对齐一次，缺失映射一次批量写入。
+
+        Args:
+            session: 通用数据库会话。
+            source: 来源系统名称 (如 'zentao', 'jira')。
+            external_ids: 外部系统账号集合，允许重复及空值。
+            profiles: 可选的账号资料，形如 ``{external_id: {"email": ..., "name": ...}}``，
+                用于映射缺失时按 Email 对齐及登记映射。
+
+        Returns:
+            以外部账号 (字符串) 为键的 User 字典，未能解析的账号不出现在结果中。
+        """
+        ext_ids = list(dict.fromkeys(str(e).strip() for e in external_ids if e is not None and str(e).strip()))
+        if not ext_ids:
+            return {}
+
+        resolved: dict[str, User] = {}
+
+        # 0. 内存缓存命中的账号：一次 IN 查询取回当前生效版本
+        cached = {e: cls._local_cache[(source, e)] for e in ext_ids if (source, e) in cls._local_cache}
+        if cached:
+            users = session.query(User).filter(User.global_user_id.in_(set(cached.values())), User.is_current.is_(True)).all()
+            by_gid = {u.global_user_id: u for u in users}
+            for ext_id, gid in cached.items():
+                if gid in by_gid:
+                    resolved[ext_id] = by_gid[gid]
+
+        pending = [e for e in ext_ids if e not in resolved]
+        if not pending:
+            return resolved
+
+        # 1. 一次性加载已存在的映射
+        mappings = session.query(IdentityMapping).filter(IdentityMapping.source_system == source, IdentityMapping.external_user_id.in_(pending)).all()
+        mapping_by_ext = {m.external_user_id: m for m in mappings}
+
+        # 2. 一次性加载映射指向的当前用户
+        gids = {m.global_user_id for m in mappings if m.global_user_id}
+        if gids:
+            users = session.query(User).filter(User.global_user_id.in_(gids), User.is_current.is_(True)).all()
+            by_gid = {u.global_user_id: u for u in users}
+            for ext_id, mapping in mapping_by_ext.items():
+                user = by_gid.get(mapping.global_user_id)
+                if user:
+                    resolved[ext_id] = user
+                    cls._local_cache[(source, ext_id)] = user.global_user_id
+
+        # 3. 仍未解析的账号按 Email 一次性对齐主数据
+        profiles = profiles or {}
+        emails = {}
+        for ext_id in pending:
+            email = (profiles.get(ext_id) or {}).get("email")
+            if ext_id not in resolved and email:
+                emails[ext_id] = email.lower().strip()
+        if emails:
+            users = session.query(User).filter(User.primary_email.in_(set(emails.values())), User.is_current.is_(True)).all()
+            by_email = {u.primary_email: u for u in users}
+            for ext_id, email in emails.items():
+                if email in by_email:
+                    resolved[ext_id] = by_email[email]
+                    cls._local_cache[(source, ext_id)] = by_email[email].global_user_id
+
+        # 4. 缺失映射的账号批量登记，未对齐的标记为 PENDING 供后续人工或 dbt 治理
+        missing = [e for e in pending if e not in mapping_by_ext]
+        if missing:
+            logger.debug(f"批量记录 {len(missing)} 条身份映射: {source}")
+            rows = []
+            for ext_id in missing:
+                user = resolved.get(ext_id)
+                profile = profiles.get(ext_id) or {}
+                rows.append(
+                    {
+                        "global_user_id": user.global_user_id if user else None,
+                        "source_system": source,
+                        "external_user_id": ext_id,
+                        "external_username": profile.get("name") or ext_id,
+                        "external_email": emails.get(ext_id),
+                        "mapping_status": "AUTO" if user and user.is_survivor else "PENDING",
+                        "confidence_score": 1.0 if user and user.is_survivor else 0.5,
+                    }
+                )
+            is_postgres = session.bind.dialect.name == "postgresql" if session.bind else True
+            if is_postgres:
+                stmt = insert(IdentityMapping).values(rows).on_conflict_do_nothing(index_elements=["source_system", "external_user_id"])
+                session.execute(stmt)
+            else:
+                session.add_all(IdentityMapping(**row) for row in rows)
+            session.flush()
+
+        return resolved
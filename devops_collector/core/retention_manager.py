@@ -1,38 +1,74 @@
 """数据生命周期管理器
-- 自动清理超过保留期限的原始 Staging 数据。
+- 自动清理超过保留期限的原始 Staging 数据 (PostgreSQL 分区表上按月删除整个分区)。
+- 按表配置保留策略，分块删除同步日志、审计日志等日志表中的过期记录。
+
+分块删除：整数自增主键的表按 id 区间、其余按主键键集，每块一个短事务并在块间暂停，
+待删行以 FOR UPDATE SKIP LOCKED 选取，遇到 Worker 正持有锁的行直接跳过 (下次清理再删)，
+因此可与同步任务并行运行而不产生锁等待。
 """
 
 import logging
+import time
+from collections.abc import Callable
 from datetime import UTC, datetime, timedelta
 
-from sqlalchemy import create_engine, delete
+from sqlalchemy import Table, create_engine, delete, func, select, tuple_
 from sqlalchemy.orm import sessionmaker
 
-from devops_collector.config import Config
-from devops_collector.models.base_models import RawDataStaging
+from devops_collector.config import Config, settings
+from devops_collector.core.staging_partitions import drop_expired_raw_data_partitions, is_partitioned
+from devops_collector.models.audit import AuditLog
+from devops_collector.models.base_models import RawDataStaging, SyncLog
 
 
 logger = logging.getLogger(__name__)
 
 
+class RetentionPolicy:
+    """单表保留策略：按 time_column 删除早于 retention_days 天的记录 (0 或负数表示永久保留)。"""
+
+    def __init__(self, table: Table, time_column: str, retention_days: int):
+        self.table = table
+        self.time_column = table.c[time_column]
+        self.retention_days = retention_days
+
+    @property
+    def name(self) -> str:
+        """策略对应的表名。"""
+        return self.table.name
+
+
+def default_policies() -> list[RetentionPolicy]:
+    """按当前配置生成各日志表的保留策略 (stg_raw_data 由 cleanup_raw_data 单独处理)。"""
+    return [
+        RetentionPolicy(SyncLog.__table__, "created_at", settings.database.sync_log_retention_days),
+        RetentionPolicy(AuditLog.__table__, "timestamp", settings.database.audit_log_retention_days),
+    ]
+
+
 class RetentionManager:
     """管理数据的保留和清理策略。"""
 
-    def __init__(self, session=None):
-        '''"""TODO: Add description.
+    def __init__(
+        self,
+        session=None,
+        chunk_size: int | None = None,
+        pause_seconds: float | None = None,
+        progress: Callable[[str, int, int | None, int | None], None] | None = None,
+    ):
+        """初始化。
 
         Args:
-            self: TODO
-            session: TODO
-
-        Returns:
-            TODO
-
-        Raises:
-            TODO
-        """'''
+            session: 外部传入的会话 (不传则按 Config.DB_URI 自建，用完关闭)
+            chunk_size: 每块删除行数，默认取 settings.database.retention_chunk_size
+            pause_seconds: 块间暂停秒数，默认取 settings.database.retention_pause_seconds
+            progress: 进度回调 (表名, 已删除行数, 已扫描 id 数, id 区间总数)，不传时写日志
+        """
         self._session = session
         self._external_session = session is not None
+        self.chunk_size = chunk_size or settings.database.retention_chunk_size
+        self.pause_seconds = settings.database.retention_pause_seconds if pause_seconds is None else pause_seconds
+        self.progress = progress
 
     def _get_session(self):
         '''"""TODO: Add description.
@@ -56,24 +92,27 @@ class RetentionManager:
     def cleanup_raw_data(self) -> int:
         """清理过期的原始采集数据。
 
-        根据 Config.RAW_DATA_RETENTION_DAYS 执行清理。
+        根据 Config.RAW_DATA_RETENTION_DAYS 执行清理。stg_raw_data 为分区表时删除整月过期的分区，
+        否则 (未迁移的旧表或 SQLite) 按 collected_at 分块删除。
 
         Returns:
-            int: 被删除的记录总数。
+            int: 被删除的记录总数 (按分区删除时为统计信息估算值)。
         """
         retention_days = Config.RAW_DATA_RETENTION_DAYS
         if retention_days <= 0:
             logger.info("Retention days is set to 0 or less, skipping cleanup.")
             return 0
-        threshold_date = datetime.now(UTC) - timedelta(days=retention_days)
         session = self._get_session()
         try:
-            stmt = delete(RawDataStaging).where(RawDataStaging.collected_at < threshold_date)
-            result = session.execute(stmt)
-            deleted_count = result.rowcount
-            session.commit()
+            if is_partitioned(session.connection()):
+                session.commit()
+                # 分区脱离 (DETACH ... CONCURRENTLY) 不能在事务块内执行，使用独立的自动提交连接
+                with session.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+                    _, deleted_count = drop_expired_raw_data_partitions(connection, retention_days)
+            else:
+                deleted_count = self._purge(session, RetentionPolicy(RawDataStaging.__table__, "collected_at", retention_days))
             if deleted_count > 0:
-                logger.info(f"Cleaned up {deleted_count} stale raw data records older than {threshold_date}")
+                logger.info(f"Cleaned up {deleted_count} stale raw data records older than {retention_days} days")
             else:
                 logger.info("No stale raw data records found to clean up.")
             return deleted_count
@@ -82,12 +121,101 @@ class RetentionManager:
             session.rollback()
             raise
         finally:
-            if not self._external_session:
-                session.close()
-                self._session = None
+            self._release_session(session)
+
+    def cleanup_logs(self, policies: list[RetentionPolicy] | None = None) -> dict[str, int]:
+        """按保留策略分块清理日志表。
+
+        Args:
+            policies: 保留策略列表，默认取 default_policies()
+
+        Returns:
+            {表名: 删除行数}，跳过永久保留的表
+        """
+        session = self._get_session()
+        results = {}
+        try:
+            for policy in default_policies() if policies is None else policies:
+                if policy.retention_days <= 0:
+                    logger.info(f"Retention for {policy.name} is disabled, skipping.")
+                    continue
+                results[policy.name] = self._purge(session, policy)
+            return results
+        except Exception as e:
+            logger.error(f"Failed to cleanup logs: {e}")
+            session.rollback()
+            raise
+        finally:
+            self._release_session(session)
+
+    def run_all(self) -> dict[str, int]:
+        """清理原始数据与全部日志表，返回 {表名: 删除行数}。"""
+        results = {RawDataStaging.__tablename__: self.cleanup_raw_data()}
+        results.update(self.cleanup_logs())
+        return results
+
+    def _release_session(self, session) -> None:
+        if not self._external_session:
+            session.close()
+            self._session = None
+
+    def _purge(self, session, policy: RetentionPolicy) -> int:
+        """分块删除单表过期记录，每块单独提交。"""
+        cutoff = datetime.now(UTC) - timedelta(days=policy.retention_days)
+        id_column = policy.table.c.get("id")
+        if id_column is not None and id_column.primary_key and len(policy.table.primary_key.columns) == 1:
+            deleted = self._purge_id_ranges(session, policy, id_column, cutoff)
+        else:
+            deleted = self._purge_key_batches(session, policy, cutoff)
+        logger.info(f"Purged {deleted} rows from {policy.name} older than {cutoff:%Y-%m-%d %H:%M}")
+        return deleted
+
+    def _purge_id_ranges(self, session, policy: RetentionPolicy, id_column, cutoff: datetime) -> int:
+        """按自增 id 区间分块删除：区间走主键索引，块大小固定，不随过期数据量增长。"""
+        first, last = session.execute(select(func.min(id_column), func.max(id_column)).where(policy.time_column < cutoff)).one()
+        session.commit()
+        if first is None:
+            return 0
+        deleted = 0
+        lower = first
+        while lower <= last:
+            upper = lower + self.chunk_size
+            victims = select(id_column).where(id_column >= lower, id_column < upper, policy.time_column < cutoff)
+            deleted += self._delete_chunk(session, policy, id_column.in_(victims.with_for_update(skip_locked=True)))
+            lower = upper
+            self._report(policy, deleted, lower - first, last - first + 1)
+        return deleted
+
+    def _purge_key_batches(self, session, policy: RetentionPolicy, cutoff: datetime) -> int:
+        """无自增 id 的表 (如 stg_raw_data 的复合主键) 每次按主键选取 chunk_size 行删除，直到删完。"""
+        key = tuple_(*policy.table.primary_key.columns)
+        victims = select(*policy.table.primary_key.columns).where(policy.time_column < cutoff).limit(self.chunk_size)
+        deleted = 0
+        while True:
+            count = self._delete_chunk(session, policy, key.in_(victims.with_for_update(skip_locked=True)))
+            deleted += count
+            if count < self.chunk_size:
+                return deleted
+            self._report(policy, deleted)
+
+    def _delete_chunk(self, session, policy: RetentionPolicy, condition) -> int:
+        """在独立短事务中删除一块记录，提交后按配置暂停，降低对在线写入的影响。"""
+        count = session.execute(delete(policy.table).where(condition)).rowcount
+        session.commit()
+        if self.pause_seconds > 0:
+            time.sleep(self.pause_seconds)
+        return count
+
+    def _report(self, policy: RetentionPolicy, deleted: int, scanned: int | None = None, total: int | None = None) -> None:
+        if self.progress:
+            self.progress(policy.name, deleted, scanned, total)
+        elif total:
+            logger.info(f"Purging {policy.name}: {deleted} rows deleted, {min(scanned, total) * 100 // total}% of id range scanned")
+        else:
+            logger.info(f"Purging {policy.name}: {deleted} rows deleted")
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     manager = RetentionManager()
-    manager.cleanup_raw_data()
+    manager.run_all()
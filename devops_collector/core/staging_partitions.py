@@ -0,0 +1,186 @@
+"""原始数据暂存表 (stg_raw_data) 分区管理
+
+stg_raw_data 在 PostgreSQL 上按采集月份 RANGE 分区，每月一个子表 stg_raw_data_pYYYYMM。
+不设 DEFAULT 分区 (否则无法 DETACH ... CONCURRENTLY)，写入依赖月份分区已预建：
+- Worker 启动与调度器每日预建当月及之后若干个月的分区，并为载荷列设置 TOAST 压缩 (如 lz4)；
+- 保留期清理把整个分区从父表并发脱离后 DROP，代替对大表的 DELETE + VACUUM。
+其他数据库 (如测试中的 SQLite) 上不分区，这里的函数直接返回。
+"""
+
+import logging
+import re
+from datetime import UTC, date, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+
+from devops_collector.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "stg_raw_data"
+_PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})(\d{{2}})$")
+_COMPRESSIONS = {"lz4", "pglz"}
+
+
+def month_start(value: date) -> date:
+    """所在月份的第一天。"""
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    """月初日期加减若干个月。"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """月份对应的分区表名。"""
+    return f"{PARENT_TABLE}_p{month:%Y%m}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    """stg_raw_data 是否为 PostgreSQL 分区表 (旧部署可能仍是普通表，需先执行 alembic upgrade head)。"""
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(text("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:name)"), {"name": PARENT_TABLE}).scalar())
+
+
+def list_partitions(connection: Connection) -> dict[date, str]:
+    """已存在的月份分区 {月初日期: 表名}。"""
+    rows = connection.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:name)"),
+        {"name": PARENT_TABLE},
+    ).scalars()
+    partitions = {}
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return partitions
+
+
+def _set_compression(connection: Connection, table: str) -> None:
+    compression = settings.database.raw_data_compression
+    if not compression:
+        return
+    if compression not in _COMPRESSIONS:
+        logger.warning(f"Unsupported raw data compression '{compression}', keeping the server default")
+        return
+    connection.execute(text(f'ALTER TABLE "{table}" ALTER COLUMN payload SET COMPRESSION {compression}'))
+
+
+def create_month_partition(connection: Connection, month: date) -> str:
+    """创建指定月份的分区并设置载荷压缩，返回分区表名。"""
+    name = partition_name(month)
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS \"{name}\" PARTITION OF {PARENT_TABLE} FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"))
+    _set_compression(connection, name)
+    return name
+
+
+def ensure_raw_data_partitions(connection: Connection, months_ahead: int | None = None, today: date | None = None) -> list[str]:
+    """创建当月至之后 months_ahead 个月的分区。
+
+    Args:
+        connection: 数据库连接 (调用方负责提交)
+        months_ahead: 预建的未来月份数，默认取 settings.database.raw_data_partitions_ahead
+        today: 当前日期，测试用
+
+    Returns:
+        本次新建的分区表名
+    """
+    if not is_partitioned(connection):
+        if connection.dialect.name == "postgresql":
+            logger.warning(f"{PARENT_TABLE} is not partitioned; run `alembic upgrade head`")
+        return []
+
+    months_ahead = settings.database.raw_data_partitions_ahead if months_ahead is None else months_ahead
+    current = month_start(today or datetime.now(UTC).date())
+    existing = list_partitions(connection)
+    missing = [month for month in (add_months(current, offset) for offset in range(months_ahead + 1)) if month not in existing]
+    created = [create_month_partition(connection, month) for month in missing]
+    if created:
+        logger.info(f"Created {PARENT_TABLE} partitions: {', '.join(created)}")
+    return created
+
+
+def _detached_leftovers(connection: Connection) -> dict[date, str]:
+    """已脱离父表但尚未删除的月份分区 (上次清理在 DETACH 与 DROP 之间中断)。"""
+    rows = connection.execute(
+        text("SELECT relname FROM pg_class WHERE relkind = 'r' AND NOT relispartition AND relname LIKE :pattern"),
+        {"pattern": f"{PARENT_TABLE}_p%"},
+    ).scalars()
+    leftovers = {}
+    for name in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            leftovers[date(int(match.group(1)), int(match.group(2)), 1)] = name
+    return leftovers
+
+
+def _pending_detaches(connection: Connection) -> set[str]:
+    """DETACH ... CONCURRENTLY 被中断、处于 detach pending 状态的分区 (PostgreSQL 14+)。"""
+    rows = connection.execute(
+        text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:name) AND i.inhdetachpending"),
+        {"name": PARENT_TABLE},
+    ).scalars()
+    return set(rows)
+
+
+def _detach_partition(connection: Connection, name: str, mode: str) -> bool:
+    """把分区从父表脱离；在 lock_timeout 内拿不到锁时返回 False，留待下次清理重试。"""
+    try:
+        connection.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}" {mode}'.rstrip()))
+    except OperationalError as e:
+        logger.warning(f"Could not detach {name} within the lock timeout, retrying on the next run: {e}")
+        return False
+    return True
+
+
+def drop_expired_raw_data_partitions(connection: Connection, retention_days: int, today: date | None = None) -> tuple[list[str], int]:
+    """删除整月都早于保留期的分区。
+
+    保留粒度为月：分区的月末早于 (today - retention_days) 才会删除，因此数据实际保留
+    retention_days 到 retention_days + 1 个月。
+
+    直接 DROP 分区会对父表加 ACCESS EXCLUSIVE 锁，阻塞所有读写；这里先用 DETACH ... CONCURRENTLY
+    (PostgreSQL 14+，父表上只加 SHARE UPDATE EXCLUSIVE 锁) 把分区从父表脱离，再删除已独立的表；
+    更早的版本退回普通 DETACH。两种方式都受 retention_lock_timeout_ms 限制，拿不到锁的分区跳过，下次重试。
+
+    Args:
+        connection: AUTOCOMMIT 模式的数据库连接 (DETACH ... CONCURRENTLY 不能在事务块内执行)
+        retention_days: 保留天数
+        today: 当前日期，测试用
+
+    Returns:
+        (被删除的分区表名, 按统计信息估算的行数)
+    """
+    cutoff = month_start((today or datetime.now(UTC).date()) - timedelta(days=retention_days))
+    expired = sorted(name for month, name in list_partitions(connection).items() if month < cutoff)
+    detached = sorted(name for month, name in _detached_leftovers(connection).items() if month < cutoff)
+    if not expired and not detached:
+        return [], 0
+
+    concurrent = connection.dialect.server_version_info >= (14,)
+    pending = _pending_detaches(connection) if expired and concurrent else set()
+    connection.execute(text(f"SET lock_timeout = {int(settings.database.retention_lock_timeout_ms)}"))
+    try:
+        for name in expired:
+            mode = "FINALIZE" if name in pending else ("CONCURRENTLY" if concurrent else "")
+            if _detach_partition(connection, name, mode):
+                detached.append(name)
+    finally:
+        connection.execute(text("RESET lock_timeout"))
+    if not detached:
+        return [], 0
+
+    detached.sort()
+    estimated_rows = connection.execute(
+        text("SELECT coalesce(sum(greatest(reltuples, 0)), 0) FROM pg_class WHERE relname = ANY(:names)"), {"names": detached}
+    ).scalar()
+    for name in detached:
+        connection.execute(text(f'DROP TABLE IF EXISTS "{name}"'))
+    logger.info(f"Dropped expired {PARENT_TABLE} partitions: {', '.join(detached)}")
+    return detached, int(estimated_rows)
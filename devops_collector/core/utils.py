@@ -4,7 +4,14 @@
 旨在消除重复代码，统一处理逻辑。
 """
 
+import hashlib
+import json
 import logging
+import queue
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any
 
@@ -98,6 +105,170 @@ def parse_iso8601(date_str: str | None) -> datetime | None:
         return None
 
 
+def payload_fingerprint(payload: Any) -> str:
+    """计算 API 载荷的内容指纹。
+
+    对键排序后的紧凑 JSON 取 BLAKE2b-128 摘要，键顺序不同但内容相同的载荷得到相同指纹，
+    用于跳过未变化载荷的重写。
+
+    Args:
+        payload: 可 JSON 序列化的载荷 (无法序列化的值按 str 处理)
+
+    Returns:
+        32 位十六进制指纹
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def fetch_concurrently(fetch: Callable[[Any], Any], keys: Iterable[Any], max_workers: int = 4) -> Iterator[tuple[Any, Any, Exception | None]]:
+    """有界并发地对每个 key 调用 fetch，并按提交顺序产出 (key, 结果, 异常)。
+
+    仅用于并发执行网络请求：数据库 Session 非线程安全，调用方应在主线程中消费结果并批量写库。
+    在途任务数不超过 max_workers * 2，避免一次性提交全部任务占用内存。
+
+    Args:
+        fetch: 针对单个 key 的抓取函数 (如 client.get_builds)
+        keys: 待抓取的 key 序列
+        max_workers: 最大并发线程数，<= 1 时退化为串行
+
+    Yields:
+        (key, 结果, 异常) 三元组；抓取失败时结果为 None，异常为捕获到的错误
+    """
+    if max_workers <= 1:
+        for key in keys:
+            try:
+                yield key, fetch(key), None
+            except Exception as e:
+                yield key, None, e
+        return
+
+    def _resolve(item: tuple[Any, Any]) -> tuple[Any, Any, Exception | None]:
+        key, future = item
+        try:
+            return key, future.result(), None
+        except Exception as e:
+            return key, None, e
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch") as pool:
+        pending: deque = deque()
+        for key in keys:
+            pending.append((key, pool.submit(fetch, key)))
+            if len(pending) >= max_workers * 2:
+                yield _resolve(pending.popleft())
+        while pending:
+            yield _resolve(pending.popleft())
+
+
+class _BackgroundStream:
+    """在后台线程中迭代 open_iterable() 的结果，最多领先消费方 depth 个元素。
+
+    线程在构造时即启动；源迭代器抛出的异常在消费到该位置时重新抛出。
+    消费结束或调用 close() 后，后台线程会在下一次放入队列时停止。
+    """
+
+    _DONE = object()
+
+    def __init__(self, open_iterable: Callable[[], Iterable[Any]], depth: int):
+        self._buffer: queue.Queue = queue.Queue(maxsize=max(depth, 1))
+        self._stop = threading.Event()
+        threading.Thread(target=self._produce, args=(open_iterable,), name="prefetch", daemon=True).start()
+
+    def _put(self, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, open_iterable: Callable[[], Iterable[Any]]) -> None:
+        try:
+            for item in open_iterable():
+                if not self._put((item, None)):
+                    return
+        except Exception as e:
+            self._put((self._DONE, e))
+            return
+        self._put((self._DONE, None))
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            while True:
+                item, exc = self._buffer.get()
+                if item is self._DONE:
+                    if exc is not None:
+                        raise exc
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._stop.set()
+
+
+def prefetch(iterable: Iterable[Any], depth: int = 1) -> Iterator[Any]:
+    """在后台线程中提前迭代，使下一页的网络请求与当前批次的写库重叠。
+
+    后台线程最多领先消费方 depth 个元素；源迭代器抛出的异常会在消费到该位置时重新抛出。
+    消费方提前结束 (break/异常) 时后台线程会在下一次放入队列时停止。
+
+    Args:
+        iterable: 源迭代器 (如按页产出的 API 生成器)
+        depth: 预取的元素个数，<= 0 时退化为直接迭代
+
+    Yields:
+        源迭代器的元素，顺序不变
+    """
+    if depth <= 0:
+        yield from iterable
+        return
+    yield from _BackgroundStream(lambda: iterable, depth)
+
+
+def stream_concurrently(
+    open_stream: Callable[[Any], Iterable[Any]], keys: Iterable[Any], max_workers: int = 4, depth: int = 1
+) -> Iterator[tuple[Any, Iterator[Any]]]:
+    """有界并发地为每个 key 打开分页流，并按 keys 顺序产出 (key, 页迭代器)。
+
+    与 fetch_concurrently 不同，单个 key 的结果不会整体加载进内存：每个流在后台线程中
+    最多领先消费方 depth 页，同时在途的流不超过 max_workers 个，内存占用约为
+    max_workers * (depth + 1) 页。调用方应在主线程中消费完当前页迭代器后再取下一个 key；
+    抓取异常在消费到对应页时抛出。
+
+    Args:
+        open_stream: 针对单个 key 返回分页迭代器的函数 (如 client.iter_issues)，在后台线程中调用
+        keys: 待抓取的 key 序列
+        max_workers: 同时在途的流数，<= 1 时退化为串行
+        depth: 每个流预取的页数
+
+    Yields:
+        (key, 页迭代器) 二元组
+    """
+    if max_workers <= 1:
+        for key in keys:
+            yield key, iter(open_stream(key))
+        return
+
+    pending: deque = deque()
+    try:
+        for key in keys:
+            pending.append((key, _BackgroundStream(lambda key=key: open_stream(key), depth)))
+            if len(pending) >= max_workers:
+                head, stream = pending[0]
+                yield head, iter(stream)
+                pending.popleft()[1].close()
+        while pending:
+            head, stream = pending[0]
+            yield head, iter(stream)
+            pending.popleft()[1].close()
+    finally:
+        for _, stream in pending:
+            stream.close()
+
+
 from pathlib import Path
 
 from devops_collector.config import settings
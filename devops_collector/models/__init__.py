@@ -42,6 +42,7 @@ from .base_models import (
     RevenueContract,
     Service,
     ServiceProjectMapping,
+    SyncCheckpoint,
     SyncLog,
     SysMenu,
     SysRole,
@@ -58,7 +59,7 @@ from .base_models import (
     UserRole,
     Vendor,
 )
-from .dependency import Dependency, DependencyCVE, DependencyScan, LicenseRiskRule
+from .dependency import CVECatalog, Dependency, DependencyCVE, DependencyScan, LicenseRiskRule
 from .service_desk import ServiceDeskTicket
 from .test_management import (
     GTMRequirement,
@@ -108,6 +109,7 @@ __all__ = [
     "Location",
     "Calendar",
     "SyncLog",
+    "SyncCheckpoint",
     "RawDataStaging",
     "IdentityMapping",
     "Product",
@@ -153,6 +155,7 @@ __all__ = [
     "LicenseRiskRule",
     "Dependency",
     "DependencyCVE",
+    "CVECatalog",
     "GTMTestCase",
     "GTMTestCaseIssueLink",
     "GTMRequirement",
@@ -6,13 +6,18 @@ SQLAlchemy 全量审计监听引擎 (Change Tracking Engine).
 2. UPDATE: 自动计算各字段差异 (Diff)，生成 Before/After 变更链。
 3. DELETE: 物理追踪记录删除。
 对于密码、Token 等敏感字段，引擎会自动执行“星号星号”掩码处理。
+
+审计记录在 flush 时只组装并暂存于所属 Session，事务提交前以一次多行 INSERT 写入；
+事务 (或保存点) 回滚时，其中产生的审计记录随之丢弃，与业务数据保持一致。
 """
 
 import logging
 import os
+from datetime import UTC, datetime
 from typing import Any
 
 from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
 
 from devops_collector.models.audit import AuditLog
 from devops_collector.utils.audit_context import get_snapshot
@@ -26,30 +31,40 @@ SKIP_AUDIT = os.getenv("DEVOPS_SKIP_AUDIT", "false").lower() == "true"
 # 对敏感字段执行固定掩码脱敏 (L3 合规要求)
 SENSITIVE_FIELDS_SET = {"password", "secret", "token", "access_key", "checksum", "credential_key"}
 
+# Session.info 中暂存待写入审计记录的键：[(产生记录时所在的事务, 审计记录), ...]
+_BUFFER_KEY = "audit_event_buffer"
+
+
+def _json_value(value: Any) -> Any:
+    """把 Diff 中的值转换为可 JSON 序列化的形式 (JSON 列的 dict/list 逐层转换保留结构，时间取 ISO 格式，UUID/Decimal 等取字符串)。"""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, dict):
+        return {str(k): _json_value(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_json_value(v) for v in value]
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
 
 def resolve_diffs(target) -> dict[str, Any]:
     """计算当前 ORM 对象的属性变更增量快照。"""
     diffs = {}
     ins = inspect(target)
-    for attr in ins.attrs:
-        # 0. 仅审计列属性 (Column Property)，跳过关系 (Relationship Property)
-        # 否则会触发 JSON 序列化失败 (TypeError)
-        if not hasattr(attr, "history") or not hasattr(attr, "prop"):
-            continue
-
-        # 检查是否为列属性，排除关系
-        from sqlalchemy.orm import ColumnProperty
-
-        if not isinstance(attr.prop, ColumnProperty):
+    unmodified = ins.unmodified
+    # 仅审计列属性 (Column Property)，跳过关系 (Relationship Property)；未修改的列不读取 history
+    for prop in ins.mapper.column_attrs:
+        attr_key = prop.key
+        if attr_key in unmodified:
             continue
 
-        hist = attr.history
+        hist = ins.attrs[attr_key].history
         if not hist.has_changes():
             continue
 
-        attr_key = attr.key
-        old_val = hist.deleted[0] if hist.deleted else None
-        new_val = hist.added[0] if hist.added else None
+        old_val = _json_value(hist.deleted[0]) if hist.deleted else None
+        new_val = _json_value(hist.added[0]) if hist.added else None
 
         # 1. 过滤敏感字段不入库（仅显示掩码）
         if attr_key in SENSITIVE_FIELDS_SET:
@@ -79,8 +94,9 @@ def capture_audit_event(connection, target, action: str):
     # 兼容 UUID 主键 (global_user_id) 与自增 ID
     resource_id = str(getattr(target, "id", None) or getattr(target, "global_user_id", "N/A"))
 
-    # 4. 组装审计记录并执行
+    # 4. 组装审计记录 (时间取变更发生时刻，而非批量写入时刻)
     audit_payload = {
+        "timestamp": datetime.now(UTC),
         "actor_id": ctx["actor_id"],
         "actor_name": ctx["actor_name"],
         "client_ip": ctx["client_ip"],
@@ -93,16 +109,68 @@ def capture_audit_event(connection, target, action: str):
         "remark": ctx["remark"],
     }
 
+    # 5. 暂存到所属 Session，提交前统一写入；脱离 Session 的对象直接写入
+    session = object_session(target)
+    if session is None:
+        _write_audit_logs(connection, [audit_payload])
+        return
+    owner = session.get_nested_transaction() or session.get_transaction()
+    session.info.setdefault(_BUFFER_KEY, []).append((owner, audit_payload))
+
+
+def _write_audit_logs(connection, payloads: list[dict[str, Any]]) -> None:
+    """以一次多行 INSERT 写入审计记录。"""
     try:
         # LL #28: Use defensive execution to prevent test/migration failures if audit table is missing
-        connection.execute(AuditLog.__table__.insert().values(**audit_payload))
+        connection.execute(AuditLog.__table__.insert(), payloads)
     except Exception as e:
         # Just log it, don't crash the main transaction
         logger.error(f"[AUDIT-ENGINE] Audit record failed (might be missing table in tests): {str(e)}")
 
 
+def flush_audit_buffer(session: Session) -> None:
+    """提交前写入本事务暂存的审计记录。
+
+    先执行一次 flush，使提交时才落库的变更产生的审计记录也进入本批。
+    """
+    session.flush()
+    buffer = session.info.pop(_BUFFER_KEY, None)
+    if buffer:
+        _write_audit_logs(session.connection(), [payload for _, payload in buffer])
+
+
+def _within(owner, transaction) -> bool:
+    """owner 是否为 transaction 本身或其内部的 (嵌套) 事务。"""
+    while owner is not None:
+        if owner is transaction:
+            return True
+        owner = owner.parent
+    return False
+
+
+def discard_rolled_back_events(session: Session, previous_transaction) -> None:
+    """回滚 (含保存点回滚) 时丢弃该事务内产生的审计记录。"""
+    buffer = session.info.get(_BUFFER_KEY)
+    if buffer:
+        session.info[_BUFFER_KEY] = [(owner, payload) for owner, payload in buffer if not _within(owner, previous_transaction)]
+
+
+def clear_audit_buffer(session: Session, transaction) -> None:
+    """顶层事务结束 (提交、回滚或关闭) 后清空暂存。"""
+    if transaction.parent is None:
+        session.info.pop(_BUFFER_KEY, None)
+
+
 def bind_audit_listeners(target_classes: list[Any]):
     """将全生命周期审计追踪器注册到特定的核心资产类。"""
+    for hook, listener in (
+        ("before_commit", flush_audit_buffer),
+        ("after_soft_rollback", discard_rolled_back_events),
+        ("after_transaction_end", clear_audit_buffer),
+    ):
+        if not event.contains(Session, hook, listener):
+            event.listen(Session, hook, listener)
+
     for cls in target_classes:
         event.listen(cls, "after_insert", lambda m, c, t: capture_audit_event(c, t, "CREATE"))
         event.listen(cls, "after_update", lambda m, c, t: capture_audit_event(c, t, "UPDATE"))
@@ -23,6 +23,7 @@ from sqlalchemy import (
     Text,
     UniqueConstraint,
 )
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import DeclarativeBase, backref, relationship
 
 
@@ -739,6 +740,25 @@ class SyncLog(Base, TimestampMixin):
     correlation_id = Column(String(100), index=True, comment="关联追踪ID")
 
 
+class SyncCheckpoint(Base, TimestampMixin):
+    """插件同步断点与增量水位表。
+
+    按 (来源系统, 采集范围, 实体类型) 记录分页游标与已处理数量，
+    使大批量采集在中断后可从最近一次提交的批次继续。
+    """
+
+    __tablename__ = "sys_sync_checkpoints"
+    __table_args__ = (UniqueConstraint("source", "scope", "entity_type", name="uq_sync_checkpoint"),)
+    id = Column(Integer, primary_key=True, autoincrement=True, comment="自增主键")
+    source = Column(String(50), nullable=False, comment="来源系统类型 (zentao/nexus/jira)")
+    scope = Column(String(200), nullable=False, comment="采集范围标识 (产品ID/仓库名/项目Key)")
+    entity_type = Column(String(50), nullable=False, comment="实体类型 (issue_feature/component)")
+    cursor = Column(Text, comment="断点游标 (已完成页码或 continuation token)")
+    watermark = Column(DateTime(timezone=True), comment="增量水位 (已同步记录的最大更新时间)")
+    processed_count = Column(Integer, default=0, comment="本轮已处理记录数")
+    status = Column(String(20), default="RUNNING", comment="断点状态 (RUNNING/COMPLETED)")
+
+
 class Location(Base, TimestampMixin):
     """地理位置或机房位置参考表。"""
 
@@ -775,18 +795,24 @@ class Calendar(Base, TimestampMixin):
 
 
 class RawDataStaging(Base, TimestampMixin):
-    """原始数据暂存表 (Staging 层)，用于存放未经处理的 API Payload。"""
+    """原始数据暂存表 (Staging 层)，用于存放未经处理的 API Payload。
+
+    PostgreSQL 上按采集月份 (collected_month) RANGE 分区，保留期清理直接删除过期分区
+    (见 devops_collector.core.staging_partitions)。同一实体每月保留一行，月内重复采集时
+    按 payload_hash 判断，载荷未变化则不重写。
+    """
 
     __tablename__ = "stg_raw_data"
-    __table_args__ = (UniqueConstraint("source", "entity_type", "external_id", name="uq_raw_data_staging"),)
-    id = Column(Integer, primary_key=True, autoincrement=True, comment="自增主键")
-    source = Column(String(50), comment="数据来源系统 (gitlab/jira/sonar)")
-    entity_type = Column(String(50), comment="实体类型 (project/issue/pipeline)")
-    external_id = Column(String(100), index=True, comment="外部系统记录ID")
-    payload = Column(JSON, comment="原始 JSON 数据负载")
+    __table_args__ = ({"postgresql_partition_by": "RANGE (collected_month)"},)
+    source = Column(String(50), primary_key=True, comment="数据来源系统 (gitlab/jira/sonar)")
+    entity_type = Column(String(50), primary_key=True, comment="实体类型 (project/issue/pipeline)")
+    external_id = Column(String(100), primary_key=True, comment="外部系统记录ID")
+    collected_month = Column(Date, primary_key=True, default=lambda: datetime.now(UTC).date().replace(day=1), comment="采集月份 (分区键，取当月1日)")
+    payload = Column(JSON().with_variant(JSONB(), "postgresql"), comment="原始 JSON 数据负载")
+    payload_hash = Column(String(32), comment="载荷内容指纹 (payload_fingerprint)")
     schema_version = Column(String(20), comment="Payload 结构版本")
     correlation_id = Column(String(100), index=True, comment="关联追踪ID")
-    collected_at = Column(DateTime(timezone=True), comment="采集时间")
+    collected_at = Column(DateTime(timezone=True), comment="采集时间 (载荷最近一次变化时)")
 
 
 class OKRObjective(Base, TimestampMixin, SCDMixin):
@@ -182,13 +182,45 @@ class Dependency(Base, TimestampMixin):
         return f"<Dependency(name='{self.package_name}', version='{self.package_version}')>"
 
 
+class CVECatalog(Base, TimestampMixin):
+    """CVE 知识库表 (cve_catalog)。
+
+    按 CVE 编号去重存储漏洞描述、CVSS 向量与引用链接，供所有扫描的 DependencyCVE 共享。
+
+    Attributes:
+        cve_id (str): CVE 编号，主键。
+        cvss_score (float): CVSS 评分。
+        cvss_vector (str): CVSS 向量。
+        severity (str): 严重等级 (CRITICAL, HIGH, MEDIUM, LOW)。
+        description (str): 漏洞描述。
+        references (list): 引用链接。
+    """
+
+    __tablename__ = "cve_catalog"
+    cve_id = Column(String(50), primary_key=True)
+    cvss_score = Column(Float)
+    cvss_vector = Column(String(200))
+    severity = Column(String(20))
+    description = Column(Text)
+    published_date = Column(DateTime(timezone=True))
+    last_modified_date = Column(DateTime(timezone=True))
+    references = Column(JSONB)
+
+    def __repr__(self) -> str:
+        """返回 CVE 知识库条目的字符串表示。"""
+        return f"<CVECatalog(cve_id='{self.cve_id}', severity='{self.severity}')>"
+
+
 class DependencyCVE(Base, TimestampMixin):
     """CVE 漏洞详情表 (dependency_cves)。
 
+    记录依赖与 CVE 的关联；描述、向量、引用等 CVE 自身信息保存在 cve_catalog 中，
+    本表仅冗余评分与严重等级以便筛选 (description/references 等列仅保留给历史数据)。
+
     Attributes:
         id (int): 自增主键。
         dependency_id (int): 关联的依赖 ID。
-        cve_id (str): CVE 编号 (e.g. CVE-2021-44228)。
+        cve_id (str): CVE 编号 (e.g. CVE-2021-44228)，引用 cve_catalog。
         cvss_score (float): CVSS 评分。
         cvss_vector (str): CVSS 向量。
         severity (str): 严重等级 (CRITICAL, HIGH, MEDIUM, LOW)。
@@ -196,13 +228,14 @@ class DependencyCVE(Base, TimestampMixin):
         is_ignored (bool): 是否标记为误报/忽略。
         ignore_reason (str): 忽略原因。
         dependency (Dependency): 关联的依赖对象。
+        catalog (CVECatalog): 关联的 CVE 知识库条目。
     """
 
     __tablename__ = "dependency_cves"
     __table_args__ = (UniqueConstraint("dependency_id", "cve_id", name="uq_dependency_cve"),)
     id = Column(Integer, primary_key=True)
     dependency_id = Column(Integer, ForeignKey("dependencies.id", ondelete="CASCADE"), nullable=False)
-    cve_id = Column(String(50), nullable=False)
+    cve_id = Column(String(50), ForeignKey("cve_catalog.cve_id"), nullable=False, index=True)
     cvss_score = Column(Float)
     cvss_vector = Column(String(200))
     severity = Column(String(20))
@@ -218,6 +251,7 @@ class DependencyCVE(Base, TimestampMixin):
     ignore_reason = Column(Text)
 
     dependency = relationship("Dependency", back_populates="cves")
+    catalog = relationship("CVECatalog")
 
     def __repr__(self):
         '''"""TODO: Add description.
@@ -116,13 +116,30 @@ COMMENT ON TABLE dependencies IS '依赖清单表，存储项目的依赖包及
 COMMENT ON COLUMN dependencies.dependency_type IS '依赖类型: direct(直接依赖), transitive(传递依赖)';
 
 
--- 4. CVE 漏洞详情表
+-- 4. CVE 知识库表 (按 CVE 编号去重，所有扫描共享)
+CREATE TABLE IF NOT EXISTS cve_catalog (
+    cve_id VARCHAR(50) PRIMARY KEY,
+    cvss_score FLOAT,
+    cvss_vector VARCHAR(200),
+    severity VARCHAR(20),
+    description TEXT,
+    published_date TIMESTAMP,
+    last_modified_date TIMESTAMP,
+    references JSONB,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+COMMENT ON TABLE cve_catalog IS 'CVE 知识库，存储漏洞描述、CVSS 向量与引用链接，dependency_cves 通过 cve_id 引用';
+
+
+-- 5. CVE 漏洞详情表
 CREATE TABLE IF NOT EXISTS dependency_cves (
     id SERIAL PRIMARY KEY,
     dependency_id INTEGER NOT NULL REFERENCES dependencies(id) ON DELETE CASCADE,
     
-    -- CVE 信息
-    cve_id VARCHAR(50) NOT NULL,
+    -- CVE 信息 (描述、向量、引用见 cve_catalog)
+    cve_id VARCHAR(50) NOT NULL REFERENCES cve_catalog(cve_id),
     cvss_score FLOAT,
     cvss_vector VARCHAR(200),
     severity VARCHAR(20),  -- CRITICAL, HIGH, MEDIUM, LOW
@@ -157,7 +174,7 @@ COMMENT ON TABLE dependency_cves IS 'CVE 漏洞详情表，存储依赖包的安
 COMMENT ON COLUMN dependency_cves.cvss_score IS 'CVSS 评分 (0-10)，分数越高风险越大';
 
 
--- 5. 预置常见许可证规则
+-- 6. 预置常见许可证规则
 INSERT INTO license_risk_rules (license_name, license_spdx_id, risk_level, is_copyleft, commercial_use_allowed, description) VALUES
 ('GNU General Public License v3.0', 'GPL-3.0', 'critical', TRUE, FALSE, '强传染性许可证，要求衍生作品也必须开源'),
 ('GNU Affero General Public License v3.0', 'AGPL-3.0', 'critical', TRUE, FALSE, '最严格的传染性许可证，网络服务也需开源'),
@@ -178,7 +195,7 @@ INSERT INTO license_risk_rules (license_name, license_spdx_id, risk_level, is_co
 ON CONFLICT (license_name) DO NOTHING;
 
 
--- 6. 创建增强的许可证合规性分析视图
+-- 7. 创建增强的许可证合规性分析视图
 CREATE OR REPLACE VIEW view_compliance_oss_license_risk_enhanced AS
 WITH latest_scans AS (
     SELECT DISTINCT ON (project_id)
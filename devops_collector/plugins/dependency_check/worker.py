@@ -3,17 +3,24 @@ OWASP Dependency-Check Worker
 采集项目的依赖清单、许可证信息和漏洞信息
 """
 
+import json
 import logging
+import os
 import re
+from collections.abc import Iterable, Iterator
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from devops_collector.core.base_worker import BaseWorker
 from devops_collector.core.registry import PluginRegistry
 from devops_collector.models.dependency import (
+    CVECatalog,
     Dependency,
     DependencyCVE,
     DependencyScan,
@@ -23,27 +30,165 @@ from devops_collector.models.dependency import (
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE = re.compile(r"\s*")
+
+LICENSE_SPDX_MAPPING = {
+    "Apache License 2.0": "Apache-2.0",
+    "Apache License, Version 2.0": "Apache-2.0",
+    "Apache 2.0": "Apache-2.0",
+    "MIT License": "MIT",
+    "The MIT License": "MIT",
+    "BSD 3-Clause": "BSD-3-Clause",
+    "BSD 2-Clause": "BSD-2-Clause",
+    "GPL-3.0": "GPL-3.0",
+    "GPL-2.0": "GPL-2.0",
+    "LGPL-3.0": "LGPL-3.0",
+    "LGPL-2.1": "LGPL-2.1",
+    "AGPL-3.0": "AGPL-3.0",
+    "MPL-2.0": "MPL-2.0",
+    "EPL-2.0": "EPL-2.0",
+}
+
+
+@lru_cache(maxsize=4096)
+def _normalize_license_spdx(license_str: str) -> str:
+    """规范化许可证为 SPDX ID (按许可证字符串进程内缓存，跨扫描复用)"""
+    if license_str in LICENSE_SPDX_MAPPING:
+        return LICENSE_SPDX_MAPPING[license_str]
+    license_lower = license_str.lower()
+    if "apache" in license_lower and "2" in license_lower:
+        return "Apache-2.0"
+    elif "mit" in license_lower:
+        return "MIT"
+    elif "gpl" in license_lower and "3" in license_lower:
+        return "GPL-3.0"
+    elif "gpl" in license_lower and "2" in license_lower:
+        return "GPL-2.0"
+    elif "lgpl" in license_lower:
+        return "LGPL-3.0"
+    elif "agpl" in license_lower:
+        return "AGPL-3.0"
+    elif "bsd" in license_lower:
+        return "BSD-3-Clause"
+    return "UNKNOWN"
+
+
+class _JsonStream:
+    """基于 JSONDecoder.raw_decode 的增量 JSON 读取器。
+
+    仅在缓冲区不足以解析出完整的值时才继续从文件读取，已消费的内容会被丢弃，
+    因此内存占用取决于单个值的大小而不是整个文件。
+    """
+
+    def __init__(self, fp: IO[str], chunk_size: int = 1 << 20):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """追加读取一块数据，文件结束时返回 False。"""
+        chunk = self.fp.read(self.chunk_size)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """跳过空白并返回下一个字符 (文件结束时返回空串)。"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """消费一个指定的结构字符。"""
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON report: expected {char!r}, got {self.peek()!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """解析并返回下一个完整的 JSON 值。"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # 数字等标量可能恰好被缓冲区截断，需读到其后的分隔符才能确认完整
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _stream_report(fp: IO[str], header: dict, chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """流式解析 Dependency-Check JSON 报告。
+
+    逐个产出 dependencies 数组中的元素，其余顶层字段 (报告头，体积很小) 写入 header；
+    header 在生成器耗尽后才完整。
+
+    Args:
+        fp: 以文本模式打开的报告文件
+        header: 用于接收报告头字段的字典
+        chunk_size: 每次从文件读取的字符数
+    """
+    stream = _JsonStream(fp, chunk_size)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key == "dependencies" and stream.peek() == "[":
+            stream.expect("[")
+            if stream.peek() != "]":
+                while True:
+                    yield stream.value()
+                    if stream.peek() != ",":
+                        break
+                    stream.expect(",")
+            stream.expect("]")
+        else:
+            header[key] = stream.value()
+        if stream.peek() != ",":
+            break
+        stream.expect(",")
+    stream.expect("}")
+
+
+def _measure_tree(path: str, remove: bool) -> int:
+    """以 os.scandir 单次遍历统计目录占用字节数，remove 为 True 时边遍历边删除。
+
+    目录项类型来自 readdir 结果，每个文件只做一次 lstat；统计与删除合并为一次遍历，
+    不再像 rglob + rmtree 那样把整棵目录树走两遍。
+    """
+    size = 0
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                size += _measure_tree(entry.path, remove)
+                continue
+            size += entry.stat(follow_symlinks=False).st_size
+            if remove:
+                os.unlink(entry.path)
+    if remove:
+        os.rmdir(path)
+    return size
+
 
 class DependencyCheckWorker(BaseWorker):
     """OWASP Dependency-Check 数据采集器"""
 
     SCHEMA_VERSION = "1.0.0"
-    LICENSE_SPDX_MAPPING = {
-        "Apache License 2.0": "Apache-2.0",
-        "Apache License, Version 2.0": "Apache-2.0",
-        "Apache 2.0": "Apache-2.0",
-        "MIT License": "MIT",
-        "The MIT License": "MIT",
-        "BSD 3-Clause": "BSD-3-Clause",
-        "BSD 2-Clause": "BSD-2-Clause",
-        "GPL-3.0": "GPL-3.0",
-        "GPL-2.0": "GPL-2.0",
-        "LGPL-3.0": "LGPL-3.0",
-        "LGPL-2.1": "LGPL-2.1",
-        "AGPL-3.0": "AGPL-3.0",
-        "MPL-2.0": "MPL-2.0",
-        "EPL-2.0": "EPL-2.0",
-    }
+    BATCH_SIZE = 500
+    LICENSE_SPDX_MAPPING = LICENSE_SPDX_MAPPING
 
     def __init__(
         self,
@@ -60,6 +205,8 @@ class DependencyCheckWorker(BaseWorker):
         self.report_retention_days = retention_days
         Path(self.report_base_dir).mkdir(parents=True, exist_ok=True)
         self.license_rules = self._load_license_rules()
+        self._license_risk_cache: dict[str, str] = {}
+        self._cve_cache: dict[str, dict] = {}
         self.scanner_version = self.client.get_version() if self.client else "unknown"
 
     def _load_license_rules(self) -> dict[str, LicenseRiskRule]:
@@ -93,9 +240,10 @@ class DependencyCheckWorker(BaseWorker):
     def process_ci_report(self, project_id: int, task: dict) -> int:
         """
         处理 CI 流水线上传的报告
-        """
-        import json
 
+        report_path 指向的文件会被流式解析，依赖按批写入；raw_json 仅保存报告头
+        (依赖明细已逐条保存在 dependencies.raw_data 中)。
+        """
         # 1. 获取报告内容
         report_data = task.get("report_json")
         report_path = task.get("report_path")
@@ -104,10 +252,7 @@ class DependencyCheckWorker(BaseWorker):
             logger.info(f"Loading report from file: {report_path}")
             if not Path(report_path).exists():
                 raise FileNotFoundError(f"Report not found: {report_path}")
-            with open(report_path, encoding="utf-8") as f:
-                report_data = json.load(f)
-
-        if not report_data:
+        elif not report_data:
             raise ValueError("No report data provided")
 
         # 2. 创建扫描记录
@@ -115,24 +260,30 @@ class DependencyCheckWorker(BaseWorker):
             project_id=project_id,
             scan_status="in_progress",
             scanner_name="OWASP Dependency-Check (CI)",
-            scanner_version=report_data.get("reportSchema", "unknown"),
             ci_job_id=task.get("ci_job_id"),
             ci_job_url=task.get("ci_job_url"),
             commit_sha=task.get("commit_sha"),
             branch=task.get("branch"),
             report_url=task.get("report_url"),
             scan_duration_seconds=task.get("duration"),
-            raw_json=report_data if task.get("save_raw", True) else None,
         )
         self.session.add(scan)
         self.session.commit()
 
         try:
             # 3. 解析并保存依赖
-            stats = self._save_dependencies(scan.id, project_id, report_data)
+            if report_data is not None:
+                header = {k: v for k, v in report_data.items() if k != "dependencies"}
+                stats = self._save_dependencies(scan.id, project_id, report_data.get("dependencies", []))
+            else:
+                header = {}
+                with open(report_path, encoding="utf-8") as f:
+                    stats = self._save_dependencies(scan.id, project_id, _stream_report(f, header))
 
             # 4. 更新记录状态
             scan.scan_status = "completed"
+            scan.scanner_version = header.get("reportSchema", "unknown")
+            scan.raw_json = header if task.get("save_raw", True) else None
             scan.total_dependencies = stats["total"]
             scan.vulnerable_dependencies = stats["vulnerable"]
             scan.high_risk_licenses = stats["high_risk_licenses"]
@@ -143,6 +294,7 @@ class DependencyCheckWorker(BaseWorker):
 
         except Exception as e:
             logger.error(f"Failed to process CI report: {e}")
+            self.session.rollback()
             scan.scan_status = "failed"
             self.session.commit()
             raise
@@ -150,94 +302,152 @@ class DependencyCheckWorker(BaseWorker):
     def cleanup_old_reports(self, dry_run: bool = False) -> dict[str, int]:
         """
         清理过期的报告文件
+
+        报告目录结构为 <report_dir>/<项目>/<扫描>/，按扫描目录的修改时间判断是否过期。
         """
-        import shutil
         from datetime import timedelta
 
         if self.report_retention_days == 0:
             logger.info("Report retention is set to 0 (永久保留), skipping cleanup")
             return {"deleted_count": 0, "freed_space_mb": 0.0}
         cutoff_date = datetime.now() - timedelta(days=self.report_retention_days)
+        cutoff_ts = cutoff_date.timestamp()
         logger.info(f"Cleaning up reports older than {cutoff_date}")
         deleted_count = 0
         freed_space = 0
-        report_base_path = Path(self.report_base_dir)
-        if not report_base_path.exists():
+        if not os.path.isdir(self.report_base_dir):
             logger.warning(f"Report directory does not exist: {self.report_base_dir}")
             return {"deleted_count": 0, "freed_space_mb": 0.0}
-        for project_dir in report_base_path.iterdir():
-            if not project_dir.is_dir():
-                continue
-            for scan_dir in project_dir.iterdir():
-                if not scan_dir.is_dir():
+        with os.scandir(self.report_base_dir) as project_dirs:
+            expired = []
+            for project_dir in project_dirs:
+                if not project_dir.is_dir(follow_symlinks=False):
                     continue
-                mtime = datetime.fromtimestamp(scan_dir.stat().st_mtime)
-                if mtime < cutoff_date:
-                    dir_size = sum(f.stat().st_size for f in scan_dir.rglob("*") if f.is_file())
-                    freed_space += dir_size
-                    if dry_run:
-                        logger.info(f"[DRY RUN] Would delete: {scan_dir} ({dir_size / 1024 / 1024:.2f} MB)")
-                    else:
-                        shutil.rmtree(scan_dir)
-                        logger.info(f"Deleted old report: {scan_dir} ({dir_size / 1024 / 1024:.2f} MB)")
-                    deleted_count += 1
+                with os.scandir(project_dir.path) as scan_dirs:
+                    expired += [d.path for d in scan_dirs if d.is_dir(follow_symlinks=False) and d.stat(follow_symlinks=False).st_mtime < cutoff_ts]
+        for scan_dir in expired:
+            dir_size = _measure_tree(scan_dir, remove=not dry_run)
+            freed_space += dir_size
+            if dry_run:
+                logger.info(f"[DRY RUN] Would delete: {scan_dir} ({dir_size / 1024 / 1024:.2f} MB)")
+            else:
+                logger.info(f"Deleted old report: {scan_dir} ({dir_size / 1024 / 1024:.2f} MB)")
+            deleted_count += 1
         freed_space_mb = freed_space / 1024 / 1024
         logger.info(f"Cleanup completed: {deleted_count} directories, {freed_space_mb:.2f} MB freed")
         return {"deleted_count": deleted_count, "freed_space_mb": round(freed_space_mb, 2)}
 
-    def _save_dependencies(self, scan_id: int, project_id: int, report_data: dict) -> dict:
-        """保存依赖清单"""
-        dependencies_data = report_data.get("dependencies", [])
+    def _save_dependencies(self, scan_id: int, project_id: int, dependencies: Iterable[dict]) -> dict:
+        """保存依赖清单
+
+        按 BATCH_SIZE 分批：依赖通过一次 INSERT ... RETURNING id 批量写入，
+        其 CVE 再以一次批量 INSERT 写入，整个扫描在一个事务内提交。
+        同一扫描中重复的 (包名, 版本) 只保留首次出现的记录。
+        """
         stats = {"total": 0, "vulnerable": 0, "high_risk_licenses": 0}
+        seen: set[tuple] = set()
+        iterator = iter(dependencies)
+        while batch := list(islice(iterator, self.BATCH_SIZE)):
+            dep_rows, vuln_lists = [], []
+            for dep_data in batch:
+                row = self._build_dependency_row(scan_id, project_id, dep_data)
+                key = (row["package_name"], row["package_version"])
+                if key in seen:
+                    logger.debug(f"Skipping duplicate dependency {key} in scan {scan_id}")
+                    continue
+                seen.add(key)
+                dep_rows.append(row)
+                vuln_lists.append(dep_data.get("vulnerabilities", []))
+                stats["total"] += 1
+                if row["has_vulnerabilities"]:
+                    stats["vulnerable"] += 1
+                if row["license_risk_level"] in ("critical", "high"):
+                    stats["high_risk_licenses"] += 1
+            if not dep_rows:
+                continue
 
-        for dep_data in dependencies_data:
-            package_name = dep_data.get("fileName", "Unknown")
-            package_version = self._extract_version(dep_data)
-            license_info = self._extract_license(dep_data)
-            license_risk = self._assess_license_risk(license_info.get("spdx_id"))
-            vulnerabilities = dep_data.get("vulnerabilities", [])
-            cve_stats = self._analyze_vulnerabilities(vulnerabilities)
-            dependency = Dependency(
-                scan_id=scan_id,
-                project_id=project_id,
-                package_name=package_name,
-                package_version=package_version,
-                package_manager=self._detect_package_manager(dep_data),
-                license_name=license_info.get("name"),
-                license_spdx_id=license_info.get("spdx_id"),
-                license_url=license_info.get("url"),
-                license_risk_level=license_risk,
-                has_vulnerabilities=len(vulnerabilities) > 0,
-                highest_cvss_score=cve_stats["highest_cvss"],
-                critical_cve_count=cve_stats["critical"],
-                high_cve_count=cve_stats["high"],
-                medium_cve_count=cve_stats["medium"],
-                low_cve_count=cve_stats["low"],
-                file_path=dep_data.get("filePath"),
-                description=dep_data.get("description"),
-                raw_data=dep_data,
-            )
-            self.session.add(dependency)
-            self.session.flush()
-            for vuln in vulnerabilities:
-                cve = DependencyCVE(
-                    dependency_id=dependency.id,
-                    cve_id=vuln.get("name", "UNKNOWN"),
-                    cvss_score=self._extract_cvss_score(vuln),
-                    cvss_vector=self._extract_cvss_vector(vuln),
-                    severity=vuln.get("severity", "UNKNOWN"),
-                    description=vuln.get("description"),
-                    references=vuln.get("references", []),
-                )
-                self.session.add(cve)
-            stats["total"] += 1
-            if len(vulnerabilities) > 0:
-                stats["vulnerable"] += 1
-            if license_risk in ("critical", "high"):
-                stats["high_risk_licenses"] += 1
+            ids = self.session.execute(insert(Dependency).returning(Dependency.id, sort_by_parameter_order=True), dep_rows).scalars().all()
+            cve_rows, catalog = {}, {}
+            for dependency_id, vulnerabilities in zip(ids, vuln_lists, strict=True):
+                for vuln in vulnerabilities:
+                    entry = self._build_cve_entry(vuln)
+                    catalog.setdefault(entry["cve_id"], entry)
+                    cve_rows.setdefault(
+                        (dependency_id, entry["cve_id"]),
+                        {"dependency_id": dependency_id, "cve_id": entry["cve_id"], "cvss_score": entry["cvss_score"], "severity": entry["severity"]},
+                    )
+            if cve_rows:
+                self._upsert_cve_catalog(catalog)
+                self.session.execute(insert(DependencyCVE), list(cve_rows.values()))
         self.session.commit()
         return stats
 
+    def _build_cve_entry(self, vuln: dict) -> dict:
+        """将报告中的漏洞转换为 CVE 知识库条目。"""
+        return {
+            "cve_id": vuln.get("name", "UNKNOWN"),
+            "cvss_score": self._extract_cvss_score(vuln),
+            "cvss_vector": self._extract_cvss_vector(vuln),
+            "severity": vuln.get("severity", "UNKNOWN"),
+            "description": vuln.get("description"),
+            "references": vuln.get("references", []),
+        }
+
+    def _upsert_cve_catalog(self, entries: dict[str, dict]) -> None:
+        """将一批 CVE 写入知识库：仅插入新条目并更新内容有变化的条目。
+
+        本 Worker 已写入过且内容未变的 CVE 直接跳过，不再查询数据库。
+        """
+        pending = {cve_id: entry for cve_id, entry in entries.items() if self._cve_cache.get(cve_id) != entry}
+        if not pending:
+            return
+        existing = {c.cve_id: c for c in self.session.query(CVECatalog).filter(CVECatalog.cve_id.in_(list(pending))).all()}
+        new_rows = []
+        for cve_id, entry in pending.items():
+            row = existing.get(cve_id)
+            if row is None:
+                new_rows.append(entry)
+            else:
+                for key, value in entry.items():
+                    if getattr(row, key) != value:
+                        setattr(row, key, value)
+            self._cve_cache[cve_id] = entry
+        if new_rows:
+            if self.session.bind.dialect.name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+                # 并发扫描可能同时写入同一 CVE，冲突时保留已有条目
+                self.session.execute(pg_insert(CVECatalog).values(new_rows).on_conflict_do_nothing(index_elements=["cve_id"]))
+            else:
+                self.session.execute(insert(CVECatalog), new_rows)
+        self.session.flush()
+
+    def _build_dependency_row(self, scan_id: int, project_id: int, dep_data: dict) -> dict:
+        """将报告中的单个依赖转换为 dependencies 表的插入行。"""
+        license_info = self._extract_license(dep_data)
+        vulnerabilities = dep_data.get("vulnerabilities", [])
+        cve_stats = self._analyze_vulnerabilities(vulnerabilities)
+        return {
+            "scan_id": scan_id,
+            "project_id": project_id,
+            "package_name": dep_data.get("fileName", "Unknown"),
+            "package_version": self._extract_version(dep_data),
+            "package_manager": self._detect_package_manager(dep_data),
+            "license_name": license_info.get("name"),
+            "license_spdx_id": license_info.get("spdx_id"),
+            "license_url": license_info.get("url"),
+            "license_risk_level": self._assess_license_risk(license_info.get("spdx_id")),
+            "has_vulnerabilities": len(vulnerabilities) > 0,
+            "highest_cvss_score": cve_stats["highest_cvss"],
+            "critical_cve_count": cve_stats["critical"],
+            "high_cve_count": cve_stats["high"],
+            "medium_cve_count": cve_stats["medium"],
+            "low_cve_count": cve_stats["low"],
+            "file_path": dep_data.get("filePath"),
+            "description": dep_data.get("description"),
+            "raw_data": dep_data,
+        }
+
     def _extract_version(self, dep_data: dict) -> str | None:
         """提取版本号"""
         evidence_collected = dep_data.get("evidenceCollected", {})
@@ -261,27 +471,17 @@ class DependencyCheckWorker(BaseWorker):
 
     def _normalize_license_spdx(self, license_str: str) -> str:
         """规范化许可证为 SPDX ID"""
-        if license_str in self.LICENSE_SPDX_MAPPING:
-            return self.LICENSE_SPDX_MAPPING[license_str]
-        license_lower = license_str.lower()
-        if "apache" in license_lower and "2" in license_lower:
-            return "Apache-2.0"
-        elif "mit" in license_lower:
-            return "MIT"
-        elif "gpl" in license_lower and "3" in license_lower:
-            return "GPL-3.0"
-        elif "gpl" in license_lower and "2" in license_lower:
-            return "GPL-2.0"
-        elif "lgpl" in license_lower:
-            return "LGPL-3.0"
-        elif "agpl" in license_lower:
-            return "AGPL-3.0"
-        elif "bsd" in license_lower:
-            return "BSD-3-Clause"
-        return "UNKNOWN"
+        return _normalize_license_spdx(license_str)
 
     def _assess_license_risk(self, spdx_id: str) -> str:
-        """评估许可证风险等级"""
+        """评估许可证风险等级 (结果按 SPDX ID 缓存，规则随 Worker 加载)"""
+        risk = self._license_risk_cache.get(spdx_id)
+        if risk is None:
+            risk = self._license_risk_cache[spdx_id] = self._assess_license_risk_uncached(spdx_id)
+        return risk
+
+    def _assess_license_risk_uncached(self, spdx_id: str) -> str:
+        """根据风险规则及内置默认值评估许可证风险等级"""
         rule = self.license_rules.get(spdx_id)
         if rule:
             return rule.risk_level
@@ -55,20 +55,26 @@ class IssueMixin:
     def _transform_issues_batch(self, project: GitLabProject, batch: list[dict]) -> None:
         """将原始 JSON 数据转换并加载至 Issue 实体模型中。
 
-        支持增量更新，当 ID 冲突时会更新现有记录。
+        支持增量更新，当 ID 冲突时会更新现有记录；载荷指纹未变化的 Issue 整条跳过。
 
         Args:
             project (GitLabProject): 关联的 GitLabProject 模型对象。
             batch (List[dict]): 包含多个 Issue 原始 JSON 数据的列表。
         """
-        ids = [item["id"] for item in batch]
-        existing = self.session.query(GitLabIssue).filter(GitLabIssue.id.in_(ids)).all()
+        changed = self.filter_changed(GitLabIssue, batch)
+        if not changed:
+            return
+        existing = self.session.query(GitLabIssue).filter(GitLabIssue.id.in_(changed)).all()
         existing_map = {i.id: i for i in existing}
         for data in batch:
+            fingerprint = changed.get(data["id"])
+            if fingerprint is None:
+                continue
             issue = existing_map.get(data["id"])
             if not issue:
                 issue = GitLabIssue(id=data["id"])
                 self.session.add(issue)
+            issue.raw_data_hash = fingerprint
             issue.project_id = project.id
             issue.iid = data["iid"]
             issue.title = data["title"]
@@ -214,6 +220,9 @@ class IssueMixin:
         test_case.pre_conditions = parsed["pre_conditions"]
         test_case.test_steps = parsed["test_steps"]
         test_case.description = issue.description
+        if hasattr(self, "_apply_traceability_extraction"):
+            # 同步时写入需求 -> 用例引用索引，追溯矩阵无需再逐条正则扫描
+            self._apply_traceability_extraction(test_case)
         req_iid = GitLabTestParser.extract_requirement_id(issue.description or "")
         if req_iid:
             req_issue = self.session.query(GitLabIssue).filter_by(project_id=project.id, iid=req_iid).first()
@@ -50,18 +50,31 @@ class MergeRequestMixin:
     def _transform_mrs_batch(self, project: GitLabProject, batch: list[dict]) -> None:
         """核心解析逻辑：将原始 JSON 转换为 MergeRequest 模型。
 
+        载荷指纹与上次同步相同的 MR 不重写字段；但流水线状态、审批等协作数据不在 MR 载荷中，
+        仍处于 opened 的 MR 无论指纹是否变化都重新拉取评审协作数据。
+
         Args:
             project (GitLabProject): 关联的项目实体。
             batch (List[dict]): 包含多个 MR 原始数据的列表。
         """
-        ids = [item["id"] for item in batch]
-        existing = self.session.query(GitLabMergeRequest).filter(GitLabMergeRequest.id.in_(ids)).all()
+        changed = self.filter_changed(GitLabMergeRequest, batch)
+        unchanged_opened = {data["id"] for data in batch if data["id"] not in changed and data["state"] == "opened"}
+        if not changed and not unchanged_opened:
+            return
+        existing = self.session.query(GitLabMergeRequest).filter(GitLabMergeRequest.id.in_([*changed, *unchanged_opened])).all()
         existing_map = {m.id: m for m in existing}
         for data in batch:
+            fingerprint = changed.get(data["id"])
+            if fingerprint is None:
+                mr = existing_map.get(data["id"])
+                if mr is not None and data["id"] in unchanged_opened and hasattr(self, "client"):
+                    self._apply_mr_collaboration_analysis(project, mr)
+                continue
             mr = existing_map.get(data["id"])
             if not mr:
                 mr = GitLabMergeRequest(id=data["id"])
                 self.session.add(mr)
+            mr.raw_data_hash = fingerprint
             mr.project_id = project.id
             mr.iid = data["iid"]
             mr.title = data["title"]
@@ -8,22 +8,41 @@ import re
 from typing import Any
 
 from devops_collector.models.base_models import TraceabilityLink
+from devops_collector.models.test_management import GTMTestCase
 
 from ..models import GitLabCommit, GitLabMergeRequest
 
 
 logger = logging.getLogger(__name__)
 
+# 预编译追溯单号正则，避免每次同步/查询时重复编译
+JIRA_ID_PATTERN = re.compile(r"([A-Z]{2,}-\d+)")
+# 使用正向和负向预查避免匹配到 C# 或类似的非单号内容
+ZENTAO_ID_PATTERN = re.compile(r"(?<!\w)#(\d+)(?!\w)")
+
+
+def extract_zentao_ids(text: str) -> list[str]:
+    """从文本中按出现顺序提取去重后的禅道单号 (#123)。
+
+    Args:
+        text (str): 待扫描文本。
+
+    Returns:
+        List[str]: 去重后的单号列表，保持首次出现的顺序。
+    """
+    return list(dict.fromkeys(ZENTAO_ID_PATTERN.findall(text or "")))
+
 
 class TraceabilityMixin:
     """提供链路追溯提取逻辑。
 
-    能够从 Commit Message 或 MR Description 中提取 Jira/ZenTao 等外部系统的单号，
-    并建立 TraceabilityLink 关联。
+    能够从 Commit Message、MR Description 或测试用例文本中提取 Jira/ZenTao 等外部系统的单号，
+    并建立 TraceabilityLink 关联。该表同时作为需求 -> 制品的持久化引用索引，
+    供追溯矩阵批量查询使用。
     """
 
     def _apply_traceability_extraction(self, obj: Any) -> None:
-        """从项目对象（GitLabCommit/MR）的文本内容中提取业务需求追溯信息。
+        """从项目对象（GitLabCommit/MR/GTMTestCase）的文本内容中提取业务需求追溯信息。
 
         支持正则匹配:
         - Jira: [A-Z]+-\\d+ (如 PROJ-123)
@@ -32,35 +51,52 @@ class TraceabilityMixin:
         提取到的 ID 会更新到对象的 metadata 中，并创建 TraceabilityLink 记录。
 
         Args:
-            obj (Any): 提交记录 (GitLabCommit) 或合并请求 (GitLabMergeRequest) 实体。
+            obj (Any): 提交记录 (GitLabCommit)、合并请求 (GitLabMergeRequest) 或测试用例 (GTMTestCase) 实体。
         """
         text_to_scan = ""
         if isinstance(obj, GitLabCommit):
             text_to_scan = f"{obj.title}\n{obj.message}"
         elif isinstance(obj, GitLabMergeRequest):
             text_to_scan = f"{obj.title}\n{obj.description or ''}"
-
-        if not text_to_scan:
-            return
+        elif isinstance(obj, GTMTestCase):
+            text_to_scan = f"{obj.title or ''}\n{obj.description or ''}"
 
         # 1. 提取 Jira ID (如 PROJ-123)
-        jira_matches = list(set(re.findall(r"([A-Z]{2,}-\d+)", text_to_scan)))
+        jira_matches = list(set(JIRA_ID_PATTERN.findall(text_to_scan)))
+        # 2. 提取禅道 ID (支持 #123 规范)，保持原始顺序以便识别“第一个”ID，同时去重
+        ordered_zentao_ids = extract_zentao_ids(text_to_scan)
+
+        if isinstance(obj, GTMTestCase):
+            # 用例文本修改后，先删除不再被引用的旧索引行，避免陈旧链路累积
+            self._prune_test_case_links(obj, {"jira": jira_matches, "zentao": ordered_zentao_ids})
+
         if jira_matches:
             self._save_traceability_results(obj, jira_matches, "jira", text_to_scan)
+        if ordered_zentao_ids:
+            self._save_traceability_results(obj, ordered_zentao_ids, "zentao", text_to_scan)
 
-        # 2. 提取禅道 ID (支持 #123 规范)
-        # 使用正向和负向预查避免匹配到 C# 或类似的非单号内容
-        zentao_matches = re.findall(r"(?<!\w)#(\d+)(?!\w)", text_to_scan)
-        if zentao_matches:
-            # 保持原始顺序以便识别“第一个”ID，同时去重
-            seen = set()
-            ordered_zentao_ids = []
-            for zid in zentao_matches:
-                if zid not in seen:
-                    ordered_zentao_ids.append(zid)
-                    seen.add(zid)
+    def _prune_test_case_links(self, case: GTMTestCase, current_ids: dict[str, list[str]]) -> None:
+        """删除测试用例已不再引用的自动提取索引行。
 
-            self._save_traceability_results(obj, ordered_zentao_ids, "zentao", text_to_scan)
+        Args:
+            case (GTMTestCase): 测试用例实体 (尚未落库时无需清理)。
+            current_ids (Dict[str, List[str]]): 按来源系统分组的、当前文本中仍引用的外部 ID。
+        """
+        if case.id is None:
+            return
+        links = (
+            self.session.query(TraceabilityLink)
+            .filter(
+                TraceabilityLink.target_system == "gitlab",
+                TraceabilityLink.target_type == "test_case",
+                TraceabilityLink.target_id == str(case.id),
+                TraceabilityLink.source_system.in_(("jira", "zentao")),
+            )
+            .all()
+        )
+        for link in links:
+            if (link.raw_data or {}).get("auto_extracted") and link.source_id not in current_ids.get(link.source_system, ()):
+                self.session.delete(link)
 
     def _save_traceability_results(self, obj: Any, ids: list[str], source: str, text_content: str = None) -> None:
         """保存提取到的追溯 ID 到对象并创建映射表记录。
@@ -71,7 +107,7 @@ class TraceabilityMixin:
         3. 即使目标 ID 在本地尚未同步，也允许建立关联（标记为自动提取）。
 
         Args:
-            obj (Any): 目标实体对象 (GitLabCommit 或 GitLabMergeRequest)。
+            obj (Any): 目标实体对象 (GitLabCommit、GitLabMergeRequest 或 GTMTestCase)。
             ids (List[str]): 提取到的外部 ID 列表。
             source (str): 来源系统类型 (jira, zentao)。
             text_content (str): 原始文本内容，用于存证 (截取前200字符)。
@@ -93,24 +129,34 @@ class TraceabilityMixin:
             obj.issue_source = source
 
         # 存储到追溯表 (保存全部 ID)
-        target_type = "commit" if isinstance(obj, GitLabCommit) else "mr"
-        target_id = str(obj.id) if isinstance(obj, GitLabCommit) else str(obj.iid)
-
-        for ext_id in ids:
-            # 检查是否已存在相同的关联，防止重复插入
-            existing = (
-                self.session.query(TraceabilityLink)
-                .filter_by(
-                    source_system=source,
-                    source_id=ext_id,
-                    target_system="gitlab",
-                    target_type=target_type,
-                    target_id=target_id,
-                )
-                .first()
+        if isinstance(obj, GTMTestCase):
+            if obj.id is None:
+                # 用例主键由数据库生成，需先 flush 才能作为索引目标
+                self.session.flush()
+            target_type, target_id, link_type = "test_case", str(obj.id), "tests"
+        elif isinstance(obj, GitLabCommit):
+            target_type, target_id = "commit", str(obj.id)
+            link_type = "fixes" if source == "zentao" else "implements"
+        else:
+            target_type, target_id = "mr", str(obj.iid)
+            link_type = "fixes" if source == "zentao" else "implements"
+
+        # 一次性查询已存在的关联，防止重复插入 (避免逐 ID 查询)
+        existing_ids = {
+            row[0]
+            for row in self.session.query(TraceabilityLink.source_id)
+            .filter(
+                TraceabilityLink.source_system == source,
+                TraceabilityLink.source_id.in_(ids),
+                TraceabilityLink.target_system == "gitlab",
+                TraceabilityLink.target_type == target_type,
+                TraceabilityLink.target_id == target_id,
             )
+            .all()
+        }
 
-            if not existing:
+        for ext_id in ids:
+            if ext_id not in existing_ids:
                 link = TraceabilityLink(
                     source_system=source,
                     source_type="task" if source == "zentao" else "issue",
@@ -118,7 +164,7 @@ class TraceabilityMixin:
                     target_system="gitlab",
                     target_type=target_type,
                     target_id=target_id,
-                    link_type="fixes" if source == "zentao" else "implements",
+                    link_type=link_type,
                     raw_data={
                         "auto_extracted": True,
                         "found_in": text_content[:200] if text_content else None,
@@ -361,6 +361,7 @@ class GitLabMergeRequest(Base):
         author (User): 关联的 User 对象。
         project (Project): 关联的 Project 对象。
         raw_data (dict): 原始 JSON 镜像存档。
+        raw_data_hash (str): 原始载荷指纹，用于同步时跳过未变化的 MR。
     """
 
     __tablename__ = "gitlab_merge_requests"
@@ -381,6 +382,7 @@ class GitLabMergeRequest(Base):
     diff_refs = Column(JSON)
     merge_commit_sha = Column(String)
     raw_data = Column(JSON)
+    raw_data_hash = Column(String(32), comment="原始载荷指纹，未变化时同步跳过")
     deployments = relationship(
         "GitLabDeployment",
         primaryjoin="and_(GitLabMergeRequest.merge_commit_sha==GitLabDeployment.sha, GitLabMergeRequest.project_id==GitLabDeployment.project_id)",
@@ -622,6 +624,7 @@ class GitLabIssue(Base):
         transitions (List[IssueStateTransition]): 关联的状态流转历史集合。
         blockages (List[Blockage]): 关联的阻塞记录集合。
         raw_data (dict): 原始 JSON 镜像存档。
+        raw_data_hash (str): 原始载荷指纹，用于同步时跳过未变化的 Issue。
     """
 
     __tablename__ = "gitlab_issues"
@@ -646,6 +649,7 @@ class GitLabIssue(Base):
     first_response_at = Column(DateTime(timezone=True))
     milestone_id = Column(Integer, ForeignKey("gitlab_milestones.id"), nullable=True)
     raw_data = Column(JSON)
+    raw_data_hash = Column(String(32), comment="原始载荷指纹，未变化时同步跳过")
     author_id = Column(UUID(as_uuid=True), ForeignKey("mdm_identities.global_user_id"))
     author = relationship("User", primaryjoin="and_(User.global_user_id==GitLabIssue.author_id, User.is_current==True)")
     project = relationship("GitLabProject", back_populates="issues")
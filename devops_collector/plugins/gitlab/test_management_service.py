@@ -10,11 +10,11 @@
 """
 
 import logging
-import re
+from collections import defaultdict
 from datetime import datetime
 from typing import Any
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from devops_collector.models.base_models import (
     ProjectMaster,
@@ -171,62 +171,67 @@ class TestManagementService:
         # 2. 获取需求 (Story/Feature)
         issues = db.query(ZenTaoIssue).filter(ZenTaoIssue.product_id.in_(zt_product_ids), ZenTaoIssue.type.in_(["story", "feature", "requirement"])).all()
 
-        # 3. 预加载当前范围内的 Test Cases (避免 N+1 查询)
-        # 获取涉及的 GitLab 项目 ID
-        relevant_gitlab_project_ids = []
-        if gp_ids:
-            relevant_gitlab_project_ids = gp_ids
-        else:
-            # Fallback if we only found by Code
-            pass
-
-        gtm_cases = []
-        if relevant_gitlab_project_ids:
-            gtm_cases = db.query(GTMTestCase).filter(GTMTestCase.project_id.in_(relevant_gitlab_project_ids)).all()
-
-        # 建立用例与需求的内存映射 (基于 #ID 文本匹配)
-        req_case_map = {str(i.id): [] for i in issues}
-
-        for case in gtm_cases:
-            # 简单匹配: 检查 Title 或 Description 中是否包含 #ReqID
-            # 优化: 可以使用正则提取所有 #ID，然后匹配
-            text_to_search = (case.title or "") + " " + (case.description or "")
-            # Pattern: # + digits
-            found_ids = re.findall(r"#(\d+)", text_to_search)
-            for fid in found_ids:
-                if fid in req_case_map:
-                    req_case_map[fid].append(case)
+        # 3. 基于引用索引批量构建矩阵 (仅在已关联的 GitLab 项目范围内查找用例)
+        return self._build_traceability_matrix(db, issues, gp_ids)
 
-        results = []
-        for issue in issues:
-            issue_id_str = str(issue.id)
-
-            # 4. 获取关联用例 (从内存映射)
-            linked_cases = req_case_map.get(issue_id_str, [])
-            api_cases = [
-                schemas.TestCase(
-                    global_issue_id=c.id,
-                    gitlab_issue_iid=c.iid,
-                    title=c.title,
-                    result="passed" if c.execution_count > 0 else "pending",  # 简化逻辑
-                    project_name=c.project.name if c.project else "Unknown",  # 需要确保 relationship loaded
-                )
-                for c in linked_cases
-            ]
+    def _build_traceability_matrix(self, db: Session, issues: list[ZenTaoIssue], gitlab_project_ids: list[int]) -> list[schemas.TraceabilityMatrixItem]:
+        """批量构建需求追溯矩阵。
+
+        需求 -> 制品的引用关系在同步阶段由 TraceabilityMixin 写入 TraceabilityLink，
+        此处一次查询取回全部需求的链路，再一次性加载被引用的测试用例，
+        避免逐需求查询 (N+1) 以及逐用例的正则扫描。
+
+        Args:
+            db (Session): 数据库会话。
+            issues (List[ZenTaoIssue]): 需求列表。
+            gitlab_project_ids (List[int]): 用例查找范围内的 GitLab 项目 ID。
 
-            # 5. 获取关联缺陷 (Defects)
-            # 策略: 查找关联到了上述 Test Cases 的 Bug，或者直接关联了 Requirement 的 Bug
-            # 简化: 目前只查找 TraceabilityLink 中 target_type='bug' 的
+        Returns:
+            List[schemas.TraceabilityMatrixItem]: 与需求顺序一致的矩阵行。
+        """
+        if not issues:
+            return []
 
-            # 6. 获取代码变更 (TraceabilityLink)
-            links = db.query(TraceabilityLink).filter(TraceabilityLink.source_id == issue_id_str).all()
+        # 1. 一次性获取全部需求的追溯链路
+        req_ids = [str(i.id) for i in issues]
+        links_by_req: dict[str, list[TraceabilityLink]] = defaultdict(list)
+        for link in db.query(TraceabilityLink).filter(TraceabilityLink.source_id.in_(req_ids)).all():
+            links_by_req[link.source_id].append(link)
+
+        # 2. 一次性加载被索引引用的测试用例 (预加载项目与执行记录)
+        case_ids = {int(l.target_id) for links in links_by_req.values() for l in links if l.target_type == "test_case" and l.target_id.isdigit()}
+        cases_by_id = {}
+        if case_ids and gitlab_project_ids:
+            cases = (
+                db.query(GTMTestCase)
+                .filter(GTMTestCase.id.in_(case_ids), GTMTestCase.project_id.in_(gitlab_project_ids))
+                .options(selectinload(GTMTestCase.project), selectinload(GTMTestCase.execution_records))
+                .all()
+            )
+            cases_by_id = {str(c.id): c for c in cases}
 
+        results = []
+        for issue in issues:
+            api_cases = []
             mrs = []
             commits = []
             defects = []
 
-            for l in links:
-                if l.target_type == "merge_request":
+            for l in links_by_req.get(str(issue.id), []):
+                if l.target_type == "test_case":
+                    c = cases_by_id.get(l.target_id)
+                    if c is None:
+                        continue
+                    api_cases.append(
+                        schemas.TestCase(
+                            global_issue_id=c.id,
+                            gitlab_issue_iid=c.iid,
+                            title=c.title,
+                            result="passed" if c.execution_count > 0 else "pending",  # 简化逻辑
+                            project_name=c.project.name if c.project else "Unknown",
+                        )
+                    )
+                elif l.target_type in ("merge_request", "mr"):
                     mrs.append({"id": l.target_id, "iid": l.target_id, "title": f"MR !{l.target_id}", "state": "merged"})
                 elif l.target_type == "commit":
                     commits.append({"short_id": l.target_id[:8], "title": f"Commit {l.target_id[:8]}"})
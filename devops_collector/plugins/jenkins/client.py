@@ -10,6 +10,10 @@ from typing import Any
 from devops_collector.core.base_client import BaseClient
 
 
+# 构建同步所需字段 (tree 过滤)，与 JenkinsWorker._transform_build 读取的字段保持一致
+BUILD_DETAIL_FIELDS = "number,url,result,duration,timestamp,building,queueId,executor,actions[_class,causes[_class,userName]]"
+
+
 class JenkinsClient(BaseClient):
     """Jenkins Remote API 客户端。
 
@@ -97,20 +101,22 @@ class JenkinsClient(BaseClient):
         response = self._get(endpoint)
         return response.json()
 
-    def get_builds(self, job_full_name: str, limit: int = 100) -> list[dict]:
+    def get_builds(self, job_full_name: str, limit: int = 100, fields: str = "number,url") -> list[dict]:
         """获取指定 Job 的构建历史列表。
 
         Args:
             job_full_name (str): Job 的完整路径名称。
             limit (int): 获取最近构建的数量限制。默认为 100。
+            fields (str): tree 过滤的构建字段。默认仅摘要 (number, url)；
+                传入 BUILD_DETAIL_FIELDS 可一次取回同步所需的全部字段，免去逐个构建的详情请求。
 
         Returns:
-            List[dict]: 构建记录列表，仅包含摘要信息 (number, url)。
+            List[dict]: 构建记录列表。
         """
         path_parts = job_full_name.strip("/").split("/")
         job_path = "".join([f"job/{p}/" for p in path_parts])
         endpoint = f"{job_path}api/json"
-        params = {"tree": f"builds[number,url]{{0,{limit}}}"}
+        params = {"tree": f"builds[{fields}]{{0,{limit}}}"}
         response = self._get(endpoint, params=params)
         return response.json().get("builds", [])
 
@@ -18,7 +18,8 @@ def get_config() -> dict[str, Any]:
                 'user': str
             },
             'worker': {
-                'build_limit': int
+                'build_limit': int,
+                'fetch_concurrency': int
             }
         }
     """
@@ -26,5 +27,5 @@ def get_config() -> dict[str, Any]:
 
     return {
         "client": {"url": Config.JENKINS_URL, "token": Config.JENKINS_TOKEN, "user": Config.JENKINS_USER},
-        "worker": {"build_limit": Config.JENKINS_BUILD_SYNC_LIMIT},
+        "worker": {"build_limit": Config.JENKINS_BUILD_SYNC_LIMIT, "fetch_concurrency": Config.JENKINS_FETCH_CONCURRENCY},
     }
@@ -11,9 +11,10 @@ from sqlalchemy.orm import Session
 
 from devops_collector.core.base_worker import BaseWorker
 from devops_collector.core.identity_manager import IdentityManager
+from devops_collector.core.utils import fetch_concurrently
 from devops_collector.models import JenkinsTestExecution
 
-# from .client import JenkinsClient
+from .client import BUILD_DETAIL_FIELDS
 from .models import JenkinsBuild, JenkinsJob
 from .parser import ReportParser
 
@@ -44,9 +45,10 @@ class JenkinsWorker(BaseWorker):
             session: SQLAlchemy 数据库会话。
             client: Jenkins API 客户端。
             correlation_id (str): 追踪 ID (用于日志对齐)
-            **kwargs: 其他透传参数
+            **kwargs: 其他透传参数 (fetch_concurrency: 构建详情/测试报告并发抓取线程数)
         """
         super().__init__(session, client, correlation_id=correlation_id)
+        self.fetch_concurrency = int(kwargs.get("fetch_concurrency", 4))
 
     def process_task(self, task: dict) -> None:
         """处理 Jenkins 同步任务。
@@ -75,34 +77,37 @@ class JenkinsWorker(BaseWorker):
         """同步所有 Jenkins Job 信息。"""
         logger.info("Syncing all Jenkins jobs...")
         jobs_data = self.client.get_jobs()
+        self.bulk_save_to_staging(
+            "jenkins",
+            "job",
+            jobs_data,
+            id_field=lambda d: d.get("fullName") or d.get("name"),
+            schema_version=self.SCHEMA_VERSION,
+        )
+        full_names = [j.get("fullName") or j.get("name") for j in jobs_data]
+        jobs_map = {j.full_name: j for j in self.session.query(JenkinsJob).filter(JenkinsJob.full_name.in_(full_names)).all()}
+        project_by_path, project_by_name = self._load_gitlab_project_index()
+
         count = 0
-        for j_data in jobs_data:
-            full_name = j_data.get("fullName") or j_data.get("name")
-            job = self.session.query(JenkinsJob).filter_by(full_name=full_name).first()
+        for j_data, full_name in zip(jobs_data, full_names, strict=True):
+            job = jobs_map.get(full_name)
             if not job:
                 job = JenkinsJob(full_name=full_name)
                 self.session.add(job)
+                jobs_map[full_name] = job
             job.name = j_data.get("name")
             job.url = j_data.get("url")
             job.description = j_data.get("description")
             job.color = j_data.get("color")
-            self.save_to_staging(
-                source="jenkins",
-                entity_type="job",
-                external_id=full_name,
-                payload=j_data,
-                schema_version=self.SCHEMA_VERSION,
-            )
             job.raw_data = j_data
             job.last_synced_at = datetime.now(UTC)
             job.sync_status = "SUCCESS"
-            if GitLabProject and (not job.gitlab_project_id):
-                gitlab_project = (
-                    self.session.query(GitLabProject).filter((GitLabProject.path_with_namespace == full_name) | (GitLabProject.name == job.name)).first()
-                )
-                if gitlab_project:
-                    job.gitlab_project_id = gitlab_project.id
-                    logger.info(f"Mapped Jenkins Job {full_name} to GitLab project {gitlab_project.id}")
+            if not job.gitlab_project_id:
+                # 路径精确匹配优先，其次按项目名称
+                gitlab_project_id = project_by_path.get(full_name) or project_by_name.get(job.name)
+                if gitlab_project_id:
+                    job.gitlab_project_id = gitlab_project_id
+                    logger.info(f"Mapped Jenkins Job {full_name} to GitLab project {gitlab_project_id}")
             count += 1
             if count % 50 == 0:
                 self.session.commit()
@@ -110,8 +115,25 @@ class JenkinsWorker(BaseWorker):
         self.log_success(f"Synced {count} Jenkins jobs")
         return count
 
+    def _load_gitlab_project_index(self) -> tuple[dict[str, int], dict[str, int]]:
+        """一次性加载 GitLab 项目的 path_with_namespace / name -> id 映射，供 Job 关联使用。"""
+        if not GitLabProject:
+            return {}, {}
+        by_path: dict[str, int] = {}
+        by_name: dict[str, int] = {}
+        for project_id, path, name in self.session.query(GitLabProject.id, GitLabProject.path_with_namespace, GitLabProject.name).order_by(GitLabProject.id):
+            if path:
+                by_path.setdefault(path, project_id)
+            if name:
+                by_name.setdefault(name, project_id)
+        return by_path, by_name
+
     def sync_job_builds(self, job_full_name: str, limit: int = 100) -> int:
-        """同步特定 Job 的构建记录。"""
+        """同步特定 Job 的构建记录。
+
+        一次 tree 过滤请求取回最近 limit 个构建的同步字段，一次 IN 查询加载已存在的构建；
+        缺少字段的构建详情与已结束构建的测试报告通过有界线程池并发获取。
+        """
         logger.info(f"Syncing builds for job: {job_full_name} (limit={limit})")
         job = self.session.query(JenkinsJob).filter_by(full_name=job_full_name).first()
         if not job:
@@ -119,34 +141,62 @@ class JenkinsWorker(BaseWorker):
             job = JenkinsJob(full_name=job_full_name, name=j_data.get("name"), url=j_data.get("url"))
             self.session.add(job)
             self.session.flush()
-        builds_list = self.client.get_builds(job_full_name, limit)
-        count = 0
-        for b_summary in builds_list:
-            build_num = b_summary["number"]
-            existing_build = self.session.query(JenkinsBuild).filter_by(job_id=job.id, number=build_num).first()
-            if existing_build and (not existing_build.building) and existing_build.result:
-                continue
+        builds_list = self.client.get_builds(job_full_name, limit, fields=BUILD_DETAIL_FIELDS)
+        numbers = [b["number"] for b in builds_list]
+        existing_builds = self.session.query(JenkinsBuild).filter(JenkinsBuild.job_id == job.id, JenkinsBuild.number.in_(numbers)).all()
+        existing = {b.number: b for b in existing_builds}
+        # 已结束且有结果的构建不会再变化，直接跳过
+        finished = {b.number for b in existing_builds if not b.building and b.result}
+        pending = [b for b in builds_list if b["number"] not in finished]
+        # 老版本 Jenkins 或插件可能忽略部分 tree 字段，此时回退为并发拉取构建详情
+        complete = [b for b in pending if "building" in b]
+        incomplete = [b for b in pending if "building" not in b]
+        for b_summary, b_data, exc in fetch_concurrently(lambda b: self.client.get_build_details(b["url"]), incomplete, max_workers=self.fetch_concurrency):
+            if exc:
+                logger.error(f"Failed to sync build {b_summary['number']} for job {job_full_name}: {exc}")
+            else:
+                complete.append(b_data)
+
+        self.bulk_save_to_staging(
+            "jenkins",
+            "build",
+            complete,
+            id_field=lambda d: f"{job_full_name}#{d['number']}",
+            schema_version=self.SCHEMA_VERSION,
+        )
+        users = self._resolve_trigger_users(complete)
+        builds = []
+        for b_data in complete:
             try:
-                b_data = self.client.get_build_details(b_summary["url"])
-                self.save_to_staging(
-                    source="jenkins",
-                    entity_type="build",
-                    external_id=f"{job_full_name}#{build_num}",
-                    payload=b_data,
-                    schema_version=self.SCHEMA_VERSION,
-                )
-                self._transform_build(job, existing_build, b_data)
-                count += 1
-                if count % 20 == 0:
-                    self.session.commit()
+                builds.append(self._transform_build(job, existing.get(b_data["number"]), b_data, users=users))
             except Exception as e:
-                logger.error(f"Failed to sync build {build_num} for job {job_full_name}: {e}")
+                logger.error(f"Failed to sync build {b_data.get('number')} for job {job_full_name}: {e}")
+        self.session.flush()
+        self._sync_test_reports(job, [b for b in builds if not b.building and b.result])
         self.session.commit()
-        self.log_success(f"Synced {count} builds for job {job_full_name}")
-        return count
+        self.log_success(f"Synced {len(builds)} builds for job {job_full_name}")
+        return len(builds)
+
+    def _resolve_trigger_users(self, builds_data: list[dict]) -> dict:
+        """汇总构建触发人，一次性解析为全局用户 (userName -> User)。"""
+        names = {self._trigger_cause(b_data).get("userName") for b_data in builds_data}
+        names.discard(None)
+        return IdentityManager.resolve_users(self.session, "jenkins", names, {n: {"name": n} for n in names})
+
+    @staticmethod
+    def _trigger_cause(b_data: dict) -> dict:
+        """返回构建的首个触发原因 (CauseAction.causes[0])。"""
+        for action in b_data.get("actions", []) or []:
+            if action and action.get("_class") == "hudson.model.CauseAction" and action.get("causes"):
+                return action["causes"][0]
+        return {}
 
-    def _transform_build(self, job: JenkinsJob, build: JenkinsBuild | None, b_data: dict) -> JenkinsBuild:
-        """核心解析逻辑：将原始 Jenkins Build JSON 转换为 JenkinsBuild 模型。"""
+    def _transform_build(self, job: JenkinsJob, build: JenkinsBuild | None, b_data: dict, users: dict | None = None) -> JenkinsBuild:
+        """核心解析逻辑：将原始 Jenkins Build JSON 转换为 JenkinsBuild 模型。
+
+        批量同步时由调用方预先解析触发人 (users) 并统一拉取测试报告；
+        单独调用时回退为逐条身份解析并同步测试报告。
+        """
         build_num = b_data["number"]
         if not build:
             build = self.session.query(JenkinsBuild).filter_by(job_id=job.id, number=build_num).first()
@@ -161,27 +211,51 @@ class JenkinsWorker(BaseWorker):
         build.executor = b_data.get("executor")
         if b_data.get("timestamp"):
             build.timestamp = datetime.fromtimestamp(b_data["timestamp"] / 1000.0, tz=UTC)
-        actions = b_data.get("actions", [])
-        for action in actions:
-            if action.get("_class") == "hudson.model.CauseAction":
-                causes = action.get("causes", [])
-                if causes:
-                    build.trigger_type = causes[0].get("_class")
-                    build.trigger_user = causes[0].get("userName")
-                    if build.trigger_user:
-                        u = IdentityManager.get_or_create_user(self.session, "jenkins", build.trigger_user, name=build.trigger_user)
-                        build.trigger_user_id = u.global_user_id
+        cause = self._trigger_cause(b_data)
+        if cause:
+            build.trigger_type = cause.get("_class")
+            build.trigger_user = cause.get("userName")
+            if build.trigger_user:
+                if users is None:
+                    u = IdentityManager.get_or_create_user(self.session, "jenkins", build.trigger_user, name=build.trigger_user)
+                else:
+                    u = users.get(build.trigger_user)
+                if u:
+                    build.trigger_user_id = u.global_user_id
         build.raw_data = b_data
-        if not build.building and build.result:
+        if users is None and not build.building and build.result:
             self._sync_test_report(job, build)
         return build
 
+    def _sync_test_reports(self, job: JenkinsJob, builds: list[JenkinsBuild]) -> None:
+        """并发获取一组已结束构建的测试报告，并以一次 IN 查询合并已有的测试执行记录。"""
+        if not builds:
+            return
+        existing = {}
+        for row in (
+            self.session.query(JenkinsTestExecution)
+            .filter(JenkinsTestExecution.project_id == job.gitlab_project_id, JenkinsTestExecution.build_id.in_([str(b.number) for b in builds]))
+            .all()
+        ):
+            existing[(row.build_id, row.test_level)] = row
+        for build, report_data, exc in fetch_concurrently(lambda b: self.client.get_test_report(b.url), builds, max_workers=self.fetch_concurrency):
+            if exc:
+                logger.warning(f"Failed to sync test report for build {build.number}: {exc}")
+            elif report_data:
+                self._save_test_report(job, build, report_data, existing)
+
     def _sync_test_report(self, job: JenkinsJob, build: JenkinsBuild) -> None:
         """从 Jenkins 获取并同步测试报告。"""
         try:
             report_data = self.client.get_test_report(build.url)
-            if not report_data:
-                return
+            if report_data:
+                self._save_test_report(job, build, report_data)
+        except Exception as e:
+            logger.warning(f"Failed to sync test report for build {build.number}: {e}")
+
+    def _save_test_report(self, job: JenkinsJob, build: JenkinsBuild, report_data: dict, existing_map: dict | None = None) -> None:
+        """解析并保存测试报告汇总 (existing_map 为预加载的 (build_id, test_level) -> 记录)。"""
+        try:
             summary = ReportParser.parse_jenkins_test_report(
                 project_id=job.gitlab_project_id,
                 build_id=str(build.number),
@@ -189,13 +263,18 @@ class JenkinsWorker(BaseWorker):
                 job_name=job.name or "",
             )
             if summary:
-                existing = (
-                    self.session.query(JenkinsTestExecution)
-                    .filter_by(project_id=job.gitlab_project_id, build_id=str(build.number), test_level=summary.test_level)
-                    .first()
-                )
+                if existing_map is None:
+                    existing = (
+                        self.session.query(JenkinsTestExecution)
+                        .filter_by(project_id=job.gitlab_project_id, build_id=str(build.number), test_level=summary.test_level)
+                        .first()
+                    )
+                else:
+                    existing = existing_map.get((str(build.number), summary.test_level))
                 if not existing:
                     self.session.add(summary)
+                    if existing_map is not None:
+                        existing_map[(str(build.number), summary.test_level)] = summary
                     logger.info(f"Saved test summary for build {build.number} ({summary.test_level})")
                 else:
                     existing.total_cases = summary.total_cases
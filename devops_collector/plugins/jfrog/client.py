@@ -1,10 +1,14 @@
 """JFrog Artifactory API 客户端"""
 
+import json
 from collections.abc import Generator
 
 from devops_collector.core.base_client import BaseClient
 
 
+AQL_PAGE_SIZE = 500
+
+
 class JFrogClient(BaseClient):
     """JFrog Artifactory REST API 客户端。"""
 
@@ -37,13 +41,45 @@ class JFrogClient(BaseClient):
         except Exception:
             return False
 
+    def iter_artifact_pages(self, repo: str, path: str = "", page_size: int = AQL_PAGE_SIZE) -> Generator[list[dict], None, None]:
+        """通过 AQL offset/limit 分页流式获取制品，每页附带属性 (properties) 与下载统计 (stats)。
+
+        AQL 的 sort/offset/limit 仅在 include 只含主域 (items) 字段时生效，因此分两步：
+        先按 (path, name) 排序分页取主域字段，再以一条 AQL 批量补齐本页制品的 property/stat 域，
+        替代逐个制品调用 storage ?stats 接口。
+        """
+        criteria = f'{{"repo": "{repo}", "path": {{"$match": "{path}*"}}, "type": "file"}}'
+        offset = 0
+        while True:
+            query = f'items.find({criteria}).include("*").sort({{"$asc": ["path", "name"]}}).offset({offset}).limit({page_size})'
+            items = self._aql(query)
+            if not items:
+                break
+            self._attach_details(repo, items)
+            yield items
+            if len(items) < page_size:
+                break
+            offset += len(items)
+
     def get_artifacts(self, repo: str, path: str = "") -> Generator[dict, None, None]:
-        """通过 AQL 或递归 API 获取仓库下的制品列表。"""
-        endpoint = "search/aql"
-        query = f'items.find({{"repo": "{repo}", "path": {{"$match": "{path}*"}}, "type": "file"}}).include("*", "property")'
-        response = self._post(endpoint, data=query, headers={"Content-Type": "text/plain"})
-        data = response.json()
-        yield from data.get("results", [])
+        """通过 AQL 获取仓库下的制品列表 (逐页流式，逐条产出)。"""
+        for page in self.iter_artifact_pages(repo, path):
+            yield from page
+
+    def _aql(self, query: str) -> list[dict]:
+        """执行 AQL 查询并返回 results。"""
+        response = self._post("search/aql", data=query, headers={"Content-Type": "text/plain"})
+        return response.json().get("results", [])
+
+    def _attach_details(self, repo: str, items: list[dict]) -> None:
+        """一次 AQL 查询补齐一页制品的 properties 与 stats 字段 (原地写入)。"""
+        clauses = ", ".join(f'{{"path": {json.dumps(i["path"])}, "name": {json.dumps(i["name"])}}}' for i in items)
+        query = f'items.find({{"repo": "{repo}", "$or": [{clauses}]}}).include("path", "name", "property", "stat")'
+        details = {(d["path"], d["name"]): d for d in self._aql(query)}
+        for item in items:
+            detail = details.get((item["path"], item["name"]), {})
+            item["properties"] = detail.get("properties", [])
+            item["stats"] = detail.get("stats", [])
 
     def get_artifact_stats(self, repo: str, path: str) -> dict:
         """获取制品的下载量等统计信息。"""
@@ -19,5 +19,7 @@ def get_config() -> dict[str, Any]:
             "token": os.getenv("JFROG_TOKEN", ""),
             "rate_limit": int(os.getenv("REQUESTS_PER_SECOND", "10")),
         },
-        "worker": {},
+        "worker": {
+            "fetch_concurrency": int(os.getenv("JFROG_FETCH_CONCURRENCY", "4")),
+        },
     }
@@ -1,10 +1,14 @@
 """JFrog Artifactory 数据采集 Worker"""
 
 import logging
-from datetime import UTC, datetime
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import Session
 
 from devops_collector.core.base_worker import BaseWorker
 from devops_collector.core.identity_manager import IdentityManager
+from devops_collector.core.utils import fetch_concurrently
 
 # from .client import JFrogClient
 from .models import JFrogArtifact, JFrogScan, JFrogVulnerabilityDetail
@@ -18,6 +22,19 @@ class JFrogWorker(BaseWorker):
 
     SCHEMA_VERSION = "1.0"
 
+    def __init__(self, session: Session, client: Any, correlation_id: str = "unknown-cid", **kwargs) -> None:
+        """初始化 JFrog Worker。
+
+        Args:
+            session: SQLAlchemy 数据库会话。
+            client: JFrog API 客户端。
+            correlation_id (str): 追踪 ID (用于日志对齐)
+            **kwargs: 其他透传参数 (fetch_concurrency: Xray 摘要并发抓取线程数)
+        """
+        super().__init__(session, client, correlation_id=correlation_id)
+        # 逐制品 Xray 摘要的并发抓取线程数 (受客户端令牌桶统一限速)
+        self.fetch_concurrency = int(kwargs.get("fetch_concurrency", 4))
+
     def process_task(self, task: dict) -> None:
         """处理 JFrog 同步任务。
         task 结构示例: {'repo': 'docker-local', 'job_type': 'full'}
@@ -34,83 +51,139 @@ class JFrogWorker(BaseWorker):
             raise
 
     def _sync_artifacts(self, repo: str) -> int:
-        """从 JFrog 同步制品信息。"""
-        generator = self.client.get_artifacts(repo)
+        """从 JFrog 同步制品信息：逐页批量落库，每页提交一次。"""
         count = 0
-        for item in generator:
-            artifact = self._save_artifact(repo, item)
-            stats = self.client.get_artifact_stats(repo, item["path"] + "/" + item["name"])
-            artifact.download_count = stats.get("downloadCount", 0)
-            if stats.get("lastDownloaded"):
-                artifact.last_downloaded_at = datetime.fromtimestamp(stats["lastDownloaded"] / 1000, tz=UTC)
-            scan_data = self.client.get_xray_summary(repo, item["path"] + "/" + item["name"])
-            if scan_data:
-                self._sync_xray_scan(artifact, scan_data)
-            count += 1
-        self.session.commit()
+        for page in self.client.iter_artifact_pages(repo):
+            self._sync_artifacts_batch(repo, page)
+            self.session.commit()
+            count += len(page)
+            logger.info(f"JFrog repository {repo}: {count} artifacts synced")
         return count
 
-    def _save_artifact(self, repo: str, data: dict) -> JFrogArtifact:
-        """保存或更新制品记录。"""
-        path = data["path"]
-        name = data["name"]
-        artifact = self.session.query(JFrogArtifact).filter_by(repo=repo, path=path, name=name).first()
-        if not artifact:
-            artifact = JFrogArtifact(repo=repo, path=path, name=name)
-            self.session.add(artifact)
-        self.save_to_staging(
-            source="jfrog",
-            entity_type="artifact",
-            external_id=f"{repo}:{path}/{name}",
-            payload=data,
+    def _sync_artifacts_batch(self, repo: str, batch: list[dict]) -> list[JFrogArtifact]:
+        """批量保存一页制品并并发拉取其 Xray 摘要。"""
+        artifacts = self._save_artifacts(repo, batch)
+        targets = {f"{a.path}/{a.name}": a for a in artifacts}
+        scans = []
+        for full_path, scan_data, exc in fetch_concurrently(
+            lambda p: self.client.get_xray_summary(repo, p),
+            list(targets),
+            max_workers=self.fetch_concurrency,
+        ):
+            if exc:
+                logger.warning(f"Failed to fetch Xray summary for {repo}/{full_path}: {exc}")
+            elif scan_data:
+                scans.append((targets[full_path], scan_data))
+        self._sync_xray_scans(scans)
+        return artifacts
+
+    def _save_artifacts(self, repo: str, batch: list[dict]) -> list[JFrogArtifact]:
+        """批量保存或更新制品记录 (一次 Staging 落盘、一次 IN 查询、一次身份解析)。"""
+        self.bulk_save_to_staging(
+            "jfrog",
+            "artifact",
+            batch,
+            id_field=lambda d: f"{repo}:{d['path']}/{d['name']}",
             schema_version=self.SCHEMA_VERSION,
         )
+        existing = (
+            self.session.query(JFrogArtifact)
+            .filter(
+                JFrogArtifact.repo == repo,
+                JFrogArtifact.path.in_({d["path"] for d in batch}),
+                JFrogArtifact.name.in_({d["name"] for d in batch}),
+            )
+            .all()
+        )
+        existing_map = {(a.path, a.name): a for a in existing}
+        users = IdentityManager.resolve_users(self.session, "jfrog", {d.get("created_by") for d in batch})
+
+        artifacts = []
+        for data in batch:
+            key = (data["path"], data["name"])
+            artifact = existing_map.get(key)
+            if not artifact:
+                artifact = JFrogArtifact(repo=repo, path=data["path"], name=data["name"])
+                self.session.add(artifact)
+                existing_map[key] = artifact
+            self._apply_artifact_fields(artifact, data, users)
+            artifacts.append(artifact)
+        self.session.flush()
+        return artifacts
+
+    def _save_artifact(self, repo: str, data: dict) -> JFrogArtifact:
+        """保存或更新制品记录（单条兼容接口，内部转发到批量）。"""
+        return self._save_artifacts(repo, [data])[0]
+
+    def _apply_artifact_fields(self, artifact: JFrogArtifact, data: dict, users: dict) -> None:
+        """将 AQL 结果 (含 property/stat 域) 写入制品记录。"""
         artifact.size_bytes = data.get("size")
         artifact.sha256 = data.get("sha256")
         artifact.created_at = datetime.fromisoformat(data["created"].replace("Z", "+00:00"))
         artifact.updated_at = datetime.fromisoformat(data["modified"].replace("Z", "+00:00"))
         created_by = data.get("created_by")
         if created_by:
-            u = IdentityManager.get_or_create_user(self.session, "jfrog", created_by)
-            artifact.created_by_id = u.global_user_id
-            artifact.created_by_name = u.name
+            artifact.created_by_name = created_by
+            u = users.get(str(created_by))
+            if u:
+                artifact.created_by_id = u.global_user_id
+                artifact.created_by_name = u.full_name or created_by
         props = {}
         for p in data.get("properties", []):
             props[p["key"]] = p.get("value")
         artifact.properties = props
         artifact.build_name = props.get("build.name")
         artifact.build_number = props.get("build.number")
+        # 下载统计来自 AQL stat 域，无需逐个调用 storage ?stats 接口
+        stats = (data.get("stats") or [{}])[0]
+        artifact.download_count = stats.get("downloads", 0)
+        if stats.get("downloaded"):
+            artifact.last_downloaded_at = datetime.fromisoformat(stats["downloaded"].replace("Z", "+00:00"))
         artifact.raw_data = data
-        self.session.flush()
-        return artifact
 
-    def _sync_xray_scan(self, artifact: JFrogArtifact, scan_data: dict) -> None:
-        """处理 Xray 扫描结果。"""
-        scan = self.session.query(JFrogScan).filter_by(artifact_id=artifact.id).first()
-        if not scan:
-            scan = JFrogScan(artifact_id=artifact.id)
-            self.session.add(scan)
-        self.save_to_staging(
-            source="jfrog",
-            entity_type="xray_scan",
-            external_id=f"artifact_{artifact.id}",
-            payload=scan_data,
+    def _sync_xray_scans(self, scans: list[tuple[JFrogArtifact, dict]]) -> None:
+        """批量处理一页制品的 Xray 扫描结果 (扫描与漏洞明细各一次 IN 查询)。"""
+        if not scans:
+            return
+        external_ids = {id(scan_data): f"artifact_{artifact.id}" for artifact, scan_data in scans}
+        self.bulk_save_to_staging(
+            "jfrog",
+            "xray_scan",
+            [scan_data for _, scan_data in scans],
+            id_field=lambda d: external_ids[id(d)],
             schema_version=self.SCHEMA_VERSION,
         )
-        summary = scan_data.get("summary", {})
-        scan.critical_count = summary.get("critical", 0)
-        scan.high_count = summary.get("high", 0)
-        scan.medium_count = summary.get("medium", 0)
-        scan.low_count = summary.get("low", 0)
-        issues = scan_data.get("issues", [])
-        for issue in issues:
-            cve_id = issue.get("cve", "N/A")
-            vuln = self.session.query(JFrogVulnerabilityDetail).filter_by(artifact_id=artifact.id, cve_id=cve_id).first()
-            if not vuln:
-                vuln = JFrogVulnerabilityDetail(artifact_id=artifact.id, cve_id=cve_id)
-                self.session.add(vuln)
-            vuln.severity = issue.get("severity")
-            vuln.component = issue.get("component")
-            vuln.description = issue.get("description")
-        scan.raw_data = scan_data
+        artifact_ids = [artifact.id for artifact, _ in scans]
+        scan_map = {s.artifact_id: s for s in self.session.query(JFrogScan).filter(JFrogScan.artifact_id.in_(artifact_ids)).all()}
+        vuln_map = {
+            (v.artifact_id, v.cve_id): v
+            for v in self.session.query(JFrogVulnerabilityDetail).filter(JFrogVulnerabilityDetail.artifact_id.in_(artifact_ids)).all()
+        }
+
+        for artifact, scan_data in scans:
+            scan = scan_map.get(artifact.id)
+            if not scan:
+                scan = JFrogScan(artifact_id=artifact.id)
+                self.session.add(scan)
+                scan_map[artifact.id] = scan
+            summary = scan_data.get("summary", {})
+            scan.critical_count = summary.get("critical", 0)
+            scan.high_count = summary.get("high", 0)
+            scan.medium_count = summary.get("medium", 0)
+            scan.low_count = summary.get("low", 0)
+            for issue in scan_data.get("issues", []):
+                cve_id = issue.get("cve", "N/A")
+                vuln = vuln_map.get((artifact.id, cve_id))
+                if not vuln:
+                    vuln = JFrogVulnerabilityDetail(artifact_id=artifact.id, cve_id=cve_id)
+                    self.session.add(vuln)
+                    vuln_map[(artifact.id, cve_id)] = vuln
+                vuln.severity = issue.get("severity")
+                vuln.component = issue.get("component")
+                vuln.description = issue.get("description")
+            scan.raw_data = scan_data
         self.session.flush()
+
+    def _sync_xray_scan(self, artifact: JFrogArtifact, scan_data: dict) -> None:
+        """处理 Xray 扫描结果（单条兼容接口，内部转发到批量）。"""
+        self._sync_xray_scans([(artifact, scan_data)])
@@ -4,6 +4,8 @@
 """
 
 import logging
+from collections.abc import Iterator
+from datetime import datetime
 from typing import Any
 
 
@@ -13,6 +15,28 @@ import base64
 from devops_collector.core.base_client import BaseClient
 
 
+ISSUE_PAGE_SIZE = 100
+ISSUE_FIELDS = [
+    "summary",
+    "description",
+    "status",
+    "priority",
+    "issuetype",
+    "assignee",
+    "reporter",
+    "creator",
+    "created",
+    "updated",
+    "resolutiondate",
+    "labels",
+    "fixVersions",
+    "timeoriginalestimate",
+    "timespent",
+    "timeestimate",
+    "issuelinks",
+]
+
+
 class JiraClient(BaseClient):
     """Jira API 客户端。"""
 
@@ -84,44 +108,44 @@ class JiraClient(BaseClient):
             start_at += max_results
         return sprints
 
-    def get_issues(self, jql: str) -> list[dict[str, Any]]:
-        """根据 JQL 查询获取 Issue。"""
-        issues = []
+    def iter_issues(self, jql: str, page_size: int = ISSUE_PAGE_SIZE) -> Iterator[list[dict[str, Any]]]:
+        """按页流式获取 JQL 查询结果 (含 changelog)，每次产出一页 Issue 列表。
+
+        调用方逐页消费，内存占用与单页大小相关而与结果总量无关。
+        """
         start_at = 0
-        max_results = 100
         while True:
             params = {
                 "jql": jql,
                 "startAt": start_at,
-                "maxResults": max_results,
+                "maxResults": page_size,
                 "expand": ["changelog"],
-                "fields": [
-                    "summary",
-                    "description",
-                    "status",
-                    "priority",
-                    "issuetype",
-                    "assignee",
-                    "reporter",
-                    "creator",
-                    "created",
-                    "updated",
-                    "resolutiondate",
-                    "labels",
-                    "fixVersions",
-                    "timeoriginalestimate",
-                    "timespent",
-                    "timeestimate",
-                    "issuelinks",
-                ],
+                "fields": ISSUE_FIELDS,
             }
             response = self._get("/rest/api/3/search", params=params)
             data = response.json()
-            issues.extend(data.get("issues", []))
-            total = data.get("total", 0)
-            start_at += len(data.get("issues", []))
-            if start_at >= total or not data.get("issues"):
+            issues = data.get("issues", [])
+            if not issues:
                 break
+            yield issues
+            start_at += len(issues)
+            if start_at >= data.get("total", 0):
+                break
+
+    def get_oldest_created(self, jql: str) -> datetime | None:
+        """返回 JQL 结果中最早的创建时间，用于划分回填时间片；无结果时返回 None。"""
+        params = {"jql": f"{jql} ORDER BY created ASC", "startAt": 0, "maxResults": 1, "fields": ["created"]}
+        response = self._get("/rest/api/3/search", params=params)
+        issues = response.json().get("issues", [])
+        if not issues or not issues[0].get("fields", {}).get("created"):
+            return None
+        return datetime.fromisoformat(issues[0]["fields"]["created"].replace("Z", "+00:00"))
+
+    def get_issues(self, jql: str) -> list[dict[str, Any]]:
+        """根据 JQL 查询获取全部 Issue (一次性加载，仅适用于小结果集)。"""
+        issues = []
+        for page in self.iter_issues(jql):
+            issues.extend(page)
         return issues
 
     def get_groups(self) -> list[dict[str, Any]]:
@@ -20,5 +20,8 @@ def get_config() -> dict[str, Any]:
             "api_token": os.getenv("JIRA_TOKEN", ""),
             "rate_limit": int(os.getenv("REQUESTS_PER_SECOND", "5")),
         },
-        "worker": {},
+        "worker": {
+            "fetch_concurrency": int(os.getenv("JIRA_FETCH_CONCURRENCY", "4")),
+            "backfill_slice_days": int(os.getenv("JIRA_BACKFILL_SLICE_DAYS", "30")),
+        },
     }
@@ -168,6 +168,7 @@ class JiraIssue(Base):
         time_spent (int): 实际消耗工时 (秒)。
         labels (list): 标签列表 (JSON)。
         fix_versions (list): 修复版本列表 (JSON)。
+        raw_data_hash (str): 原始载荷指纹，用于同步时跳过未变化的问题。
     """
 
     __tablename__ = "jira_issues"
@@ -191,6 +192,7 @@ class JiraIssue(Base):
     updated_at = Column(DateTime(timezone=True))
     resolved_at = Column(DateTime(timezone=True))
     raw_data = Column(JSON)
+    raw_data_hash = Column(String(32), comment="原始载荷指纹，未变化时同步跳过")
     first_commit_sha = Column(String(100))
     first_fix_date = Column(DateTime(timezone=True))
     reopening_count = Column(Integer, default=0)
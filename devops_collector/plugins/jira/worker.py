@@ -1,7 +1,8 @@
 """Jira 数据采集 Worker"""
 
 import logging
-from datetime import UTC, datetime
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
 from sqlalchemy.orm import Session
@@ -9,6 +10,7 @@ from sqlalchemy.orm import Session
 from devops_collector.core.base_worker import BaseWorker
 from devops_collector.core.identity_manager import IdentityManager
 from devops_collector.core.organization_service import OrganizationService
+from devops_collector.core.utils import stream_concurrently
 from devops_collector.models.base_models import TraceabilityLink
 
 # from .client import JiraClient
@@ -17,11 +19,17 @@ from .models import JiraBoard, JiraIssue, JiraIssueHistory, JiraProject, JiraSpr
 
 logger = logging.getLogger(__name__)
 
+JQL_TIME_FORMAT = "%Y-%m-%d %H:%M"
+
 
 class JiraWorker(BaseWorker):
     """Jira 数据采集 Worker。"""
 
     SCHEMA_VERSION = "1.0"
+    BATCH_SIZE = 200
+    INSERT_CHUNK_SIZE = 1000
+    # 回填时每个时间片在后台预取的页数
+    PREFETCH_PAGES = 2
 
     def __init__(self, session: Session, client: Any, correlation_id: str = "unknown-cid", **kwargs) -> None:
         """初始化 Jenkins Worker。
@@ -30,15 +38,23 @@ class JiraWorker(BaseWorker):
             session: SQLAlchemy 数据库会话。
             client: Jenkins API 客户端。
             correlation_id (str): 追踪 ID (用于日志对齐)
-            **kwargs: 其他透传参数
+            **kwargs: 其他透传参数 (fetch_concurrency: 并发抓取线程数, backfill_slice_days: 回填时间片天数)
         """
         super().__init__(session, client, correlation_id=correlation_id)
         self.org_service = OrganizationService(session)
+        # 回填模式下按时间片并发抓取的线程数 (受客户端令牌桶统一限速)
+        self.fetch_concurrency = int(kwargs.get("fetch_concurrency", 4))
+        self.backfill_slice_days = int(kwargs.get("backfill_slice_days", 30))
 
     def process_task(self, task: dict) -> None:
-        """处理 Jira 同步任务。"""
+        """处理 Jira 同步任务。
+
+        task 结构示例: {'project_key': 'PROJ', 'job_type': 'backfill'}
+        job_type 为 backfill 时按创建时间切片并发全量回填，否则沿用单游标 (增量) 查询。
+        """
         project_key = task.get("project_key")
         logger.info(f"Processing Jira task: project_key={project_key}")
+        started_at = datetime.now(UTC)
         try:
             self._sync_groups()
             self._sync_all_users()
@@ -53,12 +69,15 @@ class JiraWorker(BaseWorker):
                     for s_data in sprints:
                         self._sync_sprint(board, s_data)
             jql = f"project = '{project_key}'"
-            if project.last_synced_at:
-                jql += f" AND updated >= '{project.last_synced_at.strftime('%Y-%m-%d %H:%M')}'"
-            issues = self.client.get_issues(jql)
-            for i_data in issues:
-                self._sync_issue(project, i_data)
-            project.last_synced_at = datetime.now(UTC)
+            if task.get("job_type") == "backfill":
+                self._backfill_issues(project, jql, until=started_at)
+                # 回填期间发生的更新交由下一次增量同步补齐
+                project.last_synced_at = started_at
+            else:
+                if project.last_synced_at:
+                    jql += f" AND updated >= '{project.last_synced_at.strftime(JQL_TIME_FORMAT)}'"
+                self._sync_issues_streaming(project, self.client.iter_issues(jql))
+                project.last_synced_at = datetime.now(UTC)
             project.sync_status = "COMPLETED"
             self.session.commit()
         except Exception as e:
@@ -152,56 +171,175 @@ class JiraWorker(BaseWorker):
         self.session.flush()
         return sprint
 
+    def _sync_issues_streaming(self, project: JiraProject, pages: Iterable[list[dict]]) -> int:
+        """逐页消费搜索结果，凑满 BATCH_SIZE 即批量落库并提交，内存占用与项目规模无关。"""
+        processed = 0
+        buffer: list[dict] = []
+        for page in pages:
+            buffer.extend(page)
+            if len(buffer) >= self.BATCH_SIZE:
+                self._sync_issues_batch(project, buffer)
+                self.session.commit()
+                processed += len(buffer)
+                buffer = []
+        if buffer:
+            self._sync_issues_batch(project, buffer)
+            self.session.commit()
+            processed += len(buffer)
+        logger.info(f"Synced {processed} Jira issue(s) for project {project.key}")
+        return processed
+
+    def _backfill_issues(self, project: JiraProject, jql: str, until: datetime) -> int:
+        """按创建时间切片并发回填项目的全部问题。
+
+        创建时间不会变化，各时间片互不重叠且首尾开放，合并后恰好覆盖全集；
+        最多 fetch_concurrency 个时间片同时逐页抓取，每个时间片只预取 PREFETCH_PAGES 页，
+        内存占用与时间片内的问题数无关。写库沿用幂等的批量管道，时间片按顺序消费并记录断点，
+        失败后从首个未完成的时间片继续。
+        """
+        checkpoint = self.get_checkpoint("jira", project.key, "issue_backfill")
+        if checkpoint and checkpoint.cursor:
+            start = datetime.fromisoformat(checkpoint.cursor)
+            processed = checkpoint.processed_count or 0
+            open_start = False
+        else:
+            start = self.client.get_oldest_created(jql)
+            processed = 0
+            open_start = True
+            if start is None:
+                self.complete_checkpoint("jira", project.key, "issue_backfill", processed_count=0)
+                return 0
+
+        slices = self._build_backfill_slices(start, until, open_start)
+        logger.info(f"Backfilling Jira project {project.key} in {len(slices)} slice(s) with concurrency {self.fetch_concurrency}")
+
+        def open_slice(bounds: tuple[datetime | None, datetime | None]) -> Iterable[list[dict]]:
+            return self.client.iter_issues(self._slice_jql(jql, *bounds))
+
+        for (lower, upper), pages in stream_concurrently(open_slice, slices, max_workers=self.fetch_concurrency, depth=self.PREFETCH_PAGES):
+            try:
+                processed += self._sync_issues_streaming(project, pages)
+            except Exception as exc:
+                logger.error(f"Jira backfill slice [{lower}, {upper}) failed for {project.key}: {exc}")
+                raise
+            if upper is not None:
+                self.save_checkpoint("jira", project.key, "issue_backfill", cursor=upper.isoformat(), processed_count=processed)
+            self.session.commit()
+
+        self.complete_checkpoint("jira", project.key, "issue_backfill", processed_count=processed)
+        logger.info(f"Backfilled {processed} Jira issue(s) for project {project.key}")
+        return processed
+
+    def _build_backfill_slices(self, start: datetime, until: datetime, open_start: bool = True) -> list[tuple[datetime | None, datetime | None]]:
+        """将 [start, until) 按 backfill_slice_days 切分为首尾相接的时间片。
+
+        边界对齐到分钟 (JQL 的时间精度)；最后一个时间片不设上界，open_start 时第一个不设下界，
+        避免 JQL 时区换算导致的首尾遗漏。
+        """
+        start = start.replace(second=0, microsecond=0)
+        step = timedelta(days=max(self.backfill_slice_days, 1))
+        edges: list[datetime | None] = [None if open_start else start]
+        edge = start + step
+        while edge < until:
+            edges.append(edge)
+            edge += step
+        edges.append(None)
+        return list(zip(edges[:-1], edges[1:], strict=True))
+
+    @staticmethod
+    def _slice_jql(jql: str, lower: datetime | None, upper: datetime | None) -> str:
+        """为基础 JQL 追加时间片的创建时间条件 (左闭右开)。"""
+        if lower is not None:
+            jql += f" AND created >= '{lower.strftime(JQL_TIME_FORMAT)}'"
+        if upper is not None:
+            jql += f" AND created < '{upper.strftime(JQL_TIME_FORMAT)}'"
+        return jql
+
+    def _sync_issues_batch(self, project: JiraProject, batch: list[dict]) -> None:
+        """批量同步 Jira 问题：先批量落盘到 Staging，再执行批量转换。"""
+        if not batch:
+            return
+        self.bulk_save_to_staging("jira", "issue", batch, schema_version=self.SCHEMA_VERSION)
+        self._transform_issues_batch(project, batch)
+
     def _sync_issue(self, project: JiraProject, data: dict) -> JiraIssue:
-        """同步 Jira 问题：先落盘到 Staging，再执行业务转换。"""
-        self.save_to_staging(source="jira", entity_type="issue", external_id=data["id"], payload=data, schema_version=self.SCHEMA_VERSION)
-        return self._transform_issue(project, data)
+        """同步 Jira 问题（单条兼容接口，内部转发到批量）。"""
+        self._sync_issues_batch(project, [data])
+        return self.session.get(JiraIssue, int(data["id"]))
 
     def _transform_issue(self, project: JiraProject, data: dict) -> JiraIssue:
-        """核心解析逻辑：将原始 Jira JSON 转换为 JiraIssue 模型。"""
-        issue = self.session.query(JiraIssue).filter_by(id=data["id"]).first()
-        if not issue:
-            issue = JiraIssue(id=data["id"], key=data["key"], project_id=project.id)
-            self.session.add(issue)
+        """核心解析逻辑（单条兼容接口，内部转发到批量）。"""
+        self._transform_issues_batch(project, [data])
+        return self.session.get(JiraIssue, int(data["id"]))
+
+    def _transform_issues_batch(self, project: JiraProject, batch: list[dict]) -> None:
+        """批量将原始 Jira JSON 转换为 JiraIssue 模型。
+
+        整批仅一次 IN 查询加载已存在的问题、一次批量身份解析，
+        变更历史与链路关系以 INSERT ... ON CONFLICT DO NOTHING 批量写入。
+        载荷指纹与上次同步相同的问题整条跳过。
+        """
+        changed = self.filter_changed(JiraIssue, batch, key=lambda data: int(data["id"]))
+        if not changed:
+            return
+        batch = [data for data in batch if int(data["id"]) in changed]
+        existing = self.session.query(JiraIssue).filter(JiraIssue.id.in_(changed)).all()
+        existing_map = {i.id: i for i in existing}
+        users = self._resolve_issue_users(batch)
+
+        history_rows: list[dict] = []
+        link_rows: list[dict] = []
+        for data in batch:
+            issue = existing_map.get(int(data["id"]))
+            if not issue:
+                issue = JiraIssue(id=int(data["id"]), key=data["key"], project_id=project.id)
+                self.session.add(issue)
+                existing_map[issue.id] = issue
+            self._apply_issue_fields(issue, data, users)
+            issue.raw_data_hash = changed[issue.id]
+            if "changelog" in data:
+                history_rows.extend(self._build_history_rows(issue.id, data["changelog"]))
+            if data.get("fields", {}).get("issuelinks"):
+                link_rows.extend(self._build_link_rows(issue.id, data["fields"]["issuelinks"]))
+        self.session.flush()
+
+        self._insert_ignore(JiraIssueHistory, history_rows, ["id"])
+        self._insert_ignore(TraceabilityLink, link_rows, ["source_id", "target_id", "link_type"])
+
+    def _resolve_issue_users(self, batch: list[dict]) -> dict:
+        """汇总批次内的经办人/报告人/创建人，一次性解析为全局用户 (accountId -> User)。"""
+        profiles = {}
+        for data in batch:
+            fields = data.get("fields", {})
+            for role in ("assignee", "reporter", "creator"):
+                person = fields.get(role)
+                if person and person.get("accountId"):
+                    profiles[str(person["accountId"])] = {"email": person.get("emailAddress"), "name": person.get("displayName")}
+        return IdentityManager.resolve_users(self.session, "jira", profiles.keys(), profiles)
+
+    def _apply_issue_fields(self, issue: JiraIssue, data: dict, users: dict) -> None:
+        """将单条 Jira JSON 的字段写入 JiraIssue。"""
         fields = data.get("fields", {})
         issue.summary = fields.get("summary")
         issue.description = fields.get("description")
-        issue.status = fields.get("status", {}).get("name")
-        issue.priority = fields.get("priority", {}).get("name")
-        issue.issue_type = fields.get("issuetype", {}).get("name")
+        issue.status = (fields.get("status") or {}).get("name")
+        issue.priority = (fields.get("priority") or {}).get("name")
+        issue.issue_type = (fields.get("issuetype") or {}).get("name")
         if fields.get("assignee"):
             issue.assignee_name = fields["assignee"].get("displayName")
-            u = IdentityManager.get_or_create_user(
-                self.session,
-                "jira",
-                fields["assignee"]["accountId"],
-                fields["assignee"].get("emailAddress"),
-                fields["assignee"].get("displayName"),
-            )
+            u = users.get(str(fields["assignee"].get("accountId")))
             if u:
                 issue.assignee_user_id = u.global_user_id
                 issue.assignee_name = u.full_name
         if fields.get("reporter"):
             issue.reporter_name = fields["reporter"].get("displayName")
-            u = IdentityManager.get_or_create_user(
-                self.session,
-                "jira",
-                fields["reporter"]["accountId"],
-                fields["reporter"].get("emailAddress"),
-                fields["reporter"].get("displayName"),
-            )
+            u = users.get(str(fields["reporter"].get("accountId")))
             if u:
                 issue.reporter_user_id = u.global_user_id
                 issue.reporter_name = u.full_name
         if fields.get("creator"):
             issue.creator_name = fields["creator"].get("displayName")
-            u = IdentityManager.get_or_create_user(
-                self.session,
-                "jira",
-                fields["creator"]["accountId"],
-                fields["creator"].get("emailAddress"),
-                fields["creator"].get("displayName"),
-            )
+            u = users.get(str(fields["creator"].get("accountId")))
             if u:
                 issue.creator_user_id = u.global_user_id
                 issue.creator_name = u.full_name
@@ -218,42 +356,31 @@ class JiraWorker(BaseWorker):
         if fields.get("fixVersions"):
             issue.fix_versions = [v.get("name") for v in fields["fixVersions"]]
         issue.raw_data = data
-        self.session.flush()
-        if "changelog" in data:
-            self._sync_issue_history(issue, data["changelog"])
-        if fields.get("issuelinks"):
-            self._sync_issue_links(issue, fields["issuelinks"])
-        return issue
-
-    def _sync_issue_history(self, issue: JiraIssue, changelog: dict) -> None:
-        """同步 Jira 问题的变更历史。"""
+
+    def _build_history_rows(self, issue_id: int, changelog: dict) -> list[dict]:
+        """将 Jira changelog 展开为变更历史行 (每个变更字段一行)。"""
+        rows = []
         for history in changelog.get("histories", []):
             author = history.get("author", {}).get("displayName")
             created = datetime.fromisoformat(history["created"].replace("Z", "+00:00"))
             for item in history.get("items", []):
-                history_id = f"{history['id']}_{item.get('field')}"
-                h_record = self.session.query(JiraIssueHistory).filter_by(id=history_id).first()
-                if not h_record:
-                    h_record = JiraIssueHistory(
-                        id=history_id,
-                        issue_id=issue.id,
-                        author_name=author,
-                        created_at=created,
-                        field=item.get("field"),
-                        from_string=item.get("fromString"),
-                        to_string=item.get("toString"),
-                        raw_data=history,
-                    )
-                    self.session.add(h_record)
-        self.session.flush()
-
-    def _sync_issue_links(self, issue: JiraIssue, links: list[dict[str, Any]]) -> None:
-        """同步 Jira 问题的链路关系 (依赖分析)。
+                rows.append(
+                    {
+                        "id": f"{history['id']}_{item.get('field')}",
+                        "issue_id": issue_id,
+                        "author_name": author,
+                        "created_at": created,
+                        "field": item.get("field"),
+                        "from_string": item.get("fromString"),
+                        "to_string": item.get("toString"),
+                        "raw_data": history,
+                    }
+                )
+        return rows
 
-        Args:
-            issue: JiraIssue 对象
-            links: Jira API 返回的 issuelinks 列表
-        """
+    def _build_link_rows(self, issue_id: int, links: list[dict[str, Any]]) -> list[dict]:
+        """将 Jira issuelinks 转换为链路关系行 (依赖分析)。"""
+        rows = []
         for link in links:
             target_issue_data = None
             link_direction = None
@@ -265,25 +392,41 @@ class JiraWorker(BaseWorker):
                 link_direction = link.get("type", {}).get("inward")
             if not target_issue_data or not link_direction:
                 continue
-            source_ext_id = str(issue.id)
-            target_ext_id = str(target_issue_data["id"])
-            existing = (
-                self.session.query(TraceabilityLink)
-                .filter_by(source_system="jira", source_id=source_ext_id, target_id=target_ext_id, link_type=link_direction)
-                .first()
+            rows.append(
+                {
+                    "source_system": "jira",
+                    "source_type": "issue",
+                    "source_id": str(issue_id),
+                    "target_system": "jira",
+                    "target_type": "issue",
+                    "target_id": str(target_issue_data["id"]),
+                    "link_type": link_direction,
+                    "raw_data": link,
+                }
             )
-            if not existing:
-                link_record = TraceabilityLink(
-                    source_system="jira",
-                    source_type="issue",
-                    source_id=source_ext_id,
-                    target_system="jira",
-                    target_type="issue",
-                    target_id=target_ext_id,
-                    link_type=link_direction,
-                    raw_data=link,
-                )
-                self.session.add(link_record)
+        return rows
+
+    def _insert_ignore(self, model: type, rows: list[dict], key_columns: list[str]) -> None:
+        """批量插入，已存在 (按唯一键判定) 的行保持不变。
+
+        PostgreSQL 下使用 INSERT ... ON CONFLICT DO NOTHING；其他方言 (如测试用 SQLite)
+        退化为一次 IN 查询过滤已存在的键后批量插入。
+        """
+        unique_rows = list({tuple(r[c] for c in key_columns): r for r in rows}.values())
+        if not unique_rows:
+            return
+        if self.session.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            # 分块写入，避免单条语句超出 PostgreSQL 绑定参数上限 (65535)
+            for i in range(0, len(unique_rows), self.INSERT_CHUNK_SIZE):
+                stmt = pg_insert(model).values(unique_rows[i : i + self.INSERT_CHUNK_SIZE]).on_conflict_do_nothing(index_elements=key_columns)
+                self.session.execute(stmt)
+            return
+        lead = key_columns[0]
+        existing = self.session.query(*[getattr(model, c) for c in key_columns]).filter(getattr(model, lead).in_({r[lead] for r in unique_rows})).all()
+        existing_keys = {tuple(row) for row in existing}
+        self.session.add_all(model(**r) for r in unique_rows if tuple(r[c] for c in key_columns) not in existing_keys)
         self.session.flush()
 
     def _sync_groups(self) -> None:
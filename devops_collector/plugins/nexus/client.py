@@ -45,37 +45,39 @@ class NexusClient(BaseClient):
         """获取仓库列表。"""
         return self._get("repositories").json()
 
-    def list_components(self, repository: str) -> Generator[dict, None, None]:
-        """流式获取仓库下的组件列表（支持自动分页）。"""
-        continuation_token = None
+    def iter_pages(self, endpoint: str, repository: str, continuation_token: str | None = None) -> Generator[tuple[list[dict], str | None], None, None]:
+        """按页获取组件/资产列表，产出 (本页条目, 下一页 continuationToken)。
+
+        下一页令牌为 None 表示已是最后一页；调用方可持久化令牌，之后从该位置继续。
+
+        Args:
+            endpoint: 'components' 或 'assets'
+            repository: 仓库名称
+            continuation_token: 起始令牌，None 表示从头开始
+        """
         while True:
             params = {"repository": repository}
             if continuation_token:
                 params["continuationToken"] = continuation_token
-            response = self._get("components", params=params).json()
-            items = response.get("items", [])
-            yield from items
+            response = self._get(endpoint, params=params).json()
             continuation_token = response.get("continuationToken")
+            yield response.get("items", []), continuation_token
             if not continuation_token:
                 break
 
+    def list_components(self, repository: str) -> Generator[dict, None, None]:
+        """流式获取仓库下的组件列表（支持自动分页）。"""
+        for items, _ in self.iter_pages("components", repository):
+            yield from items
+
     def get_component(self, component_id: str) -> dict:
         """获取特定组件详情。"""
         return self._get(f"components/{component_id}").json()
 
     def list_assets(self, repository: str) -> Generator[dict, None, None]:
         """流式获取资产列表。"""
-        continuation_token = None
-        while True:
-            params = {"repository": repository}
-            if continuation_token:
-                params["continuationToken"] = continuation_token
-            response = self._get("assets", params=params).json()
-            items = response.get("items", [])
+        for items, _ in self.iter_pages("assets", repository):
             yield from items
-            continuation_token = response.get("continuationToken")
-            if not continuation_token:
-                break
 
     def download_asset_content(self, download_url: str) -> str:
         """下载资产内容（通常用于解析小型元数据文件）。"""
@@ -5,6 +5,7 @@ import re
 from datetime import datetime
 
 from devops_collector.core.base_worker import BaseWorker
+from devops_collector.core.utils import prefetch
 
 # from .client import NexusClient
 from devops_collector.models.base_models import Product
@@ -36,6 +37,11 @@ class NexusWorker(BaseWorker):
     """Nexus 数据采集 Worker。"""
 
     SCHEMA_VERSION = "1.0"
+    BATCH_SIZE = 100
+    # 后台预取的页数 (Nexus 每页约 10~100 条)
+    PREFETCH_PAGES = 2
+    # (group, name) -> 产品解析结果的记忆容量，超出后整体清空
+    RESOLVE_CACHE_SIZE = 100_000
 
     def process_task(self, task: dict) -> None:
         """处理 Nexus 同步任务。
@@ -57,11 +63,16 @@ class NexusWorker(BaseWorker):
             raise
 
     def _init_product_cache(self):
-        """初始化产品代码缓存及匹配模式列表。"""
+        """初始化产品代码缓存及匹配模式列表。
+
+        不含捕获分组的显式模式合并为一条带命名分组的交替正则，一次匹配即可得到首个命中的规则；
+        解析结果按 (group, name) 记忆，同一坐标的后续组件无需重复匹配。
+        """
         # 查询产品 ID 和匹配模式
         products = self.session.query(Product.product_code, Product.matching_patterns).filter(Product.is_current).all()
 
         self._product_map = {p.product_code.lower(): p.product_code for p in products}
+        self._resolve_cache: dict[tuple[str | None, str], str | None] = {}
 
         # 编译所有产品的匹配正则
         self._pattern_rules = []
@@ -86,16 +97,59 @@ class NexusWorker(BaseWorker):
                 except Exception as e:
                     logger.warning(f"Invalid matching pattern '{pat}' for product {p.product_code}: {e}")
 
+        # 合并为单条交替正则：对同一字符串，re.match 返回按顺序首个可命中的分支。
+        # 含捕获分组的模式不参与合并 (合并后分组编号整体偏移，\1 等编号反向引用会指向错误的分组)，逐条匹配。
+        self._combined_pattern = None
+        mergeable = [(i, rule) for i, rule in enumerate(self._pattern_rules) if rule["re"].groups == 0]
+        self._separate_rules = [(i, rule) for i, rule in enumerate(self._pattern_rules) if rule["re"].groups > 0]
+        if mergeable:
+            try:
+                alternation = "|".join(f"(?P<_r{i}>{rule['re'].pattern})" for i, rule in mergeable)
+                self._combined_pattern = re.compile(alternation, re.I)
+            except re.error as e:
+                # 个别模式 (如含全局内联标记) 无法合并时退化为逐条匹配
+                logger.warning(f"Falling back to per-pattern product matching: {e}")
+                self._separate_rules = list(enumerate(self._pattern_rules))
+
         logger.info(f"Loaded {len(self._product_map)} products and {len(self._pattern_rules)} patterns.")
 
+    def _match_pattern_rule(self, *candidates: str) -> str | None:
+        """返回首个命中任一候选字符串的显式规则对应的产品 (与逐条按规则顺序匹配等价)。"""
+        best = None
+        if self._combined_pattern is not None:
+            for candidate in candidates:
+                m = self._combined_pattern.match(candidate)
+                if m:
+                    # 参与合并的模式不含捕获分组，命中分支即最后一个匹配的命名分组
+                    idx = int(m.lastgroup[2:])
+                    best = idx if best is None else min(best, idx)
+        for idx, rule in self._separate_rules:
+            if best is not None and idx >= best:
+                break
+            if any(rule["re"].match(c) for c in candidates):
+                best = idx
+                break
+        return self._pattern_rules[best]["pid"] if best is not None else None
+
     def _resolve_product_id(self, group: str | None, name: str) -> str | None:
-        """根据 Group 或 Name 智能解析所属 Product ID (优先匹配显式模式)。"""
+        """根据 Group 或 Name 智能解析所属 Product ID (优先匹配显式模式，结果按坐标记忆)。"""
+        key = (group, name)
+        if key in self._resolve_cache:
+            return self._resolve_cache[key]
+        if len(self._resolve_cache) >= self.RESOLVE_CACHE_SIZE:
+            self._resolve_cache.clear()
+        pid = self._resolve_product_id_uncached(group, name)
+        self._resolve_cache[key] = pid
+        return pid
+
+    def _resolve_product_id_uncached(self, group: str | None, name: str) -> str | None:
+        """不经缓存的产品解析逻辑。"""
         target_str = f"{group or ''}:{name}"
 
         # 1. 优先使用显式定义的 matching_patterns (正则匹配)
-        for rule in self._pattern_rules:
-            if rule["re"].match(group or "") or rule["re"].match(name) or rule["re"].match(target_str):
-                return rule["pid"]
+        pid = self._match_pattern_rule(group or "", name, target_str)
+        if pid:
+            return pid
 
         # 2. 降级策略: 尝试通过 group 拆分匹配 (Maven 风格)
         if group:
@@ -112,38 +166,62 @@ class NexusWorker(BaseWorker):
         return None
 
     def _sync_components(self, repository: str) -> int:
-        """拉取并保存组件及其资产。"""
-        generator = self.client.list_components(repository)
-        count = 0
+        """拉取并保存组件及其资产。
+
+        按 continuationToken 分页，每凑满 BATCH_SIZE 条与断点 (下一页令牌、累计数量) 同一事务提交；
+        上次未完成时从断点令牌继续。后台预取下一页，使网络请求与当前批次写库重叠。
+        """
+        checkpoint = self.get_checkpoint("nexus", repository, "component")
+        token = checkpoint.cursor if checkpoint and checkpoint.status == "RUNNING" else None
+        count = (checkpoint.processed_count or 0) if token else 0
+        if token:
+            logger.info(f"Resuming Nexus repository {repository} from checkpoint after {count} components")
+
         batch = []
-        batch_size = 100
-        for item in generator:
-            batch.append(item)
-            if len(batch) >= batch_size:
-                self._save_batch(batch)
+        for items, next_token in prefetch(self.client.iter_pages("components", repository, token), depth=self.PREFETCH_PAGES):
+            batch.extend(items)
+            if len(batch) >= self.BATCH_SIZE and next_token:
                 count += len(batch)
+                # 断点与本批数据同一事务提交，保证断点不会领先于已落库的数据
+                self.save_checkpoint("nexus", repository, "component", cursor=next_token, processed_count=count)
+                self._save_batch(batch)
                 batch = []
+        count += len(batch)
         if batch:
             self._save_batch(batch)
-            count += len(batch)
+        self.complete_checkpoint("nexus", repository, "component", processed_count=count)
+        self.session.commit()
         return count
 
     def _save_batch(self, batch: list[dict]) -> None:
-        """批量保存到数据库，并执行身份/产品识别。"""
+        """批量保存到数据库，并执行身份/产品识别。
+
+        整批仅一次 Staging 批量落盘、一次组件 IN 查询与一次资产 IN 查询。
+        """
+        if not batch:
+            return
+        self.bulk_save_to_staging("nexus", "component", batch, schema_version=self.SCHEMA_VERSION)
+
+        comp_ids = [data["id"] for data in batch]
+        existing = self.session.query(NexusComponent).filter(NexusComponent.id.in_(comp_ids)).all()
+        comp_map = {c.id: c for c in existing}
+
+        all_assets = [a for data in batch for a in data.get("assets", [])]
+        existing_asset_ids = set()
+        if all_assets:
+            rows = self.session.query(NexusAsset.id).filter(NexusAsset.id.in_([a["id"] for a in all_assets])).all()
+            existing_asset_ids = {r[0] for r in rows}
+        new_assets = [a for a in all_assets if a["id"] not in existing_asset_ids]
+        if new_assets:
+            self.bulk_save_to_staging("nexus", "asset", new_assets, schema_version=self.SCHEMA_VERSION)
+
         for data in batch:
             comp_id = data["id"]
-            comp = self.session.query(NexusComponent).filter_by(id=comp_id).first()
+            comp = comp_map.get(comp_id)
             if not comp:
                 comp = NexusComponent(id=comp_id)
                 self.session.add(comp)
-
-            self.save_to_staging(
-                source="nexus",
-                entity_type="component",
-                external_id=comp_id,
-                payload=data,
-                schema_version=self.SCHEMA_VERSION,
-            )
+                comp_map[comp_id] = comp
 
             comp.repository = data["repository"]
             comp.format = data["format"]
@@ -160,45 +238,36 @@ class NexusWorker(BaseWorker):
 
             # 使用最新可用时间来进行时间隔离网判断
             # 如果资产中的 last_modified 都小于 2024 年，也可以在 asset 级别拦截
-            self._sync_assets(comp, data.get("assets", []))
+            assets_data = data.get("assets", [])
+            self._sync_assets(comp, [a for a in assets_data if a["id"] not in existing_asset_ids])
 
-            # 尝试从资产中解析追溯信息
-            self._try_parse_traceability(comp)
+            # 仅当载荷中带有追溯文件且尚未解析出提交时才下载解析，避免逐组件加载资产关系
+            if not comp.commit_sha and any(a.get("path", "").endswith(TRACE_FILE_NAME) for a in assets_data):
+                self._try_parse_traceability(comp)
 
         self.session.commit()
 
     def _sync_assets(self, component: NexusComponent, assets_data: list[dict]) -> None:
-        """同步组件关联的资产。"""
-        existing_ids = {a.id for a in component.assets}
+        """同步组件关联的新资产 (调用方已过滤掉库中已存在的资产，并已落盘 Staging)。"""
         for asset_data in assets_data:
-            a_id = asset_data["id"]
-            if a_id in existing_ids:
-                continue
-            self.save_to_staging(
-                source="nexus",
-                entity_type="asset",
-                external_id=a_id,
-                payload=asset_data,
-                schema_version=self.SCHEMA_VERSION,
-            )
-            asset = NexusAsset(
-                id=a_id,
-                component_id=component.id,
-                path=asset_data["path"],
-                download_url=asset_data.get("downloadUrl"),
-                size_bytes=asset_data.get("fileSize"),
-                raw_data=asset_data,
-            )
-
             # Nexus API lastModified example: '2022-09-08T12:00:00.000+00:00'
             last_modified_str = asset_data.get("lastModified")
             if not _is_after_cutoff(last_modified_str):
                 continue  # 如果文件本身是在 2024年1月1日之前修改/创建的，跳过入库
 
             checksums = asset_data.get("checksum", {})
-            asset.checksum_sha1 = checksums.get("sha1")
-            asset.checksum_sha256 = checksums.get("sha256")
-            asset.checksum_md5 = checksums.get("md5")
+            asset = NexusAsset(
+                id=asset_data["id"],
+                path=asset_data["path"],
+                download_url=asset_data.get("downloadUrl"),
+                size_bytes=asset_data.get("fileSize"),
+                checksum_sha1=checksums.get("sha1"),
+                checksum_sha256=checksums.get("sha256"),
+                checksum_md5=checksums.get("md5"),
+                raw_data=asset_data,
+            )
+            # 通过反向关系挂载：不会触发已持久化组件的资产集合加载
+            asset.component = component
             self.session.add(asset)
 
     def _try_parse_traceability(self, component: NexusComponent) -> None:
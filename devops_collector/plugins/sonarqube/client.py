@@ -6,6 +6,7 @@ API 文档: https://docs.sonarqube.org/latest/extension-guide/web-api/
 
 import base64
 import logging
+from collections.abc import Generator
 from typing import Any
 
 from devops_collector.core.base_client import BaseClient
@@ -13,6 +14,12 @@ from devops_collector.core.base_client import BaseClient
 
 logger = logging.getLogger(__name__)
 
+# issues/search 仅允许访问前 10000 条结果 (p * ps <= 10000)
+ISSUE_SEARCH_LIMIT = 10000
+
+# measures/search 单次最多接受 100 个 projectKeys
+MEASURES_SEARCH_BATCH = 100
+
 
 class SonarQubeClient(BaseClient):
     """SonarQube Web API 客户端。
@@ -155,6 +162,74 @@ class SonarQubeClient(BaseClient):
             result[measure["metric"]] = measure.get("value")
         return result
 
+    def get_projects_by_keys(self, keys: list[str]) -> dict[str, dict]:
+        """批量获取项目详情 (单次请求)。
+
+        Args:
+            keys: 项目 Key 列表 (建议不超过 MEASURES_SEARCH_BATCH 个)
+
+        Returns:
+            {project_key: 项目信息}，不存在的项目不会出现在结果中
+        """
+        response = self._get("projects/search", params={"projects": ",".join(keys), "ps": max(len(keys), 1)})
+        return {c["key"]: c for c in response.json().get("components", [])}
+
+    def search_measures(self, project_keys: list[str], metrics: list[str] | None = None) -> dict[str, dict[str, Any]]:
+        """通过 measures/search 一次获取多个项目的指标。
+
+        除 metrics 外总会附带 alert_status，用于替代逐项目调用 qualitygates/project_status。
+
+        Args:
+            project_keys: 项目 Key 列表 (不超过 MEASURES_SEARCH_BATCH 个)
+            metrics: 指标列表，默认使用 DEFAULT_METRICS
+
+        Returns:
+            {project_key: {"metric_name": value, ...}}
+        """
+        metric_keys = list(dict.fromkeys([*(metrics or self.DEFAULT_METRICS), "alert_status"]))
+        response = self._get("measures/search", params={"projectKeys": ",".join(project_keys), "metricKeys": ",".join(metric_keys)})
+        result: dict[str, dict[str, Any]] = {}
+        for measure in response.json().get("measures", []):
+            result.setdefault(measure["component"], {})[measure["metric"]] = measure.get("value")
+        return result
+
+    def get_issue_severity_distributions(
+        self, project_keys: list[str], types: tuple[str, ...] = ("BUG", "VULNERABILITY")
+    ) -> dict[str, dict[str, dict[str, int]]]:
+        """批量获取多个项目的问题类型 × 严重程度分布。
+
+        每个 (类型, 严重程度) 组合发起一次 issues/search，并按 projects facet 拆分到各项目，
+        请求数与项目数量无关。
+
+        Args:
+            project_keys: 项目 Key 列表 (不超过 MEASURES_SEARCH_BATCH 个)
+            types: 需要统计的问题类型
+
+        Returns:
+            {project_key: {'BUG': {'BLOCKER': 1, ...}, 'VULNERABILITY': {...}}}
+        """
+        distributions: dict[str, dict[str, dict[str, int]]] = {key: {t: {} for t in types} for key in project_keys}
+        for issue_type in types:
+            for severity in ("BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO"):
+                response = self._get(
+                    "issues/search",
+                    params={
+                        "componentKeys": ",".join(project_keys),
+                        "types": issue_type,
+                        "severities": severity,
+                        "resolved": "false",
+                        "ps": 1,
+                        "facets": "projects",
+                    },
+                )
+                for facet in response.json().get("facets", []):
+                    if facet["property"] != "projects":
+                        continue
+                    for val_item in facet.get("values", []):
+                        if val_item["val"] in distributions:
+                            distributions[val_item["val"]][issue_type][severity] = val_item["count"]
+        return distributions
+
     def get_issues(
         self,
         project_key: str,
@@ -185,6 +260,49 @@ class SonarQubeClient(BaseClient):
         response = self._get("issues/search", params=params)
         return response.json().get("issues", [])
 
+    def search_issues(self, project_key: str, page: int = 1, page_size: int = 500, **filters: Any) -> dict[str, Any]:
+        """调用 issues/search 并返回完整响应 (含 issues 与 paging)。
+
+        Args:
+            project_key: 项目 Key
+            page: 页码
+            page_size: 每页数量 (最大 500)
+            **filters: 其他查询参数，如 resolved、severities、createdAfter/createdBefore (左闭右开)、s/asc 排序；
+                值为 None 的参数会被忽略
+        """
+        params = {"componentKeys": project_key, "p": page, "ps": page_size}
+        params.update({k: v for k, v in filters.items() if v is not None})
+        response = self._get("issues/search", params=params)
+        return response.json()
+
+    @staticmethod
+    def issues_total(data: dict[str, Any]) -> int:
+        """从 issues/search 响应中提取结果总数 (兼容新旧版本的 paging 结构)。"""
+        return int(data.get("paging", {}).get("total", data.get("total", 0)) or 0)
+
+    def count_issues(self, project_key: str, **filters: Any) -> int:
+        """返回满足条件的问题总数 (仅请求 1 条记录)。"""
+        return self.issues_total(self.search_issues(project_key, page=1, page_size=1, **filters))
+
+    def get_oldest_issue_date(self, project_key: str, **filters: Any) -> str | None:
+        """返回满足条件的问题中最早的 creationDate，用于按创建时间切分查询。"""
+        data = self.search_issues(project_key, page=1, page_size=1, s="CREATION_DATE", asc="true", **filters)
+        issues = data.get("issues", [])
+        return issues[0].get("creationDate") if issues else None
+
+    def iter_issue_pages(self, project_key: str, page_size: int = 500, **filters: Any) -> Generator[list[dict], None, None]:
+        """按页流式获取问题列表，最多遍历到 SonarQube 的深分页上限 (ISSUE_SEARCH_LIMIT)。"""
+        page = 1
+        while True:
+            data = self.search_issues(project_key, page=page, page_size=page_size, **filters)
+            issues = data.get("issues", [])
+            if not issues:
+                break
+            yield issues
+            if page * page_size >= min(self.issues_total(data), ISSUE_SEARCH_LIMIT):
+                break
+            page += 1
+
     def get_all_issues(self, project_key: str, resolved: bool = False, **kwargs) -> list[dict]:
         """获取项目所有问题 (自动分页)。
 
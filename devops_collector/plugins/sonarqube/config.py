@@ -18,7 +18,8 @@ def get_config() -> dict[str, Any]:
                 'rate_limit': int
             },
             'worker': {
-                'sync_issues': bool
+                'sync_issues': bool,
+                'fetch_concurrency': int
             }
         }
     """
@@ -30,5 +31,5 @@ def get_config() -> dict[str, Any]:
             "token": Config.SONARQUBE_TOKEN,
             "rate_limit": Config.REQUESTS_PER_SECOND,
         },
-        "worker": {"sync_issues": Config.SONARQUBE_SYNC_ISSUES},
+        "worker": {"sync_issues": Config.SONARQUBE_SYNC_ISSUES, "fetch_concurrency": Config.SONARQUBE_FETCH_CONCURRENCY},
     }
@@ -121,30 +121,51 @@ class SonarDataTransformer:
         Returns:
             SonarIssue: 填充好或更新后的 Issue 对象。
         """
-        issue = self.session.query(SonarIssue).filter_by(issue_key=i_data["key"]).first()
-        if not issue:
-            issue = SonarIssue(issue_key=i_data["key"], project_id=project.id)
-            self.session.add(issue)
-        issue.type = i_data.get("type")
-        issue.severity = i_data.get("severity")
-        issue.status = i_data.get("status")
-        issue.resolution = i_data.get("resolution")
-        issue.rule = i_data.get("rule")
-        issue.message = i_data.get("message")
-        issue.component = i_data.get("component")
-        issue.line = i_data.get("line")
-        issue.effort = i_data.get("effort")
-        issue.debt = i_data.get("debt")
-        issue.assignee = i_data.get("assignee")
-        if issue.assignee:
-            u = IdentityManager.get_or_create_user(self.session, "sonarqube", issue.assignee)
-            issue.assignee_user_id = u.global_user_id
-        issue.author = i_data.get("author")
-        if issue.author:
-            u = IdentityManager.get_or_create_user(self.session, "sonarqube", issue.author)
-            issue.author_user_id = u.global_user_id
-        issue.raw_data = i_data
-        issue.creation_date = parse_iso8601(i_data.get("creationDate"))
-        issue.update_date = parse_iso8601(i_data.get("updateDate"))
-        issue.close_date = parse_iso8601(i_data.get("closeDate"))
-        return issue
+        return self.transform_issues_batch(project, [i_data])[0]
+
+    def transform_issues_batch(self, project: SonarProject, batch: list[dict]) -> list[SonarIssue]:
+        """批量转换 Issue：一次 IN 查询加载已存在记录，一次批量解析经办人/作者身份。
+
+        Args:
+            project: 关联的 SonarProject 对象。
+            batch: Issue 原始数据列表。
+
+        Returns:
+            List[SonarIssue]: 与 batch 顺序一致的 Issue 对象列表 (尚未提交)。
+        """
+        keys = [i_data["key"] for i_data in batch]
+        existing = {i.issue_key: i for i in self.session.query(SonarIssue).filter(SonarIssue.issue_key.in_(keys)).all()}
+        accounts = {i_data.get("assignee") for i_data in batch} | {i_data.get("author") for i_data in batch}
+        users = IdentityManager.resolve_users(self.session, "sonarqube", accounts)
+
+        issues = []
+        for i_data in batch:
+            issue = existing.get(i_data["key"])
+            if not issue:
+                issue = SonarIssue(issue_key=i_data["key"], project_id=project.id)
+                self.session.add(issue)
+                existing[issue.issue_key] = issue
+            issue.type = i_data.get("type")
+            issue.severity = i_data.get("severity")
+            issue.status = i_data.get("status")
+            issue.resolution = i_data.get("resolution")
+            issue.rule = i_data.get("rule")
+            issue.message = i_data.get("message")
+            issue.component = i_data.get("component")
+            issue.line = i_data.get("line")
+            issue.effort = i_data.get("effort")
+            issue.debt = i_data.get("debt")
+            issue.assignee = i_data.get("assignee")
+            u = users.get(issue.assignee) if issue.assignee else None
+            if u:
+                issue.assignee_user_id = u.global_user_id
+            issue.author = i_data.get("author")
+            u = users.get(issue.author) if issue.author else None
+            if u:
+                issue.author_user_id = u.global_user_id
+            issue.raw_data = i_data
+            issue.creation_date = parse_iso8601(i_data.get("creationDate"))
+            issue.update_date = parse_iso8601(i_data.get("updateDate"))
+            issue.close_date = parse_iso8601(i_data.get("closeDate"))
+            issues.append(issue)
+        return issues
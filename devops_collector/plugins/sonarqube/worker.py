@@ -1,14 +1,18 @@
 """SonarQube 数据采集 Worker"""
 
 import logging
+from collections.abc import Iterator
+from datetime import UTC, datetime, timedelta
 from typing import Any
 
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from devops_collector.core.base_worker import BaseWorker
-from devops_collector.core.utils import parse_iso8601
+from devops_collector.core.utils import fetch_concurrently, parse_iso8601, safe_int
 
-from .models import SonarProject
+from .client import ISSUE_SEARCH_LIMIT, MEASURES_SEARCH_BATCH
+from .models import SonarIssue, SonarMeasure, SonarProject
 from .transformer import SonarDataTransformer
 
 
@@ -19,6 +23,18 @@ except ImportError:
 logger = logging.getLogger(__name__)
 
 
+def _as_utc(value: datetime | None) -> datetime | None:
+    """将时间统一为带时区的 UTC (SQLite 等返回的无时区时间视为 UTC)。"""
+    if value is None:
+        return None
+    return value.replace(tzinfo=UTC) if value.tzinfo is None else value.astimezone(UTC)
+
+
+def _sonar_date(value: datetime) -> str:
+    """格式化为 issues/search 接受的日期时间参数 (如 2024-01-01T00:00:00+0000)。"""
+    return _as_utc(value).strftime("%Y-%m-%dT%H:%M:%S%z")
+
+
 class SonarQubeWorker(BaseWorker):
     """SonarQube 数据采集 Worker。
 
@@ -26,6 +42,11 @@ class SonarQubeWorker(BaseWorker):
     """
 
     SCHEMA_VERSION = "1.1"
+    ISSUE_PAGE_SIZE = 500
+    BATCH_SIZE = MEASURES_SEARCH_BATCH
+    SEVERITIES = ("BLOCKER", "CRITICAL", "MAJOR", "MINOR", "INFO")
+    # 对账时按 Key 回查问题的单次请求 Key 数 (受 URL 长度限制)
+    ISSUE_KEYS_BATCH = 100
 
     def __init__(self, session: Session, client: Any = None, correlation_id: str = "unknown-cid", sync_issues: bool = False, **kwargs) -> None:
         """初始化 SonarQube Worker。
@@ -35,17 +56,24 @@ class SonarQubeWorker(BaseWorker):
             client (Any): 客户端实例，若为 None 则根据配置自动选择。
             correlation_id (str): 追踪 ID (用于日志对齐)
             sync_issues (bool): 是否同步问题详情。
-            **kwargs: 其他透传参数
+            **kwargs: 其他透传参数 (如 fetch_concurrency: 批量模式下安全热点分布的并发请求数)
         """
         if client is None:
             raise ValueError("Client must be provided")
 
         super().__init__(session, client, correlation_id=correlation_id)
         self.sync_issues = sync_issues
+        self.fetch_concurrency = int(kwargs.get("fetch_concurrency", 4))
         self.transformer = SonarDataTransformer(session)
 
     def process_task(self, task: dict) -> dict:
-        """核心同步逻辑。"""
+        """核心同步逻辑。
+
+        job_type 为 batch 时按 project_keys (缺省为全部已登记项目) 批量刷新质量指标，
+        否则仅同步 project_key 指定的单个项目。
+        """
+        if task.get("job_type") == "batch":
+            return self._sync_measures_batch(task.get("project_keys"), task.get("sync_issues", self.sync_issues))
         project_key = task.get("project_key")
         if not project_key:
             raise ValueError("project_key is required")
@@ -68,9 +96,7 @@ class SonarQubeWorker(BaseWorker):
         if not project:
             project = SonarProject(key=key)
             self.session.add(project)
-        project.name = p_data.get("name")
-        project.qualifier = p_data.get("qualifier")
-        project.last_analysis_date = parse_iso8601(p_data.get("lastAnalysisDate"))
+        self._apply_project_metadata(project, p_data)
         if GitLabProject and (not project.gitlab_project_id):
             gitlab_project = self.session.query(GitLabProject).filter_by(path_with_namespace=key).first()
             if gitlab_project:
@@ -89,18 +115,211 @@ class SonarQubeWorker(BaseWorker):
         self.session.add(measure)
         return measure
 
+    @staticmethod
+    def _apply_project_metadata(project: SonarProject, p_data: dict) -> None:
+        """将 projects/search 返回的项目信息写入模型。"""
+        project.name = p_data.get("name")
+        project.qualifier = p_data.get("qualifier")
+        project.last_analysis_date = parse_iso8601(p_data.get("lastAnalysisDate"))
+
+    def _sync_measures_batch(self, project_keys: list[str] | None = None, sync_issues: bool = False) -> dict:
+        """批量刷新多个项目的质量指标。
+
+        每 BATCH_SIZE 个项目一组：项目详情、指标 (含门禁状态)、问题分布各自只需常数次请求，
+        安全热点分布仅对存在热点的项目并发获取；自上次快照以来没有新分析的项目不再写快照。
+        单组失败时回滚并标记该组为 FAILED，不影响其他分组。
+
+        Args:
+            project_keys: 需要刷新的项目 Key 列表，为 None 时刷新所有已登记项目
+            sync_issues: 是否同时同步有新分析的项目的问题详情
+
+        Returns:
+            统计信息字典
+        """
+        if project_keys is None:
+            project_keys = [key for (key,) in self.session.query(SonarProject.key).order_by(SonarProject.key).all()]
+        stats = {"projects": 0, "snapshots": 0, "issues": 0, "failed": 0}
+        for start in range(0, len(project_keys), self.BATCH_SIZE):
+            chunk = project_keys[start : start + self.BATCH_SIZE]
+            try:
+                changed = self._sync_measures_chunk(chunk)
+                stats["projects"] += len(chunk)
+                stats["snapshots"] += len(changed)
+                if sync_issues:
+                    for project in changed:
+                        stats["issues"] += self._sync_issues(project)
+            except Exception as e:
+                self.session.rollback()
+                logger.error(f"SonarQube batch refresh failed for {len(chunk)} projects starting at {chunk[0]}: {e}")
+                self.session.query(SonarProject).filter(SonarProject.key.in_(chunk)).update({"sync_status": "FAILED"}, synchronize_session=False)
+                self.session.commit()
+                stats["failed"] += len(chunk)
+            self.log_progress("SonarQube measures batch", min(start + self.BATCH_SIZE, len(project_keys)), len(project_keys))
+        return stats
+
+    def _sync_measures_chunk(self, keys: list[str]) -> list[SonarProject]:
+        """刷新一组项目 (不超过 BATCH_SIZE 个) 并提交，返回写入了新快照的项目。"""
+        payloads = self.client.get_projects_by_keys(keys)
+        self.bulk_save_to_staging("sonarqube", "project", list(payloads.values()), id_field="key")
+
+        projects = {p.key: p for p in self.session.query(SonarProject).filter(SonarProject.key.in_(keys)).all()}
+        gitlab_ids = {}
+        if GitLabProject:
+            rows = self.session.query(GitLabProject.path_with_namespace, GitLabProject.id).filter(GitLabProject.path_with_namespace.in_(list(payloads))).all()
+            gitlab_ids = dict(rows)
+        now = datetime.now(UTC)
+        for key in keys:
+            project = projects.get(key)
+            p_data = payloads.get(key)
+            if not p_data:
+                logger.warning(f"SonarQube project {key} not found")
+                if project:
+                    project.sync_status = "FAILED"
+                continue
+            if not project:
+                project = projects[key] = SonarProject(key=key)
+                self.session.add(project)
+            self._apply_project_metadata(project, p_data)
+            if not project.gitlab_project_id:
+                project.gitlab_project_id = gitlab_ids.get(key)
+            project.last_synced_at = now
+            project.sync_status = "SUCCESS"
+        self.session.flush()
+
+        # 仅为出现新分析的项目写快照 (最新快照的分析时间与项目最近分析时间不一致)
+        analysed = {key: projects[key] for key in payloads if projects[key].last_analysis_date}
+        latest = dict(
+            self.session.query(SonarMeasure.project_id, func.max(SonarMeasure.analysis_date))
+            .filter(SonarMeasure.project_id.in_([p.id for p in analysed.values()]))
+            .group_by(SonarMeasure.project_id)
+            .all()
+        )
+        changed = {key: p for key, p in analysed.items() if _as_utc(latest.get(p.id)) != _as_utc(p.last_analysis_date)}
+        if not changed:
+            self.session.commit()
+            return []
+
+        measures = self.client.search_measures(list(changed))
+        issue_keys = [key for key, m in measures.items() if safe_int(m.get("bugs")) or safe_int(m.get("vulnerabilities"))]
+        issue_dists = self.client.get_issue_severity_distributions(issue_keys) if issue_keys else {}
+        hotspot_keys = [key for key, m in measures.items() if safe_int(m.get("security_hotspots"))]
+        hotspot_dists = {}
+        for key, dist, exc in fetch_concurrently(self.client.get_hotspot_distribution, hotspot_keys, self.fetch_concurrency):
+            if exc:
+                logger.warning(f"Failed to get hotspot distribution for {key}: {exc}")
+            else:
+                hotspot_dists[key] = dist
+
+        snapshots = [
+            self.transformer.transform_measures_snapshot(changed[key], m, {"status": m.get("alert_status")}, issue_dists.get(key), hotspot_dists.get(key))
+            for key, m in measures.items()
+            if key in changed
+        ]
+        self.session.add_all(snapshots)
+        self.session.commit()
+        return [changed[key] for key in measures if key in changed]
+
     def _sync_issues(self, project: SonarProject) -> int:
-        """分页同步问题详情。"""
+        """同步问题详情：有水位时按更新时间增量同步，否则按分区全量同步。
+
+        水位 (最近一次看到的 updateDate) 保存在 sys_sync_checkpoints 中。
+        增量模式按 updateDate 倒序读取 (含已解决问题，以便同步关闭状态)，越过水位即停止；
+        若增量窗口超出深分页上限，则回退为全量分区同步：分区扫描只覆盖未解决问题，
+        因此扫描结束后再对账库中仍为未解决、但本次未出现的问题 (见 _reconcile_resolved_issues)，
+        避免窗口内未读到的已解决问题一直停留在打开状态。
+        """
+        checkpoint = self.get_checkpoint("sonarqube", project.key, "issue")
+        since = checkpoint.watermark if checkpoint else None
+        self._issue_watermark = since
+
         count = 0
-        page = 1
-        while True:
-            issues_data = self.client.get_issues(project.key, page=page)
-            if not issues_data:
-                break
-            for i_data in issues_data:
-                self.transformer.transform_issue(project, i_data)
-                count += 1
-            page += 1
-            if count % 200 == 0:
-                self.session.flush()
+        complete = False
+        if since:
+            count, complete = self._sync_issues_incremental(project, since)
+            if not complete:
+                logger.warning(f"Incremental issue window for {project.key} exceeds {ISSUE_SEARCH_LIMIT}, falling back to partitioned sync")
+        if not complete:
+            seen: set[str] = set()
+            for filters in self._partition_issue_filters(project.key, {"resolved": "false"}):
+                for page in self.client.iter_issue_pages(project.key, page_size=self.ISSUE_PAGE_SIZE, **filters):
+                    seen.update(i_data["key"] for i_data in page)
+                    count += self._save_issues_batch(project, page)
+            count += self._reconcile_resolved_issues(project, seen)
+
+        self.complete_checkpoint("sonarqube", project.key, "issue", processed_count=count, watermark=self._issue_watermark)
+        self.session.commit()
         return count
+
+    def _sync_issues_incremental(self, project: SonarProject, since: datetime) -> tuple[int, bool]:
+        """按 updateDate 倒序同步水位之后的变更，返回 (处理数量, 是否完整覆盖到水位)。"""
+        since = _as_utc(since)
+        count = 0
+        for page in self.client.iter_issue_pages(project.key, page_size=self.ISSUE_PAGE_SIZE, s="UPDATE_DATE", asc="false"):
+            changed = [i for i in page if (_as_utc(parse_iso8601(i.get("updateDate"))) or since) >= since]
+            count += self._save_issues_batch(project, changed)
+            if len(changed) < len(page):
+                return count, True
+        # 未越过水位即耗尽结果：若总量未达上限则说明已全部读完
+        return count, self.client.count_issues(project.key) < ISSUE_SEARCH_LIMIT
+
+    def _partition_issue_filters(self, project_key: str, base: dict) -> Iterator[dict]:
+        """将查询条件切分为结果数均不超过深分页上限的分区。
+
+        先按严重级别拆分，仍超限时按创建时间 (createdAfter 含、createdBefore 不含) 二分。
+        """
+        total = self.client.count_issues(project_key, **base)
+        if total <= ISSUE_SEARCH_LIMIT:
+            if total:
+                yield base
+            return
+        if "severities" not in base:
+            for severity in self.SEVERITIES:
+                yield from self._partition_issue_filters(project_key, {**base, "severities": severity})
+            return
+
+        lower = parse_iso8601(base.get("createdAfter")) or parse_iso8601(self.client.get_oldest_issue_date(project_key, **base))
+        upper = parse_iso8601(base.get("createdBefore")) or datetime.now(UTC)
+        if lower is None or upper - lower <= timedelta(seconds=1):
+            logger.warning(f"Cannot split SonarQube issue query further for {project_key} {base}: {total} results, only {ISSUE_SEARCH_LIMIT} reachable")
+            yield base
+            return
+        middle = lower + (upper - lower) / 2
+        yield from self._partition_issue_filters(project_key, {**base, "createdAfter": _sonar_date(lower), "createdBefore": _sonar_date(middle)})
+        yield from self._partition_issue_filters(project_key, {**base, "createdAfter": _sonar_date(middle), "createdBefore": _sonar_date(upper)})
+
+    def _reconcile_resolved_issues(self, project: SonarProject, unresolved_keys: set[str]) -> int:
+        """对账全量未解决扫描中缺席的本地打开问题：按 Key 回查最新状态，查不到的视为已移除。"""
+        stale = [
+            key
+            for (key,) in self.session.query(SonarIssue.issue_key).filter(SonarIssue.project_id == project.id, SonarIssue.resolution.is_(None)).all()
+            if key not in unresolved_keys
+        ]
+        count = 0
+        for start in range(0, len(stale), self.ISSUE_KEYS_BATCH):
+            keys = stale[start : start + self.ISSUE_KEYS_BATCH]
+            found: set[str] = set()
+            for page in self.client.iter_issue_pages(project.key, page_size=self.ISSUE_PAGE_SIZE, issues=",".join(keys)):
+                found.update(i_data["key"] for i_data in page)
+                count += self._save_issues_batch(project, page)
+            missing = [key for key in keys if key not in found]
+            if missing:
+                self.session.query(SonarIssue).filter(SonarIssue.issue_key.in_(missing)).update(
+                    {SonarIssue.status: "CLOSED", SonarIssue.resolution: "REMOVED", SonarIssue.close_date: datetime.now(UTC)}, synchronize_session=False
+                )
+                self.session.commit()
+                count += len(missing)
+        if stale:
+            logger.info(f"Reconciled {len(stale)} issues of {project.key} missing from the unresolved scan")
+        return count
+
+    def _save_issues_batch(self, project: SonarProject, batch: list[dict]) -> int:
+        """批量写入一页问题并提交，同时推进 updateDate 水位。"""
+        if not batch:
+            return 0
+        self.transformer.transform_issues_batch(project, batch)
+        for i_data in batch:
+            updated = _as_utc(parse_iso8601(i_data.get("updateDate")))
+            if updated and (self._issue_watermark is None or updated > _as_utc(self._issue_watermark)):
+                self._issue_watermark = updated
+        self.session.commit()
+        return len(batch)
@@ -4,6 +4,8 @@
 """
 
 import logging
+import threading
+from collections.abc import Iterator
 from typing import Any
 
 
@@ -11,6 +13,9 @@ logger = logging.getLogger(__name__)
 from devops_collector.core.base_client import BaseClient
 
 
+PAGE_LIMIT = 100
+
+
 class ZenTaoClient(BaseClient):
     """禅道 REST API 客户端 (支持 v1+ 接口)。"""
 
@@ -31,12 +36,26 @@ class ZenTaoClient(BaseClient):
         )
         self.account = account
         self.password = password
+        # 并发抓取时多个线程可能同时遇到 401，只允许一个线程刷新 Token
+        self._token_lock = threading.Lock()
         print("DEBUG: ZenTaoClient v2 initializing...")
 
-    def _refresh_token(self) -> bool:
-        """使用账号密码刷新 Token。"""
+    def _refresh_token(self, stale_token: str | None = None) -> bool:
+        """使用账号密码刷新 Token (线程安全)。
+
+        Args:
+            stale_token (Optional[str]): 触发 401 的请求所使用的 Token；
+                若当前 Token 已与之不同，说明其他线程已完成刷新，直接复用。
+        """
         if not self.account or not self.password:
             return False
+        with self._token_lock:
+            if stale_token is not None and self.headers.get("Token") != stale_token:
+                return True
+            return self._request_new_token()
+
+    def _request_new_token(self) -> bool:
+        """调用 /tokens 接口获取新 Token 并更新会话请求头。"""
         try:
             url = f"{self.base_url}/tokens"
             logger.info(f"Refreshing ZenTao token for {self.account}...")
@@ -59,6 +78,7 @@ class ZenTaoClient(BaseClient):
         """发送 GET 请求，支持 Token 自动过期重连及 404 容错。"""
         import requests
 
+        token = self.headers.get("Token")
         try:
             return super()._get(endpoint, params)
         except requests.exceptions.HTTPError as e:
@@ -66,7 +86,7 @@ class ZenTaoClient(BaseClient):
                 # 处理 401 认证过期
                 if e.response.status_code == 401 and not is_retry:
                     logger.info(f"Auth 401 detected for {endpoint}, attempting token refresh...")
-                    if self._refresh_token():
+                    if self._refresh_token(stale_token=token):
                         # 重新请求一次，标记为 is_retry 以防死循环
                         return self._get(endpoint, params=params, allow_404=allow_404, is_retry=True)
 
@@ -126,86 +146,71 @@ class ZenTaoClient(BaseClient):
         return self._get_paged_list("programs", "programs")
 
     def _get_paged_list(self, endpoint: str, key: str) -> list[dict[str, Any]]:
-        """统一的分页列表获取逻辑。"""
+        """获取小规模的全局分页列表 (项目/项目集)，出错时返回已获取部分。"""
         items = []
-        page = 1
-        limit = 100
+        try:
+            for _, current in self._iter_pages(endpoint, key):
+                items.extend(current)
+        except Exception as e:
+            logger.error(f"Error fetching {endpoint}: {e}")
+        return items
+
+    def _iter_pages(
+        self, endpoint: str, key: str, start_page: int = 1, limit: int = PAGE_LIMIT, order: str | None = None
+    ) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """统一的分页生成器，逐页产出 (页码, 当页记录)，不在内存中累积全量数据。
+
+        请求失败时异常直接抛出，由调用方基于已提交的页码断点续传。
+
+        Args:
+            endpoint (str): API 路径。
+            key (str): 响应字典中列表所在的键名。
+            start_page (int): 起始页码 (断点续传时为上次完成页码 + 1)。
+            limit (int): 每页记录数。
+            order (Optional[str]): 服务端排序 (如 lastEditedDate_desc)，用于增量同步提前终止。
+
+        Yields:
+            Tuple[int, List[dict]]: 页码与该页记录。
+        """
+        page = start_page
         max_pages = 1000  # 安全保护
         while page <= max_pages:
             params = {"page": page, "limit": limit}
+            if order:
+                params["order"] = order
             try:
                 response = self._get(endpoint, params=params, allow_404=True)
-                if response.status_code == 404:
-                    break
-                data = response.json()
-                current = data.get(key, []) if isinstance(data, dict) else (data if isinstance(data, list) else [])
-                items.extend(current)
-                if isinstance(data, dict):
-                    total = data.get("total", 0)
-                    if len(items) >= total or not current:
-                        break
-                else:
-                    break
             except Exception as e:
                 logger.error(f"Error fetching {endpoint} page {page}: {e}")
-                break
+                raise
+            if response.status_code == 404:
+                return
+            data = response.json()
+            # 这里的分页结构通常是 {'stories': [...], 'total': ...}
+            current = data.get(key, []) if isinstance(data, dict) else (data if isinstance(data, list) else [])
+            if not current:
+                return
+            yield page, current
+            # 非分页结构 (直接返回列表) 或已取满 total 时结束
+            if not isinstance(data, dict) or (page - 1) * limit + len(current) >= data.get("total", 0):
+                return
             page += 1
-        return items
+
+    def iter_stories(self, product_id: int, start_page: int = 1, order: str | None = None) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """逐页获取需求。"""
+        return self._iter_pages(f"products/{product_id}/stories", "stories", start_page=start_page, order=order)
+
+    def iter_bugs(self, product_id: int, start_page: int = 1, order: str | None = None) -> Iterator[tuple[int, list[dict[str, Any]]]]:
+        """逐页获取缺陷。"""
+        return self._iter_pages(f"products/{product_id}/bugs", "bugs", start_page=start_page, order=order)
 
     def get_stories(self, product_id: int) -> list[dict[str, Any]]:
-        """获取需求。"""
-        stories = []
-        page = 1
-        limit = 100
-        max_pages = 1000  # 安全保护
-        while page <= max_pages:
-            params = {"page": page, "limit": limit}
-            try:
-                response = self._get(f"products/{product_id}/stories", params=params, allow_404=True)
-                if response.status_code == 404:
-                    break
-                data = response.json()
-                # 这里的分页结构通常是 {'stories': [...], 'total': ...}
-                current = data.get("stories", []) if isinstance(data, dict) else (data if isinstance(data, list) else [])
-                stories.extend(current)
-                if isinstance(data, dict):
-                    total = data.get("total", 0)
-                    if len(stories) >= total or not current:
-                        break
-                else:
-                    break
-                page += 1
-            except Exception as e:
-                logger.error(f"Error fetching stories for product {product_id} page {page}: {e}")
-                break
-        return stories
+        """获取需求 (一次性返回全部，仅用于小规模产品或脚本)。"""
+        return [s for _, page in self.iter_stories(product_id) for s in page]
 
     def get_bugs(self, product_id: int) -> list[dict[str, Any]]:
-        """获取缺陷。"""
-        bugs = []
-        page = 1
-        limit = 100
-        max_pages = 1000  # 安全保护
-        while page <= max_pages:
-            params = {"page": page, "limit": limit}
-            try:
-                response = self._get(f"products/{product_id}/bugs", params=params, allow_404=True)
-                if response.status_code == 404:
-                    break
-                data = response.json()
-                current = data.get("bugs", []) if isinstance(data, dict) else (data if isinstance(data, list) else [])
-                bugs.extend(current)
-                if isinstance(data, dict):
-                    total = data.get("total", 0)
-                    if len(bugs) >= total or not current:
-                        break
-                else:
-                    break
-                page += 1
-            except Exception as e:
-                logger.error(f"Error fetching bugs for product {product_id} page {page}: {e}")
-                break
-        return bugs
+        """获取缺陷 (一次性返回全部，仅用于小规模产品或脚本)。"""
+        return [b for _, page in self.iter_bugs(product_id) for b in page]
 
     def get_test_cases(self, product_id: int) -> list[dict[str, Any]]:
         """获取测试用例。"""
@@ -27,5 +27,7 @@ def get_config() -> dict[str, Any]:
             "password": password,
             "rate_limit": int(os.getenv("REQUESTS_PER_SECOND", "5")),
         },
-        "worker": {},
+        "worker": {
+            "fetch_concurrency": int(os.getenv("ZENTAO_FETCH_CONCURRENCY", "4")),
+        },
     }
@@ -152,6 +152,7 @@ class ZenTaoIssue(Base):
         assigned_to_user_id (UUID): 目前处理人 OneID。
         closed_at (datetime): 关闭时间。
         first_commit_sha (str): 关联的代码提交。
+        raw_data_hash (str): 原始载荷指纹，用于同步时跳过未变化的记录。
     """
 
     __tablename__ = "zentao_issues"
@@ -177,6 +178,7 @@ class ZenTaoIssue(Base):
     updated_at = Column(DateTime(timezone=True))
     closed_at = Column(DateTime(timezone=True))
     raw_data = Column(JSON)
+    raw_data_hash = Column(String(32), comment="原始载荷指纹，未变化时同步跳过")
     first_commit_sha = Column(String(100))
     standard_status = Column(String(50), index=True, comment="平台标准状态 (Backlog, InProgress, Testing, Completed, Cancelled)")
     promoted_at = Column(DateTime(timezone=True), nullable=True, comment="上架到主数据的时间")
@@ -3,6 +3,7 @@
 # from .client import ZenTaoClient
 import json
 import logging
+from collections.abc import Callable, Iterator
 from datetime import UTC, datetime
 from typing import Any
 
@@ -11,8 +12,8 @@ from sqlalchemy.orm import Session
 from devops_collector.core.base_worker import BaseWorker
 from devops_collector.core.identity_manager import IdentityManager
 from devops_collector.core.organization_service import OrganizationService
-from devops_collector.core.utils import safe_id
-from devops_collector.models import SyncLog
+from devops_collector.core.utils import fetch_concurrently, safe_id
+from devops_collector.models import SyncCheckpoint, SyncLog
 
 from .models import (
     ZenTaoAction,
@@ -78,6 +79,36 @@ def _is_after_cutoff(val: Any) -> bool:
     return dt >= SYNC_SINCE_DATE
 
 
+# 增量同步默认以最近编辑时间判断变更，缺失时回退到创建时间
+CHANGE_FIELDS = ("lastEditedDate", "openedDate")
+# 用例重新执行也会产生新的结果记录，需要一并纳入变更判断
+CASE_CHANGE_FIELDS = ("lastEditedDate", "lastRunDate", "openedDate")
+# 已结束的执行在水位之后无编辑/关闭记录时，不再逐个拉取构建与任务
+CLOSED_EXECUTION_STATUSES = {"closed", "done"}
+
+
+def _edited_at(data: dict, *fields: str) -> datetime | None:
+    """返回记录在给定字段中的最近变更时间 (去除时区)。"""
+    dates = [_safe_date(data.get(f)) for f in (fields or CHANGE_FIELDS)]
+    dates = [d.replace(tzinfo=None) for d in dates if d]
+    return max(dates) if dates else None
+
+
+def _is_changed_since(data: dict, since: datetime | None, *fields: str) -> bool:
+    """判断记录在水位之后是否有变更。无水位或记录缺少日期时默认放行。"""
+    if since is None:
+        return True
+    edited = _edited_at(data, *fields)
+    return edited is None or edited >= since
+
+
+def _should_refresh_execution(execution: Any, since: datetime | None) -> bool:
+    """增量模式下判断是否需要刷新执行的构建与任务：未结束的执行总是刷新。"""
+    if since is None or (execution.status or "").lower() not in CLOSED_EXECUTION_STATUSES:
+        return True
+    return _is_changed_since(execution.raw_data or {}, since, "lastEditedDate", "closedDate", "end")
+
+
 class ZenTaoTransformer:
     """禅道数据预处理器，负责将原始状态转换为平台标准状态。"""
 
@@ -121,6 +152,7 @@ class ZenTaoWorker(BaseWorker):
     """禅道全量数据采集 Worker。"""
 
     SCHEMA_VERSION = "1.0"
+    BATCH_SIZE = 500
 
     def __init__(self, session: Session, client: Any, correlation_id: str = "unknown-cid", **kwargs):
         """初始化禅道 Worker。
@@ -129,19 +161,33 @@ class ZenTaoWorker(BaseWorker):
             session (Session): 数据库会话。
             client (Any): 禅道 API 客户端。
             correlation_id (str): 追踪 ID (用于日志对齐)
-            **kwargs: 其他透传参数
+            **kwargs: 其他透传参数 (fetch_concurrency: 并发抓取线程数)
         """
         super().__init__(session, client, correlation_id=correlation_id)
         self.org_service = OrganizationService(session)
+        # 逐执行/逐用例接口的并发抓取线程数 (受客户端令牌桶统一限速)
+        self.fetch_concurrency = int(kwargs.get("fetch_concurrency", 4))
+        self._seen_watermarks: dict[str, datetime] = {}
+        self._failed_entities: set[str] = set()
 
     def process_task(self, task: dict) -> None:
-        """处理禅道同步任务。"""
+        """处理禅道同步任务。
+
+        task 结构示例: {'product_id': 1, 'job_type': 'incremental'}
+        job_type 为 incremental 时仅同步上次水位之后有变更的记录，并跳过已关闭且无变更的执行。
+        """
         product_id = task.get("product_id")
-        logger.info(f"Processing ZenTao full-scale task: product_id={product_id}")
+        incremental = task.get("job_type") == "incremental"
+        logger.info(f"Processing ZenTao {'incremental' if incremental else 'full-scale'} task: product_id={product_id}")
+        self._seen_watermarks = {}
+        self._failed_entities = set()
         try:
             product = self._sync_product(product_id)
             if not product:
                 return
+            since = self._load_watermarks(product.id) if incremental else {}
+
+            # 组织与用户是体量很小的全局列表，增量任务同样刷新 (调度器在首次同步后只下发增量任务)
             try:
                 self._sync_org_structure()
             except Exception as e:
@@ -154,25 +200,35 @@ class ZenTaoWorker(BaseWorker):
             try:
                 plans_data = self.client.get_plans(product.id)
                 for p_data in plans_data:
-                    self._sync_plan(product.id, p_data)
+                    self._mark_seen("plan", p_data)
+                    if _is_changed_since(p_data, since.get("plan")):
+                        self._sync_plan(product.id, p_data)
             except Exception as e:
+                self._failed_entities.add("plan")
                 logger.error(f"Failed to sync plans for product {product_id}: {e}")
             # 2. 同步层级结构 (Program -> Project -> Execution)
             # 这是一个全局同步，因为它涉及到跨项目的层级
             logger.info("Syncing ZenTao hierarchy (Programs/Projects/Executions)...")
+            since_exec = since.get("execution")
 
             # 2.1 同步项目集 Programs
             try:
                 programs = self.client.get_programs()
                 for p_data in programs:
-                    self._sync_execution(product.id, p_data)
+                    self._mark_seen("execution", p_data)
+                    if _is_changed_since(p_data, since_exec):
+                        self._sync_execution(product.id, p_data)
             except Exception as e:
+                self._failed_entities.add("execution")
                 logger.warning(f"Failed to sync programs: {e}")
 
             # 2.2 同步项目 Projects
             try:
                 projects = self.client.get_projects()
                 for p_data in projects:
+                    self._mark_seen("execution", p_data)
+                    if not _is_changed_since(p_data, since_exec):
+                        continue
                     # 检查该项目是否关联到当前产品
                     linked_products = p_data.get("products", [])
                     p_id_list = []
@@ -186,95 +242,88 @@ class ZenTaoWorker(BaseWorker):
                     # 如果该项目关联到当前产品，或者它是全局的，我们就同步它
                     self._sync_execution(product.id if product.id in p_id_list else None, p_data)
             except Exception as e:
+                self._failed_entities.add("execution")
                 logger.warning(f"Failed to sync projects: {e}")
 
             # 2.3 同步当前产品下的所有执行 Executions
             try:
                 executions_data = self.client.get_executions(product_id=product.id)
                 for e_data in executions_data:
-                    self._sync_execution(product.id, e_data)
+                    self._mark_seen("execution", e_data)
+                    if _is_changed_since(e_data, since_exec):
+                        self._sync_execution(product.id, e_data)
             except Exception as e:
+                self._failed_entities.add("execution")
                 logger.error(f"Failed to sync executions for product {product_id}: {e}")
-            # 3. 批量同步 Stories (Features) 和 Bugs
+            # 3. 流式分批同步 Stories (Features) 和 Bugs (每批提交并记录断点)
             try:
-                stories = self.client.get_stories(product.id)
-                story_batch = [s for s in stories if _is_after_cutoff(s.get("openedDate"))]
-                if story_batch:
-                    self._sync_issues_batch(product.id, story_batch, "feature")
-                    self.session.commit()
+                self._sync_issues_streaming(product.id, "feature", self.client.iter_stories, since=since.get("issue_feature"))
             except Exception as e:
                 self.session.rollback()
                 logger.error(f"Failed to sync stories (features) for product {product_id}: {e}")
 
             try:
-                bugs = self.client.get_bugs(product.id)
-                bug_batch = [b for b in bugs if _is_after_cutoff(b.get("openedDate"))]
-                if bug_batch:
-                    self._sync_issues_batch(product.id, bug_batch, "bug")
-                    self.session.commit()
+                self._sync_issues_streaming(product.id, "bug", self.client.iter_bugs, since=since.get("issue_bug"))
             except Exception as e:
                 self.session.rollback()
                 logger.error(f"Failed to sync bugs for product {product_id}: {e}")
 
-            # 4. 同步测试用例与结果
+            # 4. 同步测试用例与结果 (增量模式下未变更且未重新执行的用例不再逐条拉取结果)
+            synced_case_ids = []
             try:
                 test_cases = self.client.get_test_cases(product.id)
                 for tc_data in test_cases:
                     if not _is_after_cutoff(tc_data.get("openedDate")):
                         continue
-                    tc = self._sync_test_case(product.id, tc_data)
-                    if not tc:
+                    self._mark_seen("test_case", tc_data, *CASE_CHANGE_FIELDS)
+                    if not _is_changed_since(tc_data, since.get("test_case"), *CASE_CHANGE_FIELDS):
                         continue
-                    try:
-                        results = self.client.get_test_results(tc.id)
-                        for r_data in results:
-                            if _is_after_cutoff(r_data.get("date")):
-                                self._sync_test_result(tc.id, r_data)
-                    except Exception as res_e:
-                        logger.debug(f"Failed to sync results for case {tc.id}: {res_e}")
+                    tc = self._sync_test_case(product.id, tc_data)
+                    if tc:
+                        synced_case_ids.append(tc.id)
             except Exception as case_e:
+                self._failed_entities.add("test_case")
                 logger.warning(f"Failed to sync test cases for product {product_id}: {case_e}")
 
-            product_executions = self.session.query(ZenTaoExecution).filter_by(product_id=product.id).all()
-            for exec_item in product_executions:
-                # 同步构建 (Builds)
-                try:
-                    builds = self.client.get_builds(exec_item.id)
-                    for b_data in builds:
-                        if _is_after_cutoff(b_data.get("date")):
-                            self._sync_build(product.id, exec_item.id, b_data)
-                except Exception as e:
-                    logger.warning(f"Failed to sync builds for execution {exec_item.id}: {e}")
+            # 4.1 并发拉取用例执行结果，主线程落库
+            for case_id, results, res_e in fetch_concurrently(self.client.get_test_results, synced_case_ids, self.fetch_concurrency):
+                if res_e:
+                    logger.debug(f"Failed to sync results for case {case_id}: {res_e}")
+                    continue
+                for r_data in results:
+                    if _is_after_cutoff(r_data.get("date")):
+                        self._sync_test_result(case_id, r_data)
 
-                # 批量同步任务 (Tasks)
-                try:
-                    tasks = self.client.get_tasks(exec_item.id)
-                    task_batch = [t for t in tasks if _is_after_cutoff(t.get("openedDate"))]
-                    if task_batch:
-                        self._sync_tasks_batch(product.id, exec_item.id, task_batch)
-                        self.session.commit()
-                except Exception as e:
-                    self.session.rollback()
-                    logger.error(f"Failed to sync tasks for execution {exec_item.id}: {e}")
+            product_executions = self.session.query(ZenTaoExecution).filter_by(product_id=product.id).all()
+            if incremental:
+                active_executions = [e for e in product_executions if _should_refresh_execution(e, since_exec)]
+                logger.info(f"Incremental sync: refreshing {len(active_executions)}/{len(product_executions)} executions")
+                product_executions = active_executions
+            self._sync_execution_details(product.id, [e.id for e in product_executions], since.get("task"))
 
             # 5. 同步发布 (Releases)
             try:
                 releases = self.client.get_releases(product.id)
                 for rel_data in releases:
-                    if _is_after_cutoff(rel_data.get("date")):
+                    self._mark_seen("release", rel_data, "date")
+                    if _is_after_cutoff(rel_data.get("date")) and _is_changed_since(rel_data, since.get("release"), "date"):
                         self._sync_release(product.id, rel_data)
             except Exception as e:
+                self._failed_entities.add("release")
                 logger.warning(f"Failed to sync releases for product {product_id}: {e}")
 
             # 6. 同步操作日志 (Actions) - 经常 404
             try:
                 actions = self.client.get_actions(product.id)
                 for a_data in actions:
-                    if _is_after_cutoff(a_data.get("date")):
+                    self._mark_seen("action", a_data, "date")
+                    if _is_after_cutoff(a_data.get("date")) and _is_changed_since(a_data, since.get("action"), "date"):
                         self._sync_action(product.id, a_data)
             except Exception as e:
+                self._failed_entities.add("action")
                 logger.warning(f"Failed to sync actions (audit logs) for product {product_id}: {e}")
 
+            self._save_watermarks(product.id)
             product.last_synced_at = datetime.now(UTC)
             product.sync_status = "COMPLETED"
 
@@ -316,6 +365,94 @@ class ZenTaoWorker(BaseWorker):
                 logger.error(f"Failed to record error status for product {product_id}: {inner_e}")
             raise
 
+    def _fetch_execution_details(self, execution_id: int) -> dict[str, Any]:
+        """在工作线程中拉取单个执行的构建与任务 (不访问数据库)。
+
+        Returns:
+            dict: {'builds': 列表或异常, 'tasks': 列表或异常}，两类请求互不影响。
+        """
+        details: dict[str, Any] = {}
+        for key, fetch in (("builds", self.client.get_builds), ("tasks", self.client.get_tasks)):
+            try:
+                details[key] = fetch(execution_id)
+            except Exception as e:
+                details[key] = e
+        return details
+
+    def _sync_execution_details(self, product_id: int, execution_ids: list[int], since_task: datetime | None) -> None:
+        """有界并发拉取各执行的构建与任务，并在主线程按批次写库。
+
+        Args:
+            product_id (int): 禅道产品 ID。
+            execution_ids (List[int]): 需要刷新的执行 ID。
+            since_task (Optional[datetime]): 任务增量水位。
+        """
+        pending_tasks: list[tuple[int, list[dict]]] = []
+        pending_count = 0
+
+        def flush_tasks() -> None:
+            try:
+                for exec_id, task_batch in pending_tasks:
+                    self._sync_tasks_batch(product_id, exec_id, task_batch)
+                self.session.commit()
+            except Exception as e:
+                self.session.rollback()
+                self._failed_entities.add("task")
+                logger.error(f"Failed to sync tasks for executions {[exec_id for exec_id, _ in pending_tasks]}: {e}")
+
+        for exec_id, details, _ in fetch_concurrently(self._fetch_execution_details, execution_ids, self.fetch_concurrency):
+            # 同步构建 (Builds)
+            builds = details["builds"]
+            if isinstance(builds, Exception):
+                logger.warning(f"Failed to sync builds for execution {exec_id}: {builds}")
+            else:
+                try:
+                    for b_data in builds:
+                        if _is_after_cutoff(b_data.get("date")):
+                            self._sync_build(product_id, exec_id, b_data)
+                except Exception as e:
+                    logger.warning(f"Failed to sync builds for execution {exec_id}: {e}")
+
+            # 批量同步任务 (Tasks)：跨执行累积到批次大小后统一提交
+            tasks = details["tasks"]
+            if isinstance(tasks, Exception):
+                self._failed_entities.add("task")
+                logger.error(f"Failed to sync tasks for execution {exec_id}: {tasks}")
+                continue
+            for t in tasks:
+                self._mark_seen("task", t)
+            task_batch = [t for t in tasks if _is_after_cutoff(t.get("openedDate")) and _is_changed_since(t, since_task)]
+            if task_batch:
+                pending_tasks.append((exec_id, task_batch))
+                pending_count += len(task_batch)
+            if pending_count >= self.BATCH_SIZE:
+                flush_tasks()
+                pending_tasks, pending_count = [], 0
+
+        if pending_tasks:
+            flush_tasks()
+
+    def _load_watermarks(self, product_id: int) -> dict[str, datetime]:
+        """读取产品下各实体类型的增量水位。"""
+        checkpoints = self.session.query(SyncCheckpoint).filter_by(source="zentao", scope=str(product_id)).all()
+        return {c.entity_type: c.watermark.replace(tzinfo=None) for c in checkpoints if c.watermark}
+
+    def _mark_seen(self, entity_type: str, data: dict, *fields: str) -> None:
+        """记录本轮观察到的最大变更时间，作为下一轮的水位候选。"""
+        edited = _edited_at(data, *fields)
+        if edited and (entity_type not in self._seen_watermarks or edited > self._seen_watermarks[entity_type]):
+            self._seen_watermarks[entity_type] = edited
+
+    def _save_watermarks(self, product_id: int) -> None:
+        """推进本轮成功同步的实体水位；失败的实体保持原水位以便下次重试。"""
+        current = self._load_watermarks(product_id)
+        for entity_type, watermark in self._seen_watermarks.items():
+            if entity_type in self._failed_entities:
+                continue
+            if current.get(entity_type) and current[entity_type] >= watermark:
+                continue
+            self.complete_checkpoint("zentao", product_id, entity_type, watermark=watermark)
+
     def _sync_product(self, product_id: int) -> ZenTaoProduct | None:
         """同步禅道产品的元数据。
 
@@ -434,18 +571,95 @@ class ZenTaoWorker(BaseWorker):
         self.session.flush()
         return plan
 
+    def _sync_issues_streaming(
+        self, product_id: int, issue_type: str, iter_pages: Callable[..., Iterator[tuple[int, list[dict]]]], since: datetime | None = None
+    ) -> int:
+        """逐页拉取问题并按固定批次落库，每批提交后记录页码断点。
+
+        内存中最多保留一个批次的数据；若中途失败，下次运行从最近一次提交的页码之后继续，
+        完整跑完一轮后断点清空，下次重新全量扫描。
+
+        传入水位 (since) 时按 lastEditedDate 倒序请求，仅处理水位之后变更的记录，
+        并在整页早于水位时提前终止；若服务端未按要求排序，则退化为客户端过滤的完整扫描。
+        每轮完成后将观察到的最大变更时间写回水位。
+
+        Args:
+            product_id (int): 禅道产品 ID。
+            issue_type (str): 问题类型 (feature/bug)。
+            iter_pages (Callable): 客户端分页生成器 (如 client.iter_stories)。
+            since (Optional[datetime]): 增量水位，None 表示全量。
+
+        Returns:
+            int: 本轮累计处理的记录数 (含断点之前已处理的部分)。
+        """
+        entity_type = f"issue_{issue_type}"
+        checkpoint = self.get_checkpoint("zentao", product_id, entity_type)
+        start_page = 1
+        processed = 0
+        if checkpoint and checkpoint.cursor:
+            start_page = int(checkpoint.cursor) + 1
+            processed = checkpoint.processed_count or 0
+            logger.info(f"Resuming {entity_type} sync for product {product_id} from page {start_page} ({processed} processed)")
+
+        batch: list[dict] = []
+        max_edited = checkpoint.watermark.replace(tzinfo=None) if checkpoint and checkpoint.watermark else None
+        last_edited = None
+        sorted_desc = True
+        order = "lastEditedDate_desc" if since else None
+        for page, items in iter_pages(product_id, start_page=start_page, order=order):
+            for item in items:
+                edited = _edited_at(item)
+                if not edited:
+                    continue
+                if last_edited and edited > last_edited:
+                    sorted_desc = False
+                last_edited = edited
+                max_edited = edited if not max_edited or edited > max_edited else max_edited
+            batch.extend(item for item in items if _is_after_cutoff(item.get("openedDate")) and _is_changed_since(item, since))
+            reached_watermark = bool(since and sorted_desc and last_edited and last_edited < since)
+            if len(batch) >= self.BATCH_SIZE:
+                self._sync_issues_batch(product_id, batch, issue_type)
+                processed += len(batch)
+                self.save_checkpoint("zentao", product_id, entity_type, cursor=page, processed_count=processed)
+                self.session.commit()
+                batch = []
+            elif not batch:
+                # 整页被截止日期过滤时也推进断点，避免重复拉取
+                self.save_checkpoint("zentao", product_id, entity_type, cursor=page, processed_count=processed)
+                self.session.commit()
+            if reached_watermark:
+                logger.info(f"Reached {entity_type} watermark {since} at page {page} for product {product_id}, stopping early")
+                break
+
+        if since and not sorted_desc:
+            logger.warning(f"ZenTao ignored {order} for {entity_type}; fell back to client-side filtering")
+        if batch:
+            self._sync_issues_batch(product_id, batch, issue_type)
+            processed += len(batch)
+        self.complete_checkpoint("zentao", product_id, entity_type, processed_count=processed, watermark=max_edited)
+        self.session.commit()
+        return processed
+
     def _sync_issues_batch(self, product_id: int, batch: list[dict], issue_type: str) -> None:
-        """批量同步禅道问题 (Stories/Bugs)：Staging + Transform 均走批处理。"""
+        """批量同步禅道问题 (Stories/Bugs)：Staging + Transform 均走批处理。
+
+        载荷指纹未变化的记录整条跳过，不重置 promoted_at。
+        """
         if not batch:
             return
 
         # 1. 批量 Staging (COPY FROM)
         self.bulk_save_to_staging("zentao", f"issue_{issue_type}", batch)
 
-        # 2. 批量 Transform：预加载已存在的记录
-        batch_ids = [d["id"] for d in batch]
-        existing = self.session.query(ZenTaoIssue).filter(ZenTaoIssue.id.in_(batch_ids), ZenTaoIssue.type == issue_type).all()
+        # 2. 批量 Transform：按指纹筛出有变化的记录，只预加载这些记录
+        changed = self.filter_changed(ZenTaoIssue, batch, ZenTaoIssue.type == issue_type)
+        if not changed:
+            logger.info(f"All {len(batch)} {issue_type}(s) unchanged for product {product_id}")
+            return
+        batch = [data for data in batch if data["id"] in changed]
+        existing = self.session.query(ZenTaoIssue).filter(ZenTaoIssue.id.in_(changed), ZenTaoIssue.type == issue_type).all()
         existing_map = {i.id: i for i in existing}
+        users = self._resolve_accounts(batch)
 
         for data in batch:
             issue = existing_map.get(data["id"])
@@ -475,18 +689,16 @@ class ZenTaoWorker(BaseWorker):
 
             opened = _safe_str(data.get("openedBy"))
             issue.opened_by = str(opened) if opened else None
-            if opened:
-                u = IdentityManager.get_or_create_user(self.session, "zentao", opened)
-                if u:
-                    issue.opened_by_user_id = u.global_user_id
+            u = users.get(opened) if opened else None
+            if u:
+                issue.opened_by_user_id = u.global_user_id
 
             assigned = _safe_str(data.get("assignedTo"))
             issue.assigned_to = str(assigned) if assigned else None
-            if assigned:
-                u = IdentityManager.get_or_create_user(self.session, "zentao", assigned)
-                if u:
-                    issue.assigned_to_user_id = u.global_user_id
-                    issue.user_id = u.global_user_id
+            u = users.get(assigned) if assigned else None
+            if u:
+                issue.assigned_to_user_id = u.global_user_id
+                issue.user_id = u.global_user_id
 
             if data.get("openedDate"):
                 try:
@@ -510,27 +722,39 @@ class ZenTaoWorker(BaseWorker):
                 issue.plan_id = plan_id_val
 
             issue.raw_data = data
+            issue.raw_data_hash = changed[data["id"]]
 
         # 3. 批量 flush 一次，替代逐条 flush
         self.session.flush()
         logger.info(f"Batch synced {len(batch)} {issue_type}(s) for product {product_id}")
 
+    def _resolve_accounts(self, batch: list[dict], fields: tuple[str, ...] = ("openedBy", "assignedTo")) -> dict:
+        """汇总批次内出现的禅道账号，一次性解析为全局用户 (账号 -> User)。"""
+        accounts = {_safe_str(data.get(f)) for data in batch for f in fields}
+        accounts.discard(None)
+        return IdentityManager.resolve_users(self.session, "zentao", accounts)
+
     def _sync_issue(self, product_id: int, data: dict, issue_type: str) -> ZenTaoIssue:
         """同步禅道问题（单条兼容接口，内部转发到批量）。"""
         self._sync_issues_batch(product_id, [data], issue_type)
 
     def _sync_tasks_batch(self, product_id: int, execution_id: int, batch: list[dict]) -> None:
-        """批量同步禅道任务 (Tasks)：Staging + Transform 均走批处理。"""
+        """批量同步禅道任务 (Tasks)：Staging + Transform 均走批处理，载荷指纹未变化的任务整条跳过。"""
         if not batch:
             return
 
         # 1. 批量 Staging (COPY FROM)
         self.bulk_save_to_staging("zentao", "task", batch)
 
-        # 2. 批量 Transform：预加载已存在的记录
-        batch_ids = [d["id"] for d in batch]
-        existing = self.session.query(ZenTaoIssue).filter(ZenTaoIssue.id.in_(batch_ids), ZenTaoIssue.type == "task").all()
+        # 2. 批量 Transform：按指纹筛出有变化的记录，只预加载这些记录
+        changed = self.filter_changed(ZenTaoIssue, batch, ZenTaoIssue.type == "task")
+        if not changed:
+            logger.info(f"All {len(batch)} task(s) unchanged for execution {execution_id}")
+            return
+        batch = [data for data in batch if data["id"] in changed]
+        existing = self.session.query(ZenTaoIssue).filter(ZenTaoIssue.id.in_(changed), ZenTaoIssue.type == "task").all()
         existing_map = {i.id: i for i in existing}
+        users = self._resolve_accounts(batch)
 
         for data in batch:
             issue = existing_map.get(data["id"])
@@ -559,17 +783,15 @@ class ZenTaoWorker(BaseWorker):
 
             opened = _safe_str(data.get("openedBy"))
             issue.opened_by = str(opened) if opened else None
-            if opened:
-                u = IdentityManager.get_or_create_user(self.session, "zentao", opened)
-                if u:
-                    issue.opened_by_user_id = u.global_user_id
+            u = users.get(opened) if opened else None
+            if u:
+                issue.opened_by_user_id = u.global_user_id
 
             assigned = _safe_str(data.get("assignedTo"))
             issue.assigned_to = str(assigned) if assigned else None
-            if assigned:
-                u = IdentityManager.get_or_create_user(self.session, "zentao", assigned)
-                if u:
-                    issue.assigned_to_user_id = u.global_user_id
+            u = users.get(assigned) if assigned else None
+            if u:
+                issue.assigned_to_user_id = u.global_user_id
 
             if data.get("openedDate"):
                 try:
@@ -582,6 +804,7 @@ class ZenTaoWorker(BaseWorker):
                 except Exception:
                     pass
             issue.raw_data = data
+            issue.raw_data_hash = changed[data["id"]]
 
         # 3. 批量 flush 一次
         self.session.flush()
@@ -4,7 +4,6 @@
 """
 
 import logging
-import subprocess
 import time
 from datetime import UTC, datetime, timedelta
 
@@ -12,9 +11,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from .config import Config
+from .core.dbt_trigger import DbtBuildTrigger
 from .core.dora_service import DORAService
 from .core.plugin_loader import PluginLoader
 from .core.promotion_service import PromotionService
+from .core.staging_partitions import ensure_raw_data_partitions
 from .models.base_models import Base
 from .mq import MessageQueue
 
@@ -36,10 +37,22 @@ def main() -> None:
     engine = create_engine(Config.DB_URI)
     Session = sessionmaker(bind=engine)
     mq = MessageQueue()
+    dbt_trigger = DbtBuildTrigger()
     Base.metadata.create_all(engine)
     logger.info("Scheduler started.")
+    partitions_checked_on = None
 
     while True:
+        # 0. 每天检查一次 stg_raw_data 的月份分区是否已预建
+        today = datetime.now(UTC).date()
+        if partitions_checked_on != today:
+            try:
+                with engine.begin() as conn:
+                    ensure_raw_data_partitions(conn)
+                partitions_checked_on = today
+            except Exception as e:
+                logger.error(f"Failed to ensure raw data partitions: {e}")
+
         session = Session()
         try:
             # 1. 扫描 ZenTao 产品 (高优先级)
@@ -55,7 +68,7 @@ def main() -> None:
                     task = {
                         "source": "zentao",
                         "product_id": zp.id,
-                        "job_type": "full",
+                        "job_type": "incremental" if zp.last_synced_at else "full",
                     }
                     mq.publish_task(task)
                     zp.sync_status = "QUEUED"
@@ -82,6 +95,7 @@ def main() -> None:
 
             # 3. 扫描 SonarQube 项目
             sonar_projects = session.query(SonarProject).all()
+            due_sonar_projects = []
             for sp in sonar_projects:
                 should_sync = False
                 if not sp.last_synced_at:
@@ -90,6 +104,22 @@ def main() -> None:
                     should_sync = True
 
                 if should_sync and sp.sync_status not in ["SYNCING", "QUEUED"]:
+                    due_sonar_projects.append(sp)
+
+            if due_sonar_projects and Config.SONARQUBE_BATCH_MEASURES:
+                # 批量模式：一个任务通过 measures/search 等多项目接口刷新所有到期项目
+                task = {
+                    "source": "sonarqube",
+                    "project_keys": [sp.key for sp in due_sonar_projects],
+                    "job_type": "batch",
+                    "sync_issues": Config.SONARQUBE_SYNC_ISSUES,
+                }
+                mq.publish_task(task)
+                for sp in due_sonar_projects:
+                    sp.sync_status = "QUEUED"
+                session.commit()
+            else:
+                for sp in due_sonar_projects:
                     task = {
                         "source": "sonarqube",
                         "project_key": sp.key,
@@ -111,21 +141,15 @@ def main() -> None:
                 if p_count > 0:
                     logger.info(f"Successfully promoted {p_count} records.")
                     session.commit()
+                    dbt_trigger.mark_changed("mdm")
             except Exception as e:
                 logger.error(f"Data promotion failed: {e}")
                 session.rollback()
 
-            # 4. 执行 dbt 转换与反向 ETL
+            # 4. 对有新数据的源执行 dbt build (静默期合并连续同步)，成功后再做反向 ETL
             try:
-                logger.info("Triggering dbt run...")
-                result = subprocess.run(
-                    ["dbt", "run", "--project-dir", "dbt_project", "--profiles-dir", "dbt_project"],
-                    capture_output=True,
-                    text=True,
-                    check=True,
-                )
-                if result.returncode == 0:
-                    logger.info("dbt run success")
+                dbt_trigger.observe(session)
+                if dbt_trigger.due() and dbt_trigger.run():
                     from .core.reverse_etl import (
                         sync_aligned_entities_to_mdm,
                         sync_shadow_it_findings,
@@ -139,8 +163,6 @@ def main() -> None:
                     # 5. DORA 2.0 指标重平衡 (Metric Re-balancing)
                     logger.info("Recalculating DORA 2.0 metrics...")
                     DORAService.aggregate_all_projects(session)
-                else:
-                    logger.error(f"dbt run failed: {result.stderr}")
             except Exception as e:
                 logger.error(f"Failed to run dbt or reverse ETL: {e}")
 
@@ -17,6 +17,7 @@ from sqlalchemy.orm import sessionmaker
 from .config import Config
 from .core.plugin_loader import PluginLoader
 from .core.registry import PluginRegistry
+from .core.staging_partitions import ensure_raw_data_partitions
 from .models.base_models import Base
 from .mq import MessageQueue
 
@@ -109,6 +110,8 @@ def main():
     PluginLoader.load_models()
 
     Base.metadata.create_all(_engine)
+    with _engine.begin() as conn:
+        ensure_raw_data_partitions(conn)
     mq = MessageQueue()
     mq.consume_tasks(process_task)
 
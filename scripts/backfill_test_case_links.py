@@ -0,0 +1,72 @@
+"""测试用例追溯索引回填脚本
+
+追溯矩阵只从 TraceabilityLink 读取 需求 -> 测试用例 的引用 (target_type=test_case)，
+这些索引行在 GitLab 同步用例时写入。增量同步不会重新拉取未变化的用例，
+因此索引上线前已存在的用例需要执行一次本脚本回填；可重复执行，
+已存在的链路不重复插入，用例文本中已不再引用的旧链路会被删除。
+
+Usage:
+    python scripts/backfill_test_case_links.py [--batch-size 500]
+"""
+
+import argparse
+import logging
+import os
+import sys
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from devops_collector.config import settings
+from devops_collector.core.plugin_loader import PluginLoader
+from devops_collector.models.test_management import GTMTestCase
+from devops_collector.plugins.gitlab.mixins.traceability_mixin import TraceabilityMixin
+from devops_collector.plugins.jira import models as _jira_models  # noqa: F401  GitLabProject 关系引用 JiraProject
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+logger = logging.getLogger("BackfillTestCaseLinks")
+
+
+class TestCaseIndexer(TraceabilityMixin):
+    """复用同步阶段的用例引用提取逻辑。"""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+
+def backfill(batch_size: int) -> int:
+    """按主键分批为全部测试用例重建引用索引，每批提交一次，返回处理的用例数。"""
+    PluginLoader.load_models()
+    engine = create_engine(settings.database.uri)
+    processed = 0
+    last_id = 0
+    with Session(engine) as session:
+        indexer = TestCaseIndexer(session)
+        while True:
+            cases = session.query(GTMTestCase).filter(GTMTestCase.id > last_id).order_by(GTMTestCase.id).limit(batch_size).all()
+            if not cases:
+                break
+            for case in cases:
+                indexer._apply_traceability_extraction(case)
+            last_id = cases[-1].id
+            session.commit()
+            session.expunge_all()
+            processed += len(cases)
+            logger.info(f"Indexed {processed} test cases (last id {last_id})")
+    engine.dispose()
+    return processed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    logger.info(f"Backfill finished: {backfill(args.batch_size)} test cases indexed.")
+
+
+if __name__ == "__main__":
+    main()
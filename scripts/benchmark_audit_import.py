@@ -0,0 +1,81 @@
+"""审计开销基准测试
+
+用 AdminService.import_users 导入 / 更新合成用户 CSV，对比审计开启与关闭时的导入吞吐 (行/秒)。
+审计开启时每个新建用户产生一条 CREATE、每个更新用户产生一条带字段 Diff 的 UPDATE 审计记录。
+
+Usage:
+    python scripts/benchmark_audit_import.py --rows 5000
+    python scripts/benchmark_audit_import.py --db-uri postgresql://... --rows 20000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from devops_collector.core.admin_service import AdminService
+from devops_collector.core.plugin_loader import PluginLoader
+from devops_collector.models import audit_events
+from devops_collector.models.audit import AuditLog
+from devops_collector.models.base_models import Base, User
+from devops_collector.plugins.jira import models as _jira_models  # noqa: F401  GitLabProject 关系引用 JiraProject
+
+
+def build_csv(rows: int, tag: str) -> str:
+    """生成 rows 行用户 CSV，tag 用于区分两轮导入的姓名。"""
+    lines = ["employee_id,full_name,email,hr_relationship"]
+    lines += [f"BENCH{i:07d},{tag} user {i},bench{i}@example.com,FTE" for i in range(rows)]
+    return "\n".join(lines)
+
+
+def run_import(engine, csv_content: str) -> float:
+    """执行一次导入并返回耗时 (秒)。"""
+    with Session(engine) as session:
+        started = time.perf_counter()
+        summary = AdminService(session).import_users(csv_content)
+        elapsed = time.perf_counter() - started
+    if summary.failure_count:
+        raise SystemExit(f"Import failed: {summary.errors[:3]}")
+    return elapsed
+
+
+def reset(engine) -> None:
+    """清理上一轮导入的合成用户与审计记录。"""
+    with engine.begin() as conn:
+        conn.execute(delete(AuditLog.__table__))
+        conn.execute(delete(User.__table__).where(User.__table__.c.employee_id.like("BENCH%")))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-uri", help="已有数据库 (默认使用临时 SQLite 文件)")
+    parser.add_argument("--rows", type=int, default=5_000)
+    args = parser.parse_args()
+
+    PluginLoader.load_models()
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.db_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(engine)
+
+        print(f"{'audit':<6} {'phase':<7} {'seconds':>9} {'rows/s':>10} {'audit rows':>11}")
+        for enabled in (False, True):
+            audit_events.SKIP_AUDIT = not enabled
+            reset(engine)
+            for phase, tag in (("insert", "first"), ("update", "second")):
+                elapsed = run_import(engine, build_csv(args.rows, tag))
+                with engine.connect() as conn:
+                    audit_rows = conn.execute(select(func.count()).select_from(AuditLog.__table__)).scalar()
+                print(f"{'on' if enabled else 'off':<6} {phase:<7} {elapsed:>9.2f} {args.rows / elapsed:>10,.0f} {audit_rows:>11,}")
+        reset(engine)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
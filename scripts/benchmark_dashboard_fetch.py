@@ -0,0 +1,114 @@
+"""Dashboard 取数路径基准测试
+
+对比 pandas.read_sql 与 COPY + Arrow (dashboard.common.arrow_fetch.read_arrow) 读取同一查询的
+吞吐 (行/秒) 与峰值内存。每种方式在独立子进程中运行，峰值内存取进程最大 RSS。
+
+Usage:
+    # 读取现有宽表
+    python scripts/benchmark_dashboard_fetch.py --query "SELECT * FROM public_marts.fct_developer_activity_profile"
+
+    # 在数据库中生成合成宽表 (UNLOGGED，结束后删除)
+    python scripts/benchmark_dashboard_fetch.py --synthetic-rows 1000000
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from dashboard.common.arrow_fetch import read_arrow
+from devops_collector.config import settings
+
+
+SYNTHETIC_TABLE = "bench_dashboard_fetch"
+SYNTHETIC_DDL = f"""
+CREATE UNLOGGED TABLE {SYNTHETIC_TABLE} AS
+SELECT
+    g AS id,
+    'user_' || (g % 5000) AS user_name,
+    'user_' || (g % 5000) || '@example.com' AS email,
+    'team_' || (g % 40) AS team_name,
+    'dept_' || (g % 12) AS department,
+    (g % 300)::int AS commits,
+    (g % 9000)::bigint AS additions,
+    (g % 4000)::bigint AS deletions,
+    (g % 120)::int AS merge_requests,
+    (g % 60)::int AS reviews,
+    ((g % 10000) / 100.0)::numeric(10, 2) AS activity_score,
+    random() AS focus_ratio,
+    random() AS collaboration_ratio,
+    (g % 7 = 0) AS is_core,
+    now() - (g % 720) * interval '1 hour' AS last_active_at,
+    timestamp '2025-01-01' + (g % 365) * interval '1 day' AS first_commit_at,
+    date '2025-01-01' + (g % 365) AS stat_date,
+    CASE WHEN g % 3 = 0 THEN NULL ELSE 'python,sql,go' END AS languages,
+    md5(g::text) AS profile_hash,
+    repeat('x', (g % 50)::int) AS remarks
+FROM generate_series(1, :rows) AS g
+"""
+
+
+def run_method(method: str, db_uri: str, query: str) -> dict:
+    """在当前进程执行一次读取，返回耗时、行数与最大 RSS。"""
+    engine = create_engine(db_uri)
+    with engine.connect() as conn:
+        started = time.perf_counter()
+        df = read_arrow(conn, query) if method == "arrow" else pd.read_sql(text(query), conn)
+        elapsed = time.perf_counter() - started
+    if df is None:
+        raise SystemExit("Query contains column types not supported by the Arrow path")
+    return {
+        "seconds": elapsed,
+        "rows": len(df),
+        "frame_mib": df.memory_usage(deep=True).sum() / 2**20,
+        "max_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-uri", default=settings.database.uri)
+    parser.add_argument("--query", default="SELECT * FROM public_marts.fct_developer_activity_profile")
+    parser.add_argument("--synthetic-rows", type=int, help="生成指定行数的合成宽表并读取它")
+    parser.add_argument("--method", choices=["read_sql", "arrow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.method:
+        print(json.dumps(run_method(args.method, args.db_uri, args.query)))
+        return
+
+    engine = create_engine(args.db_uri)
+    query = args.query
+    if args.synthetic_rows:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {SYNTHETIC_TABLE}"))
+            conn.execute(text(SYNTHETIC_DDL), {"rows": args.synthetic_rows})
+        query = f"SELECT * FROM {SYNTHETIC_TABLE}"
+
+    try:
+        print(f"{'method':<10} {'rows':>10} {'seconds':>9} {'rows/s':>12} {'frame MiB':>10} {'peak RSS MiB':>13}")
+        for method in ("read_sql", "arrow"):
+            cmd = [sys.executable, os.path.abspath(__file__), "--method", method, "--db-uri", args.db_uri, "--query", query]
+            result = json.loads(subprocess.run(cmd, capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+            print(
+                f"{method:<10} {result['rows']:>10,} {result['seconds']:>9.2f} {result['rows'] / result['seconds']:>12,.0f} "
+                f"{result['frame_mib']:>10.1f} {result['max_rss_mib']:>13.1f}"
+            )
+    finally:
+        if args.synthetic_rows:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {SYNTHETIC_TABLE}"))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
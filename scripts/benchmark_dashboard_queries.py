@@ -0,0 +1,137 @@
+"""Dashboard 页面加载基准测试
+
+在合成的大型 fct_code_hotspots 表上对比两种加载方式 (模拟代码热点页面的一次加载)：
+    - legacy: SELECT * 整表读入 pandas，再按项目过滤、计算 KPI 与 Top-N
+    - pushdown: 通过 build_mart_query 把过滤、聚合与 Top-N 下推到 SQL
+
+Usage:
+    python scripts/benchmark_dashboard_queries.py --rows 1000000
+    python scripts/benchmark_dashboard_queries.py --db-uri postgresql://... --table public_marts.fct_code_hotspots
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+
+from dashboard.common.db import build_mart_query
+
+
+TOP_N = 2000
+ZONES = ("RED_ZONE", "AMBER_ZONE", "CLEAR")
+
+
+def build_synthetic_table(engine, table: str, rows: int, projects: int) -> None:
+    """生成 rows 行合成热点数据。"""
+    rnd = random.Random(42)
+    base = datetime(2025, 1, 1)
+    insert = text(
+        f"INSERT INTO {table} VALUES (:project_id, :file_path, :churn_90d, :estimated_loc, :risk_factor, :risk_zone, :project_risk_rank, :last_modified_at)"
+    )
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        conn.execute(
+            text(
+                f"CREATE TABLE {table} (project_id INTEGER, file_path TEXT, churn_90d INTEGER, estimated_loc INTEGER, "
+                "risk_factor REAL, risk_zone TEXT, project_risk_rank INTEGER, last_modified_at TIMESTAMP)"
+            )
+        )
+        batch = []
+        for i in range(rows):
+            batch.append(
+                {
+                    "project_id": i % projects,
+                    "file_path": f"src/module_{i % 997}/pkg_{i % 31}/file_{i}.py",
+                    "churn_90d": rnd.randint(0, 200),
+                    "estimated_loc": rnd.randint(10, 5000),
+                    "risk_factor": round(rnd.random() * 100, 2),
+                    "risk_zone": rnd.choice(ZONES),
+                    "project_risk_rank": i // projects + 1,
+                    "last_modified_at": base + timedelta(minutes=i),
+                }
+            )
+            if len(batch) == 50000:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+
+
+def load_legacy(engine, table: str, selected: list) -> dict:
+    """旧实现：整表读入后在 pandas 中过滤。"""
+    with engine.connect() as conn:
+        df = pd.read_sql(text(f"SELECT * FROM {table}"), conn)
+    unique_projects = sorted(df["project_id"].unique())
+    filtered = df[df["project_id"].isin(selected)] if selected else df
+    kpis = (len(filtered), len(filtered[filtered["risk_zone"] == "RED_ZONE"]), filtered["churn_90d"].mean(), filtered["risk_factor"].max())
+    top = filtered.sort_values("risk_factor", ascending=False).head(TOP_N)
+    red = filtered[filtered["risk_zone"] == "RED_ZONE"].sort_values("risk_factor", ascending=False).head(15)
+    return {"options": len(unique_projects), "kpis": kpis, "rows": len(top), "red": len(red)}
+
+
+def load_pushdown(engine, table: str, selected: list) -> dict:
+    """新实现：过滤、聚合与 Top-N 在数据库端完成。"""
+    filters = {"project_id": selected}
+    queries = {
+        "options": build_mart_query(table, ["DISTINCT project_id"], order_by="project_id", descending=False),
+        "kpis": build_mart_query(
+            table,
+            [
+                "count(*) AS total_files",
+                "sum(CASE WHEN risk_zone = 'RED_ZONE' THEN 1 ELSE 0 END) AS red_count",
+                "avg(churn_90d) AS avg_churn",
+                "max(risk_factor) AS max_risk",
+            ],
+            filters=filters,
+        ),
+        "rows": build_mart_query(table, filters=filters, order_by="risk_factor", limit=TOP_N),
+        "red": build_mart_query(table, filters={**filters, "risk_zone": "RED_ZONE"}, order_by="risk_factor", limit=15),
+    }
+    with engine.connect() as conn:
+        frames = {name: pd.read_sql(text(sql), conn, params=params) for name, (sql, params) in queries.items()}
+    return {"options": len(frames["options"]), "kpis": tuple(frames["kpis"].iloc[0]), "rows": len(frames["rows"]), "red": len(frames["red"])}
+
+
+def measure(label: str, loader, *args) -> None:
+    """运行一次加载，输出耗时与 Python 侧峰值内存。"""
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = loader(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed:8.2f}s  peak {peak / 2**20:8.1f} MiB  rows={result['rows']} red={result['red']} total={result['kpis'][0]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-uri", help="已有数据库 (默认在临时 SQLite 中生成合成数据)")
+    parser.add_argument("--table", default="fct_code_hotspots")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--select", type=int, default=5, help="侧边栏选中的项目数 (0 表示全部)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(args.db_uri or f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        if not args.db_uri:
+            print(f"Generating {args.rows:,} synthetic rows...")
+            build_synthetic_table(engine, args.table, args.rows, args.projects)
+        selected = list(range(args.select))
+        measure("legacy", load_legacy, engine, args.table, selected)
+        measure("pushdown", load_pushdown, engine, args.table, selected)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""dbt 增量模型构建耗时基准测试
+
+在合成的 GitLab 提交 / 文件统计 / 禅道需求数据上，对比以下模型链的构建耗时：
+    int_file_churn_daily → int_file_churn_metrics → fct_code_hotspots
+    int_commits_with_authors → int_dora_issue_commit_lifecycle / fct_talent_radar
+
+依次测量：
+    1. --full-refresh 全量构建；
+    2. 无新数据时的增量构建；
+    3. 追加一天新提交后的增量构建。
+
+脚本会向数据库写入合成数据，请在独立的基准库上运行 (dbt 连接信息取自 dbt_project/profiles.yml 的环境变量)。
+
+Usage:
+    python scripts/benchmark_dbt_incremental.py --commits 200000 --files-per-commit 5 --days 720
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from devops_collector.config import settings
+from devops_collector.core.plugin_loader import PluginLoader
+from devops_collector.models.base_models import Base
+
+
+DBT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dbt_project")
+SELECT = ["+fct_code_hotspots", "+int_dora_issue_commit_lifecycle", "+fct_talent_radar"]
+PROJECT_BASE = 900000
+PRODUCT_ID = 900000
+
+SEED_PROJECTS = """
+INSERT INTO gitlab_projects (id, name)
+SELECT :base + g, 'bench-project-' || g FROM generate_series(1, :projects) AS g
+ON CONFLICT (id) DO NOTHING
+"""
+
+SEED_COMMITS = """
+INSERT INTO gitlab_commits (id, project_id, title, author_email, message, committed_date)
+SELECT
+    md5(:tag || g::text),
+    :base + 1 + (g % :projects),
+    'bench commit ' || g,
+    'dev' || (g % 500) || '@example.com',
+    'bench commit #' || (1 + g % :issues),
+    now() - (:end_offset + g % :days) * interval '1 day' - (g % 86400) * interval '1 second'
+FROM generate_series(1, :commits) AS g
+"""
+
+SEED_FILE_STATS = """
+INSERT INTO gitlab_commit_file_stats (commit_id, file_path, language, code_added, code_deleted)
+SELECT
+    md5(:tag || g::text),
+    'src/module_' || ((g * 7 + f) % 2000) || '/file_' || ((g + f) % 50) || '.py',
+    'Python',
+    (g + f) % 80,
+    (g * f) % 30
+FROM generate_series(1, :commits) AS g, generate_series(1, :files) AS f
+"""
+
+SEED_PRODUCT = "INSERT INTO zentao_products (id, name) VALUES (:product, 'bench-product') ON CONFLICT (id) DO NOTHING"
+
+SEED_ISSUES = """
+INSERT INTO zentao_issues (id, type, product_id, title, status, created_at, updated_at)
+SELECT g, 'story', :product, 'bench story ' || g, 'active', now() - interval '800 days', now() - interval '1 day'
+FROM generate_series(1, :issues) AS g
+ON CONFLICT DO NOTHING
+"""
+
+
+def seed(engine, tag: str, commits: int, files: int, days: int, projects: int, issues: int, end_offset_days: int) -> None:
+    """写入一批合成提交及其文件统计 (提交时间均匀分布在 days 天内)。"""
+    params = {
+        "tag": tag,
+        "commits": commits,
+        "files": files,
+        "days": days,
+        "projects": projects,
+        "issues": issues,
+        "base": PROJECT_BASE,
+        "product": PRODUCT_ID,
+        "end_offset": end_offset_days,
+    }
+    with engine.begin() as conn:
+        for statement in (SEED_PROJECTS, SEED_PRODUCT, SEED_ISSUES, SEED_COMMITS):
+            conn.execute(text(statement), params)
+        conn.execute(text(SEED_FILE_STATS), params)
+
+
+def dbt_run(*extra: str) -> float:
+    """执行 dbt run 并返回耗时 (秒)。"""
+    cmd = ["dbt", "run", "--project-dir", DBT_DIR, "--profiles-dir", DBT_DIR, "--select", *SELECT, *extra]
+    started = time.perf_counter()
+    subprocess.run(cmd, check=True, capture_output=True, text=True)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db-uri", default=settings.database.uri)
+    parser.add_argument("--commits", type=int, default=200_000, help="历史提交数")
+    parser.add_argument("--files-per-commit", type=int, default=5)
+    parser.add_argument("--days", type=int, default=720, help="历史提交分布的天数")
+    parser.add_argument("--projects", type=int, default=50)
+    parser.add_argument("--issues", type=int, default=20_000)
+    parser.add_argument("--daily-commits", type=int, default=1_000, help="追加的一天新提交数")
+    args = parser.parse_args()
+
+    PluginLoader.load_models()
+    engine = create_engine(args.db_uri)
+    Base.metadata.create_all(engine)
+
+    print(f"Seeding {args.commits:,} commits x {args.files_per_commit} files over {args.days} days...")
+    seed(engine, "history", args.commits, args.files_per_commit, args.days, args.projects, args.issues, end_offset_days=1)
+
+    results = [("full refresh", dbt_run("--full-refresh")), ("incremental, no new data", dbt_run())]
+    seed(engine, "today", args.daily_commits, args.files_per_commit, 1, args.projects, args.issues, end_offset_days=0)
+    results.append((f"incremental, +{args.daily_commits:,} commits", dbt_run()))
+
+    for label, seconds in results:
+        print(f"{label:<32} {seconds:8.1f}s")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
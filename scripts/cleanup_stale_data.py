@@ -1,5 +1,5 @@
 """数据清理脚本
-用于手动或定时执行原始采集数据的清理任务。
+用于手动或定时执行原始采集数据与日志表的保留期清理任务 (分块删除，可与同步 Worker 并行运行)。
 """
 
 import logging
@@ -30,8 +30,10 @@ def main():
     logger.info("Starting stale data cleanup...")
     try:
         manager = RetentionManager()
-        deleted_count = manager.cleanup_raw_data()
-        logger.info(f"Cleanup finished. Total records removed: {deleted_count}")
+        results = manager.run_all()
+        for table, deleted_count in results.items():
+            logger.info(f"{table}: {deleted_count} records removed")
+        logger.info(f"Cleanup finished. Total records removed: {sum(results.values())}")
     except Exception as e:
         logger.error(f"Cleanup failed: {e}")
         sys.exit(1)
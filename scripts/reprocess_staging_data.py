@@ -88,9 +88,13 @@ def reprocess_by_source(source_name: str, entity_type: str = None):
         if not worker_cls:
             raise ValueError(f"No worker found for source: {source_name}")
         worker = worker_cls(session, client=MockClient())
+        # 回放的目的就是按当前转换逻辑重写业务表，不能因载荷指纹未变而跳过
+        worker.skip_unchanged = False
         query = session.query(RawDataStaging).filter(RawDataStaging.source == source_name)
         if entity_type:
             query = query.filter(RawDataStaging.entity_type == entity_type)
+        # 同一实体可能在多个采集月份各有一行，按月份升序回放使最新载荷最后生效
+        query = query.order_by(RawDataStaging.collected_month)
         if hasattr(query, "execution_options"):
             query = query.execution_options(stream_results=True)
         batch_buffer: dict[str, list[dict]] = {}
@@ -108,7 +112,7 @@ def reprocess_by_source(source_name: str, entity_type: str = None):
                 continue
             context_obj = _resolve_context(session, source_name, rec.payload)
             if not context_obj:
-                logger.warning(f"Could not resolve context for record {rec.id}")
+                logger.warning(f"Could not resolve context for record {rec.entity_type}:{rec.external_id}")
                 continue
             try:
                 if source_name == "gitlab":
@@ -134,7 +138,7 @@ def reprocess_by_source(source_name: str, entity_type: str = None):
                         issue_type = rec.entity_type.split("_")[1]
                         handler(context_obj.id, rec.payload, issue_type)
             except Exception as e:
-                logger.error(f"Error processing record {rec.id}: {e}")
+                logger.error(f"Error processing record {rec.entity_type}:{rec.external_id}: {e}")
                 continue
             processed_count += 1
             if processed_count % 100 == 0:
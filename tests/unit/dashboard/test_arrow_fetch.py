@@ -0,0 +1,75 @@
+"""Dashboard COPY + Arrow 读取路径单元测试"""
+
+import unittest
+from collections import namedtuple
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+import pandas as pd
+from sqlalchemy.dialects.postgresql.psycopg2 import PGDialect_psycopg2
+
+from dashboard.common.arrow_fetch import read_arrow
+
+
+Column = namedtuple("Column", ["name", "type_code"])
+
+
+class FakeCursor:
+    """模拟 psycopg2 游标：记录执行的语句，COPY 时写出预置的 CSV。"""
+
+    def __init__(self, description, payload=b""):
+        self.description = description
+        self.payload = payload
+        self.executed = []
+        self.copied = None
+
+    def mogrify(self, sql, params):
+        return (sql % {k: f"'{v}'" if isinstance(v, str) else v for k, v in params.items()}).encode()
+
+    def execute(self, sql):
+        self.executed.append(sql)
+
+    def copy_expert(self, sql, file):
+        self.copied = sql
+        file.write(self.payload)
+
+    def close(self):
+        pass
+
+
+class TestArrowFetch(unittest.TestCase):
+    def _read(self, cursor, query="SELECT * FROM fct_demo", params=None):
+        conn = MagicMock()
+        conn.dialect = PGDialect_psycopg2()
+        conn.connection.dbapi_connection.cursor.return_value = cursor
+        return read_arrow(conn, query, params)
+
+    def test_copy_result_is_parsed_with_declared_types(self):
+        """测试按 PG 类型 OID 解析 CSV：NULL 与空串区分，文本不被推断为数值，时间戳换算为 UTC。"""
+        cursor = FakeCursor(
+            [Column("id", 23), Column("code", 25), Column("cost", 1700), Column("seen_at", 1184), Column("active", 16)],
+            b'1,001,12.50,2026-01-01 08:00:00+08,t\n2,"",,,f\n3,NULL,3,2026-01-02 00:00:00+00,\n',
+        )
+
+        df = self._read(cursor, "SELECT * FROM fct_demo WHERE zone = :zone;", {"zone": "RED"})
+
+        self.assertEqual(cursor.copied, b"COPY (SELECT * FROM fct_demo WHERE zone = 'RED') TO STDOUT WITH (FORMAT csv)")
+        self.assertEqual(cursor.executed[0], b"SELECT * FROM (SELECT * FROM fct_demo WHERE zone = 'RED') AS q LIMIT 0")
+        self.assertEqual([str(t) for t in df.dtypes], ["int32[pyarrow]", "object", "double[pyarrow]", "timestamp[us, tz=UTC][pyarrow]", "bool[pyarrow]"])
+        self.assertEqual(df["code"].tolist(), ["001", "", "NULL"])
+        self.assertTrue(pd.isna(df["cost"].iloc[1]))
+        self.assertEqual(df["seen_at"].iloc[0], pd.Timestamp(datetime(2026, 1, 1, tzinfo=UTC)))
+        self.assertEqual(df["active"].tolist()[:2], [True, False])
+
+    def test_unsupported_column_type_falls_back(self):
+        """测试结果集包含 jsonb 等类型时返回 None，不执行 COPY。"""
+        cursor = FakeCursor([Column("id", 23), Column("payload", 3802)])
+        self.assertIsNone(self._read(cursor))
+        self.assertIsNone(cursor.copied)
+
+    def test_empty_result_keeps_columns(self):
+        """测试空结果集仍返回带列名与类型的 DataFrame。"""
+        df = self._read(FakeCursor([Column("id", 20), Column("name", 1043)]))
+        self.assertEqual(list(df.columns), ["id", "name"])
+        self.assertEqual(len(df), 0)
+        self.assertEqual(str(df.dtypes["id"]), "int64[pyarrow]")
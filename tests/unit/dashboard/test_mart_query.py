@@ -0,0 +1,77 @@
+"""Dashboard mart 查询下推单元测试"""
+
+import unittest
+from datetime import date
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from dashboard.common import db
+
+
+class TestBuildMartQuery(unittest.TestCase):
+    def test_filters_window_and_top_n_are_pushed_into_sql(self):
+        """测试过滤、日期窗口、排序与 Top-N 生成参数化 SQL，空条件被忽略。"""
+        query, params = db.build_mart_query(
+            "public_marts.fct_code_hotspots",
+            ["file_path", "risk_factor"],
+            filters={"project_id": [3, 1], "risk_zone": "RED_ZONE", "risk_factor >=": 50, "team": None, "owner": []},
+            date_column="last_modified_at",
+            since=date(2026, 1, 1),
+            order_by="risk_factor",
+            limit=15,
+        )
+        self.assertEqual(
+            query,
+            "SELECT file_path, risk_factor FROM public_marts.fct_code_hotspots "
+            "WHERE project_id IN (:p0_0, :p0_1) AND risk_zone = :p2 AND risk_factor >= :p3 AND last_modified_at >= :since "
+            "ORDER BY risk_factor DESC LIMIT 15",
+        )
+        self.assertEqual(params, {"p0_0": 3, "p0_1": 1, "p2": "RED_ZONE", "p3": 50, "since": date(2026, 1, 1)})
+
+    def test_list_values_honour_negated_operators(self):
+        """测试集合值搭配 != / <> 生成 NOT IN，搭配其他比较符时报错。"""
+        for op in ("!=", "<>"):
+            where, params = db.build_where({f"status {op}": ["closed", "merged"]})
+            self.assertEqual(where, " WHERE status NOT IN (:p0_0, :p0_1)")
+            self.assertEqual(params, {"p0_0": "closed", "p0_1": "merged"})
+        with self.assertRaises(ValueError):
+            db.build_where({"risk_factor >=": [10, 20]})
+
+    def test_rejects_non_identifiers(self):
+        """测试表名、过滤列与排序列必须是合法标识符。"""
+        with self.assertRaises(ValueError):
+            db.build_mart_query("fct; DROP TABLE users")
+        with self.assertRaises(ValueError):
+            db.build_mart_query("fct", filters={"1=1 OR project_id": 1})
+        with self.assertRaises(ValueError):
+            db.build_mart_query("fct", filters={"project_id ~": 1})
+
+
+class TestQueryMart(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE fct_hotspots (project_id INTEGER, risk_factor REAL, risk_zone TEXT)"))
+            conn.execute(
+                text("INSERT INTO fct_hotspots VALUES (1, 90, 'RED_ZONE'), (1, 10, 'CLEAR'), (2, 70, 'RED_ZONE'), (2, 80, 'RED_ZONE'), (3, NULL, 'CLEAR')")
+            )
+        patcher = patch.object(db, "get_db_engine", return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db._cached_query.clear()
+        db.get_data_version.clear()
+
+    def test_aggregates_and_top_n_run_in_database(self):
+        """测试聚合与 Top-N 查询只返回所需的行。"""
+        summary = db.query_mart("fct_hotspots", ["count(*) AS total", "max(risk_factor) AS max_risk"], filters={"project_id": [1, 2]})
+        self.assertEqual(summary.iloc[0].tolist(), [4, 90.0])
+
+        top = db.query_mart("fct_hotspots", filters={"risk_zone": "RED_ZONE"}, order_by="risk_factor", limit=2)
+        self.assertEqual(top["risk_factor"].tolist(), [90.0, 80.0])
+
+    def test_distinct_values_for_sidebar_options(self):
+        """测试侧边栏选项按升序去重。"""
+        self.assertEqual(db.distinct_values("fct_hotspots", "project_id"), [1, 2, 3])
+        self.assertEqual(db.distinct_values("fct_hotspots", "project_id", filters={"risk_zone": "RED_ZONE"}), [1, 2])
@@ -0,0 +1,46 @@
+"""Dashboard 查询缓存单元测试"""
+
+import unittest
+from unittest.mock import patch
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from dashboard.common import db
+
+
+class TestDashboardQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        with self.engine.begin() as conn:
+            conn.execute(text("CREATE TABLE dbt_run_log (invocation_id TEXT PRIMARY KEY, finished_at TIMESTAMP)"))
+            conn.execute(text("CREATE TABLE fct_demo (project_id INTEGER, value INTEGER)"))
+            conn.execute(text("INSERT INTO fct_demo VALUES (1, 10), (2, 20)"))
+        patcher = patch.object(db, "get_db_engine", return_value=self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        db._cached_query.clear()
+        db.get_data_version.clear()
+
+    def _execute(self, sql):
+        with self.engine.begin() as conn:
+            conn.execute(text(sql))
+
+    def test_results_are_shared_until_dbt_runs_again(self):
+        """测试相同 SQL + 参数命中缓存，dbt 运行记录更新后缓存失效。"""
+        query = "SELECT value FROM fct_demo WHERE project_id = :project_id"
+        self.assertEqual(db.run_query(query, {"project_id": 1})["value"].tolist(), [10])
+        self.assertEqual(db.run_query(query, {"project_id": 2})["value"].tolist(), [20])
+
+        self._execute("UPDATE fct_demo SET value = 11 WHERE project_id = 1")
+        self.assertEqual(db.run_query(query, {"project_id": 1})["value"].tolist(), [10])
+
+        self._execute("INSERT INTO dbt_run_log VALUES ('run-1', '2026-01-01 00:00:00')")
+        db.get_data_version.clear()
+        self.assertEqual(db.run_query(query, {"project_id": 1})["value"].tolist(), [11])
+
+    def test_missing_run_log_falls_back_to_empty_version(self):
+        """测试 dbt_run_log 不存在时数据版本为空串，查询仍可执行。"""
+        self._execute("DROP TABLE dbt_run_log")
+        self.assertEqual(db.get_data_version(), "")
+        self.assertEqual(len(db.run_query("SELECT * FROM fct_demo")), 2)
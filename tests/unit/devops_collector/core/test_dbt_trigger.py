@@ -0,0 +1,152 @@
+"""单元测试：dbt 按数据源选择性构建
+
+验证同步水位读取、变化源识别、静默期合并与构建命令的选择。
+"""
+
+import unittest
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+from devops_collector.core.dbt_trigger import DbtBuildTrigger, changed_sources, read_sync_watermarks, source_selectors
+from devops_collector.models.base_models import SyncCheckpoint
+from devops_collector.plugins.sonarqube.models import SonarProject
+from devops_collector.plugins.zentao.models import ZenTaoProduct
+
+
+T0 = datetime(2026, 1, 1, 8, 0, tzinfo=UTC)
+
+
+def test_read_sync_watermarks(db_session):
+    """水位取插件主表 last_synced_at 与同步断点更新时间中的较大者，未同步过的源不出现。"""
+    db_session.add_all(
+        [
+            SonarProject(key="a", name="a", last_synced_at=datetime(2026, 1, 1, 8)),
+            SonarProject(key="b", name="b", last_synced_at=datetime(2026, 1, 1, 9)),
+            ZenTaoProduct(id=1, name="p", last_synced_at=datetime(2026, 1, 1, 7)),
+            SyncCheckpoint(source="zentao", scope="1", entity_type="issue_story", created_at=datetime(2026, 1, 1, 10)),
+            SyncCheckpoint(source="unknown", scope="1", entity_type="x", created_at=datetime(2026, 1, 2)),
+        ]
+    )
+    db_session.flush()
+
+    watermarks = read_sync_watermarks(db_session)
+
+    assert watermarks == {"sonarqube": datetime(2026, 1, 1, 9), "zentao": datetime(2026, 1, 1, 10)}
+
+
+class TestDbtBuildTrigger(unittest.TestCase):
+    """DbtBuildTrigger 行为测试类。"""
+
+    def setUp(self):
+        self.trigger = DbtBuildTrigger(debounce_seconds=300, max_delay_seconds=1800, full_build_hours=24)
+        self.trigger.last_full_build_at = T0
+
+    def test_changed_sources(self):
+        """水位前进或新出现的源视为变化；无基线时全部视为变化。"""
+        previous = {"gitlab": T0, "sonarqube": T0}
+        current = {"gitlab": T0, "sonarqube": T0 + timedelta(minutes=1), "jira": T0}
+        self.assertEqual(changed_sources(previous, current), {"sonarqube", "jira"})
+        self.assertEqual(changed_sources(None, current), {"gitlab", "sonarqube", "jira"})
+
+    def test_selectors_cover_source_tables(self):
+        """选择器为源表及其下游，未知源忽略。"""
+        self.assertEqual(
+            source_selectors(["sonarqube", "unknown"]),
+            ["source:raw.sonar_issues+", "source:raw.sonar_measures+", "source:raw.sonar_projects+"],
+        )
+
+    def test_first_observation_only_sets_baseline(self):
+        """首次观察只建立基线，之后水位前进才记为待构建。"""
+        with patch("devops_collector.core.dbt_trigger.read_sync_watermarks", side_effect=[{"gitlab": T0}, {"gitlab": T0 + timedelta(seconds=1)}]):
+            self.assertEqual(self.trigger.observe(MagicMock(), now=T0), set())
+            self.assertEqual(self.trigger.observe(MagicMock(), now=T0), {"gitlab"})
+        self.assertEqual(self.trigger.pending, {"gitlab"})
+
+    def test_debounce_coalesces_bursts(self):
+        """连续变化推迟构建，直到静默期结束或达到最长等待。"""
+        start = T0 + timedelta(hours=1)
+        self.assertFalse(self.trigger.due(start))
+        for minute in range(0, 30, 2):
+            self.trigger.mark_changed("sonarqube" if minute % 4 else "gitlab", now=start + timedelta(minutes=minute))
+            self.assertFalse(self.trigger.due(start + timedelta(minutes=minute, seconds=60)))
+        self.assertTrue(self.trigger.due(start + timedelta(minutes=30)))
+
+        self.trigger.pending.clear()
+        self.trigger.first_change_at = None
+        self.trigger.mark_changed("jira", now=start)
+        self.assertFalse(self.trigger.due(start + timedelta(seconds=299)))
+        self.assertTrue(self.trigger.due(start + timedelta(seconds=300)))
+
+    @patch("devops_collector.core.dbt_trigger.subprocess.run")
+    def test_run_builds_only_pending_sources(self, mock_run):
+        """待构建源以 --select 传入 dbt build 与随后的 dbt test，成功后清空。"""
+        mock_run.return_value = MagicMock(returncode=0)
+        now = T0 + timedelta(hours=1)
+        self.trigger.mark_changed("jenkins", now=now)
+
+        self.assertTrue(self.trigger.run(now + timedelta(minutes=5)))
+
+        build, test = (call.args[0] for call in mock_run.call_args_list)
+        self.assertEqual(build[:2], ["dbt", "build"])
+        self.assertIn("--exclude-resource-type", build)
+        self.assertEqual(test[:2], ["dbt", "test"])
+        for cmd in (build, test):
+            self.assertEqual(cmd[cmd.index("--select") + 1 :], ["source:raw.jenkins_builds+", "source:raw.jenkins_jobs+"])
+        self.assertEqual(self.trigger.pending, set())
+        self.assertFalse(self.trigger.due(now + timedelta(hours=2)))
+
+    @patch("devops_collector.core.dbt_trigger.subprocess.run")
+    def test_failed_build_keeps_pending(self, mock_run):
+        """构建失败保留待构建源，并在下一个静默期后重试。"""
+        mock_run.return_value = MagicMock(returncode=1, stdout="Database Error", stderr="")
+        now = T0 + timedelta(hours=1)
+        self.trigger.mark_changed("gitlab", now=now)
+
+        self.assertFalse(self.trigger.run(now + timedelta(minutes=5)))
+
+        self.assertEqual(self.trigger.pending, {"gitlab"})
+        self.assertEqual(mock_run.call_count, 1)
+        self.assertFalse(self.trigger.due(now + timedelta(minutes=6)))
+        self.assertTrue(self.trigger.due(now + timedelta(minutes=10)))
+
+    @patch("devops_collector.core.dbt_trigger.subprocess.run")
+    def test_failing_tests_do_not_block_downstream(self, mock_run):
+        """模型构建成功而数据测试失败时，仍视为成功，不重跑全量构建。"""
+        mock_run.side_effect = [MagicMock(returncode=0), MagicMock(returncode=1, stdout="FAIL not_null", stderr="")]
+        trigger = DbtBuildTrigger(debounce_seconds=300, full_build_hours=24)
+
+        self.assertTrue(trigger.run(T0))
+
+        self.assertEqual(trigger.last_full_build_at, T0)
+        self.assertFalse(trigger.due(T0 + timedelta(hours=1)))
+
+    @patch("devops_collector.core.dbt_trigger.subprocess.run")
+    def test_repeated_build_failures_back_off(self, mock_run):
+        """全量构建连续失败时重试间隔按静默期翻倍，上限为全量周期，成功后复位。"""
+        mock_run.return_value = MagicMock(returncode=1, stdout="", stderr="Compilation Error")
+        trigger = DbtBuildTrigger(debounce_seconds=300, full_build_hours=1)
+        now = T0
+        delays = []
+        for _ in range(5):
+            self.assertTrue(trigger.due(now))
+            self.assertFalse(trigger.run(now))
+            delays.append(trigger.retry_at - now)
+            self.assertFalse(trigger.due(trigger.retry_at - timedelta(seconds=1)))
+            now = trigger.retry_at
+        self.assertEqual([d.total_seconds() for d in delays], [300, 600, 1200, 2400, 3600])
+
+        mock_run.return_value = MagicMock(returncode=0)
+        self.assertTrue(trigger.run(now))
+        self.assertEqual((trigger.failures, trigger.retry_at), (0, None))
+
+    @patch("devops_collector.core.dbt_trigger.subprocess.run")
+    def test_full_build_on_start_and_period(self, mock_run):
+        """启动后首次构建与每个全量周期执行不带 --select 的 dbt build 与 dbt test。"""
+        mock_run.return_value = MagicMock(returncode=0)
+        trigger = DbtBuildTrigger(full_build_hours=24)
+        self.assertTrue(trigger.due(T0))
+        self.assertTrue(trigger.run(T0))
+        self.assertNotIn("--select", mock_run.call_args.args[0])
+
+        self.assertFalse(trigger.due(T0 + timedelta(hours=23)))
+        self.assertTrue(trigger.due(T0 + timedelta(hours=24)))
@@ -0,0 +1,95 @@
+"""单元测试：fetch_concurrently / stream_concurrently
+
+验证有界并发抓取助手的顺序保持、异常隔离与分页流的内存上界。
+"""
+
+import threading
+import time
+import unittest
+
+from devops_collector.core.utils import fetch_concurrently, stream_concurrently
+
+
+class TestFetchConcurrently(unittest.TestCase):
+    """fetch_concurrently 行为测试类。"""
+
+    def test_preserves_order_and_isolates_errors(self):
+        """结果按提交顺序产出，单个 key 的异常不影响其他 key。"""
+
+        def fetch(key):
+            time.sleep(0.01 * (5 - key))
+            if key == 2:
+                raise ValueError("boom")
+            return key * 10
+
+        results = list(fetch_concurrently(fetch, range(5), max_workers=3))
+        self.assertEqual([key for key, _, _ in results], [0, 1, 2, 3, 4])
+        self.assertEqual([value for _, value, _ in results], [0, 10, None, 30, 40])
+        self.assertIsInstance(results[2][2], ValueError)
+
+    def test_bounded_in_flight(self):
+        """同时运行的抓取数不超过 max_workers。"""
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fetch(key):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.02)
+            with lock:
+                state["running"] -= 1
+            return key
+
+        list(fetch_concurrently(fetch, range(12), max_workers=2))
+        self.assertLessEqual(state["peak"], 2)
+
+    def test_serial_fallback(self):
+        """max_workers <= 1 时串行执行。"""
+        results = list(fetch_concurrently(lambda k: k + 1, [1, 2], max_workers=1))
+        self.assertEqual(results, [(1, 2, None), (2, 3, None)])
+
+
+class TestStreamConcurrently(unittest.TestCase):
+    """stream_concurrently 行为测试类。"""
+
+    def test_streams_pages_in_key_order_with_bounded_lead(self):
+        """按 key 顺序逐页产出；每个流最多领先 depth 页，同时在途的流不超过 max_workers。"""
+        lock = threading.Lock()
+        produced = {}
+
+        def open_stream(key):
+            for page in range(4):
+                with lock:
+                    produced[key] = page + 1
+                yield [f"{key}-{page}"]
+
+        consumed = []
+        for key, pages in stream_concurrently(open_stream, range(4), max_workers=2, depth=1):
+            for page in pages:
+                time.sleep(0.02)
+                with lock:
+                    self.assertLessEqual(produced.get(key + 2, 0), 0)
+                    self.assertLessEqual(produced.get(key + 1, 0), 2)
+                consumed.extend(page)
+        self.assertEqual(consumed, [f"{key}-{page}" for key in range(4) for page in range(4)])
+
+    def test_errors_surface_when_the_failing_stream_is_consumed(self):
+        """前面的流完整产出，出错的流在消费到失败页时抛出。"""
+
+        def open_stream(key):
+            yield [key]
+            if key == 1:
+                raise ValueError("boom")
+            yield [key * 10]
+
+        consumed = []
+        with self.assertRaises(ValueError):
+            for _, pages in stream_concurrently(open_stream, range(3), max_workers=3):
+                for page in pages:
+                    consumed.extend(page)
+        self.assertEqual(consumed, [0, 0, 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""单元测试：prefetch
+
+验证后台预取迭代器的顺序保持、异常传递与提前终止。
+"""
+
+import threading
+import time
+import unittest
+
+from devops_collector.core.utils import prefetch
+
+
+class TestPrefetch(unittest.TestCase):
+    """prefetch 行为测试类。"""
+
+    def test_preserves_order(self):
+        """元素顺序与源迭代器一致。"""
+        self.assertEqual(list(prefetch(iter(range(20)), depth=3)), list(range(20)))
+
+    def test_fetches_next_item_while_consumer_works(self):
+        """消费方处理当前元素时，下一个元素已在后台就绪。"""
+        produced = []
+
+        def source():
+            for i in range(3):
+                produced.append(i)
+                yield i
+
+        items = prefetch(source(), depth=1)
+        self.assertEqual(next(items), 0)
+        time.sleep(0.05)
+        self.assertIn(1, produced)
+        self.assertEqual(list(items), [1, 2])
+
+    def test_propagates_source_error(self):
+        """源迭代器的异常在对应位置重新抛出。"""
+
+        def source():
+            yield 1
+            raise ConnectionError("reset")
+
+        items = prefetch(source())
+        self.assertEqual(next(items), 1)
+        with self.assertRaises(ConnectionError):
+            next(items)
+
+    def test_stops_producer_when_consumer_breaks(self):
+        """消费方提前结束后后台线程随之退出。"""
+        for _ in prefetch(iter(range(1000)), depth=1):
+            break
+        deadline = time.time() + 2
+        while any(t.name == "prefetch" for t in threading.enumerate()) and time.time() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(any(t.name == "prefetch" for t in threading.enumerate()))
+
+
+if __name__ == "__main__":
+    unittest.main()
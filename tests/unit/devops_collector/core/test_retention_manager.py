@@ -0,0 +1,63 @@
+"""单元测试：数据保留期清理
+
+验证日志表按 id 区间、stg_raw_data 按主键键集分块删除过期记录，每块单独提交并汇报进度。
+"""
+
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import patch
+
+from devops_collector.config import Config
+from devops_collector.core.retention_manager import RetentionManager, RetentionPolicy, default_policies
+from devops_collector.models.audit import AuditLog
+from devops_collector.models.base_models import RawDataStaging, SyncLog
+
+
+def _days_ago(days: int) -> datetime:
+    return datetime.now(UTC) - timedelta(days=days)
+
+
+def test_logs_are_purged_in_id_range_chunks(db_session):
+    """过期日志按 id 区间分块删除，每块提交一次，未过期记录保留。"""
+    db_session.add_all(SyncLog(source="gitlab", status="SUCCESS", created_at=_days_ago(100 if i < 20 else 1)) for i in range(25))
+    db_session.commit()
+    progress = []
+    manager = RetentionManager(db_session, chunk_size=7, pause_seconds=0, progress=lambda *args: progress.append(args))
+
+    with patch.object(db_session, "commit", wraps=db_session.commit) as commit:
+        results = manager.cleanup_logs([RetentionPolicy(SyncLog.__table__, "created_at", 90)])
+
+    assert results == {"sys_sync_logs": 20}
+    assert db_session.query(SyncLog).count() == 5
+    assert [deleted for _, deleted, _, _ in progress] == [7, 14, 20]
+    assert progress[-1][2:] == (21, 20)
+    assert commit.call_count == 4
+
+
+def test_disabled_policies_are_skipped(db_session):
+    """保留天数为 0 的表 (默认审计日志) 不清理。"""
+    db_session.add(AuditLog(action="LOGIN", timestamp=_days_ago(1000)))
+    db_session.commit()
+
+    results = RetentionManager(db_session, pause_seconds=0).cleanup_logs()
+
+    assert "sys_audit_logs" not in results
+    assert db_session.query(AuditLog).count() == 1
+    assert {policy.name for policy in default_policies()} == {"sys_sync_logs", "sys_audit_logs"}
+
+
+def test_unpartitioned_raw_data_is_purged_in_key_batches(db_session):
+    """未分区的 stg_raw_data 按复合主键分批删除。"""
+    month = date.today().replace(day=1)
+    db_session.add_all(
+        RawDataStaging(
+            source="retention", entity_type="issue", external_id=str(i), collected_month=month, payload={}, collected_at=_days_ago(60 if i < 5 else 1)
+        )
+        for i in range(8)
+    )
+    db_session.commit()
+
+    with patch.object(Config, "RAW_DATA_RETENTION_DAYS", 30):
+        deleted = RetentionManager(db_session, chunk_size=2, pause_seconds=0).cleanup_raw_data()
+
+    assert deleted == 5
+    assert sorted(int(row.external_id) for row in db_session.query(RawDataStaging).filter_by(source="retention")) == [5, 6, 7]
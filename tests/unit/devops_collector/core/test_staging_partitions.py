@@ -0,0 +1,150 @@
+"""单元测试：原始数据暂存
+
+验证 Staging 写入按载荷指纹跳过重写，以及分区的预建与过期删除。
+"""
+
+from datetime import UTC, date, datetime
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.exc import OperationalError
+
+from devops_collector.core import staging_partitions
+from devops_collector.core.base_worker import BaseWorker
+from devops_collector.core.utils import payload_fingerprint
+from devops_collector.models.base_models import RawDataStaging
+
+
+class _Worker(BaseWorker):
+    def process_task(self, task):
+        return None
+
+
+class FakeConnection:
+    """模拟 PostgreSQL 连接：按 SQL 片段返回预置结果，并记录执行的语句。"""
+
+    def __init__(self, partitions, detached=(), pending=(), locked=(), server_version=(16, 2)):
+        self.dialect = MagicMock()
+        self.dialect.name = "postgresql"
+        self.dialect.server_version_info = server_version
+        self.partitions = partitions
+        self.detached = list(detached)
+        self.pending = list(pending)
+        self.locked = set(locked)
+        self.executed = []
+
+    def execute(self, statement, params=None):
+        sql = str(statement)
+        self.executed.append(sql)
+        result = MagicMock()
+        if "relispartition" in sql:
+            result.scalars.return_value = list(self.detached)
+        elif "inhdetachpending" in sql:
+            result.scalars.return_value = list(self.pending)
+        elif "DETACH PARTITION" in sql and any(f'"{name}"' in sql for name in self.locked):
+            raise OperationalError(sql, params, Exception("canceling statement due to lock timeout"))
+        elif "pg_partitioned_table" in sql:
+            result.scalar.return_value = 1
+        elif "pg_inherits" in sql:
+            result.scalars.return_value = list(self.partitions)
+        elif "reltuples" in sql:
+            result.scalar.return_value = 1000.0
+        return result
+
+
+def test_payload_fingerprint_ignores_key_order():
+    """键顺序不同但内容相同的载荷指纹一致。"""
+    assert payload_fingerprint({"a": 1, "b": [1, 2]}) == payload_fingerprint({"b": [1, 2], "a": 1})
+    assert payload_fingerprint({"a": 1}) != payload_fingerprint({"a": 2})
+    assert len(payload_fingerprint({"a": 1})) == 32
+
+
+def test_unchanged_payload_is_not_rewritten(db_session):
+    """同月内重复采集相同载荷不重写，载荷变化时更新。"""
+    worker = _Worker(db_session, client=None)
+    worker.save_to_staging("gitlab", "issue", "1", {"id": 1, "title": "a"})
+    row = db_session.query(RawDataStaging).one()
+    first_collected_at = row.collected_at
+
+    worker.save_to_staging("gitlab", "issue", "1", {"title": "a", "id": 1})
+    db_session.expire_all()
+    assert db_session.query(RawDataStaging).one().collected_at == first_collected_at
+
+    worker.save_to_staging("gitlab", "issue", "1", {"id": 1, "title": "b"})
+    db_session.expire_all()
+    row = db_session.query(RawDataStaging).one()
+    assert row.payload == {"id": 1, "title": "b"}
+    assert row.payload_hash == payload_fingerprint({"id": 1, "title": "b"})
+    assert row.collected_month == datetime.now(UTC).date().replace(day=1)
+
+
+def test_ensure_creates_missing_months():
+    """预建当月及之后的分区，已存在的月份不重复创建，也不创建 DEFAULT 分区。"""
+    conn = FakeConnection(["stg_raw_data_p202612"])
+    with patch.object(staging_partitions.settings.database, "raw_data_compression", "lz4"):
+        created = staging_partitions.ensure_raw_data_partitions(conn, months_ahead=2, today=date(2026, 11, 20))
+
+    assert created == ["stg_raw_data_p202611", "stg_raw_data_p202701"]
+    creates = [sql for sql in conn.executed if sql.startswith("CREATE TABLE")]
+    assert creates[0].endswith("FOR VALUES FROM ('2026-11-01') TO ('2026-12-01')")
+    assert creates[1].endswith("FOR VALUES FROM ('2027-01-01') TO ('2027-02-01')")
+    assert len(creates) == 2
+    assert sum("SET COMPRESSION lz4" in sql for sql in conn.executed) == 2
+    assert not any("DETACH" in sql or "DEFAULT" in sql for sql in conn.executed)
+
+
+def test_drop_expired_partitions():
+    """只删除整月早于保留期的分区：先在 lock_timeout 下并发脱离父表再 DROP。"""
+    conn = FakeConnection(["stg_raw_data_p202608", "stg_raw_data_p202609", "stg_raw_data_p202610"])
+
+    with patch.object(staging_partitions.settings.database, "retention_lock_timeout_ms", 1500):
+        dropped, rows = staging_partitions.drop_expired_raw_data_partitions(conn, retention_days=30, today=date(2026, 10, 19))
+
+    assert dropped == ["stg_raw_data_p202608"]
+    assert rows == 1000
+    statements = [sql for sql in conn.executed if sql.startswith(("SET", "RESET", "ALTER", "DROP", "DELETE"))]
+    assert statements == [
+        "SET lock_timeout = 1500",
+        'ALTER TABLE stg_raw_data DETACH PARTITION "stg_raw_data_p202608" CONCURRENTLY',
+        "RESET lock_timeout",
+        'DROP TABLE IF EXISTS "stg_raw_data_p202608"',
+    ]
+
+
+def test_drop_retries_locked_partitions_and_finishes_interrupted_detaches():
+    """锁超时的分区跳过留待下次，中断的并发脱离以 FINALIZE 收尾，残留的已脱离表直接删除。"""
+    conn = FakeConnection(
+        ["stg_raw_data_p202606", "stg_raw_data_p202607", "stg_raw_data_p202608", "stg_raw_data_p202610"],
+        detached=["stg_raw_data_p202605", "stg_raw_data_p202610"],
+        pending=["stg_raw_data_p202607"],
+        locked=["stg_raw_data_p202608"],
+    )
+
+    dropped, _ = staging_partitions.drop_expired_raw_data_partitions(conn, retention_days=30, today=date(2026, 10, 19))
+
+    assert dropped == ["stg_raw_data_p202605", "stg_raw_data_p202606", "stg_raw_data_p202607"]
+    detaches = [sql for sql in conn.executed if "DETACH" in sql]
+    assert detaches == [
+        'ALTER TABLE stg_raw_data DETACH PARTITION "stg_raw_data_p202606" CONCURRENTLY',
+        'ALTER TABLE stg_raw_data DETACH PARTITION "stg_raw_data_p202607" FINALIZE',
+        'ALTER TABLE stg_raw_data DETACH PARTITION "stg_raw_data_p202608" CONCURRENTLY',
+    ]
+    assert "RESET lock_timeout" in conn.executed
+
+
+def test_drop_uses_plain_detach_before_postgres_14():
+    """PostgreSQL 14 之前不支持并发脱离，退回普通 DETACH。"""
+    conn = FakeConnection(["stg_raw_data_p202608", "stg_raw_data_p202610"], server_version=(13, 9))
+
+    dropped, _ = staging_partitions.drop_expired_raw_data_partitions(conn, retention_days=30, today=date(2026, 10, 19))
+
+    assert dropped == ["stg_raw_data_p202608"]
+    assert [sql for sql in conn.executed if "DETACH" in sql] == ['ALTER TABLE stg_raw_data DETACH PARTITION "stg_raw_data_p202608"']
+    assert not any("inhdetachpending" in sql for sql in conn.executed)
+
+
+def test_non_postgres_is_noop():
+    """非 PostgreSQL 数据库不做分区管理。"""
+    conn = MagicMock()
+    conn.dialect.name = "sqlite"
+    assert staging_partitions.ensure_raw_data_partitions(conn) == []
+    conn.execute.assert_not_called()
@@ -342,6 +342,27 @@ class TestGitLabWorker(unittest.TestCase):
         self.worker._save_mrs_batch(project, batch)
         self.session.add.assert_called()
 
+    def test_unchanged_opened_mrs_refresh_collaboration(self):
+        """指纹未变化的 MR 不重写字段，但 opened MR 仍刷新审批与流水线等协作数据。"""
+        project = MagicMock(spec=GitLabProject)
+        project.id = 1
+        batch = [
+            {"id": 201, "iid": 1, "title": "Open", "state": "opened", "created_at": "2023-01-01T12:00:00Z", "updated_at": "2023-01-01T12:00:00Z"},
+            {"id": 202, "iid": 2, "title": "Merged", "state": "merged", "created_at": "2023-01-01T12:00:00Z", "updated_at": "2023-01-01T12:00:00Z"},
+        ]
+        opened = MagicMock(id=201, iid=1, title="Open")
+        self.session.query.return_value.filter.return_value.all.return_value = [opened]
+        self.worker.enable_deep_analysis = False
+        with (
+            patch.object(self.worker, "filter_changed", return_value={}),
+            patch.object(self.worker, "_apply_mr_collaboration_analysis") as analyze,
+        ):
+            self.worker._transform_mrs_batch(project, batch)
+
+        analyze.assert_called_once_with(project, opened)
+        self.assertEqual(opened.title, "Open")
+        self.session.add.assert_not_called()
+
     def test_save_pipelines_batch(self):
         '''"""TODO: Add description.
 
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock
 
 from devops_collector.models.base_models import TraceabilityLink
+from devops_collector.models.test_management import GTMTestCase
 from devops_collector.plugins.gitlab.mixins.traceability_mixin import TraceabilityMixin
 from devops_collector.plugins.gitlab.models import GitLabMergeRequest
 
@@ -90,6 +91,52 @@ class TestTraceabilityExtraction(unittest.TestCase):
         self.assertEqual(len(added_links), 1)
         self.assertEqual(added_links[0].source_id, "999")
 
+    def test_test_case_reference_index(self):
+        """测试用例文本中的需求引用写入索引，重复同步不产生重复记录"""
+        case = MagicMock(spec=GTMTestCase)
+        case.id = 701
+        case.title = "验证登录 #5001"
+        case.description = "覆盖 #5002 及 #5001"
+
+        self.worker._apply_traceability_extraction(case)
+        self.session.flush()
+        self.worker._apply_traceability_extraction(case)
+
+        links = self.session.query(TraceabilityLink).order_by(TraceabilityLink.source_id).all()
+        self.assertEqual([link.source_id for link in links], ["5001", "5002"])
+        for link in links:
+            self.assertEqual(link.target_type, "test_case")
+            self.assertEqual(link.target_id, "701")
+            self.assertEqual(link.link_type, "tests")
+
+    def test_test_case_reindex_drops_stale_links(self):
+        """用例文本修改后重新索引，删除不再引用的旧链路，保留手工建立的链路"""
+        case = MagicMock(spec=GTMTestCase)
+        case.id = 702
+        case.title = "验证导出 #6001"
+        case.description = "关联 PROJ-7"
+        self.worker._apply_traceability_extraction(case)
+        self.session.add(
+            TraceabilityLink(
+                source_system="zentao",
+                source_type="task",
+                source_id="6100",
+                target_system="gitlab",
+                target_type="test_case",
+                target_id="702",
+                link_type="tests",
+            )
+        )
+        self.session.flush()
+
+        case.title = "验证导出 #6002"
+        case.description = ""
+        self.worker._apply_traceability_extraction(case)
+        self.session.flush()
+
+        links = self.session.query(TraceabilityLink).filter_by(target_id="702").order_by(TraceabilityLink.source_id).all()
+        self.assertEqual([link.source_id for link in links], ["6002", "6100"])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,83 @@
+"""Jenkins Worker 单元测试"""
+
+import unittest
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from devops_collector.models import JenkinsTestExecution
+from devops_collector.models.base_models import Base
+from devops_collector.plugins.gitlab.models import GitLabProject
+from devops_collector.plugins.jenkins.models import JenkinsBuild, JenkinsJob
+from devops_collector.plugins.jenkins.worker import JenkinsWorker
+
+
+def _build(number, building=False, result="SUCCESS", user="alice"):
+    return {
+        "number": number,
+        "url": f"http://jenkins/job/app/{number}/",
+        "result": result,
+        "building": building,
+        "duration": 1000,
+        "timestamp": 1704067200000,
+        "actions": [{"_class": "hudson.model.CauseAction", "causes": [{"_class": "hudson.model.Cause$UserIdCause", "userName": user}]}],
+    }
+
+
+class TestJenkinsWorker(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.client = MagicMock()
+        self.worker = JenkinsWorker(self.session, self.client, fetch_concurrency=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_sync_all_jobs_maps_projects_from_preloaded_index(self):
+        """测试 Job 通过预加载的路径/名称索引关联 GitLab 项目 (路径优先)。"""
+        self.session.add_all(
+            [
+                GitLabProject(id=1, name="api", path_with_namespace="team/other"),
+                GitLabProject(id=2, name="web", path_with_namespace="team/api"),
+            ]
+        )
+        self.session.commit()
+        self.client.get_jobs.return_value = [
+            {"name": "api", "fullName": "team/api"},
+            {"name": "web", "fullName": "web"},
+            {"name": "misc", "fullName": "misc"},
+        ]
+
+        self.assertEqual(self.worker.sync_all_jobs(), 3)
+        jobs = {j.full_name: j.gitlab_project_id for j in self.session.query(JenkinsJob).all()}
+        self.assertEqual(jobs, {"team/api": 2, "web": 2, "misc": None})
+
+    def test_sync_job_builds_skips_finished_and_fetches_details_concurrently(self):
+        """测试已结束构建跳过；缺字段的构建回退拉取详情；测试报告并发获取。"""
+        job = JenkinsJob(full_name="app", name="app")
+        self.session.add(job)
+        self.session.flush()
+        self.session.add(JenkinsBuild(job_id=job.id, number=1, result="SUCCESS", building=False))
+        self.session.add(JenkinsBuild(job_id=job.id, number=2, building=True))
+        self.session.commit()
+
+        self.client.get_builds.return_value = [_build(1), _build(2), _build(3, building=True, result=None), {"number": 4, "url": "http://jenkins/job/app/4/"}]
+        self.client.get_build_details.side_effect = lambda url: _build(4, user="bob")
+        self.client.get_test_report.return_value = {"totalCount": 10, "failCount": 1, "skipCount": 0, "duration": 1.5}
+
+        self.assertEqual(self.worker.sync_job_builds("app"), 3)
+        self.client.get_build_details.assert_called_once_with("http://jenkins/job/app/4/")
+        self.assertEqual(sorted(c.args[0] for c in self.client.get_test_report.call_args_list), ["http://jenkins/job/app/2/", "http://jenkins/job/app/4/"])
+
+        builds = {b.number: b for b in self.session.query(JenkinsBuild).filter_by(job_id=job.id).all()}
+        self.assertEqual(len(builds), 4)
+        self.assertFalse(builds[2].building)
+        self.assertEqual(builds[4].trigger_user, "bob")
+        self.assertEqual(self.session.query(JenkinsTestExecution).count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
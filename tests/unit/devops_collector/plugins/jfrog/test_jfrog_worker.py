@@ -0,0 +1,84 @@
+"""JFrog Worker 单元测试"""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from devops_collector.models.base_models import Base
+from devops_collector.plugins.jfrog.client import JFrogClient
+from devops_collector.plugins.jfrog.models import JFrogArtifact, JFrogScan, JFrogVulnerabilityDetail
+from devops_collector.plugins.jfrog.worker import JFrogWorker
+
+
+def _artifact(i, downloads=0):
+    return {
+        "path": "com/acme",
+        "name": f"lib{i}.jar",
+        "size": 100 + i,
+        "created": "2024-01-01T00:00:00.000Z",
+        "modified": "2024-01-02T00:00:00.000Z",
+        "created_by": "deployer",
+        "properties": [{"key": "build.name", "value": "acme"}],
+        "stats": [{"downloads": downloads, "downloaded": "2024-03-01T08:00:00.000Z"}],
+    }
+
+
+class TestJFrogClient(unittest.TestCase):
+    def test_iter_artifact_pages_uses_offset_limit(self):
+        """测试 AQL 分页：按页推进 offset，并一次补齐本页的 property/stat。"""
+        client = JFrogClient("http://jfrog", "token")
+        pages = [[{"path": "a", "name": "1"}, {"path": "a", "name": "2"}], [{"path": "b", "name": "3"}]]
+        queries = []
+
+        def aql(query):
+            queries.append(query)
+            if ".offset(" in query:
+                return pages.pop(0) if pages else []
+            return [{"path": "a", "name": "1", "stats": [{"downloads": 7}]}]
+
+        with patch.object(client, "_aql", side_effect=aql):
+            result = list(client.iter_artifact_pages("libs", page_size=2))
+
+        self.assertEqual([len(p) for p in result], [2, 1])
+        self.assertEqual(result[0][0]["stats"], [{"downloads": 7}])
+        self.assertEqual(result[0][1]["stats"], [])
+        self.assertIn(".offset(0).limit(2)", queries[0])
+        self.assertIn(".offset(2).limit(2)", queries[2])
+        self.assertIn('"stat"', queries[1])
+
+
+class TestJFrogWorker(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.client = MagicMock()
+        self.worker = JFrogWorker(self.session, self.client, fetch_concurrency=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_sync_artifacts_batches_and_upserts(self):
+        """测试逐页提交、统计取自 AQL，且重复同步不产生重复记录。"""
+        self.client.iter_artifact_pages.side_effect = lambda repo: iter([[_artifact(0), _artifact(1)], [_artifact(2, downloads=5)]])
+        self.client.get_xray_summary.side_effect = lambda repo, path: (
+            {"summary": {"high": 1}, "issues": [{"cve": "CVE-2024-0001", "severity": "High"}]} if path.endswith("lib0.jar") else {}
+        )
+
+        self.assertEqual(self.worker._sync_artifacts("libs-release"), 3)
+        self.assertEqual(self.worker._sync_artifacts("libs-release"), 3)
+
+        self.client.get_artifact_stats.assert_not_called()
+        self.assertEqual(self.session.query(JFrogArtifact).count(), 3)
+        lib2 = self.session.query(JFrogArtifact).filter_by(name="lib2.jar").one()
+        self.assertEqual(lib2.download_count, 5)
+        self.assertEqual(lib2.build_name, "acme")
+        self.assertIsNotNone(lib2.last_downloaded_at)
+        self.assertEqual(self.session.query(JFrogScan).count(), 1)
+        self.assertEqual(self.session.query(JFrogVulnerabilityDetail).count(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -70,5 +70,28 @@ class TestJiraClient(unittest.TestCase):
         self.assertEqual(mock_get.call_count, 2)
 
 
+    @patch("requests.Session.get")
+    def test_iter_issues_yields_pages(self, mock_get):
+        """流式分页：逐页产出，取满 total 后停止请求"""
+        mock_get.side_effect = [
+            MagicMock(status_code=200, json=lambda: {"total": 3, "issues": [{"id": "1"}, {"id": "2"}]}),
+            MagicMock(status_code=200, json=lambda: {"total": 3, "issues": [{"id": "3"}]}),
+        ]
+        pages = self.client.iter_issues("project = PROJ1", page_size=2)
+        self.assertEqual(next(pages), [{"id": "1"}, {"id": "2"}])
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(list(pages), [[{"id": "3"}]])
+        self.assertEqual(mock_get.call_count, 2)
+
+
+    @patch("requests.Session.get")
+    def test_get_oldest_created(self, mock_get):
+        """回填下界：按创建时间升序只取一条"""
+        mock_get.return_value = MagicMock(status_code=200, json=lambda: {"issues": [{"fields": {"created": "2023-05-01T09:15:00.000+0800"}}]})
+        oldest = self.client.get_oldest_created("project = PROJ1")
+        self.assertEqual(oldest.isoformat(), "2023-05-01T09:15:00+08:00")
+        self.assertIn("ORDER BY created ASC", mock_get.call_args.kwargs["params"]["jql"])
+
+
 if __name__ == "__main__":
     unittest.main()
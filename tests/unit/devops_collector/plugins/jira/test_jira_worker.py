@@ -79,41 +79,43 @@ class TestJiraWorker(unittest.TestCase):
                 "active": True,
             }
         ]
-        self.mock_client.get_issues.return_value = [
-            {
-                "id": "101",
-                "key": "TEST-1",
-                "fields": {
-                    "summary": "Issue 1",
-                    "status": {"name": "Open"},
-                    "issuetype": {"name": "Task"},
-                    "assignee": {
-                        "accountId": "jira_user_101",
-                        "displayName": "Jira User",
-                        "emailAddress": "jira@fake.com",
-                    },
-                    "creator": {
-                        "accountId": "user_creator",
-                        "displayName": "Creator X",
-                        "emailAddress": "creator@fake.com",
+        self.mock_client.iter_issues.return_value = [
+            [
+                {
+                    "id": "101",
+                    "key": "TEST-1",
+                    "fields": {
+                        "summary": "Issue 1",
+                        "status": {"name": "Open"},
+                        "issuetype": {"name": "Task"},
+                        "assignee": {
+                            "accountId": "jira_user_101",
+                            "displayName": "Jira User",
+                            "emailAddress": "jira@fake.com",
+                        },
+                        "creator": {
+                            "accountId": "user_creator",
+                            "displayName": "Creator X",
+                            "emailAddress": "creator@fake.com",
+                        },
+                        "reporter": {
+                            "accountId": "user_reporter",
+                            "displayName": "Reporter Y",
+                            "emailAddress": "reporter@fake.com",
+                        },
                     },
-                    "reporter": {
-                        "accountId": "user_reporter",
-                        "displayName": "Reporter Y",
-                        "emailAddress": "reporter@fake.com",
+                    "changelog": {
+                        "histories": [
+                            {
+                                "id": "1001",
+                                "author": {"displayName": "User A"},
+                                "created": "2024-01-01T10:00:00.000+0000",
+                                "items": [{"field": "status", "fromString": "New", "toString": "Open"}],
+                            }
+                        ]
                     },
-                },
-                "changelog": {
-                    "histories": [
-                        {
-                            "id": "1001",
-                            "author": {"displayName": "User A"},
-                            "created": "2024-01-01T10:00:00.000+0000",
-                            "items": [{"field": "status", "fromString": "New", "toString": "Open"}],
-                        }
-                    ]
-                },
-            }
+                }
+            ]
         ]
         # Seed Global Users for identity matching
         from uuid import uuid4
@@ -152,5 +154,121 @@ class TestJiraWorker(unittest.TestCase):
         self.assertEqual(issue.reporter_user_id, user_map["reporter@fake.com"].global_user_id)
 
 
+    def test_issue_streaming_batches_are_idempotent(self):
+        """分批流式同步：每批提交，重复同步不会产生重复的历史与链路记录"""
+        from devops_collector.models.base_models import TraceabilityLink
+
+        project = JiraProject(key="STREAM", name="Stream")
+        self.session.add(project)
+        self.session.commit()
+        self.worker.BATCH_SIZE = 2
+
+        def make_issue(n):
+            return {
+                "id": str(n),
+                "key": f"STREAM-{n}",
+                "fields": {
+                    "summary": f"Issue {n}",
+                    "assignee": {"accountId": "acc_shared", "displayName": "Shared"},
+                    "issuelinks": [{"type": {"outward": "blocks"}, "outwardIssue": {"id": "999"}}],
+                },
+                "changelog": {
+                    "histories": [
+                        {
+                            "id": f"h{n}",
+                            "author": {"displayName": "A"},
+                            "created": "2024-01-01T10:00:00.000+0000",
+                            "items": [{"field": "status"}, {"field": "assignee"}],
+                        }
+                    ]
+                },
+            }
+
+        pages = [[make_issue(1), make_issue(2)], [make_issue(3)], [make_issue(4), make_issue(5)]]
+        self.session.commit = MagicMock(wraps=self.session.commit)
+
+        processed = self.worker._sync_issues_streaming(project, iter(pages))
+        self.assertEqual(processed, 5)
+        self.assertEqual(self.session.commit.call_count, 2)
+        self.worker._sync_issues_streaming(project, iter(pages))
+
+        self.assertEqual(self.session.query(JiraIssue).filter_by(project_id=project.id).count(), 5)
+        self.assertEqual(self.session.query(JiraIssueHistory).count(), 10)
+        self.assertEqual(self.session.query(TraceabilityLink).filter_by(source_system="jira").count(), 5)
+
+    def test_unchanged_issues_are_not_rewritten(self):
+        """载荷指纹未变化的问题整条跳过，只加载并重写有变化的问题"""
+        project = JiraProject(key="HASH", name="Hash")
+        self.session.add(project)
+        self.session.commit()
+        batch = [{"id": str(n), "key": f"HASH-{n}", "fields": {"summary": f"Issue {n}"}} for n in (1, 2)]
+        self.worker._transform_issues_batch(project, batch)
+        self.session.commit()
+
+        self.worker._apply_issue_fields = MagicMock(wraps=self.worker._apply_issue_fields)
+        batch[1] = {"id": "2", "key": "HASH-2", "fields": {"summary": "Renamed"}}
+        self.worker._transform_issues_batch(project, batch)
+
+        self.assertEqual(self.worker._apply_issue_fields.call_count, 1)
+        self.assertEqual(self.session.get(JiraIssue, 2).summary, "Renamed")
+        self.assertEqual(self.session.get(JiraIssue, 1).summary, "Issue 1")
+
+
+    def test_backfill_slices_are_disjoint_and_open_ended(self):
+        """回填切片：首尾开放、相邻时间片首尾相接"""
+        from datetime import UTC, datetime
+
+        self.worker.backfill_slice_days = 10
+        slices = self.worker._build_backfill_slices(datetime(2024, 1, 1, 8, 30, 15, tzinfo=UTC), datetime(2024, 1, 25, tzinfo=UTC))
+        self.assertEqual(len(slices), 3)
+        self.assertIsNone(slices[0][0])
+        self.assertIsNone(slices[-1][1])
+        for (_, upper), (lower, _) in zip(slices[:-1], slices[1:], strict=True):
+            self.assertEqual(upper, lower)
+        jql = self.worker._slice_jql("project = 'P'", *slices[1])
+        self.assertEqual(jql, "project = 'P' AND created >= '2024-01-11 08:30' AND created < '2024-01-21 08:30'")
+
+    def test_backfill_resumes_from_last_completed_slice(self):
+        """并发回填：时间片逐页流式抓取，失败的时间片之前已提交的切片不再重复抓取"""
+        from datetime import UTC, datetime
+
+        project = JiraProject(key="BF", name="Backfill")
+        self.session.add(project)
+        self.session.commit()
+        self.worker.backfill_slice_days = 10
+        self.worker.fetch_concurrency = 3
+        self.mock_client.get_oldest_created.return_value = datetime(2024, 1, 1, tzinfo=UTC)
+        until = datetime(2024, 1, 25, tzinfo=UTC)
+
+        def slice_issues(jql):
+            n = 1 if "created >=" not in jql else (2 if "created <" in jql else 3)
+            return [{"id": str(n), "key": f"BF-{n}", "fields": {"summary": f"S{n}"}}]
+
+        calls = []
+
+        def failing_pages(jql):
+            calls.append(jql)
+            if "created >= '2024-01-21" in jql:
+                raise RuntimeError("timeout")
+            yield slice_issues(jql)
+
+        self.mock_client.iter_issues.side_effect = failing_pages
+        with self.assertRaises(RuntimeError):
+            self.worker._backfill_issues(project, "project = 'BF'", until)
+        self.session.rollback()
+        self.assertEqual(len(calls), 3)
+        checkpoint = self.worker.get_checkpoint("jira", "BF", "issue_backfill")
+        self.assertEqual(checkpoint.processed_count, 2)
+
+        calls.clear()
+        self.mock_client.iter_issues.side_effect = lambda jql: calls.append(jql) or iter([slice_issues(jql)])
+        processed = self.worker._backfill_issues(project, "project = 'BF'", until)
+        self.assertEqual(calls, ["project = 'BF' AND created >= '2024-01-21 00:00'"])
+        self.assertEqual(processed, 3)
+        self.assertEqual(self.session.query(JiraIssue).filter_by(project_id=project.id).count(), 3)
+        self.assertEqual(self.worker.get_checkpoint("jira", "BF", "issue_backfill").status, "COMPLETED")
+        self.mock_client.get_issues.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -95,3 +95,119 @@ class TestNexusWorker(unittest.TestCase):
         self.assertIsInstance(comp, NexusComponent)
         self.assertEqual(comp.product_id, "devops")
         self.session.commit.assert_called_once()
+
+    def test_combined_patterns_keep_rule_order_and_memoise(self):
+        """测试合并正则后仍按规则顺序命中，且同一坐标只解析一次。"""
+        mock_products = [
+            MagicMock(product_code="first", matching_patterns=["^lib-.*"], is_current=True),
+            MagicMock(product_code="second", matching_patterns=["com.acme.*", "^lib-core$"], is_current=True),
+        ]
+        self.session.query.return_value.filter.return_value.all.return_value = mock_products
+        self.worker._init_product_cache()
+        self.assertIsNotNone(self.worker._combined_pattern)
+
+        # name 命中规则 0、group 命中规则 1：与逐条匹配一致，取顺序靠前的规则
+        self.assertEqual(self.worker._resolve_product_id("com.acme.x", "lib-core"), "first")
+        self.assertEqual(self.worker._resolve_product_id("com.acme.x", "util"), "second")
+
+        with patch.object(self.worker, "_resolve_product_id_uncached", wraps=self.worker._resolve_product_id_uncached) as uncached:
+            for _ in range(3):
+                self.worker._resolve_product_id("com.acme.y", "util")
+            self.assertEqual(uncached.call_count, 1)
+
+    def test_patterns_with_backreferences_are_matched_separately(self):
+        """测试含捕获分组 (编号反向引用) 的模式不参与合并，仍按规则顺序正确命中。"""
+        mock_products = [
+            MagicMock(product_code="twin", matching_patterns=[r"^(\w+)-\1$"], is_current=True),
+            MagicMock(product_code="lib", matching_patterns=["^lib-.*"], is_current=True),
+        ]
+        self.session.query.return_value.filter.return_value.all.return_value = mock_products
+        self.worker._init_product_cache()
+
+        self.assertEqual([idx for idx, _ in self.worker._separate_rules], [0])
+        self.assertEqual(self.worker._resolve_product_id(None, "lib-lib"), "twin")
+        self.assertEqual(self.worker._resolve_product_id(None, "lib-core"), "lib")
+        self.assertIsNone(self.worker._resolve_product_id(None, "abc-abd"))
+
+
+class TestNexusWorkerBatch(unittest.TestCase):
+    """基于 SQLite 的批量保存测试。"""
+
+    def setUp(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from devops_collector.models.base_models import Base
+
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.client = MagicMock()
+        self.worker = NexusWorker(self.session, self.client)
+        self.worker._init_product_cache()
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_save_batch_is_idempotent(self):
+        """测试重复保存同一批次时组件与资产均不重复，且过滤截止日期之前的资产。"""
+        from devops_collector.plugins.nexus.models import NexusAsset
+
+        batch = [
+            {
+                "id": f"c{i}",
+                "repository": "maven-releases",
+                "format": "maven2",
+                "group": "com.acme",
+                "name": f"lib{i}",
+                "version": "1.0",
+                "assets": [
+                    {"id": f"a{i}", "path": f"lib{i}.jar", "lastModified": "2024-06-01T00:00:00.000+00:00"},
+                    {"id": f"old{i}", "path": f"lib{i}.pom", "lastModified": "2022-01-01T00:00:00.000+00:00"},
+                ],
+            }
+            for i in range(3)
+        ]
+        self.worker._save_batch(batch)
+        batch[0]["version"] = "1.1"
+        self.worker._save_batch(batch)
+
+        self.assertEqual(self.session.query(NexusComponent).count(), 3)
+        self.assertEqual(self.session.get(NexusComponent, "c0").version, "1.1")
+        self.assertEqual({a.id for a in self.session.query(NexusAsset).all()}, {"a0", "a1", "a2"})
+        self.client.download_asset_content.assert_not_called()
+
+    def test_sync_components_resumes_from_continuation_token(self):
+        """测试中断后从持久化的 continuationToken 继续，累计数量保持连续。"""
+        self.worker.BATCH_SIZE = 2
+        pages = {
+            None: ([self._component(0), self._component(1)], "t1"),
+            "t1": ([self._component(2), self._component(3)], "t2"),
+            "t2": ([self._component(4)], None),
+        }
+
+        def iter_pages(endpoint, repository, token=None, fail_at=None):
+            while True:
+                if token == fail_at:
+                    raise ConnectionError("reset")
+                items, token = pages[token]
+                yield items, token
+                if not token:
+                    break
+
+        self.client.iter_pages.side_effect = lambda e, r, t=None: iter_pages(e, r, t, fail_at="t2")
+        with self.assertRaises(ConnectionError):
+            self.worker._sync_components("maven-releases")
+        self.session.rollback()
+        checkpoint = self.worker.get_checkpoint("nexus", "maven-releases", "component")
+        self.assertEqual((checkpoint.cursor, checkpoint.processed_count), ("t2", 4))
+
+        self.client.iter_pages.side_effect = lambda e, r, t=None: iter_pages(e, r, t)
+        self.assertEqual(self.worker._sync_components("maven-releases"), 5)
+        self.assertEqual(self.client.iter_pages.call_args.args, ("components", "maven-releases", "t2"))
+        self.assertEqual(self.session.query(NexusComponent).count(), 5)
+        self.assertEqual(self.worker.get_checkpoint("nexus", "maven-releases", "component").status, "COMPLETED")
+
+    @staticmethod
+    def _component(i):
+        return {"id": f"c{i}", "repository": "maven-releases", "format": "maven2", "name": f"lib{i}"}
@@ -0,0 +1,145 @@
+"""SonarQube Worker 单元测试"""
+
+import unittest
+from datetime import UTC, datetime
+from unittest.mock import MagicMock
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from devops_collector.models.base_models import Base, SyncCheckpoint
+from devops_collector.plugins.sonarqube.models import SonarIssue, SonarMeasure, SonarProject
+from devops_collector.plugins.sonarqube.worker import SonarQubeWorker
+
+
+def _issue(key, updated, severity="MAJOR", assignee="alice"):
+    return {"key": key, "severity": severity, "status": "OPEN", "assignee": assignee, "creationDate": "2024-01-01T00:00:00+0000", "updateDate": updated}
+
+
+class TestSonarQubeIssueSync(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.project = SonarProject(key="app", name="app")
+        self.session.add(self.project)
+        self.session.commit()
+        self.client = MagicMock()
+        self.worker = SonarQubeWorker(self.session, self.client)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_partition_splits_by_severity_then_creation_date(self):
+        """测试超过深分页上限的查询先按严重级别、再按创建时间二分切分。"""
+
+        def count_issues(project_key, **filters):
+            if "severities" not in filters:
+                return 25000
+            if filters["severities"] == "MAJOR":
+                return 6000 if "createdAfter" in filters else 12000
+            return 100 if filters["severities"] == "MINOR" else 0
+
+        self.client.count_issues.side_effect = count_issues
+        self.client.get_oldest_issue_date.return_value = "2020-01-01T00:00:00+0000"
+
+        partitions = list(self.worker._partition_issue_filters("app", {"resolved": "false"}))
+
+        self.assertEqual([p["severities"] for p in partitions], ["MAJOR", "MAJOR", "MINOR"])
+        first, second = partitions[0], partitions[1]
+        self.assertEqual(first["createdAfter"], "2020-01-01T00:00:00+0000")
+        self.assertEqual(first["createdBefore"], second["createdAfter"])
+        self.assertNotIn("createdAfter", partitions[2])
+
+    def test_full_sync_records_watermark_then_incremental_stops_early(self):
+        """测试首次全量同步写入水位，后续增量按更新时间倒序读取并在越过水位后停止。"""
+        self.client.count_issues.return_value = 2
+        self.client.iter_issue_pages.return_value = [[_issue("K1", "2024-03-01T10:00:00+0000"), _issue("K2", "2024-03-02T10:00:00+0000")]]
+
+        self.assertEqual(self.worker._sync_issues(self.project), 2)
+        checkpoint = self.session.query(SyncCheckpoint).filter_by(source="sonarqube", scope="app", entity_type="issue").one()
+        self.assertEqual(checkpoint.watermark.replace(tzinfo=UTC), datetime(2024, 3, 2, 10, tzinfo=UTC))
+
+        self.client.iter_issue_pages.reset_mock()
+        self.client.iter_issue_pages.return_value = [
+            [_issue("K1", "2024-03-05T10:00:00+0000", severity="BLOCKER"), _issue("K2", "2024-03-02T10:00:00+0000"), _issue("K0", "2024-02-01T00:00:00+0000")]
+        ]
+
+        self.assertEqual(self.worker._sync_issues(self.project), 2)
+        self.client.iter_issue_pages.assert_called_once_with("app", page_size=SonarQubeWorker.ISSUE_PAGE_SIZE, s="UPDATE_DATE", asc="false")
+        issues = {i.issue_key: i.severity for i in self.session.query(SonarIssue).all()}
+        self.assertEqual(issues, {"K1": "BLOCKER", "K2": "MAJOR"})
+        self.session.refresh(checkpoint)
+        self.assertEqual(checkpoint.watermark.replace(tzinfo=UTC), datetime(2024, 3, 5, 10, tzinfo=UTC))
+
+    def test_overflow_fallback_reconciles_issues_resolved_in_unread_window(self):
+        """测试增量窗口超限回退为未解决分区扫描后，对账本地仍打开但扫描中缺席的问题。"""
+        self.client.count_issues.return_value = 3
+        self.client.iter_issue_pages.return_value = [[_issue(k, "2024-03-01T10:00:00+0000") for k in ("K1", "K2", "K3")]]
+        self.worker._sync_issues(self.project)
+
+        resolved = {**_issue("K2", "2024-03-03T10:00:00+0000"), "status": "CLOSED", "resolution": "FIXED"}
+
+        def iter_issue_pages(project_key, page_size, **filters):
+            if filters.get("s") == "UPDATE_DATE":
+                return [[_issue("K4", "2024-03-05T10:00:00+0000")]]
+            if "issues" in filters:
+                self.assertEqual(filters["issues"], "K2,K3")
+                return [[resolved]]
+            return [[_issue("K1", "2024-03-04T10:00:00+0000"), _issue("K4", "2024-03-05T10:00:00+0000")]]
+
+        self.client.count_issues.side_effect = lambda project_key, **filters: 2 if filters else 20000
+        self.client.iter_issue_pages.side_effect = iter_issue_pages
+
+        self.worker._sync_issues(self.project)
+
+        issues = {i.issue_key: (i.status, i.resolution) for i in self.session.query(SonarIssue).all()}
+        self.assertEqual(issues, {"K1": ("OPEN", None), "K2": ("CLOSED", "FIXED"), "K3": ("CLOSED", "REMOVED"), "K4": ("OPEN", None)})
+
+
+class TestSonarQubeMeasuresBatch(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.client = MagicMock()
+        self.worker = SonarQubeWorker(self.session, self.client, fetch_concurrency=2)
+
+    def tearDown(self):
+        self.session.close()
+
+    def test_batch_writes_snapshots_only_for_new_analyses(self):
+        """测试批量模式以常数次请求刷新一组项目，且未重新分析的项目不重复写快照。"""
+        self.client.get_projects_by_keys.return_value = {
+            "a": {"key": "a", "name": "A", "lastAnalysisDate": "2024-03-01T10:00:00+0000"},
+            "b": {"key": "b", "name": "B", "lastAnalysisDate": "2024-03-02T10:00:00+0000"},
+        }
+        self.client.search_measures.return_value = {
+            "a": {"coverage": "80.0", "bugs": "2", "security_hotspots": "1", "alert_status": "ERROR"},
+            "b": {"coverage": "90.0", "bugs": "0", "security_hotspots": "0", "alert_status": "OK"},
+        }
+        self.client.get_issue_severity_distributions.return_value = {"a": {"BUG": {"MAJOR": 2}, "VULNERABILITY": {}}}
+        self.client.get_hotspot_distribution.return_value = {"HIGH": 1, "MEDIUM": 0, "LOW": 0}
+
+        stats = self.worker.process_task({"job_type": "batch", "project_keys": ["a", "b", "gone"]})
+
+        self.assertEqual(stats, {"projects": 3, "snapshots": 2, "issues": 0, "failed": 0})
+        self.client.search_measures.assert_called_once_with(["a", "b"])
+        self.client.get_issue_severity_distributions.assert_called_once_with(["a"])
+        self.client.get_hotspot_distribution.assert_called_once_with("a")
+        snapshots = {m.project.key: m for m in self.session.query(SonarMeasure).all()}
+        self.assertEqual(snapshots["a"].bugs_major, 2)
+        self.assertEqual(snapshots["a"].security_hotspots_high, 1)
+        self.assertEqual(snapshots["a"].quality_gate_status, "ERROR")
+        self.assertEqual(snapshots["b"].coverage, 90.0)
+        self.assertEqual({p.key: p.sync_status for p in self.session.query(SonarProject).all()}, {"a": "SUCCESS", "b": "SUCCESS"})
+
+        self.client.search_measures.reset_mock()
+        self.client.get_projects_by_keys.return_value["b"]["lastAnalysisDate"] = "2024-03-03T10:00:00+0000"
+        self.client.search_measures.return_value = {"b": {"coverage": "91.0", "alert_status": "OK"}}
+
+        stats = self.worker.process_task({"job_type": "batch"})
+
+        self.assertEqual(stats["snapshots"], 1)
+        self.client.search_measures.assert_called_once_with(["b"])
+        self.assertEqual(self.session.query(SonarMeasure).count(), 3)
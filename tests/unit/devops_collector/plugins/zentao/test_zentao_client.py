@@ -46,6 +46,28 @@ class TestZenTaoClient(unittest.TestCase):
         self.assertEqual(len(stories), 3)
         self.assertGreaterEqual(mock_request.call_count, 2)
 
+    @patch("time.sleep", return_value=None)
+    @patch("requests.Session.request")
+    def test_iter_stories_yields_pages_from_start_page(self, mock_request, mock_sleep):
+        mock_request.side_effect = [
+            MagicMock(status_code=200, json=lambda: {"total": 150, "stories": [{"id": i} for i in range(101, 151)]}),
+        ]
+        pages = list(self.client.iter_stories(1, start_page=2))
+        self.assertEqual([page for page, _ in pages], [2])
+        self.assertEqual(len(pages[0][1]), 50)
+        self.assertEqual(mock_request.call_args.kwargs["params"], {"page": 2, "limit": 100})
+
+
+    def test_concurrent_401_refreshes_token_once(self):
+        self.client.account = "admin"
+        self.client.password = "secret"
+        self.client._request_new_token = MagicMock(side_effect=lambda: self.client.headers.update({"Token": "fresh"}) or True)
+
+        self.assertTrue(self.client._refresh_token(stale_token="token"))
+        # 第二个线程携带同一个过期 Token 到达时，应直接复用已刷新的 Token
+        self.assertTrue(self.client._refresh_token(stale_token="token"))
+        self.client._request_new_token.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -86,21 +86,28 @@ class TestZenTaoWorker(unittest.TestCase):
         self.mock_client.get_executions.return_value = []
         self.mock_client.get_departments.return_value = [{"id": 1, "name": "研发部", "parent": 0}]
         self.mock_client.get_users.return_value = [{"account": "dev1", "realname": "开发者1", "dept": 1, "dept_name": "研发部", "email": "dev1@fake.com"}]
-        self.mock_client.get_stories.return_value = [
-            {
-                "id": 1001,
-                "title": "Story 1",
-                "plan": 51,
-                "openedBy": "dev1",
-                "assignedTo": "dev1",
-                "openedDate": "2024-01-01 10:00:00",
-            }
-        ]
+        self.mock_client.iter_stories.return_value = iter(
+            [
+                (
+                    1,
+                    [
+                        {
+                            "id": 1001,
+                            "title": "Story 1",
+                            "plan": 51,
+                            "openedBy": "dev1",
+                            "assignedTo": "dev1",
+                            "openedDate": "2024-01-01 10:00:00",
+                        }
+                    ],
+                )
+            ]
+        )
         self.mock_client.get_test_cases.return_value = []
         self.mock_client.get_releases.return_value = []
         self.mock_client.get_programs.return_value = []
         self.mock_client.get_projects.return_value = []
-        self.mock_client.get_bugs.return_value = []
+        self.mock_client.iter_bugs.return_value = iter([])
         self.mock_client.get_actions.return_value = [
             {
                 "id": 101,
@@ -128,6 +135,162 @@ class TestZenTaoWorker(unittest.TestCase):
         self.assertEqual(issue.plan_id, 51)
         self.assertEqual(issue.title, "Story 1")
 
+    def test_issue_batch_resolves_identities_in_bulk(self):
+        """批量 Transform：身份解析的查询次数与批次内记录数无关"""
+        from sqlalchemy import event
+
+        self.session.add(ZenTaoProduct(id=1, name="Prod 1"))
+        self.session.commit()
+        self.worker.bulk_save_to_staging = MagicMock()
+
+        def run_batch(start_id, size, guest):
+            batch = [{"id": start_id + i, "title": f"S{i}", "openedBy": "dev1", "assignedTo": f"{guest}{i % 3}"} for i in range(size)]
+            statements = []
+
+            def count(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(self.engine, "before_cursor_execute", count)
+            try:
+                self.worker._sync_issues_batch(1, batch, "feature")
+            finally:
+                event.remove(self.engine, "before_cursor_execute", count)
+            return len([s for s in statements if "mdm_identity_mappings" in s or "mdm_identities" in s])
+
+        small = run_batch(1, 3, "guest_a")
+        large = run_batch(100, 30, "guest_b")
+        self.assertEqual(small, large)
+        issue = self.session.query(ZenTaoIssue).filter_by(id=100).first()
+        self.assertIsNotNone(issue.opened_by_user_id)
+        self.assertIsNone(issue.assigned_to_user_id)
+
+    def test_unchanged_issues_are_skipped(self):
+        """载荷指纹未变化的记录整条跳过，不重置转正状态；有变化的记录重写并重置"""
+        from datetime import UTC, datetime
+
+        self.session.add(ZenTaoProduct(id=1, name="Prod 1"))
+        self.session.commit()
+        self.worker.bulk_save_to_staging = MagicMock()
+        batch = [{"id": 1, "title": "S1", "status": "active"}, {"id": 2, "title": "S2", "status": "active"}]
+        self.worker._sync_issues_batch(1, batch, "feature")
+        promoted = datetime(2026, 1, 1, tzinfo=UTC)
+        for issue in self.session.query(ZenTaoIssue).all():
+            issue.promoted_at = promoted
+        self.session.commit()
+
+        self.worker._sync_issues_batch(1, [{"status": "active", "title": "S1", "id": 1}, {"id": 2, "title": "S2", "status": "closed"}], "feature")
+        self.session.commit()
+
+        unchanged, changed = self.session.query(ZenTaoIssue).order_by(ZenTaoIssue.id).all()
+        self.assertIsNotNone(unchanged.promoted_at)
+        self.assertIsNone(changed.promoted_at)
+        self.assertEqual(changed.status, "closed")
+
+        self.worker.skip_unchanged = False
+        self.worker._sync_issues_batch(1, batch[:1], "feature")
+        self.assertIsNone(self.session.get(ZenTaoIssue, (1, "feature")).promoted_at)
+
+    def test_issue_streaming_resumes_from_checkpoint(self):
+        """分批流式同步：失败后保留已提交页码断点，重跑时从下一页继续"""
+        self.session.add(ZenTaoProduct(id=1, name="Prod 1"))
+        self.session.commit()
+        self.worker.BATCH_SIZE = 2
+
+        pages = [
+            (1, [{"id": 1, "title": "S1"}, {"id": 2, "title": "S2"}]),
+            (2, [{"id": 3, "title": "S3"}, {"id": 4, "title": "S4"}]),
+            (3, [{"id": 5, "title": "S5"}]),
+        ]
+
+        def failing_pages(product_id, start_page=1, order=None):
+            for page, items in pages:
+                if page >= start_page:
+                    if page == 2:
+                        raise RuntimeError("connection reset")
+                    yield page, items
+
+        with self.assertRaises(RuntimeError):
+            self.worker._sync_issues_streaming(1, "feature", failing_pages)
+        self.session.rollback()
+        checkpoint = self.worker.get_checkpoint("zentao", 1, "issue_feature")
+        self.assertEqual(checkpoint.cursor, "1")
+        self.assertEqual(checkpoint.processed_count, 2)
+
+        requested = []
+
+        def resumed_pages(product_id, start_page=1, order=None):
+            requested.append(start_page)
+            for page, items in pages:
+                if page >= start_page:
+                    yield page, items
+
+        processed = self.worker._sync_issues_streaming(1, "feature", resumed_pages)
+        self.assertEqual(requested, [2])
+        self.assertEqual(processed, 5)
+        self.assertEqual(self.session.query(ZenTaoIssue).filter_by(type="feature").count(), 5)
+        checkpoint = self.worker.get_checkpoint("zentao", 1, "issue_feature")
+        self.assertIsNone(checkpoint.cursor)
+        self.assertEqual(checkpoint.status, "COMPLETED")
+
+    def test_incremental_issue_sync_stops_at_watermark(self):
+        """增量同步：倒序分页遇到水位之前的整页即终止，并推进水位"""
+        from datetime import datetime
+
+        self.session.add(ZenTaoProduct(id=1, name="Prod 1"))
+        self.session.commit()
+        pages = [
+            (1, [{"id": 3, "title": "S3", "lastEditedDate": "2024-05-03 10:00:00"}, {"id": 2, "title": "S2", "lastEditedDate": "2024-05-02 10:00:00"}]),
+            (2, [{"id": 1, "title": "S1", "lastEditedDate": "2024-04-01 10:00:00"}]),
+            (3, [{"id": 0, "title": "S0", "lastEditedDate": "2024-03-01 10:00:00"}]),
+        ]
+        requested = []
+
+        def sorted_pages(product_id, start_page=1, order=None):
+            self.assertEqual(order, "lastEditedDate_desc")
+            for page, items in pages:
+                requested.append(page)
+                yield page, items
+
+        processed = self.worker._sync_issues_streaming(1, "feature", sorted_pages, since=datetime(2024, 5, 1))
+        self.assertEqual(processed, 2)
+        self.assertEqual(requested, [1, 2])
+        self.assertEqual(sorted(i.id for i in self.session.query(ZenTaoIssue).all()), [2, 3])
+        checkpoint = self.worker.get_checkpoint("zentao", 1, "issue_feature")
+        self.assertEqual(checkpoint.watermark.replace(tzinfo=None), datetime(2024, 5, 3, 10))
+
+    def test_incremental_task_skips_unchanged_entities(self):
+        """增量任务：跳过已关闭且无变更的执行，以及无变更用例的结果拉取；组织与用户照常刷新"""
+        from datetime import datetime
+
+        from devops_collector.plugins.zentao.models import ZenTaoExecution
+
+        self.session.add(ZenTaoProduct(id=1, name="Prod 1"))
+        self.session.add(ZenTaoExecution(id=10, product_id=1, name="Closed", status="closed", raw_data={"lastEditedDate": "2024-01-05 00:00:00"}))
+        self.session.add(ZenTaoExecution(id=11, product_id=1, name="Doing", status="doing", raw_data={}))
+        self.session.commit()
+        for entity_type in ("execution", "test_case", "task"):
+            self.worker.complete_checkpoint("zentao", 1, entity_type, watermark=datetime(2024, 3, 1))
+        self.session.commit()
+
+        for name in ("get_plans", "get_programs", "get_projects", "get_executions", "get_releases", "get_actions", "get_builds", "get_tasks"):
+            getattr(self.mock_client, name).return_value = []
+        self.mock_client.iter_stories.return_value = iter([])
+        self.mock_client.iter_bugs.return_value = iter([])
+        self.mock_client.get_test_cases.return_value = [
+            {"id": 7, "title": "Old case", "openedDate": "2024-01-02 00:00:00", "lastRunDate": "2024-02-01 00:00:00"},
+            {"id": 8, "title": "Re-run case", "openedDate": "2024-01-02 00:00:00", "lastRunDate": "2024-03-02 00:00:00"},
+        ]
+        self.mock_client.get_test_results.return_value = []
+
+        self.worker.process_task({"product_id": 1, "job_type": "incremental"})
+
+        self.mock_client.get_departments.assert_called_once()
+        self.mock_client.get_users.assert_called_once()
+        self.mock_client.get_builds.assert_called_once_with(11)
+        self.mock_client.get_test_results.assert_called_once_with(8)
+        checkpoint = self.worker.get_checkpoint("zentao", 1, "test_case")
+        self.assertEqual(checkpoint.watermark.replace(tzinfo=None), datetime(2024, 3, 2))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -39,12 +39,18 @@ async def test_get_aggregated_requirements_service_logic():
     mock_issue.status = "active"
     mock_issue.type = "story"
 
-    # 6. Mock Traceability Links
+    # 6. Mock Traceability Links (requirement -> artefact reference index)
     link_mr = MagicMock()
+    link_mr.source_id = "5001"
     link_mr.target_type = "merge_request"
     link_mr.target_id = "123"
 
-    # 7. Mock GTMTestCase (New)
+    link_case = MagicMock()
+    link_case.source_id = "5001"
+    link_case.target_type = "test_case"
+    link_case.target_id = "701"
+
+    # 7. Mock GTMTestCase (resolved from the index)
     mock_case = MagicMock()
     mock_case.id = 701
     mock_case.iid = 1
@@ -64,8 +70,7 @@ async def test_get_aggregated_requirements_service_logic():
     # 3. ZenTaoProduct (filter by gitlab_project_id)
     # 4. ZenTaoProduct (filter by code)
     # 5. ZenTaoIssue (filter by product_id list)
-    # 6. GTMTestCase (filter by project_id list) -> New call added
-    # 7. TraceabilityLink (filter by source_id)
+    # 6. TraceabilityLink (one bulk query for all requirement ids)
 
     filter_mock.all.side_effect = [
         [mock_relation],  # 1
@@ -73,9 +78,10 @@ async def test_get_aggregated_requirements_service_logic():
         [mock_zp_git],  # 3
         [mock_zp_code],  # 4
         [mock_issue],  # 5
-        [mock_case],  # 6 (Found Test Cases)
-        [link_mr],  # 7 (Links for Issue 5001)
+        [link_mr, link_case],  # 6 (Links for all requirements)
     ]
+    # 7. GTMTestCase (bulk load of indexed cases with eager options)
+    filter_mock.options.return_value.all.return_value = [mock_case]
 
     # --- Execute ---
     results = await service.get_aggregated_requirements(mock_db, MagicMock(), product_id=product_id)
@@ -85,7 +91,7 @@ async def test_get_aggregated_requirements_service_logic():
     item = results[0]
 
     # Check Traceability logic
-    # Test Case should be linked because title contains "#5001"
+    # Test Case should be linked through the reference index
     assert len(item.test_cases) == 1
     assert item.test_cases[0].title == "Verify User Login #5001"
 
@@ -0,0 +1,102 @@
+"""单元测试：审计监听引擎
+
+验证审计记录按事务暂存、提交时一次写入，回滚 (含保存点) 时丢弃，以及字段级 Diff 内容。
+"""
+
+import uuid
+from datetime import UTC, datetime
+from unittest.mock import patch
+
+from sqlalchemy import select
+
+from devops_collector.models import audit_events
+from devops_collector.models.audit import AuditLog
+from devops_collector.models.base_models import Product, User
+
+
+def _user(employee_id: str) -> User:
+    return User(global_user_id=uuid.uuid4(), employee_id=employee_id, full_name=employee_id, primary_email=f"{employee_id}@example.com")
+
+
+def _audit_rows(session):
+    return session.execute(select(AuditLog.action, AuditLog.resource_id, AuditLog.changes).order_by(AuditLog.id)).all()
+
+
+def test_events_are_written_once_at_commit(db_session):
+    """多次 flush 产生的审计记录在提交前不落库，提交时以一次批量写入。"""
+    users = [_user(f"E{i}") for i in range(3)]
+    db_session.add_all(users)
+    db_session.flush()
+    users[0].full_name = "renamed"
+    db_session.flush()
+    db_session.delete(users[2])
+    db_session.flush()
+    assert _audit_rows(db_session) == []
+
+    with patch.object(audit_events, "_write_audit_logs", wraps=audit_events._write_audit_logs) as write:
+        db_session.commit()
+
+    write.assert_called_once()
+    assert [payload["action"] for payload in write.call_args.args[1]] == ["CREATE", "CREATE", "CREATE", "UPDATE", "DELETE"]
+    rows = _audit_rows(db_session)
+    assert len(rows) == 5
+    assert rows[3].resource_id == str(users[0].global_user_id)
+    assert rows[3].changes == {"full_name": {"old": "E0", "new": "renamed"}}
+
+
+def test_pending_changes_flushed_by_commit_are_audited(db_session):
+    """提交时才 flush 的变更同样产生审计记录，Diff 中的时间按 ISO 格式保存。"""
+    user = _user("E1")
+    db_session.add(user)
+    db_session.commit()
+
+    user.updated_at = datetime(2026, 1, 1, tzinfo=UTC)
+    db_session.commit()
+
+    changes = _audit_rows(db_session)[-1].changes
+    assert changes["updated_at"]["new"] == "2026-01-01T00:00:00+00:00"
+
+
+def test_json_column_changes_keep_their_structure(db_session):
+    """JSON 列的变更按原结构 (而非字符串) 记录。"""
+    product = Product(product_code="AUDIT-JSON", product_name="p", product_description="p", version_schema="SemVer", specification={"cpu": 2})
+    db_session.add(product)
+    db_session.commit()
+    assert product.specification == {"cpu": 2}
+
+    product.specification = {"cpu": 4, "tags": ["a", "b"], "limits": {"memory": "4Gi"}}
+    db_session.commit()
+
+    changes = _audit_rows(db_session)[-1].changes
+    assert changes["specification"] == {"old": {"cpu": 2}, "new": {"cpu": 4, "tags": ["a", "b"], "limits": {"memory": "4Gi"}}}
+
+
+def test_rollback_discards_buffered_events(db_session):
+    """事务回滚丢弃全部暂存记录，保存点回滚只丢弃保存点内的记录。"""
+    db_session.add(_user("E1"))
+    db_session.flush()
+    db_session.rollback()
+
+    kept = _user("E2")
+    db_session.add(kept)
+    db_session.flush()
+    savepoint = db_session.begin_nested()
+    db_session.add(_user("E3"))
+    db_session.flush()
+    savepoint.rollback()
+    db_session.commit()
+
+    assert [(row.action, row.resource_id) for row in _audit_rows(db_session)] == [("CREATE", str(kept.global_user_id))]
+
+
+def test_sensitive_fields_are_masked():
+    """敏感字段只记录掩码。"""
+    with patch.object(audit_events, "inspect") as mock_inspect:
+        ins = mock_inspect.return_value
+        ins.unmodified = set()
+        ins.mapper.column_attrs = [type("Prop", (), {"key": "password"})()]
+        ins.attrs["password"].history.has_changes.return_value = True
+        ins.attrs["password"].history.deleted = ["old-secret"]
+        ins.attrs["password"].history.added = ["new-secret"]
+
+        assert audit_events.resolve_diffs(object()) == {"password": {"old": "********", "new": "********"}}
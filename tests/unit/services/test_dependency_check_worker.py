@@ -2,10 +2,33 @@
 OWASP Dependency-Check Worker 单元测试
 """
 
+import io
+import json
+import os
+import tempfile
 import unittest
 from unittest.mock import MagicMock
 
-from devops_collector.plugins.dependency_check.worker import DependencyCheckWorker
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from devops_collector.models.base_models import Base
+from devops_collector.models.dependency import CVECatalog, Dependency, DependencyCVE, DependencyScan
+from devops_collector.plugins.dependency_check.worker import DependencyCheckWorker, _stream_report
+from devops_collector.plugins.gitlab.models import GitLabProject
+
+
+def _report(n=3):
+    dependencies = [
+        {
+            "fileName": f"lib-{i}-1.0.{i}.jar",
+            "filePath": f"/app/lib/lib-{i}-1.0.{i}.jar",
+            "license": "MIT License",
+            "vulnerabilities": [{"name": f"CVE-2024-{i:04d}", "severity": "HIGH", "cvssv3": {"baseScore": 7.5}}] if i % 2 == 0 else [],
+        }
+        for i in range(n)
+    ]
+    return {"reportSchema": "1.1", "scanInfo": {"engineVersion": "9.0.0"}, "dependencies": dependencies, "projectInfo": {"name": "app"}}
 
 
 class TestDependencyCheckWorker(unittest.TestCase):
@@ -132,6 +155,85 @@ class TestDependencyCheckWorker(unittest.TestCase):
         self.assertIsNone(self.worker._extract_cvss_score(vuln_none))
 
 
+class TestDependencyCheckStreaming(unittest.TestCase):
+    """测试报告流式解析与批量写入"""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite:///:memory:")
+        Base.metadata.create_all(self.engine)
+        self.session = sessionmaker(bind=self.engine)()
+        self.session.add(GitLabProject(id=1, name="app", path_with_namespace="team/app"))
+        self.session.commit()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.worker = DependencyCheckWorker(self.session, None, report_dir=self.tmpdir.name)
+
+    def tearDown(self):
+        self.session.close()
+        self.tmpdir.cleanup()
+
+    def test_stream_report_matches_json_load_across_chunk_boundaries(self):
+        """测试小缓冲区下逐个产出依赖，且报告头与 json.load 结果一致"""
+        report = _report(5)
+        header = {}
+        items = list(_stream_report(io.StringIO(json.dumps(report, indent=2)), header, chunk_size=7))
+        self.assertEqual(items, report["dependencies"])
+        self.assertEqual(header, {"reportSchema": "1.1", "scanInfo": {"engineVersion": "9.0.0"}, "projectInfo": {"name": "app"}})
+
+    def test_process_report_file_bulk_inserts_dependencies_and_cves(self):
+        """测试文件报告分批写入依赖与 CVE，重复依赖只保留一条"""
+        report = _report(5)
+        report["dependencies"].append(dict(report["dependencies"][0]))
+        path = os.path.join(self.tmpdir.name, "report.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        self.worker.BATCH_SIZE = 2
+
+        scan_id = self.worker.process_task({"project_id": 1, "report_path": path})
+
+        scan = self.session.get(DependencyScan, scan_id)
+        self.assertEqual(scan.scan_status, "completed")
+        self.assertEqual(scan.scanner_version, "1.1")
+        self.assertNotIn("dependencies", scan.raw_json)
+        self.assertEqual((scan.total_dependencies, scan.vulnerable_dependencies), (5, 3))
+        self.assertEqual(self.session.query(Dependency).filter_by(scan_id=scan_id).count(), 5)
+        cves = {c.cve_id: c.dependency.package_name for c in self.session.query(DependencyCVE).all()}
+        self.assertEqual(cves, {"CVE-2024-0000": "lib-0-1.0.0.jar", "CVE-2024-0002": "lib-2-1.0.2.jar", "CVE-2024-0004": "lib-4-1.0.4.jar"})
+
+    def test_cve_catalog_is_shared_across_scans(self):
+        """测试重复扫描共享 CVE 知识库，仅在内容变化时更新条目"""
+        report = _report(3)
+        report["dependencies"][0]["vulnerabilities"][0]["description"] = "old"
+        self.worker.process_task({"project_id": 1, "report_json": report})
+        report["dependencies"][0]["vulnerabilities"][0]["description"] = "new"
+        DependencyCheckWorker(self.session, None, report_dir=self.tmpdir.name).process_task({"project_id": 1, "report_json": report})
+
+        self.assertEqual(self.session.query(DependencyCVE).count(), 4)
+        self.assertEqual(self.session.query(CVECatalog).count(), 2)
+        catalog = self.session.get(CVECatalog, "CVE-2024-0000")
+        self.assertEqual(catalog.description, "new")
+        self.assertEqual(catalog.cvss_score, 7.5)
+        cve = self.session.query(DependencyCVE).filter_by(cve_id="CVE-2024-0000").first()
+        self.assertIsNone(cve.description)
+        self.assertEqual(cve.catalog.description, "new")
+
+    def test_cleanup_old_reports_measures_and_removes_expired_scans(self):
+        """测试过期扫描目录按实际大小统计并删除，未过期目录保留"""
+        old_scan = os.path.join(self.tmpdir.name, "app", "scan-1")
+        new_scan = os.path.join(self.tmpdir.name, "app", "scan-2")
+        os.makedirs(os.path.join(old_scan, "nested"))
+        os.makedirs(new_scan)
+        for path, size in ((os.path.join(old_scan, "report.json"), 1024 * 1024), (os.path.join(old_scan, "nested", "report.html"), 1024 * 1024)):
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+        os.utime(old_scan, (0, 0))
+
+        self.assertEqual(self.worker.cleanup_old_reports(dry_run=True), {"deleted_count": 1, "freed_space_mb": 2.0})
+        self.assertTrue(os.path.isdir(old_scan))
+        self.assertEqual(self.worker.cleanup_old_reports(), {"deleted_count": 1, "freed_space_mb": 2.0})
+        self.assertFalse(os.path.exists(old_scan))
+        self.assertTrue(os.path.isdir(new_scan))
+
+
 # Helper context managers for patching methods on the instance
 from contextlib import contextmanager
 
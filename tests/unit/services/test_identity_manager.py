@@ -95,5 +95,30 @@ class TestIdentityManager(unittest.TestCase):
         self.assertEqual(user.primary_email, "u1@ex.com")
 
 
+    def test_resolve_users_bulk(self):
+        """测试批量解析：命中映射的账号返回用户，未知账号登记为 PENDING 映射。"""
+        import uuid
+
+        from devops_collector.models.base_models import User
+
+        IdentityManager._local_cache.clear()
+        user = User(global_user_id=uuid.uuid4(), primary_email="bulk@ex.com", full_name="Bulk", is_current=True)
+        self.session.add(user)
+        self.session.add(IdentityMapping(source_system="zentao", external_user_id="known", global_user_id=user.global_user_id))
+        self.session.commit()
+
+        users = IdentityManager.resolve_users(self.session, "zentao", ["known", "known", "ghost", None, ""])
+        self.assertEqual(set(users), {"known"})
+        self.assertEqual(users["known"].global_user_id, user.global_user_id)
+        pending = self.session.query(IdentityMapping).filter_by(source_system="zentao", external_user_id="ghost").one()
+        self.assertEqual(pending.mapping_status, "PENDING")
+        self.assertIsNone(pending.global_user_id)
+
+        # 二次解析走缓存，且不会重复登记映射
+        again = IdentityManager.resolve_users(self.session, "zentao", ["known", "ghost"])
+        self.assertEqual(again["known"].global_user_id, user.global_user_id)
+        self.assertEqual(self.session.query(IdentityMapping).filter_by(source_system="zentao").count(), 2)
+
+
 if __name__ == "__main__":
     unittest.main()